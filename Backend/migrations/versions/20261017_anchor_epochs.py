@@ -0,0 +1,43 @@
+"""Add anchor_epochs on-chain anchoring epochs
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the anchor_epochs table."""
+
+    op.create_table(
+        'anchor_epochs',
+        sa.Column('epoch', sa.BigInteger, primary_key=True, autoincrement=False),
+        sa.Column('root_of_roots', sa.String(64), nullable=False),
+        sa.Column('members', postgresql.JSONB, nullable=False),
+        sa.Column('status', sa.String(16), nullable=False),
+        sa.Column('tx_hash', sa.String(66), nullable=True),
+        sa.Column('replaced_tx_hashes', postgresql.JSONB, nullable=False, server_default='[]'),
+        sa.Column('nonce', sa.BigInteger, nullable=True),
+        sa.Column('fee_bumps', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('block_number', sa.BigInteger, nullable=True),
+        sa.Column('gas_used', sa.BigInteger, nullable=True),
+        sa.Column('error', sa.Text, nullable=True),
+        sa.Column('sealed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('confirmed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Drop the anchor_epochs table."""
+    op.drop_table('anchor_epochs')
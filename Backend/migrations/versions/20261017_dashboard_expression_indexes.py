@@ -0,0 +1,51 @@
+"""Expression indexes for dashboard aggregates on honeypot_logs
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match IS_MALICIOUS_SQL / ATTACK_TYPE_SQL in src/core/models_sqlalchemy.py
+IS_MALICIOUS_SQL = "(metadata -> 'classification' ->> 'is_malicious')"
+ATTACK_TYPE_SQL = "(metadata -> 'classification' ->> 'attack_type')"
+
+
+def upgrade() -> None:
+    """Create the classification expression indexes without locking writes."""
+    
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_honeypot_logs_is_malicious', 'honeypot_logs',
+            [sa.text(IS_MALICIOUS_SQL)],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_honeypot_logs_attack_type', 'honeypot_logs',
+            [sa.text(ATTACK_TYPE_SQL)],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_honeypot_logs_malicious_ip_timestamp', 'honeypot_logs',
+            ['attacker_ip', 'timestamp'],
+            postgresql_where=sa.text(f"{IS_MALICIOUS_SQL} = 'true'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the classification expression indexes."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_honeypot_logs_malicious_ip_timestamp', table_name='honeypot_logs', postgresql_concurrently=True)
+        op.drop_index('ix_honeypot_logs_attack_type', table_name='honeypot_logs', postgresql_concurrently=True)
+        op.drop_index('ix_honeypot_logs_is_malicious', table_name='honeypot_logs', postgresql_concurrently=True)
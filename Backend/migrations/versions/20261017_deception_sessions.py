@@ -0,0 +1,37 @@
+"""Add deception_sessions for spilled LLM command histories
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the deception_sessions table."""
+    
+    op.create_table(
+        'deception_sessions',
+        sa.Column('ip_address', sa.String(45), primary_key=True),
+        sa.Column('commands', postgresql.JSONB, nullable=False),
+        sa.Column('last_seen', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    
+    op.create_index('ix_deception_sessions_last_seen', 'deception_sessions', ['last_seen'])
+
+
+def downgrade() -> None:
+    """Drop the deception_sessions table."""
+    op.drop_index('ix_deception_sessions_last_seen', table_name='deception_sessions')
+    op.drop_table('deception_sessions')
@@ -0,0 +1,45 @@
+"""Add integrity_checkpoints signed chain checkpoints
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the integrity_checkpoints table."""
+    
+    op.create_table(
+        'integrity_checkpoints',
+        sa.Column('id', sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column('stream', sa.String(64), nullable=False),
+        sa.Column('entry_count', sa.BigInteger, nullable=False),
+        sa.Column('head_hash', sa.String(64), nullable=True),
+        sa.Column('frontier', postgresql.JSONB, nullable=False),
+        sa.Column('merkle_root', sa.String(64), nullable=True),
+        sa.Column('cursor', sa.Text, nullable=True),
+        sa.Column('signature', sa.String(64), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    
+    op.create_index(
+        'ix_integrity_checkpoints_stream_count', 'integrity_checkpoints',
+        ['stream', 'entry_count'],
+    )
+
+
+def downgrade() -> None:
+    """Drop the integrity_checkpoints table."""
+    op.drop_index('ix_integrity_checkpoints_stream_count', table_name='integrity_checkpoints')
+    op.drop_table('integrity_checkpoints')
@@ -0,0 +1,47 @@
+"""Add honeypot_logs.inserted_at for insertion-ordered exports
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:00.000000
+
+Existing rows take the time of the migration (``now()`` is evaluated
+once, so the column is added without rewriting the table).  The first
+``since_cursor`` STIX pull after upgrading therefore re-sends them once,
+with the same deterministic ids.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add inserted_at and its export index without locking writes for the build."""
+
+    op.add_column(
+        'honeypot_logs',
+        sa.Column(
+            'inserted_at', sa.DateTime(timezone=True),
+            server_default=sa.text('now()'), nullable=False,
+            comment='When the row was inserted',
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_honeypot_logs_tenant_inserted_at', 'honeypot_logs',
+            ['tenant_id', 'inserted_at', 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop inserted_at and its index."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_honeypot_logs_tenant_inserted_at', table_name='honeypot_logs', postgresql_concurrently=True)
+    op.drop_column('honeypot_logs', 'inserted_at')
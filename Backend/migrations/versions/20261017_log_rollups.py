@@ -0,0 +1,51 @@
+"""Add log_rollups minute/hour dashboard buckets
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 00:00:00.000000
+
+After upgrading, populate the buckets from existing logs with
+``python scripts/backfill_rollups.py``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the log_rollups table."""
+    
+    op.create_table(
+        'log_rollups',
+        sa.Column('granularity', sa.String(8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('dimension', sa.String(16), nullable=False),
+        sa.Column('key', sa.Text, nullable=False),
+        sa.Column('sub_key', sa.Text, server_default='', nullable=False),
+        sa.Column('is_malicious', sa.Boolean, nullable=False),
+        sa.Column('count', sa.BigInteger, nullable=False),
+        sa.Column('last_seen', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('latitude', sa.Float, nullable=True),
+        sa.Column('longitude', sa.Float, nullable=True),
+        sa.PrimaryKeyConstraint(
+            'granularity', 'bucket_start', 'dimension', 'key', 'sub_key', 'is_malicious'
+        ),
+    )
+    
+    op.create_index(
+        'ix_log_rollups_dimension_bucket', 'log_rollups',
+        ['granularity', 'dimension', 'bucket_start'],
+    )
+
+
+def downgrade() -> None:
+    """Drop the log_rollups table."""
+    op.drop_index('ix_log_rollups_dimension_bucket', table_name='log_rollups')
+    op.drop_table('log_rollups')
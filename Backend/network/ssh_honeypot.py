@@ -1,4 +1,3 @@
-import asyncio
 import socket
 import logging
 import threading
@@ -14,6 +13,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.core.config import settings
+from src.utils.http_clients import http_clients
 
 # Configure logging
 logging.basicConfig(
@@ -63,10 +63,13 @@ class HoneypotInterface(paramiko.ServerInterface):
         return 'password'
 
 
-async def forward_command_to_brain(ip_address: str, command: str) -> str:
+def forward_command_to_brain(ip_address: str, command: str) -> str:
     """
     Forwards the raw shell command to the central FastAPI /trap/execute endpoint.
     Returns the deceptive output generated by the BiLSTM/LLM.
+
+    Runs on the per-connection paramiko thread using the shared, thread-safe
+    keep-alive pool, so every session reuses the same upstream connections.
     """
     payload = {
         "command": command,
@@ -74,11 +77,11 @@ async def forward_command_to_brain(ip_address: str, command: str) -> str:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(FASTAPI_TRAP_URL, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("response", "")
+        client = http_clients.get_sync_client(FASTAPI_TRAP_URL)
+        response = client.post(FASTAPI_TRAP_URL, json=payload, timeout=30.0)
+        response.raise_for_status()
+        data = response.json()
+        return data.get("response", "")
     except httpx.ConnectError:
         logger.error(f"Failed to connect to central brain at {FASTAPI_TRAP_URL}. Is FastAPI running?")
         return "bash: connection closed by remote host\r\n"
@@ -163,18 +166,9 @@ def handle_connection(client_socket, client_address):
                         break
                     
                     if cmd:
-                        # Sync to Async bridge to call the FastAPI endpoint
+                        # Blocking call on this connection's thread (pooled client)
                         logger.info(f"[{client_ip}] Executing: {cmd}")
-                        
-                        try:
-                            loop = asyncio.get_event_loop()
-                        except RuntimeError:
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            
-                        response_text = loop.run_until_complete(
-                            forward_command_to_brain(client_ip, cmd)
-                        )
+                        response_text = forward_command_to_brain(client_ip, cmd)
                         
                         # Ensure newlines form properly in the terminal
                         if response_text:
@@ -0,0 +1,95 @@
+"""
+Benchmark + parity check for the compiled heuristic engine.
+
+Replays every payload in a dataset through both the compiled single-scan
+engine and the sequential ``re.search`` reference, fails on any verdict
+mismatch, and reports throughput for each.
+
+Run:  python scripts/benchmark_heuristic_engine.py
+      python scripts/benchmark_heuristic_engine.py --dataset data/augmented_dataset.csv
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.ml_engine.heuristic_engine import heuristic_engine
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_DATASET = REPO_ROOT / "final_dataset.csv"
+
+# Same column conventions as the training scripts
+PAYLOAD_COLUMNS = ["command_sequence", "Sentence", "sentence", "query", "command", "payload"]
+
+
+def load_payloads(path: Path) -> list[str]:
+    """Read the payload column of a CSV dataset."""
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        head = f.read(64)
+        if head.startswith("version https://git-lfs"):
+            raise SystemExit(
+                f"{path} is a Git LFS pointer — run `git lfs pull` first "
+                f"or pass --dataset <csv>."
+            )
+        f.seek(0)
+
+        csv.field_size_limit(sys.maxsize)
+        reader = csv.DictReader(f)
+        column = next((c for c in PAYLOAD_COLUMNS if c in (reader.fieldnames or [])), None)
+        if column is None:
+            raise SystemExit(f"No payload column found in {path} (columns: {reader.fieldnames})")
+
+        return [row[column] for row in reader if row.get(column) is not None]
+
+
+def timed(fn, payloads: list[str], repeat: int) -> tuple[list, float]:
+    """Run ``fn`` over all payloads ``repeat`` times; return results and best time."""
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(p) for p in payloads]
+        best = min(best, time.perf_counter() - start)
+    return results, best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dataset", type=Path, default=DEFAULT_DATASET)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.dataset)
+    print(f"Loaded {len(payloads):,} payloads from {args.dataset}")
+
+    expected, seq_time = timed(heuristic_engine.classify_sequential, payloads, args.repeat)
+    actual, engine_time = timed(heuristic_engine.classify, payloads, args.repeat)
+
+    mismatches = [
+        (payload, exp, got)
+        for payload, exp, got in zip(payloads, expected, actual)
+        if exp != got
+    ]
+
+    n = len(payloads) or 1
+    print(f"  sequential re.search : {seq_time:8.3f}s  ({seq_time / n * 1e6:8.1f} µs/payload)")
+    print(f"  compiled single-scan : {engine_time:8.3f}s  ({engine_time / n * 1e6:8.1f} µs/payload)")
+    if engine_time > 0:
+        print(f"  speed-up             : {seq_time / engine_time:8.2f}x")
+
+    if mismatches:
+        print(f"PARITY FAILURE: {len(mismatches)} mismatching verdicts")
+        for payload, exp, got in mismatches[:20]:
+            print(f"  {payload[:80]!r}: expected {exp}, got {got}")
+        return 1
+
+    print(f"Parity OK: {len(payloads):,}/{len(payloads):,} identical verdicts")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
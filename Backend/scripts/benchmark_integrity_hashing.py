@@ -0,0 +1,112 @@
+"""
+Benchmark + parity check for Merkle leaf hashing.
+
+Generates synthetic ``HoneypotLog.to_dict()`` entries and hashes them with
+the reference copy-and-sort encoding, the single-pass canonical encoder,
+and the chunked process-pool path; fails on any hash mismatch and
+reports throughput for each.
+
+Run:  python scripts/benchmark_integrity_hashing.py
+      python scripts/benchmark_integrity_hashing.py --count 200000 --workers 4
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.integrity import (
+    PARALLEL_CHUNK_SIZE,
+    _canonical_log_json_reference,
+    hash_log_entries,
+    hash_log_entry,
+)
+
+ATTACK_TYPES = ["SQLI", "XSS", "SSI", "BENIGN"]
+COMMANDS = ["' OR 1=1 --", "<script>alert(1)</script>", "<!--#exec cmd=\"id\"-->", "ls -la", "admin"]
+
+
+def synthetic_logs(count: int, seed: int = 7) -> list[dict]:
+    """``count`` log dicts shaped like ``HoneypotLog.to_dict()``."""
+    rng = random.Random(seed)
+    tenant_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    logs = []
+    for i in range(count):
+        attack_type = rng.choice(ATTACK_TYPES)
+        logs.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "tenant_id": tenant_id,
+            "attacker_ip": f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}",
+            "command_entered": rng.choice(COMMANDS),
+            "response_sent": "Invalid credentials",
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            "metadata": {
+                "classification": {
+                    "is_malicious": attack_type != "BENIGN",
+                    "attack_type": attack_type,
+                    "confidence": round(rng.random(), 4),
+                },
+                "user_agent": "Mozilla/5.0",
+                "path": "/api/trap/submit",
+            },
+        })
+    return logs
+
+
+def reference_hash(entry: dict) -> str:
+    """The pre-fast-path ``hash_log_entry``."""
+    return hashlib.sha256(_canonical_log_json_reference(entry).encode("utf-8")).hexdigest()
+
+
+def timed(label: str, fn, n: int) -> tuple[list[str], float]:
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28}: {elapsed:8.3f}s  ({elapsed / (n or 1) * 1e6:6.2f} µs/log)")
+    return result, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=PARALLEL_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logs = synthetic_logs(args.count)
+    print(f"Generated {len(logs):,} synthetic logs")
+
+    n = len(logs)
+    expected, ref_time = timed("reference (copy + sort)", lambda: [reference_hash(e) for e in logs], n)
+    serial, fast_time = timed("single-pass encoder", lambda: [hash_log_entry(e) for e in logs], n)
+    parallel, pool_time = timed(
+        "chunked process pool",
+        lambda: hash_log_entries(logs, workers=args.workers, chunk_size=args.chunk_size, parallel_threshold=0),
+        n,
+    )
+    if fast_time > 0 and pool_time > 0:
+        print(f"  speed-up (serial / pool)    : {ref_time / fast_time:6.2f}x / {ref_time / pool_time:6.2f}x")
+
+    mismatches = [
+        i for i, (exp, a, b) in enumerate(zip(expected, serial, parallel))
+        if not exp == a == b
+    ]
+    if mismatches or not len(expected) == len(serial) == len(parallel):
+        print(f"PARITY FAILURE: {len(mismatches)} mismatching hashes")
+        for i in mismatches[:20]:
+            print(f"  #{i}: {expected[i]} / {serial[i]} / {parallel[i]}")
+        return 1
+
+    print(f"Parity OK: {n:,}/{n:,} identical hashes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
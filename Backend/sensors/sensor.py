@@ -3,8 +3,10 @@ import logging
 import json
 import httpx
 import asyncio
+import importlib.util
 import os
 import argparse
+from typing import Optional
 
 # Configure basic logging for the sensor
 logging.basicConfig(
@@ -20,6 +22,30 @@ CENTRAL_BRAIN_URL = os.getenv("CHAMELEON_BRAIN_URL", "http://127.0.0.1:8000/trap
 BIND_HOST = os.getenv("BIND_HOST", "0.0.0.0")
 BIND_PORT = int(os.getenv("BIND_PORT", "9999"))
 
+# Outbound pool to the brain (kept alive across attacker payloads).
+# The sensor deliberately does not import src/, so it keeps its own
+# single pooled client instead of the backend's http_clients registry.
+BRAIN_MAX_CONNECTIONS = int(os.getenv("BRAIN_MAX_CONNECTIONS", "20"))
+BRAIN_TIMEOUT = float(os.getenv("BRAIN_TIMEOUT", "10.0"))
+
+_brain_client: Optional[httpx.AsyncClient] = None
+
+
+def get_brain_client() -> httpx.AsyncClient:
+    """Lazily create the shared keep-alive client for the central brain."""
+    global _brain_client
+    if _brain_client is None or _brain_client.is_closed:
+        _brain_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(BRAIN_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=BRAIN_MAX_CONNECTIONS,
+                max_keepalive_connections=BRAIN_MAX_CONNECTIONS // 2 or 1,
+                keepalive_expiry=30.0,
+            ),
+            http2=importlib.util.find_spec("h2") is not None,
+        )
+    return _brain_client
+
 async def forward_payload(ip_address: str, raw_payload: str):
     """
     Forwards raw bytes (decoded to string) to the central brain's API.
@@ -30,11 +56,10 @@ async def forward_payload(ip_address: str, raw_payload: str):
     }
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(CENTRAL_BRAIN_URL, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("response", "")
+        response = await get_brain_client().post(CENTRAL_BRAIN_URL, json=payload)
+        response.raise_for_status()
+        data = response.json()
+        return data.get("response", "")
     except httpx.ConnectError:
         logger.error(f"Cannot reach central brain at {CENTRAL_BRAIN_URL}.")
         return "Connection refused.\r\n"
@@ -102,8 +127,12 @@ async def start_sensor():
     logger.info(f"✅ Distributed Sensor Node listening on {addr}")
     logger.info(f"   Forwarding traffic to: {CENTRAL_BRAIN_URL}")
     
-    async with server:
-        await server.serve_forever()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if _brain_client is not None:
+            await _brain_client.aclose()
 
 
 if __name__ == "__main__":
@@ -1,116 +1,273 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from typing import Dict, Any, List
+"""
+STIX 2.1 export for SIEM ingestion.
+
+``GET /api/export/stix`` streams a STIX 2.1 bundle built incrementally
+from a server-side cursor over ``honeypot_logs`` (in insertion order), so an
+export of millions of objects runs in flat memory.
+
+Object IDs are deterministic ``uuid5`` values:
+  - one ``indicator`` per attacker IP
+  - one ``attack-pattern`` per attack type (+ an ``indicates`` relationship
+    from each IP's indicator)
+  - one ``sighting`` per log
+so re-exporting the same logs yields the same IDs and SIEMs de-duplicate
+instead of piling up copies.
+
+STIX treats ``created`` as immutable per id, and the shared objects
+(identity, indicator, attack-pattern, relationship) are re-emitted by
+every export that touches them.  Their ``created`` (and the indicator's
+``valid_from``) is therefore the fixed ``STIX_CREATED`` epoch; only
+``modified`` moves, to the time of the log that emitted them.
+
+Incremental pulls: logs are exported in the order they were inserted
+(``inserted_at``, set by PostgreSQL), not by their ``timestamp`` — the
+write-behind log writer inserts a log up to a flush interval after it
+happened, and a replayed spill file hours later.  The bundle ends with
+``x_chameleon_next_cursor``; passing it back as ``?since_cursor=``
+returns only logs inserted after the last exported one.  Logs inserted
+in the last ``STIX_EXPORT_SETTLE_SECONDS`` are left for the next pull,
+so a transaction still committing when the cursor was issued cannot
+end up behind it.  ``?since=`` / ``?until=`` restrict the time range.
+"""
+
+import json
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
-# Adjust imports to your structure
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database_postgres import get_db, get_default_tenant
-from src.core.models_sqlalchemy import HoneypotLog
+from src.core.database_postgres import (
+    db,
+    decode_log_cursor,
+    encode_log_cursor,
+    get_db,
+    get_default_tenant,
+    stream_honeypot_logs,
+)
 from src.api.auth import verify_token
+from src.core.config import settings
+from src.utils.bounded_cache import LRUTTLCache
 
 stix_router = APIRouter()
 
-def create_stix_bundle(logs: List[HoneypotLog]) -> Dict[str, Any]:
+STIX_MEDIA_TYPE = "application/stix+json;version=2.1"
+
+# Namespace for every deterministic Chameleon STIX id
+STIX_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "chameleon.honeypot/stix")
+IDENTITY_ID = f"identity--{uuid.uuid5(uuid.NAMESPACE_URL, 'chameleon.honeypot')}"
+
+# ``created`` of every object whose id is shared across exports
+STIX_CREATED = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Objects serialised per chunk written to the response
+CHUNK_OBJECTS = 200
+
+
+def stix_timestamp(value: datetime) -> str:
+    """RFC 3339 UTC timestamp with millisecond precision (``...T12:00:00.000Z``)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+def stix_id(object_type: str, name: str) -> str:
+    """Deterministic ``<type>--<uuid5>`` id for ``name``."""
+    return f"{object_type}--{uuid.uuid5(STIX_NAMESPACE, f'{object_type}:{name}')}"
+
+
+class StixBundleBuilder:
     """
-    Converts a list of HoneypotLog objects into a STIX 2.1 Bundle.
+    Turns log rows into STIX objects, emitting each indicator,
+    attack-pattern and relationship only once per export.
+
+    The "already emitted" set is a bounded LRU; if a very long export
+    evicts an IP its indicator is re-emitted with the same id, which
+    consumers treat as a duplicate.
+
+    Args:
+        dedupe_capacity: Max shared-object ids remembered per export.
     """
-    objects = []
-    
-    # 1. Identity (The Honeypot System itself)
-    identity_id = f"identity--{uuid.uuid5(uuid.NAMESPACE_URL, 'chameleon.honeypot')}"
-    objects.append({
-        "type": "identity",
-        "spec_version": "2.1",
-        "id": identity_id,
-        "created": datetime.utcnow().isoformat() + "Z",
-        "modified": datetime.utcnow().isoformat() + "Z",
-        "name": "Chameleon Honeypot System",
-        "identity_class": "system"
-    })
-    
-    # 2. Process each log as an observed IPv4 indicator and a corresponding Incident/Sighting
-    for log in logs:
-        # Indicator for the attacker IP
-        indicator_id = f"indicator--{uuid.uuid4()}"
-        objects.append({
-            "type": "indicator",
+
+    def __init__(self, dedupe_capacity: int = 100_000):
+        self._emitted: LRUTTLCache[str, bool] = LRUTTLCache(max_entries=dedupe_capacity)
+        self.object_count = 0
+
+    def _once(self, object_id: str) -> bool:
+        """True the first time ``object_id`` is seen in this export."""
+        if self._emitted.get(object_id):
+            return False
+        self._emitted.put(object_id, True)
+        return True
+
+    def identity(self) -> Dict[str, Any]:
+        self.object_count += 1
+        return {
+            "type": "identity",
             "spec_version": "2.1",
-            "id": indicator_id,
-            "created": log.timestamp.isoformat() + "Z",
-            "modified": log.timestamp.isoformat() + "Z",
-            "name": "Malicious IP Connection",
-            "description": f"Automated honeypot detection. Command entered: {log.command_entered}",
-            "pattern": f"[ipv4-addr:value = '{log.attacker_ip}']",
-            "pattern_type": "stix",
-            "valid_from": log.timestamp.isoformat() + "Z"
-        })
-        
-        # Attack Pattern (if applicable)
-        if log.log_metadata.get("is_malicious"):
-            attack_pattern_id = f"attack-pattern--{uuid.uuid4()}"
-            objects.append({
-                "type": "attack-pattern",
-                "spec_version": "2.1",
-                "id": attack_pattern_id,
-                "created": log.timestamp.isoformat() + "Z",
-                "modified": log.timestamp.isoformat() + "Z",
-                "name": "Honeypot Exploitation Attempt",
-                "description": log.command_entered
-            })
-            
-            # Sighting linking the indicator to the attack pattern
+            "id": IDENTITY_ID,
+            "created": stix_timestamp(STIX_CREATED),
+            "modified": stix_timestamp(STIX_CREATED),
+            "name": "Chameleon Honeypot System",
+            "identity_class": "system",
+        }
+
+    def objects_for_log(self, log: Any) -> List[Dict[str, Any]]:
+        """STIX objects for one log row (``HoneypotLog`` or streamed row)."""
+        meta = log.log_metadata or {}
+        classification = meta.get("classification") or {}
+        is_malicious = classification.get("is_malicious", meta.get("is_malicious", False))
+        ts = stix_timestamp(log.timestamp)
+        created = stix_timestamp(STIX_CREATED)
+        ip = log.attacker_ip
+        objects: List[Dict[str, Any]] = []
+
+        indicator_id = stix_id("indicator", ip)
+        if self._once(indicator_id):
             objects.append({
-                "type": "sighting",
+                "type": "indicator",
                 "spec_version": "2.1",
-                "id": f"sighting--{uuid.uuid4()}",
-                "created": log.timestamp.isoformat() + "Z",
-                "modified": log.timestamp.isoformat() + "Z",
-                "sighting_of_ref": indicator_id,
-                "where_sighted_refs": [identity_id]
+                "id": indicator_id,
+                "created": created,
+                "modified": ts,
+                "name": f"Honeypot attacker {ip}",
+                "description": "Source address observed interacting with the Chameleon honeypot.",
+                "indicator_types": ["malicious-activity"],
+                "pattern": f"[ipv4-addr:value = '{ip}']",
+                "pattern_type": "stix",
+                "valid_from": created,
             })
 
-    # 3. Wrap everything in a STIX 2.1 Bundle
-    bundle = {
+        if is_malicious:
+            attack_type = classification.get("attack_type") or "UNKNOWN"
+            attack_pattern_id = stix_id("attack-pattern", attack_type)
+            if self._once(attack_pattern_id):
+                objects.append({
+                    "type": "attack-pattern",
+                    "spec_version": "2.1",
+                    "id": attack_pattern_id,
+                    "created": created,
+                    "modified": ts,
+                    "name": f"Honeypot exploitation attempt ({attack_type})",
+                })
+            relationship_id = stix_id("relationship", f"{ip}:{attack_type}")
+            if self._once(relationship_id):
+                objects.append({
+                    "type": "relationship",
+                    "spec_version": "2.1",
+                    "id": relationship_id,
+                    "created": created,
+                    "modified": ts,
+                    "relationship_type": "indicates",
+                    "source_ref": indicator_id,
+                    "target_ref": attack_pattern_id,
+                })
+
+        objects.append({
+            "type": "sighting",
+            "spec_version": "2.1",
+            "id": stix_id("sighting", str(log.id)),
+            "created": ts,
+            "modified": ts,
+            "first_seen": ts,
+            "last_seen": ts,
+            "count": 1,
+            "description": log.command_entered,
+            "sighting_of_ref": indicator_id,
+            "where_sighted_refs": [IDENTITY_ID],
+        })
+
+        self.object_count += len(objects)
+        return objects
+
+
+async def stream_stix_bundle(
+    logs: AsyncIterator[Any],
+    builder: Optional[StixBundleBuilder] = None,
+    resume_cursor: Optional[str] = None,
+    chunk_objects: int = CHUNK_OBJECTS,
+) -> AsyncIterator[str]:
+    """
+    Serialise a bundle piece by piece while ``logs`` is consumed.
+
+    The closing trailer carries ``x_chameleon_next_cursor`` — the
+    insertion position of the last exported log (or ``resume_cursor``
+    when nothing new was exported).
+    """
+    builder = builder or StixBundleBuilder()
+    yield (
+        f'{{"type":"bundle","id":"bundle--{uuid.uuid4()}","objects":['
+        + json.dumps(builder.identity())
+    )
+
+    pending: List[str] = []
+    last = None
+    async for log in logs:
+        last = log
+        pending.extend(json.dumps(obj) for obj in builder.objects_for_log(log))
+        if len(pending) >= chunk_objects:
+            yield "," + ",".join(pending)
+            pending = []
+    if pending:
+        yield "," + ",".join(pending)
+
+    next_cursor = encode_log_cursor(last.inserted_at, last.id) if last is not None else resume_cursor
+    yield f'],"x_chameleon_next_cursor":{json.dumps(next_cursor)}}}'
+
+
+def create_stix_bundle(logs: Iterable[Any]) -> Dict[str, Any]:
+    """
+    Converts a list of HoneypotLog objects into a STIX 2.1 Bundle (in memory).
+    """
+    builder = StixBundleBuilder()
+    objects = [builder.identity()]
+    for log in logs:
+        objects.extend(builder.objects_for_log(log))
+    return {
         "type": "bundle",
         "id": f"bundle--{uuid.uuid4()}",
-        "objects": objects
+        "objects": objects,
     }
-    
-    return bundle
+
+
+async def _tenant_logs(tenant_id: str, **filters: Any) -> AsyncIterator[Any]:
+    """Stream a tenant's settled logs in insertion order from a dedicated session."""
+    async with db.session_factory() as session:
+        async for row in stream_honeypot_logs(
+            session, tenant_id=tenant_id, newest_first=False, by_insertion=True,
+            settle_seconds=settings.STIX_EXPORT_SETTLE_SECONDS, **filters,
+        ):
+            yield row
 
 
 @stix_router.get("/stix")
 async def export_stix(
-    limit: int = Query(100, ge=1, le=1000),
+    limit: Optional[int] = Query(None, ge=1, description="Max logs to export (default: all)"),
+    since: Optional[datetime] = Query(None, description="Only logs at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only logs before this time"),
+    since_cursor: Optional[str] = Query(None, description="x_chameleon_next_cursor of a previous export"),
     username: str = Depends(verify_token),
     session: AsyncSession = Depends(get_db)
 ):
     """
-    Exports the latest Honeypot logs in STIX 2.1 JSON format for SIEM ingestion.
+    Streams Honeypot logs (in insertion order) as a STIX 2.1 bundle for SIEM ingestion.
     Requires Authentication via JWT token.
     """
+    after = None
+    if since_cursor:
+        try:
+            after = decode_log_cursor(since_cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid since_cursor")
+
     tenant = await get_default_tenant(session)
     if not tenant:
         raise HTTPException(status_code=404, detail="No tenant found")
 
-    stmt = select(HoneypotLog).where(
-        HoneypotLog.tenant_id == tenant.id
-    ).order_by(HoneypotLog.timestamp.desc()).limit(limit)
-    
-    result = await session.execute(stmt)
-    logs = result.scalars().all()
-    
-    if not logs:
-        return {
-            "type": "bundle",
-            "id": f"bundle--{uuid.uuid4()}",
-            "objects": []
-        }
-        
-    return create_stix_bundle(logs)
+    logs = _tenant_logs(str(tenant.id), after=after, since=since, until=until, limit=limit)
+    return StreamingResponse(
+        stream_stix_bundle(logs, resume_cursor=since_cursor),
+        media_type=STIX_MEDIA_TYPE,
+    )
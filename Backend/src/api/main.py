@@ -19,11 +19,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, JSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from contextlib import asynccontextmanager
-import httpx
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from io import BytesIO
 import asyncio
+import json
 import random
 import logging
 
@@ -31,6 +31,7 @@ from pydantic import BaseModel, Field
 
 from src.core.config import settings
 from src.utils.alert_manager import alert_manager
+from src.utils.http_clients import http_clients
 
 # ── ORM & Pydantic models ───────────────────────────────────────────────
 from src.core.models import (
@@ -47,29 +48,39 @@ from src.api.auth import create_access_token, verify_token, verify_credentials
 from src.core.database_postgres import (
     get_db,                   # FastAPI Depends() → yields AsyncSession
     db,                       # Database singleton (.connect / .disconnect)
-    save_honeypot_log,        # (session, tenant_id, ip, cmd, resp, meta)
-    get_default_tenant,       # (session) → Tenant | None
+    get_default_tenant,       # (session) → Tenant | None (cached)
+    tenant_resolver,          # In-process tenant cache (stats / invalidation)
+    decode_log_cursor,        # Opaque keyset cursor → (timestamp, id)
+    get_honeypot_logs_page,   # Keyset page of HoneypotLog rows
+    get_honeypot_logs,        # OFFSET page (legacy ?offset=)
+)
+from src.core.log_writer import log_writer   # Write-behind batched HoneypotLog inserts
+from src.core.integrity_checkpoints import (
+    integrity_checkpointer,   # Signed chain checkpoints + background full audits
+    STREAM_BLOCKCHAIN,
+    STREAM_THREAT_SCORES,
 )
 
 # ── Legacy MongoDB (existing endpoints) ─────────────────────────────────
 from src.core.database import (
     connect_to_mongo, close_mongo_connection, save_attack_log,
     get_attack_logs, get_attack_by_id, get_dashboard_stats,
-    get_logs_by_ip,
+    get_dashboard_timeline, get_logs_by_ip,
+    get_attack_logs_page, stream_attack_logs,
 )
 
 # ── ML Inference (Local MLX Model) ──────────────────────────────────────────
 from src.ml_engine.local_inference import mlx_model
-from src.api.pipeline import evaluate_payload
+from src.api.pipeline import evaluate_payload, get_verdict_cache_stats
 
 # ── LLM Deception Engine (DeepSeek API) ─────────────────────────────────
-from src.utils.llm_controller import generate_deceptive_response
+from src.utils.llm_controller import generate_deceptive_response, get_controller_stats, llm_controller
 
 # ── Integrity Hashing ──────────────────────────────────────────────────
 from src.utils.integrity import hash_log_entry as calculate_hash
+from src.utils.integrity import shutdown_hash_pool
 
 # ── Other Services ──────────────────────────────────────────────────────
-from src.ml_engine.ml_classifier import classifier
 from src.utils.deception_engine import deception_engine
 from src.utils.deception_engine_v2 import progressive_deception_engine
 from src.utils.attacker_session import (
@@ -78,9 +89,11 @@ from src.utils.attacker_session import (
 )
 from src.utils.tarpit_manager import tarpit_manager
 from src.utils.blockchain_logger import blockchain_logger
+from src.utils.blockchain_sync import anchor_scheduler   # Batched Sepolia anchoring (root of roots per epoch)
 from src.utils.report_generator import report_generator
 from src.utils.login_rate_limiter import login_limiter
 from src.utils.threat_score import threat_score_system
+from src.utils.score_log import iter_score_records
 from src.utils.threat_intel_service import threat_intel_service
 from src.utils.chatbot_service import get_chatbot
 from src.utils.bumblebee_deception import (
@@ -100,6 +113,7 @@ from src.optimization.meta_heuristics import (
     rrt_optimizer,      # Standard RRT (baseline for comparison)
     session_tracker,    # Session tracking for fitness evaluation
 )
+from src.optimization.optimizer_service import SessionOutcome, optimizer_service
 
 logger = logging.getLogger(__name__)
 
@@ -139,7 +153,8 @@ async def handle_deception_layer(payload: str, request_data: dict, request: Requ
     session_id = str(uuid.uuid4())[:8]
 
     # ── TC-PSO: Get optimal tarpit delay (NOVEL ALGORITHM) ──────────────────────────────────
-    optimal_delay = await tc_pso_optimizer.get_optimal_delay(attack_category)
+    # Lock-free read of the service's published snapshot; no swarm work here
+    optimal_delay = optimizer_service.get_delay(attack_category)
     logger.info(f"🐜 TC-PSO Optimal Delay (NOVEL) | Category: {attack_category} | Delay: {optimal_delay:.2f}s")
 
     # Create session tracker for this attacker
@@ -174,37 +189,52 @@ async def handle_deception_layer(payload: str, request_data: dict, request: Requ
     )
 
     try:
-        # Flag in DB as deeply anomalous / trapped
-        async with db.session_factory() as session:
-            tenant = await get_default_tenant(session)
-            tenant_id = str(tenant.id) if tenant else "00000000-0000-0000-0000-000000000000"
-            log_meta = {
-                "honeypot_event": "DECEPTION_LAYER_TRIGGERED",
-                "fingerprint_data": request_data,
-                "user_agent": request.headers.get("user-agent", "") if request else "",
-                "referer": request.headers.get("referer", "") if request else "",
-                "classification": {
-                    "attack_type": "ATTACKER_IN_DECEPTION",
-                    "confidence": 0.99,
-                    "is_malicious": True,
-                },
-                "session_id": session_id,
-                "schema_id": schema_id,
-                "pso_delay": optimal_delay,
-            }
-            log = HoneypotLog(
-                tenant_id=tenant_id,
-                attacker_ip=ip,
-                command_entered=f"[DECEPTION] {payload}",
-                response_sent="Routed to deception layer with S-RRT schema",
-                log_metadata=log_meta,
-            )
-            session.add(log)
-            await session.commit()
+        # Flag in DB as deeply anomalous / trapped (write-behind, no DB round-trip)
+        log_meta = {
+            "honeypot_event": "DECEPTION_LAYER_TRIGGERED",
+            "fingerprint_data": request_data,
+            "user_agent": request.headers.get("user-agent", "") if request else "",
+            "referer": request.headers.get("referer", "") if request else "",
+            "classification": {
+                "attack_type": "ATTACKER_IN_DECEPTION",
+                "confidence": 0.99,
+                "is_malicious": True,
+            },
+            "session_id": session_id,
+            "schema_id": schema_id,
+            "pso_delay": optimal_delay,
+        }
+        await log_writer.submit(
+            attacker_ip=ip,
+            command_entered=f"[DECEPTION] {payload}",
+            response_sent="Routed to deception layer with S-RRT schema",
+            metadata=log_meta,
+        )
     except Exception as e:
         logger.error(f"Failed to flag attacker in DB: {e}")
 
-    # The deception response is tailored based on action and S-RRT schema
+    response = _deception_response(action, payload, ip, session_id, optimal_delay, schema_id, fake_schema)
+
+    session = session_tracker.end_session(session_id)
+    if settings.TC_PSO_LEARN_FROM_REQUESTS and session is not None:
+        # P_drop for the TC-PSO fitness: did the attacker give up during the tarpit?
+        dropped = await request.is_disconnected() if request else False
+        # Queued; the optimizer service applies outcomes in batches
+        optimizer_service.submit(SessionOutcome(
+            attack_category=attack_category,
+            delay_used=optimal_delay,
+            commands_executed=session.commands_executed,
+            dropped=dropped,
+            session_id=session_id,
+        ))
+    return response
+
+
+def _deception_response(
+    action: str, payload: str, ip: str, session_id: str,
+    optimal_delay: float, schema_id: str, fake_schema: dict,
+) -> JSONResponse:
+    """The deception response, tailored based on action and S-RRT schema."""
     if action == "login":
         # Record interaction for S-RRT fitness
         session_tracker.record_path_interaction(session_id, "/api/auth/login")
@@ -335,7 +365,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"[WARN] PostgreSQL connection failed: {e}")
         logger.warning("[WARN] Running without database - some features will be limited")
+    await asyncio.to_thread(threat_score_system.load)   # Segmented score chain + snapshot
+    await integrity_checkpointer.start()   # Restore signed checkpoints, checkpoint periodically
+    await anchor_scheduler.restore()       # Anchored epochs, so old proofs still resolve
+    if anchor_scheduler.configured:
+        await anchor_scheduler.start()     # One on-chain root of roots per epoch
     yield
+    await anchor_scheduler.stop()
+    await log_writer.stop()           # Drain buffered HoneypotLog rows before disconnecting
+    await integrity_checkpointer.stop()    # Final checkpoint while the database is still up
+    await optimizer_service.stop()    # Apply queued TC-PSO session outcomes
+    threat_score_system.close()       # Snapshot scores, release the score log
+    await llm_controller.spill_all_sessions()  # Keep attacker context across restarts
+    await http_clients.aclose()       # Pooled outbound HTTP connections
+    await asyncio.to_thread(shutdown_hash_pool)   # Log-hashing worker processes
     await close_mongo_connection()
     if db.connected:
         await db.disconnect()
@@ -371,6 +414,12 @@ app.add_middleware(
 # Register routers
 app.include_router(stix_router, prefix="/api/export", tags=["SIEM Export"])
 
+# Chains covered by signed integrity checkpoints
+integrity_checkpointer.register(STREAM_BLOCKCHAIN, blockchain_logger)
+integrity_checkpointer.register(STREAM_THREAT_SCORES, threat_score_system)
+anchor_scheduler.register(STREAM_BLOCKCHAIN, blockchain_logger)
+anchor_scheduler.register(STREAM_THREAT_SCORES, threat_score_system)
+
 
 # ========================================================================
 # Helpers
@@ -389,19 +438,19 @@ async def fetch_geo_location(ip: str) -> Optional[GeoLocation]:
     if ip in ("127.0.0.1", "localhost", "::1"):
         return None
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{settings.GEOIP_API_URL}{ip}")
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get("status") == "success":
-                    return GeoLocation(
-                        country=data.get("country"),
-                        region=data.get("regionName"),
-                        city=data.get("city"),
-                        latitude=data.get("lat"),
-                        longitude=data.get("lon"),
-                        isp=data.get("isp"),
-                    )
+        client = http_clients.get_client(settings.GEOIP_API_URL)
+        resp = await client.get(f"{settings.GEOIP_API_URL}{ip}")
+        if resp.status_code == 200:
+            data = resp.json()
+            if data.get("status") == "success":
+                return GeoLocation(
+                    country=data.get("country"),
+                    region=data.get("regionName"),
+                    city=data.get("city"),
+                    latitude=data.get("lat"),
+                    longitude=data.get("lon"),
+                    isp=data.get("isp"),
+                )
     except Exception as e:
         logger.warning("GeoIP lookup failed: %s", e)
     return None
@@ -458,7 +507,6 @@ async def trap_execute(
     payload: TrapExecuteRequest,
     request: Request,
     background_tasks: BackgroundTasks,
-    session: AsyncSession = Depends(get_db),
 ):
     """
     Core honeypot pipeline (fully async, non-blocking):
@@ -469,15 +517,15 @@ async def trap_execute(
        • score > 0.85  →  DeepSeek LLM generates fake terminal output
        • score ≤ 0.85  →  static 'command not found' (saves API $)
     4. SHA-256 hash  →  calculate_hash(ip + command + response + score)
-    5. PostgreSQL save  →  HoneypotLog with score + hash in JSONB metadata
+    5. PostgreSQL save  →  HoneypotLog queued on the write-behind log_writer
     6. Return deceptive text to the attacker
     """
     ip_address = payload.ip_address or get_client_ip(request)
     command = payload.command
 
     # ── Step 1: ML Prediction via Two-Stage Pipeline ─────────────────────
-    verdict = await evaluate_payload(command)
-    is_malicious: bool = (verdict == "BLOCK")
+    pipeline_result = await evaluate_payload(command)
+    is_malicious: bool = pipeline_result.is_malicious
     prediction_score: float = 0.99 if is_malicious else 0.01
 
     # ── Step 2: Deceptive Response (threshold gate) ─────────────────────
@@ -532,23 +580,22 @@ async def trap_execute(
         "hash": interaction_hash,
         "user_agent": request.headers.get("User-Agent"),
         "model": "chameleon_lstm_m4_50k",
+        "pipeline": {
+            "stage": pipeline_result.stage,
+            "timings_ms": pipeline_result.timings_ms,
+        },
         "honeytoken_session_id": honeytoken_session_id,
         "bumblebee_bait": bumblebee_bait,
     }
 
-    # Resolve tenant (single-tenant mode → first tenant in DB)
-    tenant = await get_default_tenant(session)
-    tenant_id = str(tenant.id) if tenant else "00000000-0000-0000-0000-000000000000"
-
-    await save_honeypot_log(
-        session=session,
-        tenant_id=tenant_id,
+    # Queued for the write-behind writer (tenant resolved at flush time);
+    # the attacker's response never waits on PostgreSQL.
+    await log_writer.submit(
         attacker_ip=ip_address,
         command_entered=command,
         response_sent=response_text,
         metadata=metadata,
     )
-    # get_db dependency auto-commits on successful return
 
     # ── Step 4.5: Trigger Webhook Alert for Critical Attacks ────────────
     if prediction_score > DECEPTION_THRESHOLD:
@@ -717,16 +764,10 @@ async def submit_trap(
     if is_tarpit and delay > 0:
         await asyncio.sleep(delay)
 
-    # Classification (Local MLX model + old ML classifier for attack type mapping)
-    verdict = await evaluate_payload(user_input.input_text)
-    classification = classifier.classify(user_input.input_text)
-    
-    is_malicious = (verdict == "BLOCK")
-    classification.is_malicious = is_malicious
-    classification.confidence = 0.99 if is_malicious else 0.01
-    
-    if is_malicious and classification.attack_type == AttackType.BENIGN:
-        classification.attack_type = AttackType.SSI  # Default fallback attack type
+    # Classification (Local MLX verdict + heuristic attack type from the same pass)
+    pipeline_result = await evaluate_payload(user_input.input_text)
+    classification = pipeline_result.to_classification(fallback_type=AttackType.SSI)
+    is_malicious = classification.is_malicious
 
     geo_location = await fetch_geo_location(ip)
 
@@ -796,8 +837,9 @@ async def login(
     # ── 1. Check if the username or password itself is a malicious payload ──
     combined_input = f"{login_data.username} {login_data.password}"
     
-    # Run the regex heuristic classifier
-    classification = classifier.classify(combined_input)
+    # Run the pipeline once: LLM verdict + regex heuristic classification
+    pipeline_result = await evaluate_payload(combined_input)
+    classification = pipeline_result.classification.model_copy()
     
     # The heuristic classifier naively flags strings containing "password" or "admin" 
     # as BRUTE_FORCE attacks. We must ignore this for the actual login endpoint, 
@@ -807,11 +849,8 @@ async def login(
         classification.is_malicious = False
         classification.confidence = 0.0
 
-    # Run the LLM
-    verdict = await evaluate_payload(combined_input)
-    
     # Either the LLM blocked it, or the heuristic caught SQLi/XSS/Command Injection
-    is_malicious = (verdict == "BLOCK") or classification.is_malicious
+    is_malicious = pipeline_result.is_malicious or classification.is_malicious
     
     if is_malicious:
         # Ensure it has a valid attack type if the LLM blocked it but the heuristic didn't
@@ -895,19 +934,77 @@ async def login(
 @app.get("/api/dashboard/stats", response_model=DashboardStats)
 async def get_stats(username: str = Depends(verify_token)):
     stats = await get_dashboard_stats()
-    recent_logs = await get_attack_logs(0, 100)
-    merkle_root = blockchain_logger.get_merkle_root_for_recent_logs(recent_logs)
-    stats["merkle_root"] = merkle_root
-    flagged_ips = threat_score_system.get_flagged_ips(threshold=70)
-    top_threats = threat_score_system.get_top_threats(limit=5)
-    stats["flagged_ips_count"] = len(flagged_ips)
-    stats["top_threats"] = top_threats
+    # Maintained incrementally by the chain's Merkle accumulator
+    stats["merkle_root"] = blockchain_logger.get_merkle_root()
+    stats["flagged_ips_count"] = threat_score_system.count_flagged_ips(threshold=70)
+    stats["top_threats"] = threat_score_system.get_top_threats(limit=5)
     return stats
 
 
+@app.get("/api/dashboard/timeline")
+async def get_timeline(
+    granularity: str = Query("hour", pattern="^(minute|hour)$"),
+    hours: int = Query(24, ge=1, le=24 * 90),
+    username: str = Depends(verify_token),
+):
+    """Attack counts per minute/hour bucket, read from the dashboard rollups."""
+    return await get_dashboard_timeline(granularity, hours)
+
+
+def _parse_log_cursor(cursor: Optional[str]):
+    """Decode a ``?cursor=`` query parameter (400 on garbage)."""
+    if not cursor:
+        return None
+    try:
+        return decode_log_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _ndjson_default(value: Any) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+async def _ndjson_lines(items):
+    async for item in items:
+        yield json.dumps(item, default=_ndjson_default) + "\n"
+
+
 @app.get("/api/dashboard/logs", response_model=List[AttackLog])
-async def get_logs(skip: int = 0, limit: int = 50, username: str = Depends(verify_token)):
-    return await get_attack_logs(skip, limit)
+async def get_logs(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    username: str = Depends(verify_token),
+):
+    """
+    Newest-first attack logs.  Pass the ``X-Next-Cursor`` response header
+    back as ``?cursor=`` for the next page (keyset — constant cost at any
+    depth); ``?skip=`` is the legacy OFFSET form.
+    """
+    if skip and not cursor:
+        return await get_attack_logs(skip, limit)
+    logs, next_cursor = await get_attack_logs_page(limit, after=_parse_log_cursor(cursor))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return logs
+
+
+@app.get("/api/dashboard/logs/stream")
+async def stream_logs(
+    ip: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    username: str = Depends(verify_token),
+):
+    """
+    NDJSON stream of attack logs (newest first, optionally for one IP),
+    read from a server-side cursor.  When ``limit`` ends the stream early
+    the last line is ``{"next_cursor": ...}``.
+    """
+    items = stream_attack_logs(after=_parse_log_cursor(cursor), ip_address=ip, limit=limit)
+    return StreamingResponse(_ndjson_lines(items), media_type="application/x-ndjson")
 
 
 @app.get("/api/dashboard/logs/{log_id}", response_model=AttackLog)
@@ -919,8 +1016,23 @@ async def get_log(log_id: str, username: str = Depends(verify_token)):
 
 
 @app.get("/api/dashboard/logs/ip/{ip_address}", response_model=List[AttackLog])
-async def get_ip_logs(ip_address: str, username: str = Depends(verify_token)):
-    return await get_logs_by_ip(ip_address)
+async def get_ip_logs(
+    ip_address: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    username: str = Depends(verify_token),
+):
+    """
+    Keyset-paginated logs for one IP (see ``X-Next-Cursor``); use
+    ``/api/dashboard/logs/stream?ip=`` to fetch everything.
+    """
+    logs, next_cursor = await get_attack_logs_page(
+        limit, after=_parse_log_cursor(cursor), ip_address=ip_address
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return logs
 
 
 # ========================================================================
@@ -980,16 +1092,11 @@ async def honeypot_log(request: Request, background_tasks: BackgroundTasks):
     if event_type == "LOGIN_ATTEMPT":
         username = event_data.get("username", "")
         if username:
-            verdict = await evaluate_payload(username)
-            classification = classifier.classify(username)
-            is_malicious = (verdict == "BLOCK")
-            
-            classification.is_malicious = is_malicious
-            classification.confidence = 0.99 if is_malicious else 0.01
-            
-            if is_malicious and classification.attack_type == AttackType.BENIGN:
-                classification.attack_type = AttackType.BRUTE_FORCE
-                
+            pipeline_result = await evaluate_payload(username)
+            classification = pipeline_result.to_classification(
+                fallback_type=AttackType.BRUTE_FORCE,
+            )
+
             if classification.is_malicious:
                 classification_dict = {
                     "attack_type": classification.attack_type.value,
@@ -1008,29 +1115,23 @@ async def honeypot_log(request: Request, background_tasks: BackgroundTasks):
                         session_id=None
                     )
 
-    # Persist to PostgreSQL
+    # Persist to PostgreSQL (write-behind)
     try:
-        async with db.session_factory() as session:
-            tenant = await get_default_tenant(session)
-            tenant_id = str(tenant.id) if tenant else "00000000-0000-0000-0000-000000000000"
-            log_meta = {
-                "honeypot_event": event_type,
-                "fingerprint_data": event_data,
-                "user_agent": request.headers.get("user-agent", ""),
-                "referer": request.headers.get("referer", ""),
-            }
-            if classification_dict:
-                log_meta["classification"] = classification_dict
-                
-            log = HoneypotLog(
-                tenant_id=tenant_id,
-                attacker_ip=attacker_ip,
-                command_entered=f"[HONEYPOT] {event_type}",
-                response_sent="Decoy interaction logged",
-                log_metadata=log_meta,
-            )
-            session.add(log)
-            await session.commit()
+        log_meta = {
+            "honeypot_event": event_type,
+            "fingerprint_data": event_data,
+            "user_agent": request.headers.get("user-agent", ""),
+            "referer": request.headers.get("referer", ""),
+        }
+        if classification_dict:
+            log_meta["classification"] = classification_dict
+
+        await log_writer.submit(
+            attacker_ip=attacker_ip,
+            command_entered=f"[HONEYPOT] {event_type}",
+            response_sent="Decoy interaction logged",
+            metadata=log_meta,
+        )
     except Exception as e:
         logger.error("Failed to persist honeypot log: %s", e)
 
@@ -1039,25 +1140,25 @@ async def honeypot_log(request: Request, background_tasks: BackgroundTasks):
 
 @app.get("/api/honeypot/logs")
 async def honeypot_logs(
-    limit: int = 200,
+    limit: int = Query(200, ge=1, le=1000),
     offset: int = 0,
+    cursor: Optional[str] = None,
     username: str = Depends(verify_token),
 ):
     """
     Returns paginated honeypot event logs for the Attacker Footprint dashboard.
+    Pass ``next_cursor`` back as ``?cursor=`` for the next page (``offset``
+    is kept for older clients).
     Protected — requires admin JWT.
     """
+    after = _parse_log_cursor(cursor)
     try:
         async with db.session_factory() as session:
-            from sqlalchemy import select, desc
-            stmt = (
-                select(HoneypotLog)
-                .order_by(desc(HoneypotLog.created_at))
-                .limit(limit)
-                .offset(offset)
-            )
-            result = await session.execute(stmt)
-            rows = result.scalars().all()
+            if offset and after is None:
+                rows = await get_honeypot_logs(session, skip=offset, limit=limit)
+                next_cursor = None
+            else:
+                rows, next_cursor = await get_honeypot_logs_page(session, limit=limit, after=after)
 
             logs = []
             for row in rows:
@@ -1069,10 +1170,10 @@ async def honeypot_logs(
                     "fingerprint_data": meta.get("fingerprint_data", {}),
                     "user_agent": meta.get("user_agent", ""),
                     "classification": meta.get("classification"),
-                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                    "created_at": row.timestamp.isoformat() if row.timestamp else None,
                 })
 
-            return {"logs": logs, "total": len(logs), "offset": offset}
+            return {"logs": logs, "total": len(logs), "offset": offset, "next_cursor": next_cursor}
     except Exception as e:
         logger.error(f"Error fetching honeypot logs: {e}")
         return {"logs": [], "total": 0, "error": str(e)}
@@ -1082,8 +1183,79 @@ async def honeypot_logs(
 
 @app.get("/api/blockchain/verify")
 async def verify_blockchain(username: str = Depends(verify_token)):
-    integrity = blockchain_logger.verify_chain_integrity()
-    return {"integrity": integrity, "chain_length": len(blockchain_logger.chain)}
+    """Verify blocks appended since the last trusted checkpoint."""
+    return integrity_checkpointer.verify(STREAM_BLOCKCHAIN)
+
+
+@app.get("/api/blockchain/anchors")
+async def list_anchor_epochs(
+    skip: int = 0, limit: int = Query(50, ge=1, le=500),
+    username: str = Depends(verify_token),
+):
+    """On-chain anchoring epochs, newest first."""
+    epochs = anchor_scheduler.epochs[::-1][skip:skip + limit]
+    return {
+        "epochs": [e.to_dict() for e in epochs],
+        "total": len(anchor_scheduler.epochs),
+        "stats": anchor_scheduler.get_stats(),
+    }
+
+
+@app.get("/api/blockchain/anchors/proof/{index}")
+async def get_anchor_proof(
+    index: int,
+    stream: str = STREAM_BLOCKCHAIN,
+    username: str = Depends(verify_token),
+):
+    """Proof that entry ``index`` of a chain is covered by an anchored epoch."""
+    proof = await anchor_scheduler.prove_log(_integrity_stream(stream), index)
+    if proof is None:
+        raise HTTPException(status_code=404, detail="Entry not anchored yet")
+    return {**proof, "verified": anchor_scheduler.verify_inclusion(proof)}
+
+
+# ========================================================================
+# Integrity Checkpoints & Full Audits
+# ========================================================================
+
+_INTEGRITY_STREAMS = (STREAM_BLOCKCHAIN, STREAM_THREAT_SCORES)
+
+
+def _integrity_stream(stream: str) -> str:
+    if stream not in _INTEGRITY_STREAMS:
+        raise HTTPException(status_code=404, detail=f"Unknown integrity stream: {stream}")
+    return stream
+
+
+@app.get("/api/integrity/checkpoints")
+async def get_integrity_checkpoints(username: str = Depends(verify_token)):
+    """Latest trusted checkpoint per chain, plus audit progress."""
+    return integrity_checkpointer.get_stats()
+
+
+@app.post("/api/integrity/checkpoints/{stream}")
+async def create_integrity_checkpoint(stream: str, username: str = Depends(verify_token)):
+    """Verify the tail of a chain and write a signed checkpoint now."""
+    checkpoint = await integrity_checkpointer.checkpoint(_integrity_stream(stream))
+    latest = integrity_checkpointer.latest(stream)
+    return {
+        "created": checkpoint is not None,
+        "checkpoint": latest.summary() if latest else None,
+    }
+
+
+@app.post("/api/integrity/audit/{stream}", status_code=202)
+async def start_integrity_audit(stream: str, username: str = Depends(verify_token)):
+    """Start a background re-hash of the whole chain (poll with GET)."""
+    return integrity_checkpointer.start_audit(_integrity_stream(stream)).to_dict()
+
+
+@app.get("/api/integrity/audit/{stream}")
+async def get_integrity_audit(stream: str, username: str = Depends(verify_token)):
+    audit = integrity_checkpointer.get_audit(_integrity_stream(stream))
+    if audit is None:
+        raise HTTPException(status_code=404, detail="No audit has been started for this stream")
+    return audit.to_dict()
 
 
 
@@ -1094,6 +1266,7 @@ async def verify_blockchain(username: str = Depends(verify_token)):
 @app.get("/api/threat-scores/")
 async def list_all_threat_scores(username: str = Depends(verify_token)):
     """List all tracked IP reputation scores."""
+    threat_score_system.sync_scores()
     scores = []
     for ip, score in threat_score_system.ip_scores.items():
         level = threat_score_system.get_reputation_level(score)
@@ -1120,8 +1293,8 @@ async def get_top_threats(limit: int = 10, username: str = Depends(verify_token)
 
 @app.get("/api/threat-scores/verify-chain")
 async def verify_score_chain(username: str = Depends(verify_token)):
-    integrity = threat_score_system.verify_chain_integrity()
-    return {"integrity": integrity, "chain_length": len(threat_score_system.score_chain)}
+    """Verify score records added since the last trusted checkpoint."""
+    return integrity_checkpointer.verify(STREAM_THREAT_SCORES)
 
 
 @app.get("/api/threat-scores/blockchain")
@@ -1130,11 +1303,17 @@ async def get_blockchain_data(
     ip_address: Optional[str] = None,
     username: str = Depends(verify_token),
 ):
+    """Page of score records, read from the log segments that hold it."""
     chain = threat_score_system.score_chain
     if ip_address:
-        chain = [b for b in chain if b.get("ip_address") == ip_address]
-    total = len(chain)
-    records = chain[skip : skip + limit]
+        # Full scan of the segments, so it runs in a worker thread up to
+        # the current length while new records keep being appended
+        total, records = await asyncio.to_thread(
+            chain.records_for_ip, ip_address, skip, limit, len(chain)
+        )
+    else:
+        total = len(chain)
+        records = chain[max(skip, 0) : max(skip, 0) + max(limit, 0)]
     return {
         "total": total, "skip": skip, "limit": limit,
         "records": records,
@@ -1164,25 +1343,39 @@ async def export_blockchain(
     ip_address: Optional[str] = None,
     username: str = Depends(verify_token),
 ):
+    if format != "json":
+        raise HTTPException(status_code=400, detail="Unsupported format")
     chain = threat_score_system.score_chain
-    if ip_address:
-        chain = [b for b in chain if b.get("ip_address") == ip_address]
-    if format == "json":
-        return {
-            "blockchain": chain,
-            "metadata": {
-                "total_blocks": len(chain),
-                "chain_integrity": threat_score_system.verify_chain_integrity(),
-                "exported_at": datetime.utcnow().isoformat(),
-                "filter_ip": ip_address,
-            },
-        }
-    raise HTTPException(status_code=400, detail="Unsupported format")
+    end = len(chain)
+    chain_integrity = threat_score_system.verify_chain_integrity()
+    exported_at = datetime.utcnow().isoformat()
+
+    async def body():
+        # Same document as before, streamed one segment at a time
+        yield '{"blockchain":['
+        total = 0
+        for raw in chain.iter_raw(0, end):
+            parts = []
+            for record in iter_score_records(raw):
+                if ip_address and record.ip_address != ip_address:
+                    continue
+                parts.append(("," if total else "") + json.dumps(record.to_dict()))
+                total += 1
+            yield "".join(parts)
+            await asyncio.sleep(0)
+        yield '],"metadata":' + json.dumps({
+            "total_blocks": total,
+            "chain_integrity": chain_integrity,
+            "exported_at": exported_at,
+            "filter_ip": ip_address,
+        }) + "}"
+
+    return StreamingResponse(body(), media_type="application/json")
 
 
 @app.get("/api/threat-scores/analytics")
 async def get_threat_analytics(username: str = Depends(verify_token)):
-    chain = threat_score_system.score_chain
+    threat_score_system.sync_scores()
     total_ips = len(threat_score_system.ip_scores)
     score_distribution = {
         "TRUSTED": 0, "NEUTRAL": 0, "SUSPICIOUS": 0,
@@ -1191,19 +1384,13 @@ async def get_threat_analytics(username: str = Depends(verify_token)):
     for _, score in threat_score_system.ip_scores.items():
         level = threat_score_system.get_reputation_level(score)
         score_distribution[level] += 1
-    attack_types: Dict[str, int] = {}
-    ip_activity: Dict[str, int] = {}
-    for block in chain:
-        at = block.get("attack_type", "UNKNOWN")
-        attack_types[at] = attack_types.get(at, 0) + 1
-        bip = block.get("ip_address")
-        ip_activity[bip] = ip_activity.get(bip, 0) + 1
-    most_active = sorted(ip_activity.items(), key=lambda x: x[1], reverse=True)[:10]
+    # Running counters kept alongside the chain (no segment scan)
+    most_active = threat_score_system.get_most_active_ips(10)
     return {
         "total_ips_tracked": total_ips,
-        "total_score_changes": len(chain),
+        "total_score_changes": len(threat_score_system.score_chain),
         "score_distribution": score_distribution,
-        "attack_type_distribution": attack_types,
+        "attack_type_distribution": dict(threat_score_system.attack_type_counts),
         "most_active_ips": [{"ip": ip, "activity_count": c} for ip, c in most_active],
         "chain_integrity": threat_score_system.verify_chain_integrity(),
     }
@@ -1383,10 +1570,10 @@ async def get_public_blockchain_data(skip: int = 0, limit: int = 10):
     import hashlib
     from datetime import datetime, timedelta
     
-    chain = threat_score_system.score_chain
+    chain = threat_score_system.score_chain[max(skip, 0) : max(skip, 0) + max(limit, 0)]
     
     # If no blockchain data, return sample data for demonstration
-    if not chain:
+    if not len(threat_score_system.score_chain):
         now = datetime.utcnow()
         sample_chain = []
         prev_hash = "0" * 64
@@ -1423,7 +1610,7 @@ async def get_public_blockchain_data(skip: int = 0, limit: int = 10):
         
         chain = sample_chain[skip:skip+limit]
     
-    total = len(threat_score_system.score_chain) if threat_score_system.score_chain else len(chain)
+    total = len(threat_score_system.score_chain) or len(chain)
     
     return {
         "total": total, "skip": skip, "limit": limit,
@@ -1501,8 +1688,9 @@ async def system_status():
         pass
 
     # ── Active tarpits (IPs currently being tarpitted) ───────────────────
-    active_tarpit_ips = len(tarpit_manager.request_timestamps)
-    blocked_ips = len(tarpit_manager.blocked_ips)
+    tarpit_stats = tarpit_manager.get_stats()
+    active_tarpit_ips = tarpit_stats["active_ips"]
+    blocked_ips = tarpit_stats["blocked_ips"]
 
     # ── TC-PSO attacker sessions ──────────────────────────────────────────
     session_stats = await get_session_stats()
@@ -1538,6 +1726,11 @@ async def system_status():
         "mlx_backend": "Metal GPU" if model_loaded else "CPU",
         "precision": "4-bit Quantized",
         "platform": platform.machine(),  # arm64
+        "verdict_cache": get_verdict_cache_stats(),
+        "http_pools": http_clients.get_stats(),
+        "llm_controller": get_controller_stats(),
+        "log_writer": log_writer.get_stats(),
+        "tenant_cache": tenant_resolver.get_stats(),
         "timestamp": datetime.utcnow().isoformat(),
     }
 
@@ -1642,6 +1835,7 @@ async def get_meta_heuristic_stats():
 
     return {
         "pso": pso_stats,
+        "pso_service": optimizer_service.get_stats(),
         "srrt": srrt_stats,
         "timestamp": datetime.utcnow().isoformat(),
     }
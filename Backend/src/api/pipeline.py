@@ -6,17 +6,209 @@ Integrates:
   - Balanced MLX LLM for malicious classification
   - PSO for adaptive tarpitting
   - GA for dynamic deception schema evolution
+
+Verdicts are memoised in a bounded LRU+TTL cache keyed on a hash of the
+payload, so scanners replaying the same strings skip both stages.  The
+cache is flushed whenever the classifier pattern set or the MLX model
+directory changes.
 """
 
 import asyncio
+import dataclasses
+import hashlib
 import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.config import settings
+from src.core.models import AttackType, ClassificationResult
 from src.ml_engine.bilstm_inference import bilstm_model
-from src.ml_engine.local_inference import mlx_model
+from src.ml_engine.heuristic_engine import heuristic_engine
+from src.ml_engine.local_inference import MODEL_DIR, mlx_model
 from src.ml_engine.ml_classifier import classifier
+from src.utils.bounded_cache import LRUTTLCache
 
 logger = logging.getLogger(__name__)
 
-async def evaluate_payload(payload: str) -> str:
+# Stages that can decide the final verdict
+STAGE_HEURISTIC = "heuristic"
+STAGE_MLX = "mlx"
+STAGE_MLX_FALLBACK = "mlx_fallback"  # MLX raised; heuristic BLOCK used instead
+
+
+@dataclass
+class PipelineVerdict:
+    """
+    Result of the two-stage pipeline.
+
+    Attributes:
+        verdict: Final "BLOCK" / "ALLOW" decision.
+        classification: Stage 1 heuristic result (computed once per request,
+            so endpoints never need to call ``classifier.classify`` again).
+        stage: Which stage decided (see ``STAGE_*``).
+        timings_ms: Wall-clock time spent in each stage that ran.
+        cache_hit: True when served from the verdict cache (``stage`` then
+            names the stage that originally decided).
+    """
+    verdict: str
+    classification: ClassificationResult
+    stage: str
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    cache_hit: bool = False
+
+    @property
+    def is_malicious(self) -> bool:
+        return self.verdict == "BLOCK"
+
+    def to_classification(self, fallback_type: AttackType = AttackType.SSI) -> ClassificationResult:
+        """
+        Heuristic classification reconciled with the final verdict.
+
+        Returns a fresh copy with ``is_malicious`` taken from the verdict,
+        confidence set to 0.99 / 0.01, and ``fallback_type`` used when the
+        pipeline blocked a payload the heuristic labelled BENIGN.
+        """
+        result = self.classification.model_copy()
+        result.is_malicious = self.is_malicious
+        result.confidence = 0.99 if self.is_malicious else 0.01
+        if self.is_malicious and result.attack_type == AttackType.BENIGN:
+            result.attack_type = fallback_type
+        return result
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000.0, 3)
+
+
+# ============================================================
+# Verdict Cache
+# ============================================================
+
+def _model_dir_signature(model_dir: Path) -> Tuple[Any, ...]:
+    """Cheap change detector for the MLX model directory (names + mtimes)."""
+    try:
+        with os.scandir(model_dir) as entries:
+            return tuple(sorted(
+                (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                for entry in entries
+            ))
+    except OSError:
+        return ()
+
+
+class VerdictCache:
+    """
+    LRU+TTL cache of pipeline verdicts.
+
+    Keys are a BLAKE2 digest of the payload's exact UTF-8 bytes.  The only
+    normalisation applied is the encoding: the heuristics are case-,
+    whitespace- and anchor-sensitive (``^login:``, ``--\\s*$``,
+    ``rat\\s``) and MLX sees the raw string, so folding case or trimming
+    whitespace would change verdicts.
+
+    The cache remembers the generation (pattern fingerprint + model
+    directory signature) its entries were computed under and clears
+    itself when either changes.  The fingerprint is compared on every
+    lookup, so ``heuristic_engine.load`` takes effect immediately; the
+    directory is re-stat'ed at most every ``check_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        model_dir: Path = MODEL_DIR,
+        check_interval: float = 5.0,
+    ):
+        self.model_dir = model_dir
+        self.check_interval = check_interval
+        self._cache: LRUTTLCache[bytes, PipelineVerdict] = LRUTTLCache(max_entries, ttl_seconds)
+        self._generation = self._current_generation()
+        self._fingerprint = self._generation[0]
+        self._last_check = time.monotonic()
+
+    @staticmethod
+    def key(payload: str) -> bytes:
+        return hashlib.blake2b(
+            payload.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+
+    def _current_generation(self) -> Tuple[str, Tuple[Any, ...]]:
+        return heuristic_engine.fingerprint, _model_dir_signature(self.model_dir)
+
+    def _check_generation(self) -> None:
+        now = time.monotonic()
+        if heuristic_engine.fingerprint == self._fingerprint and now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        generation = self._current_generation()
+        if generation != self._generation:
+            logger.info("Verdict cache invalidated (classifier patterns or model directory changed)")
+            self._generation = generation
+            self._fingerprint = generation[0]
+            self._cache.clear()
+
+    def get(self, payload: str) -> Optional[PipelineVerdict]:
+        self._check_generation()
+        return self._cache.get(self.key(payload))
+
+    def put(self, payload: str, result: PipelineVerdict) -> None:
+        self._cache.put(self.key(payload), result)
+
+    def invalidate(self) -> None:
+        self._generation = self._current_generation()
+        self._fingerprint = self._generation[0]
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._cache.get_stats()
+
+
+verdict_cache = VerdictCache(
+    max_entries=settings.VERDICT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.VERDICT_CACHE_TTL_SECONDS,
+    check_interval=settings.VERDICT_CACHE_CHECK_INTERVAL,
+)
+
+
+def get_verdict_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters for the status endpoint."""
+    return {"enabled": settings.VERDICT_CACHE_ENABLED, **verdict_cache.get_stats()}
+
+
+async def evaluate_payload(payload: str) -> PipelineVerdict:
+    """
+    Evaluate a payload, serving repeated payloads from the verdict cache.
+
+    Cache hits return a copy (callers may mutate the classification) with
+    ``cache_hit=True``.  Verdicts produced by the MLX error fallback are
+    not cached so a transient failure is retried on the next request.
+    """
+    if not settings.VERDICT_CACHE_ENABLED:
+        return await _evaluate_uncached(payload)
+
+    started = time.perf_counter()
+    cached = verdict_cache.get(payload)
+    if cached is not None:
+        return dataclasses.replace(
+            cached,
+            classification=cached.classification.model_copy(),
+            timings_ms={"cache": _elapsed_ms(started)},
+            cache_hit=True,
+        )
+
+    result = await _evaluate_uncached(payload)
+    if result.stage != STAGE_MLX_FALLBACK:
+        verdict_cache.put(payload, dataclasses.replace(
+            result, classification=result.classification.model_copy(),
+        ))
+    return result
+
+
+async def _evaluate_uncached(payload: str) -> PipelineVerdict:
     """
     Two-Stage Evaluation Pipeline:
     Stage 1 (Fast Filter): Heuristic classifier provides attack type detection.
@@ -28,27 +220,38 @@ async def evaluate_payload(payload: str) -> str:
     FALLBACK BEHAVIOR:
     - If MLX model is not loaded, trust heuristic classifier for high-confidence detections
     - Heuristic confidence > 0.80 is considered reliable for production use
+
+    Returns:
+        PipelineVerdict carrying the verdict, the heuristic classification,
+        the deciding stage and per-stage timings.
     """
+    timings: Dict[str, float] = {}
+
     # Stage 1: Heuristic Classification (reliable for benign detection)
+    started = time.perf_counter()
     classification = classifier.classify(payload)
+    timings[STAGE_HEURISTIC] = _elapsed_ms(started)
     logger.info(f"Pipeline Stage 1 [Heuristic]: Type={classification.attack_type.value}, Malicious={classification.is_malicious}, Confidence={classification.confidence:.2%}")
 
     # If heuristic says benign, trust it (avoids any ML false positives)
     if not classification.is_malicious:
         logger.info("Pipeline Stage 1 [Heuristic]: Benign input detected. Returning ALLOW.")
-        return "ALLOW"
+        return PipelineVerdict("ALLOW", classification, STAGE_HEURISTIC, timings)
 
     # If heuristic detects malicious with high confidence, trust it even if MLX fails
     if classification.confidence > 0.80:
         logger.info(f"Pipeline Stage 1 [Heuristic]: High-confidence malicious detected ({classification.confidence:.2%}). Returning BLOCK.")
-        return "BLOCK"
+        return PipelineVerdict("BLOCK", classification, STAGE_HEURISTIC, timings)
 
     # Stage 2: Deep Analysis (Balanced MLX LLM) for potentially malicious inputs
     # Only reached if heuristic confidence is moderate (< 80%)
+    started = time.perf_counter()
     try:
         mlx_verdict = await mlx_model.infer(payload)
+        timings[STAGE_MLX] = _elapsed_ms(started)
         logger.info(f"Pipeline Stage 2 [MLX-Balanced]: Verdict is {mlx_verdict}")
-        return mlx_verdict
+        return PipelineVerdict(mlx_verdict, classification, STAGE_MLX, timings)
     except Exception as e:
+        timings[STAGE_MLX] = _elapsed_ms(started)
         logger.warning(f"MLX inference failed: {e}. Falling back to heuristic verdict: BLOCK")
-        return "BLOCK"
+        return PipelineVerdict("BLOCK", classification, STAGE_MLX_FALLBACK, timings)
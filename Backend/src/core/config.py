@@ -48,6 +48,16 @@ class Settings(BaseSettings):
     TARPIT_THRESHOLD: int = 5
     TARPIT_DELAY_MIN: float = 2.0
     TARPIT_DELAY_MAX: float = 10.0
+    # Sliding-window rate tracking (tarpit + login limiter)
+    RATE_TRACKING_MAX_KEYS: int = int(os.getenv("RATE_TRACKING_MAX_KEYS", "100000"))
+    RATE_TRACKING_SWEEP_INTERVAL: float = float(os.getenv("RATE_TRACKING_SWEEP_INTERVAL", "30"))
+    # Where tarpit / login-limiter / threat-score state lives: "memory"
+    # (per worker) or "shared" (one host-wide file for all workers)
+    STATE_BACKEND: str = os.getenv("STATE_BACKEND", "memory")
+    STATE_BACKEND_PATH: str = os.getenv("STATE_BACKEND_PATH", "/dev/shm/chameleon-state.db")
+    # Seconds a request waits on another worker's write before falling
+    # back to per-worker state (the wait blocks the event loop)
+    STATE_BACKEND_BUSY_TIMEOUT: float = float(os.getenv("STATE_BACKEND_BUSY_TIMEOUT", "0.05"))
     CONFIDENCE_THRESHOLD: float = 0.7
     MAX_INPUT_LENGTH: int = 200
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production-2024")
@@ -55,6 +65,94 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     PORT: int = int(os.getenv("PORT", 8000))
     
+    # ============================================================
+    # Pipeline Verdict Cache
+    # ============================================================
+    VERDICT_CACHE_ENABLED: bool = os.getenv("VERDICT_CACHE_ENABLED", "true").lower() == "true"
+    VERDICT_CACHE_MAX_ENTRIES: int = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "10000"))
+    VERDICT_CACHE_TTL_SECONDS: float = float(os.getenv("VERDICT_CACHE_TTL_SECONDS", "600"))
+    # How often (seconds) the model directory is re-stat'ed for changes
+    VERDICT_CACHE_CHECK_INTERVAL: float = float(os.getenv("VERDICT_CACHE_CHECK_INTERVAL", "5"))
+
+    # ============================================================
+    # Outbound HTTP Client Pools (per upstream host)
+    # ============================================================
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+    # ============================================================
+    # Tenant Resolution Cache
+    # ============================================================
+    TENANT_CACHE_TTL_SECONDS: float = float(os.getenv("TENANT_CACHE_TTL_SECONDS", "300"))
+    TENANT_API_KEY_CACHE_SIZE: int = int(os.getenv("TENANT_API_KEY_CACHE_SIZE", "1024"))
+
+    # ============================================================
+    # Write-Behind HoneypotLog Persistence
+    # ============================================================
+    LOG_WRITER_BATCH_SIZE: int = int(os.getenv("LOG_WRITER_BATCH_SIZE", "500"))
+    LOG_WRITER_FLUSH_INTERVAL_MS: float = float(os.getenv("LOG_WRITER_FLUSH_INTERVAL_MS", "200"))
+    LOG_WRITER_MAX_QUEUE_SIZE: int = int(os.getenv("LOG_WRITER_MAX_QUEUE_SIZE", "10000"))
+    # Seconds a request waits for queue space before its row goes to disk
+    LOG_WRITER_ENQUEUE_TIMEOUT: float = float(os.getenv("LOG_WRITER_ENQUEUE_TIMEOUT", "0.05"))
+    LOG_WRITER_SPILL_DIR: str = os.getenv("LOG_WRITER_SPILL_DIR", "data/log_spill")
+    # Spill directory cap; the oldest files are deleted beyond it
+    LOG_WRITER_MAX_SPILL_MB: int = int(os.getenv("LOG_WRITER_MAX_SPILL_MB", "256"))
+    LOG_WRITER_MAX_SPILL_FILES: int = int(os.getenv("LOG_WRITER_MAX_SPILL_FILES", "10000"))
+    # Timer-driven spill replay: first retry delay, doubled up to the max while PostgreSQL is down
+    LOG_WRITER_REPLAY_INTERVAL_SECONDS: float = float(os.getenv("LOG_WRITER_REPLAY_INTERVAL_SECONDS", "5"))
+    LOG_WRITER_REPLAY_MAX_INTERVAL_SECONDS: float = float(os.getenv("LOG_WRITER_REPLAY_MAX_INTERVAL_SECONDS", "300"))
+    # STIX exports leave out logs inserted this recently; must exceed the
+    # longest log-insert transaction or a since_cursor pull can skip rows
+    STIX_EXPORT_SETTLE_SECONDS: float = float(os.getenv("STIX_EXPORT_SETTLE_SECONDS", "60"))
+
+    # ============================================================
+    # TC-PSO Optimizer Service (session outcomes applied off the request path)
+    # ============================================================
+    # Feed deception-layer outcomes to the live swarm.  Off by default: a
+    # deception hit is a single request, not a session, so its outcome
+    # (0 or 1 commands) says little and would move production delays
+    TC_PSO_LEARN_FROM_REQUESTS: bool = os.getenv("TC_PSO_LEARN_FROM_REQUESTS", "false").lower() == "true"
+    TC_PSO_SERVICE_BATCH_SIZE: int = int(os.getenv("TC_PSO_SERVICE_BATCH_SIZE", "256"))
+    TC_PSO_SERVICE_FLUSH_INTERVAL_MS: float = float(os.getenv("TC_PSO_SERVICE_FLUSH_INTERVAL_MS", "50"))
+    # Outcomes beyond this are dropped rather than delaying the attacker's request
+    TC_PSO_SERVICE_MAX_QUEUE_SIZE: int = int(os.getenv("TC_PSO_SERVICE_MAX_QUEUE_SIZE", "10000"))
+
+    # ============================================================
+    # Dashboard Rollups (log_rollups)
+    # ============================================================
+    ROLLUPS_ENABLED: bool = os.getenv("ROLLUPS_ENABLED", "true").lower() == "true"
+    # Minute buckets older than this are deleted (hour buckets are kept)
+    ROLLUP_MINUTE_RETENTION_HOURS: int = int(os.getenv("ROLLUP_MINUTE_RETENTION_HOURS", "48"))
+    ROLLUP_PRUNE_INTERVAL_SECONDS: float = float(os.getenv("ROLLUP_PRUNE_INTERVAL_SECONDS", "300"))
+
+    # ============================================================
+    # Signed Integrity Checkpoints (integrity_checkpoints)
+    # ============================================================
+    # HMAC key for checkpoint signatures (defaults to the JWT secret)
+    INTEGRITY_CHECKPOINT_SECRET: str = os.getenv("INTEGRITY_CHECKPOINT_SECRET", "") or JWT_SECRET_KEY
+    INTEGRITY_CHECKPOINT_INTERVAL_SECONDS: float = float(os.getenv("INTEGRITY_CHECKPOINT_INTERVAL_SECONDS", "300"))
+    # Blocks re-hashed per step of a background full audit
+    INTEGRITY_AUDIT_BATCH_SIZE: int = int(os.getenv("INTEGRITY_AUDIT_BATCH_SIZE", "5000"))
+
+    # ============================================================
+    # Threat Score Chain (segmented on-disk log)
+    # ============================================================
+    THREAT_SCORE_LOG_DIR: str = os.getenv("THREAT_SCORE_LOG_DIR", "data/score_chain")
+    THREAT_SCORE_SEGMENT_RECORDS: int = int(os.getenv("THREAT_SCORE_SEGMENT_RECORDS", "16384"))
+    # Most recent records also kept in memory
+    THREAT_SCORE_TAIL_RECORDS: int = int(os.getenv("THREAT_SCORE_TAIL_RECORDS", "4096"))
+    # Records between score snapshots
+    THREAT_SCORE_SNAPSHOT_INTERVAL: int = int(os.getenv("THREAT_SCORE_SNAPSHOT_INTERVAL", "10000"))
+    THREAT_SCORE_HISTORY_PER_IP: int = int(os.getenv("THREAT_SCORE_HISTORY_PER_IP", "100"))
+    # Hours for an IP's score deficit to halve with no new attacks (0 = never recover by time)
+    THREAT_SCORE_HALF_LIFE_HOURS: float = float(os.getenv("THREAT_SCORE_HALF_LIFE_HOURS", "24"))
+    # Minimum seconds between sweeps that forget fully recovered IPs
+    THREAT_SCORE_SWEEP_INTERVAL: float = float(os.getenv("THREAT_SCORE_SWEEP_INTERVAL", "300"))
+
     # ============================================================
     # LLM API Configuration
     # ============================================================
@@ -78,6 +176,18 @@ class Settings(BaseSettings):
     LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", "100"))
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.7"))
     LLM_TIMEOUT: int = int(os.getenv("LLM_TIMEOUT", "30"))
+
+    # LLM response cache (LRU, keyed by normalised command)
+    LLM_RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+    LLM_RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("LLM_RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    LLM_RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_RESPONSE_CACHE_TTL_SECONDS", "3600"))
+
+    # Per-attacker command-history sessions (idle timeout, optional Postgres spill)
+    LLM_SESSION_MAX_ENTRIES: int = int(os.getenv("LLM_SESSION_MAX_ENTRIES", "50000"))
+    LLM_SESSION_MAX_BYTES: int = int(os.getenv("LLM_SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+    LLM_SESSION_IDLE_TIMEOUT: float = float(os.getenv("LLM_SESSION_IDLE_TIMEOUT", "1800"))
+    LLM_SESSION_SWEEP_INTERVAL: float = float(os.getenv("LLM_SESSION_SWEEP_INTERVAL", "60"))
+    LLM_SESSION_SPILL_ENABLED: bool = os.getenv("LLM_SESSION_SPILL_ENABLED", "false").lower() == "true"
     
     # ============================================================
     # Feature Flags
@@ -6,14 +6,27 @@ the real `honeypot_logs` table instead of falling back to mock_database.
 """
 
 import logging
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 from sqlalchemy import select, func, desc, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database_postgres import db              # singleton Database instance
+from src.core.database_postgres import (
+    db,                                                 # singleton Database instance
+    LogCursor,
+    encode_log_cursor,
+    get_honeypot_logs_page,
+    stream_honeypot_logs,
+    summarize_classification_counts,
+)
+from src.core.rollups import (
+    rollup_classification_counts,
+    rollup_geo_locations,
+    rollup_timeline,
+    rollup_top_attackers,
+)
 from src.core.models_sqlalchemy import HoneypotLog
 
 logger = logging.getLogger(__name__)
@@ -141,6 +154,57 @@ async def get_attack_logs(skip: int = 0, limit: int = 50) -> List[dict]:
         return []
 
 
+async def get_attack_logs_page(
+    limit: int = 50,
+    after: Optional[LogCursor] = None,
+    ip_address: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Keyset-paginated attack logs (newest first), optionally for one IP.
+
+    Returns (logs, next_cursor); pass next_cursor back (decoded) as
+    ``after`` to get the following page.  Cost is independent of depth.
+    """
+    if not db.connected or not db.session_factory:
+        logger.warning("PostgreSQL not connected — returning empty logs")
+        return [], None
+
+    try:
+        async with db.session_factory() as session:
+            rows, next_cursor = await get_honeypot_logs_page(
+                session, limit=limit, after=after, attacker_ip=ip_address
+            )
+            return [_row_to_dashboard_dict(r) for r in rows], next_cursor
+    except Exception as e:
+        logger.error(f"Error fetching attack logs page: {e}")
+        return [], None
+
+
+async def stream_attack_logs(
+    after: Optional[LogCursor] = None,
+    ip_address: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> AsyncIterator[dict]:
+    """
+    Yield attack logs (newest first) from a server-side cursor.
+
+    If ``limit`` cuts the stream short, a final ``{"next_cursor": ...}``
+    item tells the client where to resume.
+    """
+    if not db.connected or not db.session_factory:
+        return
+
+    async with db.session_factory() as session:
+        sent = 0
+        last = None
+        async for row in stream_honeypot_logs(session, after=after, attacker_ip=ip_address, limit=limit):
+            sent += 1
+            last = row
+            yield _row_to_dashboard_dict(row)
+        if limit is not None and sent == limit and last is not None:
+            yield {"next_cursor": encode_log_cursor(last.timestamp, last.id)}
+
+
 async def get_attack_by_id(log_id: str) -> Optional[dict]:
     """Get a single attack log by UUID."""
     if not db.connected or not db.session_factory:
@@ -174,72 +238,16 @@ async def get_dashboard_stats() -> dict:
 
     try:
         async with db.session_factory() as session:
-            # Total rows
-            total = (await session.execute(
-                select(func.count()).select_from(HoneypotLog)
-            )).scalar() or 0
-
-            # Fetch all rows (small dataset) to compute stats from metadata
-            stmt = select(HoneypotLog).order_by(desc(HoneypotLog.timestamp))
-            result = await session.execute(stmt)
-            rows = result.scalars().all()
-
-            malicious = 0
-            benign = 0
-            attack_dist: Dict[str, int] = {}
-            ip_counts: Dict[str, int] = {}
-            ip_last_seen: Dict[str, datetime] = {}
-            geo_counts: Dict[str, dict] = {}
-
-            for row in rows:
-                meta = row.log_metadata or {}
-                classification = meta.get("classification", {})
-                attack_type = classification.get("attack_type", "BENIGN")
-                is_mal = classification.get("is_malicious", False)
-
-                if is_mal:
-                    malicious += 1
-                else:
-                    benign += 1
-
-                attack_dist[attack_type] = attack_dist.get(attack_type, 0) + 1
-
-                # Top attackers
-                if is_mal:
-                    ip = row.attacker_ip
-                    ip_counts[ip] = ip_counts.get(ip, 0) + 1
-                    if ip not in ip_last_seen or row.timestamp > ip_last_seen[ip]:
-                        ip_last_seen[ip] = row.timestamp
-
-                # Geo
-                geo = meta.get("geo_location")
-                if geo and is_mal:
-                    key = f"{geo.get('country', '')}_{geo.get('city', '')}"
-                    if key not in geo_counts:
-                        geo_counts[key] = {
-                            "country": geo.get("country"),
-                            "city": geo.get("city"),
-                            "latitude": geo.get("latitude"),
-                            "longitude": geo.get("longitude"),
-                            "count": 0,
-                        }
-                    geo_counts[key]["count"] += 1
-
-            top_attackers = sorted(
-                [{"ip": ip, "count": c, "last_seen": ip_last_seen[ip]}
-                 for ip, c in ip_counts.items()],
-                key=lambda x: x["count"], reverse=True
-            )[:10]
-
-            geo_locations = sorted(
-                geo_counts.values(), key=lambda x: x["count"], reverse=True
-            )[:50]
+            # Summed from the hour buckets in log_rollups — O(buckets), not O(rows)
+            counts = await rollup_classification_counts(session)
+            stats = summarize_classification_counts(
+                counts, default_attack_type="BENIGN", malicious_only_distribution=False
+            )
+            top_attackers = await rollup_top_attackers(session, limit=10, malicious_only=True)
+            geo_locations = await rollup_geo_locations(session, limit=50, malicious_only=True)
 
             return {
-                "total_attempts": total,
-                "malicious_attempts": malicious,
-                "benign_attempts": benign,
-                "attack_distribution": attack_dist,
+                **stats,
                 "top_attackers": top_attackers,
                 "geo_locations": geo_locations,
             }
@@ -249,6 +257,20 @@ async def get_dashboard_stats() -> dict:
         return empty
 
 
+async def get_dashboard_timeline(granularity: str = "hour", hours: int = 24) -> List[dict]:
+    """Per-minute or per-hour attack counts for the last ``hours`` hours."""
+    if not db.connected or not db.session_factory:
+        return []
+
+    try:
+        async with db.session_factory() as session:
+            since = datetime.now(timezone.utc) - timedelta(hours=hours)
+            return await rollup_timeline(session, granularity, since)
+    except Exception as e:
+        logger.error(f"Error fetching dashboard timeline: {e}")
+        return []
+
+
 async def get_logs_by_ip(ip_address: str) -> List[dict]:
     """Get all logs for a specific IP address."""
     if not db.connected or not db.session_factory:
@@ -10,14 +10,19 @@ This module provides:
 """
 
 import os
+import time
+import base64
 import logging
-from typing import AsyncGenerator, Optional, List, Dict, Any
+from typing import AsyncGenerator, AsyncIterator, Optional, List, Dict, Any, Tuple
+from uuid import UUID
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 
-from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy import select, update, delete, func, and_, or_, literal_column, tuple_, cast, Float, Text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
@@ -25,13 +30,26 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import selectinload
 
+from src.core.config import settings
 from src.core.models_sqlalchemy import (
     Base,
     Tenant,
     HoneypotLog,
     ReputationScore,
-    AttackType
+    DeceptionSession,
+    IntegrityCheckpoint,
+    AnchorEpochRecord,
+    AttackType,
+    IS_MALICIOUS_SQL,
+    ATTACK_TYPE_SQL,
+    GEO_LOCATION_SQL,
 )
+from src.core.rollups import (
+    rollup_classification_counts,
+    rollup_geo_locations,
+    rollup_top_attackers,
+)
+from src.utils.bounded_cache import LRUTTLCache
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -209,6 +227,95 @@ async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+# ============================================================
+# Tenant Resolution Cache
+# ============================================================
+
+class TenantResolver:
+    """
+    In-process cache in front of the tenant lookups.
+    
+    Tenants are effectively static (single-tenant mode has exactly one),
+    yet every trap request, deception trigger, honeypot log and STIX
+    export used to look one up.  The resolver keeps the default tenant and
+    an LRU of API key -> tenant, both with a TTL so other workers'
+    changes are picked up eventually; ``create_tenant`` invalidates the
+    local cache immediately.
+    
+    Cached rows are expunged from the session that loaded them (so a
+    later rollback there cannot expire them) and merged into each caller's
+    session with ``load=False``, which issues no SQL.
+    """
+    
+    def __init__(self, ttl_seconds: float = 300.0, api_key_cache_size: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self._default: Optional[Tenant] = None
+        self._default_expires = 0.0
+        self._by_api_key: LRUTTLCache[str, Tenant] = LRUTTLCache(api_key_cache_size, ttl_seconds)
+        self.stats = {"default_hits": 0, "default_misses": 0}
+    
+    async def default_tenant(self, session: AsyncSession) -> Optional[Tenant]:
+        """First-created tenant (single-tenant mode)."""
+        if self._default is not None and time.monotonic() < self._default_expires:
+            self.stats["default_hits"] += 1
+            return await session.merge(self._default, load=False)
+        
+        self.stats["default_misses"] += 1
+        result = await session.execute(
+            select(Tenant).order_by(Tenant.created_at, Tenant.id).limit(1)
+        )
+        tenant = result.scalar_one_or_none()
+        if tenant is None:
+            return None
+        session.expunge(tenant)
+        self._default = tenant
+        self._default_expires = time.monotonic() + self.ttl_seconds
+        return await session.merge(tenant, load=False)
+    
+    async def default_tenant_id(self, session: AsyncSession) -> Optional[str]:
+        """Id of the default tenant, without attaching it to ``session``."""
+        if self._default is not None and time.monotonic() < self._default_expires:
+            self.stats["default_hits"] += 1
+            return str(self._default.id)
+        tenant = await self.default_tenant(session)
+        return str(tenant.id) if tenant else None
+    
+    async def by_api_key(self, session: AsyncSession, api_key: str) -> Optional[Tenant]:
+        """Tenant owning ``api_key`` (unknown keys are not cached)."""
+        tenant = self._by_api_key.get(api_key)
+        if tenant is not None:
+            return await session.merge(tenant, load=False)
+        
+        result = await session.execute(
+            select(Tenant).where(Tenant.api_key == api_key)
+        )
+        tenant = result.scalar_one_or_none()
+        if tenant is None:
+            return None
+        session.expunge(tenant)
+        self._by_api_key.put(api_key, tenant)
+        return await session.merge(tenant, load=False)
+    
+    def invalidate(self) -> None:
+        """Drop every cached tenant (called after tenant writes)."""
+        self._default = None
+        self._default_expires = 0.0
+        self._by_api_key.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "default_cached": self._default is not None,
+            "api_keys": self._by_api_key.get_stats(),
+        }
+
+
+tenant_resolver = TenantResolver(
+    ttl_seconds=settings.TENANT_CACHE_TTL_SECONDS,
+    api_key_cache_size=settings.TENANT_API_KEY_CACHE_SIZE,
+)
+
+
 # ============================================================
 # Repository Functions for Tenant Operations
 # ============================================================
@@ -239,15 +346,13 @@ async def create_tenant(
     session.add(tenant)
     await session.flush()
     await session.refresh(tenant)
+    tenant_resolver.invalidate()
     return tenant
 
 
 async def get_tenant_by_api_key(session: AsyncSession, api_key: str) -> Optional[Tenant]:
-    """Get tenant by API key."""
-    result = await session.execute(
-        select(Tenant).where(Tenant.api_key == api_key)
-    )
-    return result.scalar_one_or_none()
+    """Get tenant by API key (cached by ``tenant_resolver``)."""
+    return await tenant_resolver.by_api_key(session, api_key)
 
 
 async def get_tenant_by_id(session: AsyncSession, tenant_id: str) -> Optional[Tenant]:
@@ -259,9 +364,8 @@ async def get_tenant_by_id(session: AsyncSession, tenant_id: str) -> Optional[Te
 
 
 async def get_default_tenant(session: AsyncSession) -> Optional[Tenant]:
-    """Get the default tenant (first tenant in single-tenant mode)."""
-    result = await session.execute(select(Tenant).limit(1))
-    return result.scalar_one_or_none()
+    """Get the default tenant (first tenant in single-tenant mode, cached)."""
+    return await tenant_resolver.default_tenant(session)
 
 
 # ============================================================
@@ -373,6 +477,177 @@ async def count_honeypot_logs(
     return result.scalar() or 0
 
 
+# ============================================================
+# Keyset Pagination (honeypot_logs newest-first)
+# ============================================================
+
+# Position of a log in (timestamp, id) order — (inserted_at, id) for by_insertion
+LogCursor = Tuple[datetime, UUID]
+
+# Columns needed to render a log; streamed as plain rows so that
+# nothing accumulates in the session identity map
+_LOG_COLUMNS = (
+    HoneypotLog.id,
+    HoneypotLog.tenant_id,
+    HoneypotLog.attacker_ip,
+    HoneypotLog.command_entered,
+    HoneypotLog.response_sent,
+    HoneypotLog.timestamp,
+    HoneypotLog.inserted_at,
+    HoneypotLog.log_metadata.label("log_metadata"),
+    HoneypotLog.is_exfiltration_attempt,
+)
+
+
+def encode_log_cursor(timestamp: datetime, log_id: Any) -> str:
+    """Opaque cursor for the position just after this log."""
+    raw = f"{timestamp.isoformat()}|{log_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_log_cursor(cursor: str) -> LogCursor:
+    """
+    Parse a cursor produced by ``encode_log_cursor``.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, log_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), UUID(log_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid log cursor: {cursor!r}") from e
+
+
+def logs_keyset_query(
+    columns: Any = HoneypotLog,
+    after: Optional[LogCursor] = None,
+    attacker_ip: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    newest_first: bool = True,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    by_insertion: bool = False,
+    settle_seconds: Optional[float] = None
+):
+    """
+    ``SELECT`` over honeypot_logs in (timestamp, id) order, starting after ``after``.
+    
+    Newest-first by default; ``newest_first=False`` walks forward in time.
+    ``since``/``until`` bound the time range (inclusive / exclusive).  The
+    redundant plain timestamp bound lets PostgreSQL start the index range
+    scan (ix_honeypot_logs_ip_timestamp for per-IP queries) at the cursor;
+    the row comparison on (timestamp, id) breaks ties.
+    
+    ``by_insertion`` orders (and positions ``after``) on ``inserted_at``
+    instead, for incremental exports: a log written late (another worker's
+    batch, a replayed spill file) still lands after every cursor already
+    handed out.  ``settle_seconds`` then leaves out rows inserted in the
+    last few seconds, whose neighbours may sit in still-uncommitted
+    transactions with earlier ``inserted_at`` values.
+    """
+    entities = columns if isinstance(columns, tuple) else (columns,)
+    position_column = HoneypotLog.inserted_at if by_insertion else HoneypotLog.timestamp
+    if newest_first:
+        order = (position_column.desc(), HoneypotLog.id.desc())
+    else:
+        order = (position_column.asc(), HoneypotLog.id.asc())
+    query = select(*entities).order_by(*order)
+    if attacker_ip:
+        query = query.where(HoneypotLog.attacker_ip == attacker_ip)
+    if tenant_id:
+        query = query.where(HoneypotLog.tenant_id == tenant_id)
+    if since is not None:
+        query = query.where(HoneypotLog.timestamp >= since)
+    if until is not None:
+        query = query.where(HoneypotLog.timestamp < until)
+    if settle_seconds is not None:
+        query = query.where(HoneypotLog.inserted_at < func.now() - timedelta(seconds=settle_seconds))
+    if after is not None:
+        timestamp, log_id = after
+        position = tuple_(position_column, HoneypotLog.id)
+        if newest_first:
+            query = query.where(position_column <= timestamp, position < tuple_(timestamp, log_id))
+        else:
+            query = query.where(position_column >= timestamp, position > tuple_(timestamp, log_id))
+    return query
+
+
+async def count_logs_through(
+    session: AsyncSession,
+    attacker_ip: str,
+    through: LogCursor
+) -> int:
+    """Count one IP's logs at or before ``through`` in (timestamp, id) order."""
+    timestamp, log_id = through
+    result = await session.execute(
+        select(func.count(HoneypotLog.id)).where(
+            HoneypotLog.attacker_ip == attacker_ip,
+            HoneypotLog.timestamp <= timestamp,
+            tuple_(HoneypotLog.timestamp, HoneypotLog.id) <= tuple_(timestamp, log_id),
+        )
+    )
+    return result.scalar() or 0
+
+
+async def get_honeypot_logs_page(
+    session: AsyncSession,
+    limit: int = 50,
+    after: Optional[LogCursor] = None,
+    attacker_ip: Optional[str] = None,
+    tenant_id: Optional[str] = None
+) -> Tuple[List[HoneypotLog], Optional[str]]:
+    """
+    One keyset page of logs, newest first.
+    
+    Returns:
+        (rows, next_cursor) — next_cursor is None on the last page
+    """
+    result = await session.execute(
+        logs_keyset_query(HoneypotLog, after, attacker_ip, tenant_id).limit(limit + 1)
+    )
+    rows = list(result.scalars().all())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_log_cursor(rows[-1].timestamp, rows[-1].id)
+
+
+async def stream_honeypot_logs(
+    session: AsyncSession,
+    after: Optional[LogCursor] = None,
+    attacker_ip: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    batch_size: int = 500,
+    newest_first: bool = True,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    by_insertion: bool = False,
+    settle_seconds: Optional[float] = None
+) -> AsyncIterator[Any]:
+    """
+    Yield log rows from a server-side cursor (see ``logs_keyset_query``).
+    
+    Rows are fetched ``batch_size`` at a time, so memory stays flat no
+    matter how many logs match.  Rows expose the ``_LOG_COLUMNS`` names.
+    """
+    query = logs_keyset_query(
+        _LOG_COLUMNS, after, attacker_ip, tenant_id,
+        newest_first=newest_first, since=since, until=until,
+        by_insertion=by_insertion, settle_seconds=settle_seconds,
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    result = await session.stream(query.execution_options(yield_per=batch_size))
+    try:
+        async for row in result:
+            yield row
+    finally:
+        await result.close()
+
+
 # ============================================================
 # Repository Functions for ReputationScore Operations
 # ============================================================
@@ -501,81 +776,316 @@ async def get_top_threats(
     return result.scalars().all()
 
 
+# ============================================================
+# Repository Functions for Spilled Deception Sessions
+# ============================================================
+
+async def save_deception_sessions(
+    session: AsyncSession,
+    sessions: Dict[str, List[Dict[str, str]]]
+) -> int:
+    """
+    Upsert spilled LLM command histories (one row per attacker IP).
+    
+    Args:
+        session: Database session
+        sessions: Mapping of IP address -> CommandHistory.to_dict()
+    
+    Returns:
+        Number of sessions written
+    """
+    if not sessions:
+        return 0
+    
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    
+    stmt = pg_insert(DeceptionSession).values([
+        {"ip_address": ip, "commands": commands, "last_seen": datetime.utcnow()}
+        for ip, commands in sessions.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DeceptionSession.ip_address],
+        set_={"commands": stmt.excluded.commands, "last_seen": stmt.excluded.last_seen},
+    )
+    await session.execute(stmt)
+    return len(sessions)
+
+
+async def load_deception_session(
+    session: AsyncSession,
+    ip_address: str
+) -> Optional[List[Dict[str, str]]]:
+    """Get the spilled command history for an IP, if any."""
+    result = await session.execute(
+        select(DeceptionSession.commands).where(DeceptionSession.ip_address == ip_address)
+    )
+    return result.scalar_one_or_none()
+
+
+# ============================================================
+# Repository Functions for IntegrityCheckpoint Operations
+# ============================================================
+
+async def save_integrity_checkpoint(
+    session: AsyncSession,
+    values: Dict[str, Any],
+    replace: bool = False
+) -> IntegrityCheckpoint:
+    """
+    Persist one signed checkpoint (``Checkpoint.to_row()``).
+    
+    Checkpoints are append-only, older rows kept as an audit trail,
+    unless ``replace`` is set: then the stream's earlier rows are deleted
+    so it keeps only the latest (per-IP streams, one row per attacker).
+    """
+    if replace:
+        await session.execute(
+            delete(IntegrityCheckpoint).where(IntegrityCheckpoint.stream == values["stream"])
+        )
+    checkpoint = IntegrityCheckpoint(**values)
+    session.add(checkpoint)
+    await session.flush()
+    return checkpoint
+
+
+async def get_latest_integrity_checkpoint(
+    session: AsyncSession,
+    stream: str
+) -> Optional[IntegrityCheckpoint]:
+    """Get the checkpoint covering the most entries of ``stream``."""
+    result = await session.execute(
+        select(IntegrityCheckpoint)
+        .where(IntegrityCheckpoint.stream == stream)
+        .order_by(IntegrityCheckpoint.entry_count.desc(), IntegrityCheckpoint.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+# ============================================================
+# Repository Functions for Anchor Epochs
+# ============================================================
+
+async def save_anchor_epoch(
+    session: AsyncSession,
+    values: Dict[str, Any]
+) -> None:
+    """Upsert one anchoring epoch (``AnchorEpoch.to_row()``)."""
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    
+    stmt = pg_insert(AnchorEpochRecord).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AnchorEpochRecord.epoch],
+        set_={k: stmt.excluded[k] for k in values if k != "epoch"},
+    )
+    await session.execute(stmt)
+
+
+async def get_anchor_epochs(session: AsyncSession) -> List[AnchorEpochRecord]:
+    """All anchoring epochs, oldest first."""
+    result = await session.execute(select(AnchorEpochRecord).order_by(AnchorEpochRecord.epoch))
+    return list(result.scalars().all())
+
+
+async def try_advisory_lock(key: int) -> Optional[AsyncConnection]:
+    """
+    Take the session-level advisory lock ``key`` on a dedicated connection.
+
+    Returns the connection holding the lock (in autocommit, so it does
+    not sit idle in a transaction), or None if another session holds it.
+    Closing the connection releases the lock.
+    """
+    if not db.engine:
+        raise RuntimeError("Database not connected")
+    conn = await db.engine.connect()
+    try:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        acquired = (await conn.execute(select(func.pg_try_advisory_lock(key)))).scalar()
+    except Exception:
+        await conn.close()
+        raise
+    if not acquired:
+        await conn.close()
+        return None
+    return conn
+
+
+async def ping_connection(conn: AsyncConnection) -> None:
+    """Round-trip on ``conn``; raises if the connection is gone."""
+    await conn.execute(select(1))
+
+
 # ============================================================
 # Dashboard Statistics Functions
 # ============================================================
 
-async def get_dashboard_stats(session: AsyncSession) -> Dict[str, Any]:
+# Same SQL text as the expression indexes on honeypot_logs (see models)
+_is_malicious = literal_column(IS_MALICIOUS_SQL, Text)
+_attack_type = literal_column(ATTACK_TYPE_SQL, Text)
+_geo = literal_column(GEO_LOCATION_SQL)
+# Literal (not a bind parameter) so the partial index predicate can match
+_is_malicious_true = _is_malicious == literal_column("'true'")
+
+
+async def aggregate_classification_counts(
+    session: AsyncSession
+) -> List[Tuple[bool, Optional[str], int]]:
     """
-    Get comprehensive dashboard statistics.
+    Row counts grouped by (is_malicious, attack_type) over all logs.
     
     Returns:
-        Dictionary with attack statistics, top attackers, and geo data
+        List of (is_malicious, attack_type or None, count) tuples
     """
-    # Total counts
-    total_logs = await count_honeypot_logs(session)
-    
-    # Get recent logs for analysis
-    recent_logs = await get_honeypot_logs(session, limit=1000)
-    
-    # Count malicious vs benign (based on metadata classification)
-    malicious_count = 0
-    benign_count = 0
-    attack_distribution: Dict[str, int] = {}
-    attacker_counts: Dict[str, int] = {}
-    geo_locations: List[Dict[str, Any]] = []
-    
-    for log in recent_logs:
-        # Extract classification from metadata
-        metadata = log.log_metadata or {}
-        classification = metadata.get("classification", {})
-        is_malicious = classification.get("is_malicious", False)
-        attack_type = classification.get("attack_type", "UNKNOWN")
-        
+    result = await session.execute(
+        select(_is_malicious, _attack_type, func.count())
+        .select_from(HoneypotLog)
+        .group_by(_is_malicious, _attack_type)
+    )
+    return [(flag == "true", attack_type, count) for flag, attack_type, count in result.all()]
+
+
+def summarize_classification_counts(
+    counts: List[Tuple[bool, Optional[str], int]],
+    default_attack_type: str,
+    malicious_only_distribution: bool,
+) -> Dict[str, Any]:
+    """Fold ``aggregate_classification_counts`` rows into dashboard totals."""
+    malicious = benign = 0
+    distribution: Dict[str, int] = {}
+    for is_malicious, attack_type, count in counts:
         if is_malicious:
-            malicious_count += 1
-            attack_distribution[attack_type] = attack_distribution.get(attack_type, 0) + 1
+            malicious += count
         else:
-            benign_count += 1
-        
-        # Count attacks per IP
-        attacker_counts[log.attacker_ip] = attacker_counts.get(log.attacker_ip, 0) + 1
-        
-        # Extract geo data
-        geo = metadata.get("geo_location")
-        if geo and geo.get("country"):
-            geo_locations.append({
-                "country": geo.get("country"),
-                "city": geo.get("city"),
-                "latitude": geo.get("latitude"),
-                "longitude": geo.get("longitude"),
-                "count": 1
-            })
-    
-    # Top attackers
-    top_attackers = [
-        {"ip": ip, "count": count}
-        for ip, count in sorted(
-            attacker_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
+            benign += count
+        if is_malicious or not malicious_only_distribution:
+            key = attack_type or default_attack_type
+            distribution[key] = distribution.get(key, 0) + count
+    return {
+        "total_attempts": malicious + benign,
+        "malicious_attempts": malicious,
+        "benign_attempts": benign,
+        "attack_distribution": distribution,
+    }
+
+
+async def aggregate_top_attackers(
+    session: AsyncSession,
+    limit: int = 10,
+    malicious_only: bool = True
+) -> List[Dict[str, Any]]:
+    """Most active IPs with their log count and last-seen timestamp."""
+    count = func.count().label("count")
+    stmt = (
+        select(HoneypotLog.attacker_ip, count, func.max(HoneypotLog.timestamp))
+        .group_by(HoneypotLog.attacker_ip)
+        .order_by(count.desc(), HoneypotLog.attacker_ip)
+        .limit(limit)
+    )
+    if malicious_only:
+        stmt = stmt.where(_is_malicious_true)
+    result = await session.execute(stmt)
+    return [
+        {"ip": ip, "count": n, "last_seen": last_seen}
+        for ip, n, last_seen in result.all()
     ]
+
+
+async def aggregate_geo_locations(
+    session: AsyncSession,
+    limit: int = 50,
+    malicious_only: bool = True,
+    require_country: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Log counts per (country, city) from ``metadata.geo_location``.
+
+    Latitude and longitude come from the same log: the most recent one in
+    the group whose geo_location carries both as numbers.
+    """
+    country = _geo.op("->>", return_type=Text)(literal_column("'country'"))
+    city = _geo.op("->>", return_type=Text)(literal_column("'city'"))
+    has_coordinates = and_(*(
+        func.jsonb_typeof(_geo.op("->")(literal_column(f"'{field}'"))) == "number"
+        for field in ("latitude", "longitude")
+    ))
+
+    def newest(field: str):
+        value = cast(_geo.op("->>", return_type=Text)(literal_column(f"'{field}'")), Float)
+        return array_agg(
+            aggregate_order_by(value, HoneypotLog.timestamp.desc(), HoneypotLog.id.desc())
+        ).filter(has_coordinates)[1]
+
+    count = func.count().label("count")
     
-    # Get flagged IPs count
-    flagged = await get_flagged_ips(session, threshold=50, limit=1000)
+    stmt = (
+        select(
+            country, city,
+            newest("latitude"), newest("longitude"),
+            count,
+        )
+        .select_from(HoneypotLog)
+        .where(func.jsonb_typeof(_geo) == "object")
+        .where(_geo != literal_column("'{}'::jsonb"))
+        .group_by(country, city)
+        .order_by(count.desc())
+        .limit(limit)
+    )
+    if malicious_only:
+        stmt = stmt.where(_is_malicious_true)
+    if require_country:
+        stmt = stmt.where(func.coalesce(country, "") != "")
     
-    # Get top threats
+    result = await session.execute(stmt)
+    return [
+        {
+            "country": row_country,
+            "city": row_city,
+            "latitude": lat,
+            "longitude": lon,
+            "count": n,
+        }
+        for row_country, row_city, lat, lon, n in result.all()
+    ]
+
+
+async def count_flagged_ips(session: AsyncSession, threshold: int = 50) -> int:
+    """Number of IPs with a reputation score below ``threshold``."""
+    result = await session.execute(
+        select(func.count())
+        .select_from(ReputationScore)
+        .where(ReputationScore.reputation_score < threshold)
+    )
+    return result.scalar() or 0
+
+
+async def get_dashboard_stats(session: AsyncSession) -> Dict[str, Any]:
+    """
+    Get comprehensive dashboard statistics.
+    
+    Log figures are summed from the hour buckets in ``log_rollups``
+    (maintained by the log writer), so the cost grows with the number of
+    buckets rather than the number of logs.
+    
+    Returns:
+        Dictionary with attack statistics, top attackers, and geo data
+    """
+    counts = await rollup_classification_counts(session)
+    stats = summarize_classification_counts(
+        counts, default_attack_type="UNKNOWN", malicious_only_distribution=True
+    )
+    
+    top_attackers = await rollup_top_attackers(session, limit=10, malicious_only=False)
+    geo_locations = await rollup_geo_locations(
+        session, limit=50, malicious_only=False, require_country=True
+    )
+    flagged_count = await count_flagged_ips(session, threshold=50)
     top_threats = await get_top_threats(session, limit=5)
     
     return {
-        "total_attempts": total_logs,
-        "malicious_attempts": malicious_count,
-        "benign_attempts": benign_count,
-        "attack_distribution": attack_distribution,
-        "top_attackers": top_attackers,
-        "geo_locations": geo_locations[:50],
-        "flagged_ips_count": len(flagged),
+        **stats,
+        "top_attackers": [{"ip": a["ip"], "count": a["count"]} for a in top_attackers],
+        "geo_locations": geo_locations,
+        "flagged_ips_count": flagged_count,
         "top_threats": [
             {
                 "ip": t.ip_address,
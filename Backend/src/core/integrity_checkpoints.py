@@ -0,0 +1,422 @@
+"""
+Signed Integrity Checkpoints
+=============================
+
+Verifying the hash chains used to mean re-hashing all of them on every
+request.  A checkpoint records, for one append-only stream, how many
+entries it had, the hash of the last one and the Merkle frontier over
+all of them, signed with HMAC-SHA256 (``INTEGRITY_CHECKPOINT_SECRET``)
+and persisted to ``integrity_checkpoints``.
+
+Once a checkpoint is trusted (signature valid, head hash still in place)
+verification only covers the entries appended after it:
+  - in-memory chains (``blockchain_logger``, ``threat_score_system``)
+    resume their incremental ``verify_chain_integrity`` from it;
+  - per-IP log streams (``ip:<address>``) restore the Merkle frontier
+    and only fetch and hash the logs after the checkpoint's cursor
+    (``verify_ip_log_integrity``).
+
+Entries *before* a checkpoint are re-verified by a separate full audit
+that runs as a background task, re-hashing the chain in batches and
+checking it against the signed frontier; its progress is polled through
+``get_audit``.
+
+Usage:
+    from src.core.integrity_checkpoints import integrity_checkpointer
+
+    integrity_checkpointer.register("blockchain", blockchain_logger)
+    await integrity_checkpointer.start()          # lifespan startup
+    integrity_checkpointer.verify("blockchain")
+    integrity_checkpointer.start_audit("blockchain")
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Protocol
+
+from src.core.config import settings
+from src.core.database_postgres import (
+    db,
+    get_latest_integrity_checkpoint,
+    save_integrity_checkpoint,
+)
+from src.utils.integrity import MerkleAccumulator
+
+logger = logging.getLogger(__name__)
+
+STREAM_BLOCKCHAIN = "blockchain"
+STREAM_THREAT_SCORES = "threat_scores"
+
+
+def ip_stream(ip_address: str) -> str:
+    """Checkpoint stream name for one attacker's honeypot logs."""
+    return f"ip:{ip_address}"
+
+
+class CheckpointedChain(Protocol):
+    """What a stream must expose (``BlockchainLogger``, ``ThreatScoreSystem``)."""
+
+    def checkpoint_state(self) -> Dict[str, Any]: ...
+    def block_hash(self, index: int) -> str: ...
+    def block_hashes(self, start: int, end: int) -> List[str]: ...
+    def verify_blocks(self, start: int, end: int) -> Optional[int]: ...
+    def verify_chain_integrity(self, full: bool = False) -> bool: ...
+    def trust_checkpoint(self, count: int, head_hash: Optional[str]) -> bool: ...
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """One signed checkpoint of a stream's first ``count`` entries."""
+    stream: str
+    count: int
+    head_hash: Optional[str]
+    frontier: List[Optional[str]]
+    cursor: Optional[str] = None
+    signature: str = ""
+    created_at: Optional[datetime] = None
+
+    @property
+    def merkle_root(self) -> Optional[str]:
+        return MerkleAccumulator(self.count, self.frontier).root()
+
+    def accumulator(self) -> MerkleAccumulator:
+        """A fresh accumulator positioned at this checkpoint."""
+        return MerkleAccumulator(self.count, self.frontier)
+
+    def payload(self) -> bytes:
+        """Canonical bytes covered by the signature."""
+        return json.dumps(
+            {
+                "stream": self.stream,
+                "count": self.count,
+                "head_hash": self.head_hash,
+                "frontier": self.frontier,
+                "cursor": self.cursor,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def signed(self, key: bytes) -> "Checkpoint":
+        signature = hmac.new(key, self.payload(), hashlib.sha256).hexdigest()
+        return replace(self, signature=signature)
+
+    def verify_signature(self, key: bytes) -> bool:
+        expected = hmac.new(key, self.payload(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, self.signature)
+
+    def to_row(self) -> Dict[str, Any]:
+        """Column values for ``IntegrityCheckpoint``."""
+        return {
+            "stream": self.stream,
+            "entry_count": self.count,
+            "head_hash": self.head_hash,
+            "frontier": list(self.frontier),
+            "merkle_root": self.merkle_root,
+            "cursor": self.cursor,
+            "signature": self.signature,
+        }
+
+    @classmethod
+    def from_row(cls, row: Any) -> "Checkpoint":
+        return cls(
+            stream=row.stream,
+            count=row.entry_count,
+            head_hash=row.head_hash,
+            frontier=list(row.frontier or []),
+            cursor=row.cursor,
+            signature=row.signature,
+            created_at=row.created_at,
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "stream": self.stream,
+            "count": self.count,
+            "head_hash": self.head_hash,
+            "merkle_root": self.merkle_root,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+@dataclass
+class AuditProgress:
+    """State of one background full audit."""
+    stream: str
+    total: int
+    status: str = "running"  # running | passed | failed | cancelled | error
+    checked: int = 0
+    first_invalid: Optional[int] = None
+    detail: Optional[str] = None
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["progress"] = round(self.checked / self.total, 4) if self.total else 1.0
+        data["started_at"] = self.started_at.isoformat()
+        data["finished_at"] = self.finished_at.isoformat() if self.finished_at else None
+        return data
+
+
+class IntegrityCheckpointer:
+    """
+    Signs, persists and trusts checkpoints for registered chains.
+
+    Args:
+        secret: HMAC key for checkpoint signatures.
+        interval: Seconds between periodic checkpoints (``start``).
+        audit_batch_size: Entries re-hashed per step of a full audit
+            before yielding to the event loop.
+    """
+
+    def __init__(self, secret: str, interval: float = 300.0, audit_batch_size: int = 5000):
+        if audit_batch_size < 1:
+            raise ValueError("audit_batch_size must be >= 1")
+        self._key = secret.encode("utf-8")
+        self.interval = interval
+        self.audit_batch_size = audit_batch_size
+        self._chains: Dict[str, CheckpointedChain] = {}
+        self._latest: Dict[str, Checkpoint] = {}
+        self._audits: Dict[str, AuditProgress] = {}
+        self._audit_tasks: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {
+            "checkpoints": 0,
+            "persist_errors": 0,
+            "rejected_signatures": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Streams
+    # ------------------------------------------------------------------
+
+    def register(self, stream: str, chain: CheckpointedChain) -> None:
+        self._chains[stream] = chain
+
+    def _chain(self, stream: str) -> CheckpointedChain:
+        try:
+            return self._chains[stream]
+        except KeyError:
+            raise KeyError(f"Unknown integrity stream: {stream!r}") from None
+
+    def latest(self, stream: str) -> Optional[Checkpoint]:
+        """Last trusted checkpoint of ``stream`` held in memory."""
+        return self._latest.get(stream)
+
+    # ------------------------------------------------------------------
+    # Signing and persistence
+    # ------------------------------------------------------------------
+
+    def sign(self, checkpoint: Checkpoint) -> Checkpoint:
+        return checkpoint.signed(self._key)
+
+    def is_trusted(self, checkpoint: Checkpoint) -> bool:
+        if checkpoint.verify_signature(self._key):
+            return True
+        self.stats["rejected_signatures"] += 1
+        logger.warning(f"Integrity checkpoint for {checkpoint.stream} has a bad signature; ignoring it")
+        return False
+
+    async def save(self, checkpoint: Checkpoint, session=None) -> Checkpoint:
+        """
+        Sign and persist ``checkpoint`` (in ``session`` if given, otherwise
+        in its own transaction).  Persistence failures are logged; the
+        checkpoint is still trusted in memory.  Registered chains keep
+        every checkpoint; other (per-IP) streams keep only the latest.
+        """
+        checkpoint = self.sign(replace(checkpoint, created_at=checkpoint.created_at or datetime.now(timezone.utc)))
+        latest_only = checkpoint.stream not in self._chains
+        try:
+            if session is not None:
+                await save_integrity_checkpoint(session, checkpoint.to_row(), replace=latest_only)
+            elif db.connected and db.session_factory:
+                async with db.session_factory() as own_session:
+                    await save_integrity_checkpoint(own_session, checkpoint.to_row(), replace=latest_only)
+                    await own_session.commit()
+        except Exception as e:
+            self.stats["persist_errors"] += 1
+            logger.warning(f"Integrity checkpoint for {checkpoint.stream} not persisted: {e}")
+        self.stats["checkpoints"] += 1
+        # Only registered chains are remembered; per-IP streams live in the table
+        if checkpoint.stream in self._chains:
+            self._latest[checkpoint.stream] = checkpoint
+        return checkpoint
+
+    async def load(self, stream: str, session=None) -> Optional[Checkpoint]:
+        """Latest persisted checkpoint of ``stream`` with a valid signature."""
+        try:
+            if session is not None:
+                row = await get_latest_integrity_checkpoint(session, stream)
+            elif db.connected and db.session_factory:
+                async with db.session_factory() as own_session:
+                    row = await get_latest_integrity_checkpoint(own_session, stream)
+            else:
+                return self._latest.get(stream)
+        except Exception as e:
+            logger.warning(f"Integrity checkpoint for {stream} not loaded: {e}")
+            return self._latest.get(stream)
+        if row is None:
+            return None
+        checkpoint = Checkpoint.from_row(row)
+        return checkpoint if self.is_trusted(checkpoint) else None
+
+    # ------------------------------------------------------------------
+    # Registered chains
+    # ------------------------------------------------------------------
+
+    async def checkpoint(self, stream: str) -> Optional[Checkpoint]:
+        """
+        Checkpoint ``stream`` at its current head.
+
+        The entries since the previous checkpoint are verified first, so
+        a tampered chain is never signed.  Returns None when nothing was
+        appended or verification failed.
+        """
+        chain = self._chain(stream)
+        if not chain.verify_chain_integrity():
+            logger.error(f"Integrity stream {stream} failed verification; not checkpointing")
+            return None
+        state = chain.checkpoint_state()
+        previous = self._latest.get(stream)
+        if not state["count"] or (previous is not None and previous.count == state["count"]):
+            return None
+        return await self.save(Checkpoint(stream, state["count"], state["head_hash"], state["frontier"]))
+
+    async def checkpoint_all(self) -> List[Checkpoint]:
+        written = []
+        for stream in list(self._chains):
+            checkpoint = await self.checkpoint(stream)
+            if checkpoint is not None:
+                written.append(checkpoint)
+        return written
+
+    async def restore(self, stream: str, session=None) -> bool:
+        """
+        Load the persisted checkpoint of ``stream`` and, if the chain
+        still ends the checkpointed prefix with the signed head hash,
+        start incremental verification after it.
+        """
+        checkpoint = await self.load(stream, session=session)
+        if checkpoint is None or not self._chain(stream).trust_checkpoint(checkpoint.count, checkpoint.head_hash):
+            return False
+        self._latest[stream] = checkpoint
+        return True
+
+    def verify(self, stream: str) -> Dict[str, Any]:
+        """Verify only the entries appended after the last trusted point."""
+        chain = self._chain(stream)
+        checkpoint = self._latest.get(stream)
+        if checkpoint is not None:
+            chain.trust_checkpoint(checkpoint.count, checkpoint.head_hash)
+        verified_from = getattr(chain, "verified_upto", 0)
+        integrity = chain.verify_chain_integrity()
+        return {
+            "integrity": integrity,
+            "chain_length": chain.checkpoint_state()["count"],
+            "verified_from": verified_from,
+            "checkpoint": checkpoint.summary() if checkpoint else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Background full audit
+    # ------------------------------------------------------------------
+
+    def start_audit(self, stream: str) -> AuditProgress:
+        """Start (or return the running) full audit of ``stream``."""
+        chain = self._chain(stream)
+        task = self._audit_tasks.get(stream)
+        if task is not None and not task.done():
+            return self._audits[stream]
+        progress = AuditProgress(stream=stream, total=chain.checkpoint_state()["count"])
+        self._audits[stream] = progress
+        self._audit_tasks[stream] = asyncio.get_running_loop().create_task(self._run_audit(chain, progress))
+        return progress
+
+    def get_audit(self, stream: str) -> Optional[AuditProgress]:
+        return self._audits.get(stream)
+
+    async def _run_audit(self, chain: CheckpointedChain, progress: AuditProgress) -> None:
+        """Re-hash every entry up to the head captured at start, in batches."""
+        checkpoint = self._latest.get(progress.stream)
+        accumulator = MerkleAccumulator()
+        try:
+            for start in range(0, progress.total, self.audit_batch_size):
+                end = min(start + self.audit_batch_size, progress.total)
+                bad = chain.verify_blocks(start, end)
+                if bad is not None:
+                    progress.first_invalid = bad
+                    progress.detail = f"Entry {bad} does not match its hash or link"
+                    progress.status = "failed"
+                    return
+                for index in range(start, end):
+                    accumulator.append(chain.block_hash(index))
+                    if checkpoint is not None and accumulator.size == checkpoint.count:
+                        if accumulator.frontier != checkpoint.frontier:
+                            progress.first_invalid = 0
+                            progress.detail = f"Entries before checkpoint {checkpoint.count} differ from the signed frontier"
+                            progress.status = "failed"
+                            return
+                progress.checked = end
+                await asyncio.sleep(0)
+            progress.status = "passed"
+        except asyncio.CancelledError:
+            progress.status = "cancelled"
+            raise
+        except Exception as e:
+            progress.status = "error"
+            progress.detail = str(e)
+            logger.error(f"Integrity audit of {progress.stream} failed: {e}")
+        finally:
+            progress.finished_at = datetime.now(timezone.utc)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Restore persisted checkpoints and start periodic checkpointing."""
+        for stream in list(self._chains):
+            await self.restore(stream)
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel background work and write a final checkpoint (lifespan shutdown)."""
+        tasks = [t for t in [self._task, *self._audit_tasks.values()] if t is not None and not t.done()]
+        self._task = None
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.checkpoint_all()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.checkpoint_all()
+            except Exception as e:
+                logger.error(f"Periodic integrity checkpoint failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "streams": {stream: checkpoint.summary() for stream, checkpoint in self._latest.items()},
+            "audits": {stream: audit.to_dict() for stream, audit in self._audits.items()},
+        }
+
+
+integrity_checkpointer = IntegrityCheckpointer(
+    secret=settings.INTEGRITY_CHECKPOINT_SECRET,
+    interval=settings.INTEGRITY_CHECKPOINT_INTERVAL_SECONDS,
+    audit_batch_size=settings.INTEGRITY_AUDIT_BATCH_SIZE,
+)
@@ -0,0 +1,521 @@
+"""
+Write-Behind HoneypotLog Persistence
+=====================================
+
+Request handlers hand finished ``honeypot_logs`` rows to ``log_writer``
+and return immediately; a single background task per event loop groups
+queued rows and writes each group with one multi-row ``INSERT``.  A
+group is flushed when ``batch_size`` rows have been collected or the
+oldest queued row has waited ``flush_interval_ms``.
+
+Failure handling:
+  - Backpressure: when the queue is full ``submit`` waits up to
+    ``enqueue_timeout`` seconds for room before giving up on memory.
+  - Durable spill: rows that cannot be queued, and batches that cannot
+    be written (PostgreSQL down or erroring), are written to JSONL spill
+    files under ``spill_dir`` (fsync'ed) and replayed oldest-first once
+    writes succeed again, or by a retry timer with exponential backoff
+    while no new rows arrive.  Row ids are generated client-side and
+    inserted with ``ON CONFLICT DO NOTHING``, so a partially replayed
+    file can be retried safely.  Files that PostgreSQL rejects as bad
+    data are renamed ``*.rejected`` instead of being retried forever.
+  - Spill cap: the spill directory is held under ``max_spill_bytes`` /
+    ``max_spill_files``; the oldest files are deleted past the cap and
+    counted in ``stats``.
+  - No database: when the app runs without PostgreSQL (``db`` never
+    connected) rows are counted as ``unpersisted`` and discarded rather
+    than spilled, so the disk does not fill one file per request.
+  - Graceful drain: ``stop()`` (FastAPI lifespan shutdown) flushes
+    everything still queued before the database disconnects.
+
+Dashboard rollups: each batch also updates the minute/hour buckets in
+``log_rollups`` (see ``src/core/rollups.py``) inside the same
+transaction, counting only the rows the INSERT actually created.
+
+Usage:
+    from src.core.log_writer import log_writer
+
+    log_id = await log_writer.submit(
+        attacker_ip=ip, command_entered=cmd, response_sent=resp, metadata=meta,
+    )
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from src.core.config import settings
+from src.core.database_postgres import db, tenant_resolver
+from src.core.models_sqlalchemy import HoneypotLog
+from src.core.rollups import apply_rollups, prune_minute_rollups
+from src.utils.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Placeholder used by the request handlers before this writer existed
+NULL_TENANT_ID = "00000000-0000-0000-0000-000000000000"
+
+# asyncpg caps a statement at 32767 bind parameters (8 columns per row)
+MAX_ROWS_PER_INSERT = 2000
+
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2000)
+FLUSH_MS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+InsertFn = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+class _BadRows(Exception):
+    """Rows PostgreSQL refused as data errors (retrying will not help)."""
+
+
+class _NoDatabase(ConnectionError):
+    """PostgreSQL is not connected in this process (running without a database)."""
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return str(value)
+
+
+def _encode_row(row: Dict[str, Any]) -> str:
+    return json.dumps(row, default=_json_default, separators=(",", ":"))
+
+
+def _decode_row(line: str) -> Dict[str, Any]:
+    row = json.loads(line)
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+
+class HoneypotLogWriter:
+    """
+    Buffered, batched writer for ``honeypot_logs`` rows.
+
+    Args:
+        batch_size: Rows per flush (size trigger).
+        flush_interval_ms: Max time the oldest queued row waits (time trigger).
+        max_queue_size: Rows held in memory before backpressure kicks in.
+        enqueue_timeout: Seconds ``submit`` waits for queue space before
+            spilling the row straight to disk.
+        spill_dir: Directory for JSONL spill files.
+        insert_fn: ``async fn(rows)`` that persists a batch; defaults to a
+            multi-row INSERT through the shared ``db`` engine.
+        rollups: Update ``log_rollups`` alongside each default INSERT.
+        minute_retention_hours: Age after which minute rollups are pruned.
+        prune_interval: Seconds between minute-rollup prunes.
+        max_spill_bytes: Total size of the spill directory before the
+            oldest files are deleted.
+        max_spill_files: Number of spill files before the oldest are deleted.
+        replay_interval: Seconds before the first timer-driven spill replay;
+            doubled after each failed attempt up to ``replay_max_interval``.
+        replay_max_interval: Longest wait between spill replay attempts.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval_ms: float = 200.0,
+        max_queue_size: int = 10000,
+        enqueue_timeout: float = 0.05,
+        spill_dir: str = "data/log_spill",
+        insert_fn: Optional[InsertFn] = None,
+        rollups: bool = True,
+        minute_retention_hours: int = 48,
+        prune_interval: float = 300.0,
+        max_spill_bytes: int = 256 * 1024 * 1024,
+        max_spill_files: int = 10000,
+        replay_interval: float = 5.0,
+        replay_max_interval: float = 300.0,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_dir = Path(spill_dir)
+        self.insert_fn: InsertFn = insert_fn or self._insert_rows
+        self.rollups = rollups
+        self.minute_retention = timedelta(hours=minute_retention_hours)
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self.max_spill_bytes = max_spill_bytes
+        self.max_spill_files = max_spill_files
+        self.replay_interval = replay_interval
+        self.replay_max_interval = replay_max_interval
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._replayer: Optional[asyncio.Task] = None
+        self._replay_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Rows taken off the queue by the worker but not yet written
+        self._collecting: List[Dict[str, Any]] = []
+        self._spill_seq = 0
+        self._spill_pending = bool(self._spill_files())
+
+        self.batch_size_histogram = Histogram("log_writer_batch_size", BATCH_SIZE_BUCKETS)
+        self.flush_ms_histogram = Histogram("log_writer_flush_ms", FLUSH_MS_BUCKETS)
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "backpressure_waits": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "rejected": 0,
+            "errors": 0,
+            "rollup_rows": 0,
+            "unpersisted": 0,
+            "spill_dropped_files": 0,
+            "spill_dropped_rows": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def submit(
+        self,
+        attacker_ip: str,
+        command_entered: str,
+        response_sent: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        tenant_id: Optional[str] = None,
+        is_exfiltration_attempt: bool = False,
+    ) -> str:
+        """
+        Queue one ``honeypot_logs`` row and return its id without waiting
+        for the database.  ``tenant_id`` defaults to the default tenant,
+        resolved (from ``tenant_resolver``) at flush time.
+        """
+        row = {
+            "id": str(uuid4()),
+            "tenant_id": tenant_id,
+            "attacker_ip": attacker_ip,
+            "command_entered": command_entered,
+            "response_sent": response_sent,
+            "timestamp": datetime.now(timezone.utc),
+            "metadata": metadata,
+            "is_exfiltration_attempt": is_exfiltration_attempt,
+        }
+        self.stats["submitted"] += 1
+        queue = self._ensure_worker()
+
+        try:
+            queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.stats["backpressure_waits"] += 1
+            try:
+                await asyncio.wait_for(queue.put(row), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                await self._spill([row])
+        return row["id"]
+
+    async def flush(self) -> None:
+        """
+        Write everything queued so far, then replay the spill directory.
+
+        Only safe once the worker has been stopped — see ``stop``.
+        """
+        if self._collecting:
+            batch, self._collecting = self._collecting, []
+            await self._write(batch)
+        queue = self._queue
+        while queue is not None and not queue.empty():
+            batch = [queue.get_nowait() for _ in range(min(queue.qsize(), self.batch_size))]
+            await self._write(batch)
+        await self.replay_spill()
+
+    async def stop(self) -> None:
+        """Stop the background tasks and drain the queue (lifespan shutdown)."""
+        for task in (self._worker, self._replayer):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._worker = self._replayer = None
+        await self.flush()
+        self._queue = None
+        self._loop = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "spill_files": len(self._spill_files()),
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "flush_ms": self.flush_ms_histogram.snapshot(),
+        }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Create the queue and worker task for the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._queue is None:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._replay_lock = asyncio.Lock()
+            self._worker = self._replayer = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        if self._replayer is None or self._replayer.done():
+            self._replayer = loop.create_task(self._replay_periodically())
+        return self._queue
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Dict[str, Any]]:
+        """
+        Block for the first row, then gather more until size or deadline.
+
+        Rows are accumulated in ``self._collecting`` so that a cancelled
+        worker leaves them for ``flush`` instead of losing them.
+        """
+        batch = self._collecting
+        batch.append(await queue.get())
+        deadline = time.perf_counter() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            await self._collect(queue)
+            # Rows stay in _collecting until written, so a cancelled insert
+            # is retried by flush(); ON CONFLICT makes that idempotent.
+            written = await self._write(self._collecting)
+            self._collecting = []
+            if written and self._spill_pending:
+                await self.replay_spill()
+
+    async def _replay_periodically(self) -> None:
+        """Retry spilled rows on a timer, backing off while the database stays down."""
+        delay = self.replay_interval
+        while True:
+            await asyncio.sleep(delay)
+            if not self._spill_pending:
+                delay = self.replay_interval
+                continue
+            await self.replay_spill()
+            if self._spill_pending:
+                delay = min(delay * 2, self.replay_max_interval)
+            else:
+                delay = self.replay_interval
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        """Persist a batch, spilling it to disk on failure."""
+        started = time.perf_counter()
+        try:
+            await self.insert_fn(batch)
+        except _BadRows as e:
+            self.stats["errors"] += 1
+            logger.error(f"Log writer: batch of {len(batch)} rejected by PostgreSQL: {e}")
+            await self._spill(batch, rejected=True)
+            return False
+        except _NoDatabase:
+            if not self.stats["unpersisted"]:
+                logger.warning("Log writer: PostgreSQL not connected; honeypot logs are not persisted")
+            self.stats["unpersisted"] += len(batch)
+            return False
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Log writer: batch of {len(batch)} not written, spilling to disk: {e}")
+            await self._spill(batch)
+            return False
+
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        self.batch_size_histogram.observe(len(batch))
+        self.flush_ms_histogram.observe((time.perf_counter() - started) * 1000.0)
+        return True
+
+    async def _insert_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Multi-row INSERT through the shared async engine."""
+        if not db.connected or not db.session_factory:
+            raise _NoDatabase("PostgreSQL not connected")
+
+        async with db.session_factory() as session:
+            if any(not row["tenant_id"] for row in rows):
+                default_tenant_id = await tenant_resolver.default_tenant_id(session) or NULL_TENANT_ID
+                for row in rows:
+                    if not row["tenant_id"]:
+                        row["tenant_id"] = default_tenant_id
+            try:
+                inserted: List[Dict[str, Any]] = []
+                for start in range(0, len(rows), MAX_ROWS_PER_INSERT):
+                    chunk = rows[start:start + MAX_ROWS_PER_INSERT]
+                    stmt = (
+                        pg_insert(HoneypotLog.__table__).values(chunk)
+                        .on_conflict_do_nothing(index_elements=["id"])
+                        .returning(HoneypotLog.__table__.c.id)
+                    )
+                    result = await session.execute(stmt)
+                    # Rows already present (spill replay) must not be counted twice
+                    new_ids = {str(log_id) for log_id in result.scalars()}
+                    inserted.extend(row for row in chunk if row["id"] in new_ids)
+                if self.rollups and inserted:
+                    self.stats["rollup_rows"] += await apply_rollups(session, inserted)
+                    await self._maybe_prune_rollups(session)
+                await session.commit()
+            except (DataError, IntegrityError) as e:
+                await session.rollback()
+                raise _BadRows(str(e)) from e
+
+    async def _maybe_prune_rollups(self, session) -> None:
+        now = time.monotonic()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.prune_interval
+        await prune_minute_rollups(session, datetime.now(timezone.utc) - self.minute_retention)
+
+    # ------------------------------------------------------------------
+    # Disk spill
+    # ------------------------------------------------------------------
+
+    def _spill_files(self) -> List[Path]:
+        if not self.spill_dir.is_dir():
+            return []
+        return sorted(self.spill_dir.glob("spill-*.jsonl"))
+
+    def _trim_spill_dir(self) -> Tuple[int, int]:
+        """Delete the oldest spill files past the caps; returns (files, rows) dropped."""
+        files = []
+        for path in sorted(self.spill_dir.glob("spill-*")):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                files.append((path, path.stat().st_size))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size in files)
+        dropped_files = dropped_rows = 0
+        # Always keep the newest file
+        while len(files) > 1 and (len(files) > self.max_spill_files or total > self.max_spill_bytes):
+            path, size = files.pop(0)
+            try:
+                with open(path, "rb") as f:
+                    rows = sum(1 for line in f if line.strip())
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            total -= size
+            dropped_files += 1
+            dropped_rows += rows
+        return dropped_files, dropped_rows
+
+    def _write_spill_file(self, rows: List[Dict[str, Any]], rejected: bool) -> Path:
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._spill_seq += 1
+        name = f"spill-{time.time_ns():020d}-{os.getpid()}-{self._spill_seq:06d}.jsonl"
+        if rejected:
+            name += ".rejected"
+        path = self.spill_dir / name
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(_encode_row(row) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return path
+
+    async def _spill(self, rows: List[Dict[str, Any]], rejected: bool = False) -> None:
+        try:
+            await asyncio.to_thread(self._write_spill_file, rows, rejected)
+            dropped_files, dropped_rows = await asyncio.to_thread(self._trim_spill_dir)
+        except OSError as e:
+            logger.error(f"Log writer: could not spill {len(rows)} rows to {self.spill_dir}: {e}")
+            return
+        if dropped_files:
+            self.stats["spill_dropped_files"] += dropped_files
+            self.stats["spill_dropped_rows"] += dropped_rows
+            logger.error(
+                f"Log writer: spill directory over its cap, deleted the {dropped_files} oldest "
+                f"files ({dropped_rows} rows)"
+            )
+        if rejected:
+            self.stats["rejected"] += len(rows)
+        else:
+            self.stats["spilled"] += len(rows)
+            self._spill_pending = True
+
+    async def replay_spill(self) -> int:
+        """Re-insert spilled rows oldest-first; stops at the first failure."""
+        if self._replay_lock is None:
+            return await self._replay_spill()
+        async with self._replay_lock:
+            return await self._replay_spill()
+
+    async def _replay_spill(self) -> int:
+        replayed = 0
+        for path in self._spill_files():
+            try:
+                lines = await asyncio.to_thread(path.read_text, "utf-8")
+            except FileNotFoundError:
+                continue  # deleted by the spill cap meanwhile
+            rows = [_decode_row(line) for line in lines.splitlines() if line.strip()]
+            try:
+                for start in range(0, len(rows), self.batch_size):
+                    await self.insert_fn(rows[start:start + self.batch_size])
+            except _BadRows as e:
+                logger.error(f"Log writer: spill file {path.name} rejected: {e}")
+                self.stats["rejected"] += len(rows)
+                os.replace(path, path.with_name(path.name + ".rejected"))
+                continue
+            except Exception:
+                break  # database still unavailable; retry on a later flush or timer
+            path.unlink(missing_ok=True)
+            replayed += len(rows)
+        else:
+            self._spill_pending = False
+
+        self.stats["replayed"] += replayed
+        self.stats["written"] += replayed
+        return replayed
+
+
+log_writer = HoneypotLogWriter(
+    batch_size=settings.LOG_WRITER_BATCH_SIZE,
+    flush_interval_ms=settings.LOG_WRITER_FLUSH_INTERVAL_MS,
+    max_queue_size=settings.LOG_WRITER_MAX_QUEUE_SIZE,
+    enqueue_timeout=settings.LOG_WRITER_ENQUEUE_TIMEOUT,
+    spill_dir=settings.LOG_WRITER_SPILL_DIR,
+    rollups=settings.ROLLUPS_ENABLED,
+    minute_retention_hours=settings.ROLLUP_MINUTE_RETENTION_HOURS,
+    prune_interval=settings.ROLLUP_PRUNE_INTERVAL_SECONDS,
+    max_spill_bytes=settings.LOG_WRITER_MAX_SPILL_MB * 1024 * 1024,
+    max_spill_files=settings.LOG_WRITER_MAX_SPILL_FILES,
+    replay_interval=settings.LOG_WRITER_REPLAY_INTERVAL_SECONDS,
+    replay_max_interval=settings.LOG_WRITER_REPLAY_MAX_INTERVAL_SECONDS,
+)
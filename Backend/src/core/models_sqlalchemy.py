@@ -7,6 +7,9 @@ This module defines the database models for:
 - HoneypotLogs: Attack logs with command/response tracking
 - ReputationScores: IP reputation with Merkle Tree integrity
 - BeaconEvents: Honeytoken exfiltration tracking (Canary Trap)
+- DeceptionSessions: Spilled LLM command-history sessions per attacker IP
+- LogRollups: Minute/hour honeypot log counts for the dashboard
+- IntegrityCheckpoints: HMAC-signed hash-chain / Merkle frontier checkpoints
 """
 
 from datetime import datetime
@@ -14,7 +17,7 @@ from typing import Optional, List, Dict, Any
 from uuid import UUID, uuid4
 
 from sqlalchemy import (
-    String, Integer, Text, DateTime, Boolean, ForeignKey, Index, func
+    BigInteger, Float, String, Integer, Text, DateTime, Boolean, ForeignKey, Index, func, text
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship, DeclarativeBase
@@ -91,6 +94,14 @@ class Tenant(Base):
         return f"<Tenant(id={self.id}, email={self.email})>"
 
 
+# JSONB classification fields used by the dashboard aggregates.  Queries and
+# the expression indexes on honeypot_logs must spell these exactly the same
+# way (literal keys, ``->`` operators) for the planner to use the indexes.
+IS_MALICIOUS_SQL = "(metadata -> 'classification' ->> 'is_malicious')"
+ATTACK_TYPE_SQL = "(metadata -> 'classification' ->> 'attack_type')"
+GEO_LOCATION_SQL = "(metadata -> 'geo_location')"
+
+
 class HoneypotLog(Base):
     """
     Honeypot log model for tracking attacker interactions.
@@ -146,6 +157,16 @@ class HoneypotLog(Base):
         comment="When the attack was logged"
     )
     
+    # Set by PostgreSQL when the row is written (transaction start); a
+    # spilled log replayed hours later keeps its timestamp but gets a
+    # fresh inserted_at, so incremental exports page on this column
+    inserted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        comment="When the row was inserted"
+    )
+    
     # JSONB for flexible metadata storage
     # Note: Python attribute is 'log_metadata' because 'metadata' is reserved by SQLAlchemy DeclarativeBase.
     # The actual database column is still named 'metadata'.
@@ -175,6 +196,14 @@ class HoneypotLog(Base):
     __table_args__ = (
         Index('ix_honeypot_logs_tenant_timestamp', 'tenant_id', 'timestamp'),
         Index('ix_honeypot_logs_ip_timestamp', 'attacker_ip', 'timestamp'),
+        Index('ix_honeypot_logs_tenant_inserted_at', 'tenant_id', 'inserted_at', 'id'),
+        # Dashboard aggregates (GROUP BY over JSONB classification fields)
+        Index('ix_honeypot_logs_is_malicious', text(IS_MALICIOUS_SQL)),
+        Index('ix_honeypot_logs_attack_type', text(ATTACK_TYPE_SQL)),
+        Index(
+            'ix_honeypot_logs_malicious_ip_timestamp', 'attacker_ip', 'timestamp',
+            postgresql_where=text(f"{IS_MALICIOUS_SQL} = 'true'"),
+        ),
     )
     
     def __repr__(self) -> str:
@@ -387,6 +416,194 @@ class BeaconEvent(Base):
         }
 
 
+class DeceptionSession(Base):
+    """
+    Cold LLM deception session spilled out of the in-process store.
+
+    When an attacker's command history idles out of memory it is written
+    here, and reloaded the next time the same IP shows up so the fake
+    terminal stays consistent with what it told them before.
+    """
+    __tablename__ = "deception_sessions"
+
+    # Primary key - attacker IP (one session per IP, like the in-memory store)
+    ip_address: Mapped[str] = mapped_column(
+        String(45),
+        primary_key=True,
+        comment="Attacker IP address (IPv4 or IPv6)"
+    )
+
+    # Recent command/response pairs (CommandHistory.to_dict())
+    commands: Mapped[List[Dict[str, str]]] = mapped_column(
+        JSONB,
+        nullable=False,
+        comment="Recent command/response history for LLM context"
+    )
+
+    last_seen: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+        index=True,
+        comment="When the session was last spilled"
+    )
+
+    def __repr__(self) -> str:
+        return f"<DeceptionSession(ip={self.ip_address}, commands={len(self.commands or [])})>"
+
+
+class LogRollup(Base):
+    """
+    Pre-aggregated honeypot log counts per time bucket.
+    
+    One row per (granularity, bucket, dimension, key, is_malicious), kept
+    up to date by the log writer in the same transaction as the log rows
+    it inserts.  Dashboard reads sum the hour buckets instead of scanning
+    ``honeypot_logs``; minute buckets back short-range timelines and are
+    pruned after a retention window.
+    
+    Dimensions:
+      - attack_type: key = classification.attack_type ('' when missing)
+      - ip:          key = attacker IP
+      - country:     key = geo country, sub_key = city (with coordinates)
+    """
+    __tablename__ = "log_rollups"
+
+    # 'minute' or 'hour'
+    granularity: Mapped[str] = mapped_column(String(8), primary_key=True)
+
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        comment="UTC start of the bucket"
+    )
+
+    dimension: Mapped[str] = mapped_column(String(16), primary_key=True)
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    sub_key: Mapped[str] = mapped_column(Text, primary_key=True, default="", server_default="")
+    is_malicious: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    last_seen: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    # Representative coordinates (country dimension only)
+    latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    __table_args__ = (
+        Index('ix_log_rollups_dimension_bucket', 'granularity', 'dimension', 'bucket_start'),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<LogRollup({self.granularity} {self.bucket_start} "
+            f"{self.dimension}={self.key!r} count={self.count})>"
+        )
+
+
+class IntegrityCheckpoint(Base):
+    """
+    Signed snapshot of an append-only hash chain.
+    
+    Records how many entries a stream had, the hash of the last one and
+    the Merkle frontier over all of them, signed with HMAC-SHA256.  Once
+    a checkpoint is trusted, verification only re-hashes the entries
+    appended after it (see ``src/core/integrity_checkpoints.py``).
+    
+    Streams:
+      - blockchain:     the legacy attack-log chain (``blockchain_logger``)
+      - threat_scores:  the reputation score chain
+      - ip:<address>:   one attacker's honeypot logs, oldest first
+    """
+    __tablename__ = "integrity_checkpoints"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    stream: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    entry_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    head_hash: Mapped[Optional[str]] = mapped_column(
+        String(64),
+        nullable=True,
+        comment="Hash of the last entry covered"
+    )
+
+    # MerkleAccumulator.frontier (subtree roots by level)
+    frontier: Mapped[List[Optional[str]]] = mapped_column(JSONB, nullable=False)
+
+    merkle_root: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
+    # Keyset position of the last covered log (ip:<address> streams)
+    cursor: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    signature: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        comment="HMAC-SHA256 over the checkpoint fields"
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    __table_args__ = (
+        Index('ix_integrity_checkpoints_stream_count', 'stream', 'entry_count'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IntegrityCheckpoint({self.stream} count={self.entry_count})>"
+
+
+class AnchorEpochRecord(Base):
+    """
+    One on-chain anchoring epoch (``AnchorEpoch`` in
+    ``src/utils/blockchain_sync.py``): the roots it sealed and the state
+    of its transaction.  Reloaded at startup so log → epoch proofs
+    survive a restart; the per-stream coverage is rebuilt from
+    ``members``.
+    """
+    __tablename__ = "anchor_epochs"
+
+    epoch: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+
+    root_of_roots: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    # [{"source", "root", "count", "head_hash"}, ...] in Merkle leaf order
+    members: Mapped[List[Dict[str, Any]]] = mapped_column(JSONB, nullable=False)
+
+    status: Mapped[str] = mapped_column(
+        String(16),
+        nullable=False,
+        comment="sealed | sent | timed_out | confirmed | failed"
+    )
+
+    tx_hash: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)
+
+    # Transactions this one replaced at a higher fee (same nonce)
+    replaced_tx_hashes: Mapped[List[str]] = mapped_column(JSONB, nullable=False, default=list)
+
+    nonce: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+    fee_bumps: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    block_number: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+    gas_used: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    sealed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    confirmed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<AnchorEpochRecord(epoch={self.epoch} status={self.status})>"
+
+
 # Pydantic models for API validation (kept for request/response schemas)
 from pydantic import BaseModel, Field
 from enum import Enum
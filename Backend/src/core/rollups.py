@@ -0,0 +1,402 @@
+"""
+Dashboard Rollups
+=================
+
+Minute and hour buckets of ``honeypot_logs`` counts (table
+``log_rollups``) maintained incrementally on the write path, so the
+dashboard reads O(buckets) rows instead of scanning every log.
+
+Each persisted log adds 1 to one row per (granularity, dimension):
+  - attack_type: classification.attack_type ('' when missing)
+  - ip:          attacker IP
+  - country:     geo country + city (only logs with a geo_location)
+
+Write path:  ``HoneypotLogWriter`` calls ``apply_rollups`` in the same
+transaction as its INSERT, passing only the rows that were actually
+inserted (``ON CONFLICT DO NOTHING ... RETURNING id``), so replaying a
+spill file never double counts.
+
+Read path:   ``rollup_*`` helpers return the same shapes as the
+``aggregate_*`` helpers in ``database_postgres`` (which remain the exact
+reference used by ``scripts/backfill_rollups.py --verify``).
+
+Rebuild:     ``backfill_rollups`` recomputes buckets from history with
+``INSERT ... SELECT`` while holding an EXCLUSIVE lock on ``log_rollups``
+(live writers wait for it, so no log is counted twice or missed).
+
+Usage:
+    python scripts/backfill_rollups.py               # rebuild everything
+    python scripts/backfill_rollups.py --since 2026-10-01T00:00:00+00:00
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.models_sqlalchemy import (
+    ATTACK_TYPE_SQL,
+    GEO_LOCATION_SQL,
+    IS_MALICIOUS_SQL,
+    LogRollup,
+)
+
+GRANULARITIES = ("minute", "hour")
+DIMENSIONS = ("attack_type", "ip", "country")
+
+_PRIMARY_KEY = ("granularity", "bucket_start", "dimension", "key", "sub_key", "is_malicious")
+
+# asyncpg caps a statement at 32767 bind parameters (10 columns per row)
+MAX_ROWS_PER_UPSERT = 3000
+
+
+# ============================================================
+# Write path
+# ============================================================
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    """UTC start of the minute/hour bucket containing ``ts``."""
+    ts = ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+    if granularity == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup granularity: {granularity!r}")
+
+
+def _json_text(value: Any) -> str:
+    """Python equivalent of PostgreSQL ``->>`` ('' for null / missing)."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _coordinate(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def rollup_deltas(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge ``honeypot_logs`` rows (writer dicts with a ``metadata`` key)
+    into one increment per rollup primary key.
+
+    Keys mirror the SQL used by ``backfill_rollups`` so incremental and
+    rebuilt buckets agree.  The result is sorted by primary key, which
+    gives concurrent writers the same row-lock order.
+    """
+    merged: Dict[Tuple, Dict[str, Any]] = {}
+    for row in rows:
+        meta = row.get("metadata") or {}
+        classification = meta.get("classification")
+        if not isinstance(classification, dict):
+            classification = {}
+        malicious = _json_text(classification.get("is_malicious")) == "true"
+        ts = row["timestamp"]
+
+        entries = [
+            ("attack_type", _json_text(classification.get("attack_type")), "", None, None),
+            ("ip", row["attacker_ip"], "", None, None),
+        ]
+        geo = meta.get("geo_location")
+        if isinstance(geo, dict) and geo:
+            latitude = _coordinate(geo.get("latitude"))
+            longitude = _coordinate(geo.get("longitude"))
+            # Coordinates are kept as a pair or not at all
+            if latitude is None or longitude is None:
+                latitude = longitude = None
+            entries.append((
+                "country",
+                _json_text(geo.get("country")),
+                _json_text(geo.get("city")),
+                latitude,
+                longitude,
+            ))
+
+        for granularity in GRANULARITIES:
+            bucket = bucket_start(ts, granularity)
+            for dimension, key, sub_key, latitude, longitude in entries:
+                pk = (granularity, bucket, dimension, key, sub_key, malicious)
+                delta = merged.get(pk)
+                if delta is None:
+                    merged[pk] = dict(
+                        zip(_PRIMARY_KEY, pk),
+                        count=1, last_seen=ts, latitude=latitude, longitude=longitude,
+                    )
+                    continue
+                delta["count"] += 1
+                if ts > delta["last_seen"]:
+                    delta["last_seen"] = ts
+                if latitude is not None:
+                    delta["latitude"] = latitude
+                    delta["longitude"] = longitude
+
+    return [merged[pk] for pk in sorted(merged)]
+
+
+async def apply_rollups(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """
+    Add freshly inserted log rows to their buckets (caller commits).
+
+    Returns:
+        Number of rollup rows upserted
+    """
+    deltas = rollup_deltas(rows)
+    table = LogRollup.__table__
+    for start in range(0, len(deltas), MAX_ROWS_PER_UPSERT):
+        stmt = pg_insert(table).values(deltas[start:start + MAX_ROWS_PER_UPSERT])
+        excluded = stmt.excluded
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=list(_PRIMARY_KEY),
+                set_={
+                    "count": table.c.count + excluded.count,
+                    "last_seen": func.greatest(table.c.last_seen, excluded.last_seen),
+                    "latitude": func.coalesce(excluded.latitude, table.c.latitude),
+                    "longitude": func.coalesce(excluded.longitude, table.c.longitude),
+                },
+            )
+        )
+    return len(deltas)
+
+
+async def prune_minute_rollups(session: AsyncSession, before: datetime) -> int:
+    """Delete minute buckets that start before ``before`` (caller commits)."""
+    result = await session.execute(
+        delete(LogRollup)
+        .where(LogRollup.granularity == "minute")
+        .where(LogRollup.bucket_start < before)
+    )
+    return result.rowcount or 0
+
+
+# ============================================================
+# Read path (hour buckets cover all history)
+# ============================================================
+
+def _hour_buckets(dimension: str):
+    return (LogRollup.granularity == "hour", LogRollup.dimension == dimension)
+
+
+async def rollup_classification_counts(
+    session: AsyncSession
+) -> List[Tuple[bool, Optional[str], int]]:
+    """Same result as ``aggregate_classification_counts``, from rollups."""
+    result = await session.execute(
+        select(LogRollup.is_malicious, LogRollup.key, func.sum(LogRollup.count))
+        .where(*_hour_buckets("attack_type"))
+        .group_by(LogRollup.is_malicious, LogRollup.key)
+    )
+    return [(malicious, key or None, int(n)) for malicious, key, n in result.all()]
+
+
+async def rollup_top_attackers(
+    session: AsyncSession,
+    limit: int = 10,
+    malicious_only: bool = True
+) -> List[Dict[str, Any]]:
+    """Same result as ``aggregate_top_attackers``, from rollups."""
+    count = func.sum(LogRollup.count).label("count")
+    stmt = (
+        select(LogRollup.key, count, func.max(LogRollup.last_seen))
+        .where(*_hour_buckets("ip"))
+        .group_by(LogRollup.key)
+        .order_by(count.desc(), LogRollup.key)
+        .limit(limit)
+    )
+    if malicious_only:
+        stmt = stmt.where(LogRollup.is_malicious.is_(True))
+    result = await session.execute(stmt)
+    return [
+        {"ip": ip, "count": int(n), "last_seen": last_seen}
+        for ip, n, last_seen in result.all()
+    ]
+
+
+async def rollup_geo_locations(
+    session: AsyncSession,
+    limit: int = 50,
+    malicious_only: bool = True,
+    require_country: bool = False
+) -> List[Dict[str, Any]]:
+    """Same result as ``aggregate_geo_locations``, from rollups."""
+    has_coordinates = LogRollup.latitude.isnot(None) & LogRollup.longitude.isnot(None)
+
+    def newest(column):
+        # Same ordering for both columns so they come from one bucket
+        return array_agg(aggregate_order_by(
+            column, LogRollup.last_seen.desc(), LogRollup.bucket_start.desc(), LogRollup.is_malicious.desc()
+        )).filter(has_coordinates)[1]
+
+    count = func.sum(LogRollup.count).label("count")
+    stmt = (
+        select(
+            LogRollup.key, LogRollup.sub_key,
+            newest(LogRollup.latitude), newest(LogRollup.longitude),
+            count,
+        )
+        .where(*_hour_buckets("country"))
+        .group_by(LogRollup.key, LogRollup.sub_key)
+        .order_by(count.desc())
+        .limit(limit)
+    )
+    if malicious_only:
+        stmt = stmt.where(LogRollup.is_malicious.is_(True))
+    if require_country:
+        stmt = stmt.where(LogRollup.key != "")
+    result = await session.execute(stmt)
+    return [
+        {
+            "country": country or None,
+            "city": city or None,
+            "latitude": latitude,
+            "longitude": longitude,
+            "count": int(n),
+        }
+        for country, city, latitude, longitude, n in result.all()
+    ]
+
+
+async def rollup_timeline(
+    session: AsyncSession,
+    granularity: str,
+    since: datetime,
+    until: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    Per-bucket totals between ``since`` and ``until`` (oldest first).
+
+    Returns:
+        List of {"bucket_start", "total", "malicious", "attack_distribution"}
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown rollup granularity: {granularity!r}")
+    stmt = (
+        select(LogRollup.bucket_start, LogRollup.is_malicious, LogRollup.key, LogRollup.count)
+        .where(LogRollup.granularity == granularity)
+        .where(LogRollup.dimension == "attack_type")
+        .where(LogRollup.bucket_start >= bucket_start(since, granularity))
+        .order_by(LogRollup.bucket_start)
+    )
+    if until is not None:
+        stmt = stmt.where(LogRollup.bucket_start < until)
+    result = await session.execute(stmt)
+
+    timeline: Dict[datetime, Dict[str, Any]] = {}
+    for bucket, malicious, key, n in result.all():
+        point = timeline.get(bucket)
+        if point is None:
+            point = timeline[bucket] = {
+                "bucket_start": bucket, "total": 0, "malicious": 0, "attack_distribution": {},
+            }
+        point["total"] += n
+        if malicious:
+            point["malicious"] += n
+            attack_type = key or "UNKNOWN"
+            point["attack_distribution"][attack_type] = point["attack_distribution"].get(attack_type, 0) + n
+    return list(timeline.values())
+
+
+# ============================================================
+# Backfill
+# ============================================================
+
+def _coordinate_sql(field: str) -> str:
+    """Coordinate of the newest log in the group that has both, as a pair."""
+    return (
+        f"(array_agg(({GEO_LOCATION_SQL} ->> '{field}')::float8 ORDER BY timestamp DESC, id DESC) "
+        f"FILTER (WHERE jsonb_typeof({GEO_LOCATION_SQL} -> 'latitude') = 'number' "
+        f"AND jsonb_typeof({GEO_LOCATION_SQL} -> 'longitude') = 'number'))[1]"
+    )
+
+
+# dimension -> (key, sub_key, latitude, longitude, row filter)
+_DIMENSION_SQL = {
+    "attack_type": (f"COALESCE({ATTACK_TYPE_SQL}, '')", "''", "NULL::float8", "NULL::float8", "TRUE"),
+    "ip": ("attacker_ip", "''", "NULL::float8", "NULL::float8", "TRUE"),
+    "country": (
+        f"COALESCE({GEO_LOCATION_SQL} ->> 'country', '')",
+        f"COALESCE({GEO_LOCATION_SQL} ->> 'city', '')",
+        _coordinate_sql("latitude"),
+        _coordinate_sql("longitude"),
+        f"jsonb_typeof({GEO_LOCATION_SQL}) = 'object' AND {GEO_LOCATION_SQL} <> '{{}}'::jsonb",
+    ),
+}
+
+
+def backfill_statement(granularity: str, dimension: str, since: Optional[datetime] = None):
+    """``INSERT ... SELECT`` rebuilding one (granularity, dimension) from honeypot_logs."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown rollup granularity: {granularity!r}")
+    key, sub_key, latitude, longitude, row_filter = _DIMENSION_SQL[dimension]
+    sql = f"""
+        INSERT INTO log_rollups (
+            granularity, bucket_start, dimension, key, sub_key, is_malicious,
+            count, last_seen, latitude, longitude
+        )
+        SELECT
+            '{granularity}',
+            date_trunc('{granularity}', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS rollup_bucket,
+            '{dimension}',
+            {key} AS rollup_key,
+            {sub_key} AS rollup_sub_key,
+            COALESCE({IS_MALICIOUS_SQL} = 'true', false) AS rollup_malicious,
+            count(*),
+            max(timestamp),
+            {latitude},
+            {longitude}
+        FROM honeypot_logs
+        WHERE {row_filter}{" AND timestamp >= :since" if since is not None else ""}
+        GROUP BY rollup_bucket, rollup_key, rollup_sub_key, rollup_malicious
+    """
+    stmt = text(sql)
+    return stmt.bindparams(since=since) if since is not None else stmt
+
+
+async def backfill_rollups(
+    session: AsyncSession,
+    since: Optional[datetime] = None,
+    minute_retention_hours: int = 48,
+    now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Rebuild rollups from ``honeypot_logs`` (caller commits).
+
+    Hour buckets are rebuilt from ``since`` (rounded down to the hour, or
+    from the beginning); minute buckets only inside the retention window.
+    Live writers block on the table lock until the caller commits.
+
+    Returns:
+        Rows written per granularity
+    """
+    now = now or datetime.now(timezone.utc)
+    await session.execute(text("LOCK TABLE log_rollups IN EXCLUSIVE MODE"))
+
+    retention_start = bucket_start(now - timedelta(hours=minute_retention_hours), "minute")
+    hour_since = bucket_start(since, "hour") if since is not None else None
+    minute_since = max(retention_start, hour_since) if hour_since is not None else retention_start
+
+    clear_hours = delete(LogRollup).where(LogRollup.granularity == "hour")
+    if hour_since is not None:
+        clear_hours = clear_hours.where(LogRollup.bucket_start >= hour_since)
+    await session.execute(clear_hours)
+    await session.execute(
+        delete(LogRollup)
+        .where(LogRollup.granularity == "minute")
+        .where(LogRollup.bucket_start >= minute_since)
+    )
+    await prune_minute_rollups(session, retention_start)
+
+    written: Dict[str, int] = {}
+    for granularity, start in (("hour", hour_since), ("minute", minute_since)):
+        written[granularity] = 0
+        for dimension in DIMENSIONS:
+            result = await session.execute(backfill_statement(granularity, dimension, start))
+            written[granularity] += result.rowcount or 0
+    return written
@@ -0,0 +1,412 @@
+"""
+Compiled Heuristic Classification Engine
+=========================================
+
+Precompiled replacement for the per-call ``re.search`` loops that used to
+live in ``MLClassifier.heuristic_fallback``.
+
+Every threat family is compiled once into a single master pattern of the
+form ``(?=(?P<ssi>...)|(?P<xss>...)|...)``.  The zero-width alternation is
+evaluated at every position of the input in one left-to-right scan; at a
+given position the regex engine reports the highest-priority family that
+matches there, and the scan keeps the best family seen so far (stopping
+early once the top-priority family is found).  The result is identical to
+running the families one after another with ``re.search``.
+
+Benign exceptions are matched first against the lowercased text (as
+before) with their own combined pattern, and the brute-force heuristic
+stays a cheap Python check after the regex scan.
+
+Priority order:
+    benign exceptions → SSI → XSS → SQLi → path traversal → pipe
+    injection → OS command → NoSQL → SSRF → XXE → brute force
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Pattern, Tuple
+
+from src.core.models import AttackType
+
+
+@dataclass(frozen=True)
+class HeuristicFamily:
+    """One family of regexes that maps to a single verdict."""
+    name: str
+    patterns: Tuple[str, ...]
+    flags: int
+    attack_type: AttackType
+    confidence: float
+
+
+# =============================================================================
+# BENIGN EXCEPTIONS - Common legitimate commands (matched on lowercased text)
+# =============================================================================
+BENIGN_PATTERNS: Tuple[str, ...] = (
+    r"python\d*\s+--version",
+    r"node\s+--version",
+    r"npm\s+--version",
+    r"pip\d*\s+--version",
+    r"java\s+--version",
+    r"git\s+--version",
+    r"docker\s+--version",
+    r"curl\s+--version",
+    r"wget\s+--version",
+    r"python\d*\s+-m\s+pip",
+    r"npm\s+(install|run|build|start|test|dev)",
+    r"git\s+(status|log|pull|push|commit|checkout|branch)",
+    r"docker\s+(ps|images|run|build|stop|start)",
+    r"systemctl\s+(status|start|stop|restart)",
+    r"journalctl\s+-u",
+    r"^login:",                    # Login attempts (case insensitive)
+    r"^login:[a-z0-9_.-]+$",       # LOGIN:username format
+)
+
+# =============================================================================
+# SSI (Server-Side Injection) Patterns - most specific
+# =============================================================================
+SSI_PATTERNS: Tuple[str, ...] = (
+    r"<!--#exec", r"<!--#include", r"<!--#echo", r"<!--#config",
+    r"<!--#set", r"<!--#printenv", r"<!--#flastmod", r"<!--#fsize",
+    r"\{\{.*\}\}",           # SSTI: Jinja2, Angular
+    r"\$\{.*\}",             # SSTI: Spring EL, JavaScript
+    r"<%.*%>",               # SSTI: JSP, ASP
+    r"\[\[.*\]\]",           # SSTI: Some templates
+    r"#\{.*\}",              # SSTI: Ruby, OGNL
+    r"\{\%.*\%\}",           # SSTI: Jinja2 blocks
+    r"\{\{7\*7\}\}",         # SSTI test payload
+    r"\{\{.*\*.*\}\}",       # SSTI arithmetic
+)
+
+# =============================================================================
+# XSS (Cross-Site Scripting) Patterns
+# =============================================================================
+XSS_PATTERNS: Tuple[str, ...] = (
+    r"<script", r"</script>", r"javascript:", r"onerror\s*=",
+    r"onload\s*=", r"onclick\s*=", r"onmouseover\s*=",
+    r"<iframe", r"<svg.*on", r"<math", r"<img.*onerror",
+    r"document\.cookie", r"document\.location", r"document\.write",
+    r"alert\s*\(", r"confirm\s*\(", r"prompt\s*\(",
+    r"eval\s*\(", r"setTimeout\s*\(", r"setInterval\s*\(",
+    r"innerHTML\s*=", r"outerHTML\s*=", r"insertAdjacentHTML",
+    r"fromcharcode", r"atob\s*\(", r"btoa\s*\(",
+    r"<body.*on", r"<input.*on", r"<form.*on",
+    r"data:text/html", r"<embed", r"<object",
+    r"<details.*ontoggle", r"<marquee.*onstart",
+)
+
+# =============================================================================
+# SQL Injection (SQLi) Patterns
+# =============================================================================
+SQLI_PATTERNS: Tuple[str, ...] = (
+    r"union\s+select", r"union\s+all\s+select",
+    r"or\s+1\s*=\s*1", r"and\s+1\s*=\s*1",
+    r"'\s*or\s*'", r"'\s*and\s*'",
+    r"--\s*$", r"--\s+", r"#\s*$",
+    r"drop\s+table", r"drop\s+database",
+    r"insert\s+into", r"update\s+.*\s+set",
+    r"delete\s+from", r"truncate\s+table",
+    r"admin'\s*--", r"admin'\s*#",
+    r"'\s*or\s+'1'\s*=\s*'1", r"'\s*or\s+true",
+    r"select\s+.*\s+from", r"select\s+.*\s+where",
+    r"exec\s+xp_", r"execute\s+xp_",
+    r"waitfor\s+delay", r"sleep\s*\(",
+    r"benchmark\s*\(", r"pg_sleep",
+    r"information_schema", r"sys\.(tables|columns|objects)",
+    r"concat\s*\(", r"char\s*\(", r"hex\s*\(",
+    r"0x[0-9a-fA-F]+",  # Hex values
+    r"'\s*;\s*",        # Statement termination
+)
+
+# =============================================================================
+# Path Traversal Patterns
+# =============================================================================
+PATH_TRAVERSAL_PATTERNS: Tuple[str, ...] = (
+    r"\.\./",              # Basic Linux ../
+    r"\.\.\\",             # Windows ..\
+    r"\.\.%2f",            # URL encoded ../
+    r"\.\.%5c",            # URL encoded ..\
+    r"%2e%2e%2f",          # Fully URL encoded
+    r"%2e%2e/",            # Partially URL encoded
+    r"\.\.%252f",          # Double URL encoded
+    r"%252e%252e%252f",    # Double URL encoded
+    r"\.\.%c0%af",         # Unicode encoding
+    r"\.\.%c1%9c",         # Unicode encoding (Windows)
+    r"/etc/passwd",        # Sensitive Linux files
+    r"/etc/shadow",        # Sensitive Linux files
+    r"/proc/self",         # Linux proc filesystem
+    r"/var/log",           # Linux logs
+    r"\\windows\\system32", # Windows system files
+    r"\\windows\\repair",   # Windows repair
+    r"boot\.ini",          # Windows boot
+    r"win\.ini",           # Windows ini files
+    r"web\.config",        # ASP.NET config
+    r"\.htaccess",         # Apache config
+    r"wp-config\.php",     # WordPress config
+    r"\.env",              # Environment files
+    r"\.git/",             # Git directory
+    r"\.svn/",             # SVN directory
+)
+
+# =============================================================================
+# Pipe & Command Injection Patterns (case-sensitive)
+# =============================================================================
+PIPE_INJECTION_PATTERNS: Tuple[str, ...] = (
+    r"\|\s*\w+",           # | command
+    r"\|&",                # |&
+    r"\|\|",               # ||
+    r";\s*\w+",            # ; command
+    r"&\s*\w+",            # & command
+    r"`[^`]+`",            # Backtick execution
+    r"\$\([^)]+\)",        # $(command) substitution
+    r">\s*/",              # Redirect to root
+    r"<\s*/",              # Redirect from root
+    r"&&\s*\w+",           # && command
+    r"\|\s*cat\s+",        # | cat
+    r"\|\s*ls\s+",         # | ls
+    r"\|\s*whoami",        # | whoami
+    r"\|\s*id\s",          # | id
+    r"\|\s*uname",         # | uname
+)
+
+# =============================================================================
+# OS Command Injection / Destructive Commands
+# =============================================================================
+OS_COMMAND_PATTERNS: Tuple[str, ...] = (
+    r"rm\s+-rf", r"rm\s+-fr", r"rm\s+/\s",
+    r"wget\s+http", r"wget\s+https",
+    r"curl\s+.*\|\s*bash", r"curl\s+.*\|\s*sh",
+    r"cat\s+/etc/passwd", r"cat\s+/etc/shadow",
+    r"nc\s+-e", r"nc\s+.*-e", r"netcat\s+-e",
+    r"bash\s+-i", r"bash\s+-c",
+    r"chmod\s+\+x", r"chmod\s+777",
+    r"chown\s+root", r"chown\s+sudo",
+    r"sudo\s+su", r"sudo\s+bash", r"sudo\s+-i",
+    r"su\s+-", r"su\s+root",
+    r"mkfifo", r"mknod",
+    r"telnet\s+", r"ssh\s+.*@",
+    r"python.*-c\s+.*import\s+socket",
+    r"perl.*-e\s+.*socket",
+    r"ruby.*-e\s+.*socket",
+    r"php.*-r\s+.*fsockopen",
+    r"lua.*-e\s+.*socket",
+    r"nmap\s+", r"masscan\s+",
+    r"hydra\s+", r"john\s+", r"hashcat\s+",
+    r"sqlmap\s+", r"nikto\s+", r"nuclei\s+",
+    r"metasploit", r"msfconsole",
+    r"meterpreter", r"reverse.*shell",
+    r"bind.*shell", r"payload.*sh",
+    r"backdoor", r"trojan", r"rat\s",
+    r"keylog", r"screen\s+capture",
+    r"/dev/tcp/", r"/dev/udp/",
+    r"base64\s+-d", r"base64\s+--decode",
+    r"xxd\s+-r", r"xxd\s+--revert",
+)
+
+# =============================================================================
+# NoSQL Injection Patterns (case-sensitive)
+# =============================================================================
+NOSQL_PATTERNS: Tuple[str, ...] = (
+    r"\{\s*\"\s*\$\s*gt\s*:",    # {$gt:
+    r"\{\s*\"\s*\$\s*lt\s*:",    # {$lt:
+    r"\{\s*\"\s*\$\s*ne\s*:",    # {$ne:
+    r"\{\s*\"\s*\$\s*regex\s*:", # {$regex:
+    r"\{\s*\"\s*\$\s*where\s*:", # {$where:
+    r"\{\s*\"\s*\$\s*or\s*:",    # {$or:
+    r"\{\s*\"\s*\$\s*and\s*:",   # {$and:
+    r"\{\s*\"\s*\$\s*in\s*:",    # {$in:
+    r"\{\s*\"\s*\$\s*nin\s*:",   # {$nin:
+    r"\"password\"\s*:\s*\{",    # password: {
+    r"\"username\"\s*:\s*\{",    # username: {
+)
+
+# =============================================================================
+# SSRF (Server-Side Request Forgery) Patterns
+# =============================================================================
+SSRF_PATTERNS: Tuple[str, ...] = (
+    r"http://127\.0\.0\.1",
+    r"http://localhost",
+    r"http://0\.0\.0\.0",
+    r"http://\[::1\]",
+    r"http://169\.254\.169\.254",  # AWS metadata
+    r"http://metadata\.google",     # GCP metadata
+    r"http://169\.254\.170\.2",     # ECS metadata
+    r"gopher://",
+    r"dict://",
+    r"file://",
+    r"ldap://",
+    r"tftp://",
+    r"netdoc://",
+    r"http://.*:22",  # SSH port
+    r"http://.*:23",  # Telnet port
+    r"http://.*:3306", # MySQL port
+    r"http://.*:5432", # PostgreSQL port
+    r"http://.*:6379", # Redis port
+    r"http://.*:27017", # MongoDB port
+)
+
+# =============================================================================
+# XXE (XML External Entity) Patterns
+# =============================================================================
+XXE_PATTERNS: Tuple[str, ...] = (
+    r"<!DOCTYPE.*\[",
+    r"<!ENTITY",
+    r"SYSTEM\s+['\"]file:",
+    r"SYSTEM\s+['\"]http:",
+    r"SYSTEM\s+['\"]expect:",
+    r"PUBLIC\s+['\"]",
+    r"<!ATTLIST",
+    r"<!NOTATION",
+)
+
+# Threat families in priority order (first match wins)
+THREAT_FAMILIES: Tuple[HeuristicFamily, ...] = (
+    HeuristicFamily("ssi", SSI_PATTERNS, re.IGNORECASE, AttackType.SSI, 0.90),
+    HeuristicFamily("xss", XSS_PATTERNS, re.IGNORECASE, AttackType.XSS, 0.90),
+    HeuristicFamily("sqli", SQLI_PATTERNS, re.IGNORECASE, AttackType.SQLI, 0.85),
+    HeuristicFamily("path_traversal", PATH_TRAVERSAL_PATTERNS, re.IGNORECASE, AttackType.SSI, 0.90),
+    HeuristicFamily("pipe_injection", PIPE_INJECTION_PATTERNS, 0, AttackType.SSI, 0.90),
+    HeuristicFamily("os_command", OS_COMMAND_PATTERNS, re.IGNORECASE, AttackType.SSI, 0.95),
+    HeuristicFamily("nosql", NOSQL_PATTERNS, 0, AttackType.SQLI, 0.85),
+    HeuristicFamily("ssrf", SSRF_PATTERNS, re.IGNORECASE, AttackType.SSI, 0.85),
+    HeuristicFamily("xxe", XXE_PATTERNS, re.IGNORECASE, AttackType.SSI, 0.90),
+)
+
+# Brute force (heuristic: short text with common keywords).
+# "admin" and "root" are deliberately excluded — they are valid usernames.
+BRUTE_FORCE_KEYWORDS: Tuple[str, ...] = ("password", "123456")
+BRUTE_FORCE_MAX_LENGTH = 15
+BRUTE_FORCE_CONFIDENCE = 0.75
+
+
+class HeuristicEngine:
+    """
+    Precompiled multi-family matcher.
+
+    Build once (module singleton ``heuristic_engine``) and call
+    ``classify(text)``; the result is the ``(AttackType, confidence)``
+    tuple that ``MLClassifier.heuristic_fallback`` has always returned.
+    ``load`` swaps in a new pattern set and recomputes ``fingerprint``.
+    """
+
+    def __init__(
+        self,
+        benign_patterns: Tuple[str, ...] = BENIGN_PATTERNS,
+        families: Tuple[HeuristicFamily, ...] = THREAT_FAMILIES,
+    ):
+        self.load(benign_patterns, families)
+
+    def load(
+        self,
+        benign_patterns: Tuple[str, ...] = BENIGN_PATTERNS,
+        families: Tuple[HeuristicFamily, ...] = THREAT_FAMILIES,
+    ) -> None:
+        """
+        Compile a pattern set and make it current.
+
+        Everything is compiled before anything is replaced, so an invalid
+        pattern raises ``re.error`` and leaves the current set in place.
+        """
+        benign_re = re.compile("|".join(f"(?:{p})" for p in benign_patterns))
+
+        branches = []
+        for family in families:
+            body = "|".join(f"(?:{p})" for p in family.patterns)
+            if family.flags & re.IGNORECASE:
+                body = f"(?i:{body})"
+            branches.append(f"(?P<{family.name}>{body})")
+        master_re = re.compile("(?=" + "|".join(branches) + ")")
+
+        priority = {f.name: i for i, f in enumerate(families)}
+
+        self.benign_patterns = benign_patterns
+        self.families = families
+        self._benign_re: Pattern = benign_re
+        self._priority: Dict[str, int] = priority
+        self._master_re: Pattern = master_re
+        self.fingerprint = self._compute_fingerprint()
+
+    def _compute_fingerprint(self) -> str:
+        """Stable hash of the pattern set (used to invalidate verdict caches)."""
+        digest = hashlib.sha256()
+        for pattern in self.benign_patterns:
+            digest.update(b"benign\x00" + pattern.encode() + b"\x00")
+        for family in self.families:
+            header = f"{family.name}|{family.flags}|{family.attack_type.value}|{family.confidence}"
+            digest.update(header.encode() + b"\x00")
+            for pattern in family.patterns:
+                digest.update(pattern.encode() + b"\x00")
+        digest.update(f"bf|{BRUTE_FORCE_KEYWORDS}|{BRUTE_FORCE_MAX_LENGTH}".encode())
+        return digest.hexdigest()[:16]
+
+    def match_family(self, text: str) -> str | None:
+        """
+        Return the name of the highest-priority threat family matching
+        anywhere in ``text``, or None.
+        """
+        best = None
+        best_rank = len(self.families)
+        for match in self._master_re.finditer(text):
+            rank = self._priority[match.lastgroup]
+            if rank < best_rank:
+                best, best_rank = match.lastgroup, rank
+                if rank == 0:
+                    break
+        return best
+
+    def classify(self, text: str) -> Tuple[AttackType, float]:
+        """
+        Classify a payload.
+
+        Args:
+            text: Raw payload / command string.
+
+        Returns:
+            (attack_type, confidence) — (BENIGN, 0.0) when nothing matches.
+        """
+        text_lower = text.lower()
+
+        if self._benign_re.search(text_lower):
+            return AttackType.BENIGN, 0.0
+
+        name = self.match_family(text)
+        if name is not None:
+            family = self.families[self._priority[name]]
+            return family.attack_type, family.confidence
+
+        return self._brute_force(text, text_lower)
+
+    def classify_sequential(self, text: str) -> Tuple[AttackType, float]:
+        """
+        Reference implementation: one ``re.search`` per pattern, in order.
+
+        Kept for parity benchmarks and tests; do not use on hot paths.
+        """
+        text_lower = text.lower()
+
+        for pattern in self.benign_patterns:
+            if re.search(pattern, text_lower):
+                return AttackType.BENIGN, 0.0
+
+        for family in self.families:
+            for pattern in family.patterns:
+                if re.search(pattern, text, family.flags):
+                    return family.attack_type, family.confidence
+
+        return self._brute_force(text, text_lower)
+
+    @staticmethod
+    def _brute_force(text: str, text_lower: str) -> Tuple[AttackType, float]:
+        # Only flag as brute force if it looks like a password attempt, NOT a username
+        if len(text) < BRUTE_FORCE_MAX_LENGTH and any(k in text_lower for k in BRUTE_FORCE_KEYWORDS):
+            if any(c.isdigit() for c in text) or "password" in text_lower:
+                return AttackType.BRUTE_FORCE, BRUTE_FORCE_CONFIDENCE
+        return AttackType.BENIGN, 0.0
+
+    def family_names(self) -> List[str]:
+        """Threat family names in priority order."""
+        return [family.name for family in self.families]
+
+
+heuristic_engine = HeuristicEngine()
@@ -13,17 +13,22 @@ Usage:
     predictor = ChameleonPredictor()
     score = await predictor.predict("cat /etc/passwd")
     # score ≈ 0.97 (malicious)
+
+Concurrent ``predict()`` calls are coalesced by a MicroBatcher into
+padded batches and scored in a worker thread (see batching.py).
 """
 
 import json
 import logging
 import threading
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List
 
 import torch
 import torch.nn as nn
 
+from src.ml_engine.batching import MicroBatcher
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -42,6 +47,12 @@ HIDDEN_DIM = 128
 NUM_LAYERS = 2
 DROPOUT = 0.3
 
+# ---------------------------------------------------------------------------
+# Micro-batching (tune against /trap/execute p99)
+# ---------------------------------------------------------------------------
+MAX_BATCH_SIZE = 32
+MAX_BATCH_WAIT_MS = 5.0
+
 
 # ============================================================
 # Character-Level Tokenizer
@@ -210,6 +221,14 @@ class ChameleonPredictor:
             f"  → Model loaded: {total_params:,} params on {self.device}"
         )
 
+        # ---- Batching front-end ---------------------------------------------
+        self.batcher: MicroBatcher[str, float] = MicroBatcher(
+            self.predict_batch,
+            max_batch_size=MAX_BATCH_SIZE,
+            max_wait_ms=MAX_BATCH_WAIT_MS,
+            name="bilstm",
+        )
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -225,10 +244,30 @@ class ChameleonPredictor:
             Float in [0.0, 1.0] — probability that the command is
             malicious.  Values above 0.85 are high-confidence attacks.
         """
-        encoded = self.tokenizer.encode(command)
-        tensor = torch.tensor([encoded], dtype=torch.long, device=self.device)
+        return await self.batcher.submit(command)
+
+    def predict_batch(self, commands: List[str]) -> List[float]:
+        """
+        Score several commands in a single forward pass (blocking).
+
+        Every sequence is right-padded to the tokenizer's fixed length,
+        exactly as in training, so batched scores match batch-of-one
+        scores.  Called from the batcher's worker thread.
+
+        Args:
+            commands: Raw shell command strings.
+
+        Returns:
+            One maliciousness probability per command, in input order.
+        """
+        encoded = [self.tokenizer.encode(command) for command in commands]
+        tensor = torch.tensor(encoded, dtype=torch.long, device=self.device)
 
         with torch.no_grad():
             output = self.model(tensor)
 
-        return float(output.item())
+        return [float(score) for score in output.view(-1).tolist()]
+
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """Batch-size / queue-wait histograms for latency tuning."""
+        return self.batcher.get_stats()
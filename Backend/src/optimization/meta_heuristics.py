@@ -26,6 +26,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,6 +56,7 @@ PSO_CONFIG = {
     "min_delay": 0.5,             # Minimum tarpit delay (seconds)
     "max_delay": 12.0,            # Maximum tarpit delay (seconds)
     "fitness_decay": 0.95,        # Fitness memory decay factor
+    "fitness_history_size": 5,    # Recent session fitnesses averaged per particle
 }
 
 # TC-PSO Hyperparameters (Threat-Calibrated PSO)
@@ -101,14 +104,112 @@ FITNESS_WEIGHTS = {
 # Novel Contribution: Dynamic inertia scaling based on BiLSTM anomaly detection
 # ============================================================================
 
-@dataclass
-class Particle:
-    """Represents a single particle in the PSO swarm."""
-    position: float  # Current delay value
-    velocity: float  # Current velocity
-    best_position: float  # Personal best position
-    best_fitness: float = float('-inf')  # Personal best fitness
-    fitness_history: List[float] = field(default_factory=list)
+def _uniform_draws(n: int) -> np.ndarray:
+    """
+    ``n`` values from ``random.random()``, in call order.
+
+    The swarm updates are vectorized, but their random numbers still come
+    from the ``random`` module (and in the order the per-particle loops
+    drew them), so ``random.seed`` reproduces the same swarms.
+    """
+    return np.fromiter((random.random() for _ in range(n)), dtype=float, count=n)
+
+
+class ParticleSwarm:
+    """
+    PSO swarm for one attack category, stored as NumPy arrays.
+
+    Index i across ``position``, ``velocity``, ``best_position``,
+    ``best_fitness`` and the rows of ``fitness_history`` (a per-particle
+    ring buffer) is particle i, so fitness and motion updates are array
+    operations rather than a loop over particle objects.
+    """
+
+    def __init__(self, config: Dict, num_particles: Optional[int] = None):
+        n = config["num_particles"] if num_particles is None else num_particles
+        self.min_delay = config["min_delay"]
+        self.max_delay = config["max_delay"]
+        self.max_velocity = (self.max_delay - self.min_delay) * 0.3
+
+        # Random initial position within bounds and bounded velocity,
+        # drawn alternately per particle
+        draws = _uniform_draws(2 * n)
+        self.position = self.min_delay + (self.max_delay - self.min_delay) * draws[0::2]
+        self.velocity = -self.max_velocity + (2 * self.max_velocity) * draws[1::2]
+
+        self.best_position = self.position.copy()
+        self.best_fitness = np.full(n, float('-inf'))
+        self.fitness_history = np.zeros((n, config["fitness_history_size"]))
+        self.history_count = np.zeros(n, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def record_fitness(
+        self, delay_used: float, fitness: float, global_best_fitness: float
+    ) -> Optional[Tuple[float, float]]:
+        """
+        Add a session's fitness to the particles near the delay it used.
+
+        Each nearby particle averages its recent fitness history and
+        updates its personal best.  Returns the new (position, fitness)
+        global best if one of them beat ``global_best_fitness``, else None.
+        """
+        # Update particles near the used delay
+        near = np.flatnonzero(np.abs(self.position - delay_used) < 1.5)
+        if not len(near):
+            return None
+
+        size = self.fitness_history.shape[1]
+        count = self.history_count[near] + 1
+        self.fitness_history[near, (count - 1) % size] = fitness
+        self.history_count[near] = count
+
+        # Sum each ring oldest first (unwritten slots are 0.0)
+        history = self.fitness_history[near]
+        rows = np.arange(len(near))
+        total = np.zeros(len(near))
+        for offset in range(size):
+            total += history[rows, (count + offset) % size]
+        avg_fitness = total / np.minimum(count, size)
+
+        # Update personal bests
+        improved = avg_fitness > self.best_fitness[near]
+        better = near[improved]
+        self.best_fitness[better] = avg_fitness[improved]
+        self.best_position[better] = self.position[better]
+
+        # First particle with the highest average, as a sequential scan finds it
+        best = int(np.argmax(avg_fitness))
+        if avg_fitness[best] > global_best_fitness:
+            return float(self.position[near[best]]), float(avg_fitness[best])
+        return None
+
+    def step(self, inertia: float, c1: float, c2: float, global_best_position: float):
+        """
+        Move every particle:
+        v(t+1) = w·v(t) + c1·r1·(p_best - x(t)) + c2·r2·(g_best - x(t))
+        with velocity and position clamped to their bounds.
+        """
+        draws = _uniform_draws(2 * len(self))
+        r1, r2 = draws[0::2], draws[1::2]
+
+        cognitive = c1 * r1 * (self.best_position - self.position)
+        social = c2 * r2 * (global_best_position - self.position)
+
+        self.velocity = np.clip(inertia * self.velocity + cognitive + social,
+                                -self.max_velocity, self.max_velocity)
+        self.position = np.clip(self.position + self.velocity, self.min_delay, self.max_delay)
+
+    def statistics(self) -> Dict:
+        """Position spread and mean personal-best fitness"""
+        seen = self.best_fitness[self.best_fitness > float('-inf')]
+        return {
+            "mean_position": float(self.position.mean()) if len(self) else 0,
+            "std_position": float(self.position.std()) if len(self) > 1 else 0,
+            "mean_fitness": float(seen.mean()) if len(seen) else 0,
+            "num_particles": len(self),
+        }
 
 
 class ThreatCalibratedPSO:
@@ -144,14 +245,14 @@ class ThreatCalibratedPSO:
     accelerating learning for dangerous attack patterns.
 
     Attributes:
-        particles (Dict[str, List[Particle]]): Swarm particles per attack category
+        particles (Dict[str, ParticleSwarm]): Swarm per attack category
         global_best (Dict[str, Tuple[float, float]]): Global best position & fitness
         session_tracker (Dict): Tracks active sessions and their metrics
         anomaly_scores (Dict[str, float]): Cached anomaly scores per category
     """
 
     def __init__(self):
-        self.particles: Dict[str, List[Particle]] = {}
+        self.particles: Dict[str, ParticleSwarm] = {}
         self.global_best: Dict[str, Tuple[float, float]] = {}  # (position, fitness)
         self.session_tracker: Dict[str, Dict] = {}
         self.iteration_count: Dict[str, int] = {}
@@ -163,7 +264,6 @@ class ThreatCalibratedPSO:
 
     def _initialize_swarm(self, category: str):
         """Initialize TC-PSO swarm for a specific attack category."""
-        self.particles[category] = []
         self.iteration_count[category] = 0
 
         # Initialize global best with default moderate delay
@@ -172,23 +272,7 @@ class ThreatCalibratedPSO:
         # Initialize with default anomaly score (neutral)
         self.anomaly_scores[category] = 0.5
 
-        for _ in range(TC_PSO_CONFIG["num_particles"]):
-            # Random initial position within bounds
-            position = random.uniform(
-                TC_PSO_CONFIG["min_delay"],
-                TC_PSO_CONFIG["max_delay"]
-            )
-            # Random initial velocity (bounded)
-            max_velocity = (TC_PSO_CONFIG["max_delay"] - TC_PSO_CONFIG["min_delay"]) * 0.3
-            velocity = random.uniform(-max_velocity, max_velocity)
-
-            particle = Particle(
-                position=position,
-                velocity=velocity,
-                best_position=position,
-                best_fitness=float('-inf')
-            )
-            self.particles[category].append(particle)
+        self.particles[category] = ParticleSwarm(TC_PSO_CONFIG)
 
     def _calculate_dynamic_inertia(self, category: str) -> float:
         """
@@ -303,35 +387,17 @@ class ThreatCalibratedPSO:
             f"Fitness: {fitness:.4f}"
         )
 
-        # Update particles
-        particles = self.particles[category]
-
-        for particle in particles:
-            # Find particle closest to the delay_used
-            distance = abs(particle.position - delay_used)
-
-            if distance < 1.5:  # Update particles near the used delay
-                particle.fitness_history.append(fitness)
-
-                # Apply fitness decay for historical memory
-                if len(particle.fitness_history) > 5:
-                    particle.fitness_history.pop(0)
-
-                avg_fitness = sum(particle.fitness_history) / len(particle.fitness_history)
-
-                # Update personal best
-                if avg_fitness > particle.best_fitness:
-                    particle.best_fitness = avg_fitness
-                    particle.best_position = particle.position
-
-                # Update global best
-                if avg_fitness > self.global_best[category][1]:
-                    self.global_best[category] = (particle.position, avg_fitness)
-                    logger.info(
-                        f"🎯 TC-PSO New Global Best | {category}: "
-                        f"Delay={particle.position:.2f}s, Fitness={avg_fitness:.4f}, "
-                        f"Anomaly={self.anomaly_scores[category]:.2f}"
-                    )
+        # Update particles near the used delay (personal bests), then global best
+        new_best = self.particles[category].record_fitness(
+            delay_used, fitness, self.global_best[category][1]
+        )
+        if new_best is not None:
+            self.global_best[category] = new_best
+            logger.info(
+                f"🎯 TC-PSO New Global Best | {category}: "
+                f"Delay={new_best[0]:.2f}s, Fitness={new_best[1]:.4f}, "
+                f"Anomaly={self.anomaly_scores[category]:.2f}"
+            )
 
         # Update velocity and position for all particles using dynamic inertia
         self._update_swarm(category)
@@ -346,45 +412,18 @@ class ThreatCalibratedPSO:
         # Get dynamic inertia weight (novel contribution)
         w = self._calculate_dynamic_inertia(category)
         
-        c1 = TC_PSO_CONFIG["cognitive_coefficient"]
-        c2 = TC_PSO_CONFIG["social_coefficient"]
-
-        g_best_pos = self.global_best[category][0]
-
-        for particle in self.particles[category]:
-            # Generate random coefficients
-            r1 = random.random()
-            r2 = random.random()
-
-            # Update velocity using PSO formula:
-            # v(t+1) = w·v(t) + c1·r1·(p_best - x(t)) + c2·r2·(g_best - x(t))
-            cognitive = c1 * r1 * (particle.best_position - particle.position)
-            social = c2 * r2 * (g_best_pos - particle.position)
-
-            particle.velocity = w * particle.velocity + cognitive + social
-
-            # Clamp velocity
-            max_v = (TC_PSO_CONFIG["max_delay"] - TC_PSO_CONFIG["min_delay"]) * 0.3
-            particle.velocity = max(-max_v, min(max_v, particle.velocity))
-
-            # Update position
-            particle.position += particle.velocity
-
-            # Clamp position to bounds
-            particle.position = max(
-                TC_PSO_CONFIG["min_delay"],
-                min(particle.position, TC_PSO_CONFIG["max_delay"])
-            )
+        self.particles[category].step(
+            w,
+            TC_PSO_CONFIG["cognitive_coefficient"],
+            TC_PSO_CONFIG["social_coefficient"],
+            self.global_best[category][0],
+        )
 
     def get_swarm_statistics(self, category: str) -> Dict:
         """Get statistical summary of the swarm for a category."""
         if category not in self.particles:
             return {}
 
-        particles = self.particles[category]
-        positions = [p.position for p in particles]
-        fitnesses = [p.best_fitness for p in particles if p.best_fitness > float('-inf')]
-
         # Get global best fitness, handle -inf for JSON serialization
         global_best_fitness = self.global_best.get(category, (0, 0))[1]
         if global_best_fitness == float('-inf') or global_best_fitness == float('inf'):
@@ -395,10 +434,7 @@ class ThreatCalibratedPSO:
             "iterations": self.iteration_count.get(category, 0),
             "global_best_delay": self.global_best.get(category, (0, 0))[0],
             "global_best_fitness": global_best_fitness,
-            "mean_position": sum(positions) / len(positions) if positions else 0,
-            "std_position": math.sqrt(sum((x - sum(positions)/len(positions))**2 for x in positions) / len(positions)) if len(positions) > 1 else 0,
-            "mean_fitness": sum(fitnesses) / len(fitnesses) if fitnesses else 0,
-            "num_particles": len(particles),
+            **self.particles[category].statistics(),
             "current_anomaly_score": self.anomaly_scores.get(category, 0.5),
             "dynamic_inertia": self._calculate_dynamic_inertia(category),
         }
@@ -417,7 +453,7 @@ class AdaptiveTarpitPSO:
     """
 
     def __init__(self):
-        self.particles: Dict[str, List[Particle]] = {}
+        self.particles: Dict[str, ParticleSwarm] = {}
         self.global_best: Dict[str, Tuple[float, float]] = {}
         self.session_tracker: Dict[str, Dict] = {}
         self.iteration_count: Dict[str, int] = {}
@@ -427,25 +463,9 @@ class AdaptiveTarpitPSO:
 
     def _initialize_swarm(self, category: str):
         """Initialize PSO swarm for a specific attack category."""
-        self.particles[category] = []
         self.iteration_count[category] = 0
         self.global_best[category] = (3.0, float('-inf'))
-
-        for _ in range(PSO_CONFIG["num_particles"]):
-            position = random.uniform(
-                PSO_CONFIG["min_delay"],
-                PSO_CONFIG["max_delay"]
-            )
-            max_velocity = (PSO_CONFIG["max_delay"] - PSO_CONFIG["min_delay"]) * 0.3
-            velocity = random.uniform(-max_velocity, max_velocity)
-
-            particle = Particle(
-                position=position,
-                velocity=velocity,
-                best_position=position,
-                best_fitness=float('-inf')
-            )
-            self.particles[category].append(particle)
+        self.particles[category] = ParticleSwarm(PSO_CONFIG)
 
     async def get_optimal_delay(self, attack_category: str) -> float:
         """Retrieve the optimal tarpit delay for a given attack category."""
@@ -492,78 +512,39 @@ class AdaptiveTarpitPSO:
             f"Dropped: {dropped} | Fitness: {fitness:.4f}"
         )
 
-        particles = self.particles[category]
-
-        for particle in particles:
-            distance = abs(particle.position - delay_used)
-
-            if distance < 1.5:
-                particle.fitness_history.append(fitness)
-
-                if len(particle.fitness_history) > 5:
-                    particle.fitness_history.pop(0)
-
-                avg_fitness = sum(particle.fitness_history) / len(particle.fitness_history)
-
-                if avg_fitness > particle.best_fitness:
-                    particle.best_fitness = avg_fitness
-                    particle.best_position = particle.position
-
-                if avg_fitness > self.global_best[category][1]:
-                    self.global_best[category] = (particle.position, avg_fitness)
-                    logger.info(
-                        f"🎯 PSO New Global Best | {category}: "
-                        f"Delay={particle.position:.2f}s, Fitness={avg_fitness:.4f}"
-                    )
+        new_best = self.particles[category].record_fitness(
+            delay_used, fitness, self.global_best[category][1]
+        )
+        if new_best is not None:
+            self.global_best[category] = new_best
+            logger.info(
+                f"🎯 PSO New Global Best | {category}: "
+                f"Delay={new_best[0]:.2f}s, Fitness={new_best[1]:.4f}"
+            )
 
         self._update_swarm(category)
         self.iteration_count[category] += 1
 
     def _update_swarm(self, category: str):
         """Update velocity and position for all particles in the swarm."""
-        w = PSO_CONFIG["inertia_weight"]
-        c1 = PSO_CONFIG["cognitive_coefficient"]
-        c2 = PSO_CONFIG["social_coefficient"]
-
-        g_best_pos = self.global_best[category][0]
-
-        for particle in self.particles[category]:
-            r1 = random.random()
-            r2 = random.random()
-
-            cognitive = c1 * r1 * (particle.best_position - particle.position)
-            social = c2 * r2 * (g_best_pos - particle.position)
-
-            particle.velocity = w * particle.velocity + cognitive + social
-
-            max_v = (PSO_CONFIG["max_delay"] - PSO_CONFIG["min_delay"]) * 0.3
-            particle.velocity = max(-max_v, min(max_v, particle.velocity))
-
-            particle.position += particle.velocity
-
-            particle.position = max(
-                PSO_CONFIG["min_delay"],
-                min(particle.position, PSO_CONFIG["max_delay"])
-            )
+        self.particles[category].step(
+            PSO_CONFIG["inertia_weight"],
+            PSO_CONFIG["cognitive_coefficient"],
+            PSO_CONFIG["social_coefficient"],
+            self.global_best[category][0],
+        )
 
     def get_swarm_statistics(self, category: str) -> Dict:
         """Get statistical summary of the swarm for a category."""
         if category not in self.particles:
             return {}
 
-        particles = self.particles[category]
-        positions = [p.position for p in particles]
-        fitnesses = [p.best_fitness for p in particles if p.best_fitness > float('-inf')]
-
         return {
             "category": category,
             "iterations": self.iteration_count.get(category, 0),
             "global_best_delay": self.global_best.get(category, (0, 0))[0],
             "global_best_fitness": self.global_best.get(category, (0, 0))[1],
-            "mean_position": sum(positions) / len(positions) if positions else 0,
-            "std_position": math.sqrt(sum((x - sum(positions)/len(positions))**2 for x in positions) / len(positions)) if len(positions) > 1 else 0,
-            "mean_fitness": sum(fitnesses) / len(fitnesses) if fitnesses else 0,
-            "num_particles": len(particles),
+            **self.particles[category].statistics(),
         }
 
 
@@ -1892,11 +1873,11 @@ class SessionTracker:
             self.sessions[session_id].interacted_paths.append(path)
 
     def end_session(self, session_id: str) -> Optional[AttackerSession]:
-        """Mark session as ended and return it for fitness evaluation."""
-        if session_id in self.sessions:
-            self.sessions[session_id].ended = True
-            return self.sessions[session_id]
-        return None
+        """Mark session as ended, stop tracking it and return it for fitness evaluation."""
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            session.ended = True
+        return session
 
 
 # Global session tracker
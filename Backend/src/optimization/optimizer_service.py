@@ -0,0 +1,231 @@
+"""
+TC-PSO Optimizer Service
+========================
+
+Keeps swarm updates off the request path.  ``handle_deception_layer``
+reads the tarpit delay for its attack category from an immutable
+snapshot (a ``MappingProxyType`` that is replaced, never mutated) and,
+only with ``TC_PSO_LEARN_FROM_REQUESTS`` on, hands the outcome to
+``submit``, which only enqueues it.  One
+background task per event loop takes outcomes off a bounded queue in
+batches, applies them to the swarm one after another and then publishes
+a fresh snapshot, so the particle arrays have a single writer and
+request handlers never run optimizer code or wait on it.
+
+When the queue is full an outcome is dropped (and counted) rather than
+making the attacker's request wait: the swarm is a learner, and losing
+a sample under load is cheaper than a stalled tarpit.
+
+Usage:
+    from src.optimization.optimizer_service import SessionOutcome, optimizer_service
+
+    delay = optimizer_service.get_delay("SQLI")
+    optimizer_service.submit(SessionOutcome("SQLI", delay, commands_executed=3, dropped=False))
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+from src.core.config import settings
+from src.optimization.meta_heuristics import TC_PSO_CONFIG, ThreatCalibratedPSO, tc_pso_optimizer
+
+logger = logging.getLogger(__name__)
+
+# Delay for categories the swarm has never seen (as get_optimal_delay)
+DEFAULT_DELAY = 2.5
+
+
+@dataclass(frozen=True)
+class SessionOutcome:
+    """How an attacker session went under the delay it was given."""
+    attack_category: str
+    delay_used: float
+    commands_executed: int
+    dropped: bool
+    session_id: Optional[str] = None
+    anomaly_score: float = 0.5
+
+
+class TarpitOptimizerService:
+    """
+    Single-writer front end for a ``ThreatCalibratedPSO``.
+
+    Args:
+        optimizer: Swarm the outcomes are applied to.
+        batch_size: Outcomes applied per snapshot publication.
+        flush_interval_ms: Max time the oldest queued outcome waits.
+        max_queue_size: Outcomes held before new ones are dropped.
+    """
+
+    def __init__(
+        self,
+        optimizer: ThreatCalibratedPSO,
+        batch_size: int = 256,
+        flush_interval_ms: float = 50.0,
+        max_queue_size: int = 10000,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self.optimizer = optimizer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Outcomes taken off the queue by the worker but not yet applied
+        self._collecting: List[SessionOutcome] = []
+
+        self._delays: Mapping[str, float] = MappingProxyType({})
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "applied": 0,
+            "batches": 0,
+            "dropped": 0,
+            "errors": 0,
+        }
+        self._publish()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def delays(self) -> Mapping[str, float]:
+        """Read-only ``{category: optimal delay}`` as of the last applied batch"""
+        return self._delays
+
+    def get_delay(self, attack_category: str) -> float:
+        """Optimal tarpit delay for a category, from the published snapshot."""
+        return self._delays.get(attack_category.upper(), DEFAULT_DELAY)
+
+    def submit(self, outcome: SessionOutcome) -> bool:
+        """
+        Queue a session outcome for the background task.  Never waits;
+        returns False if the queue was full and the outcome was dropped.
+        """
+        self.stats["submitted"] += 1
+        try:
+            self._ensure_worker().put_nowait(outcome)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+        return True
+
+    async def flush(self) -> None:
+        """
+        Apply everything queued so far and publish the result.
+
+        Only safe once the worker has been stopped — see ``stop``.
+        """
+        if self._collecting:
+            batch, self._collecting = self._collecting, []
+            await self._apply(batch)
+        queue = self._queue
+        while queue is not None and not queue.empty():
+            await self._apply([queue.get_nowait() for _ in range(min(queue.qsize(), self.batch_size))])
+
+    async def stop(self) -> None:
+        """Stop the background task and apply what is still queued (lifespan shutdown)."""
+        worker = self._worker
+        self._worker = None
+        if worker is not None and not worker.done():
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        self._queue = None
+        self._loop = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "delays": dict(self._delays),
+        }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Create the queue and worker task for the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._queue is None:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def _collect(self, queue: asyncio.Queue) -> List[SessionOutcome]:
+        """Block for the first outcome, then gather more until size or deadline."""
+        batch = self._collecting
+        batch.append(await queue.get())
+        deadline = time.perf_counter() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            await self._collect(queue)
+            batch, self._collecting = self._collecting, []
+            await self._apply(batch)
+
+    async def _apply(self, batch: List[SessionOutcome]) -> None:
+        """Apply a batch in arrival order, then publish one new snapshot."""
+        for outcome in batch:
+            try:
+                await self.optimizer.update_fitness(
+                    attack_category=outcome.attack_category,
+                    delay_used=outcome.delay_used,
+                    commands_executed=outcome.commands_executed,
+                    dropped=outcome.dropped,
+                    session_id=outcome.session_id,
+                    bilstm_anomaly_score=outcome.anomaly_score,
+                )
+                self.stats["applied"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"TC-PSO service: failed to apply outcome for {outcome.attack_category}: {e}")
+        self.stats["batches"] += 1
+        self._publish()
+
+    def _publish(self) -> None:
+        lo, hi = TC_PSO_CONFIG["min_delay"], TC_PSO_CONFIG["max_delay"]
+        self._delays = MappingProxyType({
+            category: max(lo, min(position, hi))
+            for category, (position, _) in self.optimizer.global_best.items()
+        })
+
+
+optimizer_service = TarpitOptimizerService(
+    tc_pso_optimizer,
+    batch_size=settings.TC_PSO_SERVICE_BATCH_SIZE,
+    flush_interval_ms=settings.TC_PSO_SERVICE_FLUSH_INTERVAL_MS,
+    max_queue_size=settings.TC_PSO_SERVICE_MAX_QUEUE_SIZE,
+)
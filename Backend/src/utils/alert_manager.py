@@ -1,10 +1,10 @@
-import httpx
 import logging
 from datetime import datetime
 from typing import Dict, Any, Optional
 import json
 
 from src.core.config import settings
+from src.utils.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -23,9 +23,9 @@ class AlertManager:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(self.slack_webhook_url, json=slack_data)
-                response.raise_for_status()
+            client = http_clients.get_client(self.slack_webhook_url)
+            response = await client.post(self.slack_webhook_url, json=slack_data)
+            response.raise_for_status()
         except Exception as e:
             logger.error(f"Failed to send Slack alert: {e}")
 
@@ -38,9 +38,9 @@ class AlertManager:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(self.discord_webhook_url, json=discord_data)
-                response.raise_for_status()
+            client = http_clients.get_client(self.discord_webhook_url)
+            response = await client.post(self.discord_webhook_url, json=discord_data)
+            response.raise_for_status()
         except Exception as e:
             logger.error(f"Failed to send Discord alert: {e}")
 
@@ -3,9 +3,17 @@ import json
 from typing import List, Optional, Dict
 from datetime import datetime
 
+from src.utils.integrity import MerkleAccumulator
+
 class BlockchainLogger:
     def __init__(self):
         self.chain: List[Dict] = []
+        # Merkle root over every block hash, maintained on append
+        self.accumulator = MerkleAccumulator()
+        # Blocks [0, verified_upto) have been verified; the checkpoint
+        # records the head hash they ended with
+        self.verified_upto = 0
+        self.checkpoint_hash: Optional[str] = None
 
     def calculate_hash(self, data: dict, previous_hash: str) -> str:
         # Create a block structure to hash
@@ -21,34 +29,27 @@ class BlockchainLogger:
         previous_hash = "0" * 64
         if self.chain:
             previous_hash = self.chain[-1]["hash"]
-            
+
         current_hash = self.calculate_hash(log_data, previous_hash)
-        
+
         block = {
             "hash": current_hash,
             "previous_hash": previous_hash,
             "data": log_data
         }
-        
+
         self.chain.append(block)
+        self.accumulator.append(current_hash)
         return {"hash": current_hash, "previous_hash": previous_hash}
 
     def calculate_merkle_root(self, hashes: List[str]) -> Optional[str]:
-        if not hashes:
-            return None
-        if len(hashes) == 1:
-            return hashes[0]
-            
-        new_level = []
-        # If odd number of hashes, duplicate the last one
-        if len(hashes) % 2 != 0:
-            hashes.append(hashes[-1])
-            
-        for i in range(0, len(hashes), 2):
-            pair = hashes[i] + hashes[i+1]
-            new_level.append(hashlib.sha256(pair.encode()).hexdigest())
-            
-        return self.calculate_merkle_root(new_level)
+        # Bitcoin-style root (odd last node paired with itself); the
+        # caller's list is left untouched
+        return MerkleAccumulator.from_leaves(hashes).root()
+
+    def get_merkle_root(self) -> Optional[str]:
+        """Merkle root over the whole chain — O(1) once computed after an append."""
+        return self.accumulator.root()
 
     def get_merkle_root_for_recent_logs(self, logs: List[dict]) -> Optional[str]:
         hashes = [log.get("hash") for log in logs if log.get("hash")]
@@ -56,20 +57,76 @@ class BlockchainLogger:
             return None
         return self.calculate_merkle_root(hashes)
 
-    def verify_chain_integrity(self) -> bool:
-        for i in range(1, len(self.chain)):
+    def verify_blocks(self, start: int, end: int) -> Optional[int]:
+        """
+        Re-hash blocks [start, end) and check their links.
+
+        Returns:
+            Index of the first bad block, or None if all are valid
+        """
+        for i in range(start, min(end, len(self.chain))):
             current_block = self.chain[i]
-            previous_block = self.chain[i-1]
-            
+
             # Verify previous hash link
-            if current_block["previous_hash"] != previous_block["hash"]:
-                return False
-                
+            if i > 0 and current_block["previous_hash"] != self.chain[i - 1]["hash"]:
+                return i
+
             # Verify current hash
             recalculated_hash = self.calculate_hash(current_block["data"], current_block["previous_hash"])
             if recalculated_hash != current_block["hash"]:
-                return False
-                
+                return i
+        return None
+
+    def verify_chain_integrity(self, full: bool = False) -> bool:
+        """
+        Verify hash links and block hashes.
+
+        Only blocks appended since the last successful verification (or
+        trusted checkpoint) are re-hashed, after checking that the
+        checkpoint block still carries the hash it was verified with.
+        ``full=True`` re-verifies the whole chain (and resets the checkpoint).
+        """
+        start = 0 if full else self.verified_upto
+        if start > len(self.chain):
+            start = 0
+        if start and self.chain[start - 1]["hash"] != self.checkpoint_hash:
+            return False
+
+        # The checkpoint block itself was verified; only its successors' links are new
+        if self.verify_blocks(max(start, 1), len(self.chain)) is not None:
+            return False
+
+        if self.chain:
+            self.verified_upto = len(self.chain)
+            self.checkpoint_hash = self.chain[-1]["hash"]
+        return True
+
+    def checkpoint_state(self) -> Dict:
+        """Entry count, head hash and Merkle frontier for a signed checkpoint."""
+        snapshot = self.accumulator.snapshot()
+        return {
+            "count": snapshot["size"],
+            "head_hash": self.chain[-1]["hash"] if self.chain else None,
+            "frontier": snapshot["frontier"],
+        }
+
+    def block_hash(self, index: int) -> str:
+        return self.chain[index]["hash"]
+
+    def block_hashes(self, start: int, end: int) -> List[str]:
+        """Hashes of blocks [start, end); the chain only grows, so any thread may call it."""
+        return [block["hash"] for block in self.chain[start:end]]
+
+    def trust_checkpoint(self, count: int, head_hash: Optional[str]) -> bool:
+        """
+        Treat blocks [0, count) as verified if block ``count - 1`` still
+        has ``head_hash``; later verifications start from there.
+        """
+        if not 0 < count <= len(self.chain) or self.chain[count - 1]["hash"] != head_hash:
+            return False
+        if count > self.verified_upto:
+            self.verified_upto = count
+            self.checkpoint_hash = head_hash
         return True
 
 blockchain_logger = BlockchainLogger()
@@ -5,6 +5,31 @@ Chameleon Blockchain Sync — Ethereum Sepolia Anchor
 Scheduled background task that anchors Merkle root hashes from the
 honeypot's integrity module onto the Ethereum Sepolia testnet.
 
+Anchoring is batched: ``AnchorScheduler`` collects the current Merkle
+root of every registered chain (plus any roots submitted explicitly)
+and, once per epoch, anchors a single *root of roots* — one transaction
+however many roots the epoch holds.  ``prove_log`` maps any log to the
+epoch that anchored it, with the two Merkle proofs linking
+log → chain root → on-chain root of roots.
+
+Transactions go through one cached ``AnchorClient`` (Web3 connection,
+contract and account built once) with a locally managed nonce.  Receipts
+are polled from the event loop; each RPC runs on a small dedicated
+thread pool instead of holding a default-executor thread for minutes.
+A transaction still unmined after the receipt timeout is replaced on
+the next epoch: same nonce, fees raised by ``ANCHOR_FEE_BUMP``.
+
+Epochs are persisted to ``anchor_epochs`` (next to the signed
+``integrity_checkpoints``) and reloaded by ``restore``, so proofs for
+entries anchored before a restart keep resolving.
+
+With several uvicorn workers only one of them anchors: the scheduled
+task seals epochs only while its process holds a Postgres advisory lock
+(``ANCHOR_LOCK_KEY``), so there is one epoch numbering, one transaction
+per epoch and one nonce sequence for ``PRIVATE_KEY``.  The other workers
+keep trying for the lock every epoch and, once they get it, reload the
+epochs the previous holder persisted before anchoring.
+
 Prerequisites:
     pip install web3 python-dotenv
 
@@ -21,6 +46,13 @@ Usage:
     from blockchain_sync import anchor_latest_root
     tx_hash = await anchor_latest_root("a1b2c3d4e5f6...")
 
+    # Batched (FastAPI lifespan)
+    from src.utils.blockchain_sync import anchor_scheduler
+    anchor_scheduler.register("blockchain", blockchain_logger)
+    await anchor_scheduler.restore()               # after the chains are loaded
+    await anchor_scheduler.start()
+    await anchor_scheduler.prove_log("blockchain", 42)
+
 ABI Compilation Guide:
     1. Open Remix IDE (https://remix.ethereum.org)
     2. Paste ChameleonLedger.sol into a new file
@@ -37,19 +69,46 @@ ABI Compilation Guide:
 """
 
 import asyncio
+import bisect
 import json
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from dotenv import load_dotenv
-from web3 import Web3
-from web3.middleware import ExtraDataToPOAMiddleware
-from web3.exceptions import (
-    ContractLogicError,
-    TransactionNotFound,
+
+try:
+    from web3 import Web3
+    from web3.middleware import ExtraDataToPOAMiddleware
+    from web3.exceptions import (
+        ContractLogicError,
+        TransactionNotFound,
+    )
+except ImportError:
+    # web3 not installed — only injected clients (local EVM stand-ins) work
+    Web3 = None
+    ExtraDataToPOAMiddleware = None
+
+    class ContractLogicError(Exception):
+        pass
+
+    class TransactionNotFound(Exception):
+        pass
+
+from src.core.database_postgres import (
+    db,
+    get_anchor_epochs,
+    ping_connection,
+    save_anchor_epoch,
+    try_advisory_lock,
 )
+from src.utils.bounded_cache import LRUTTLCache
+from src.utils.integrity import MerkleAccumulator, MerkleTree
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +119,17 @@ SEPOLIA_RPC_URL = os.getenv("SEPOLIA_RPC_URL", "")
 PRIVATE_KEY = os.getenv("PRIVATE_KEY", "")
 CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS", "")
 
+# ── Batched anchoring ────────────────────────────────────────────────────
+ANCHOR_EPOCH_SECONDS = float(os.getenv("ANCHOR_EPOCH_SECONDS", "3600"))
+# Threads for blocking RPC calls (send, receipt lookups, reads)
+ANCHOR_RPC_WORKERS = int(os.getenv("ANCHOR_RPC_WORKERS", "2"))
+ANCHOR_RECEIPT_POLL_SECONDS = float(os.getenv("ANCHOR_RECEIPT_POLL_SECONDS", "5"))
+ANCHOR_RECEIPT_TIMEOUT_SECONDS = float(os.getenv("ANCHOR_RECEIPT_TIMEOUT_SECONDS", "600"))
+# Fee multiplier per replacement of a stuck transaction (nodes want >= 1.1)
+ANCHOR_FEE_BUMP = float(os.getenv("ANCHOR_FEE_BUMP", "1.25"))
+# Postgres advisory lock held by the one worker that anchors
+ANCHOR_LOCK_KEY = int(os.getenv("ANCHOR_LOCK_KEY", "7263001"))
+
 # ── ABI ──────────────────────────────────────────────────────────────────
 # Path to the compiled ABI JSON (from Remix or solcx)
 ABI_PATH = Path(__file__).parent / "contracts" / "ChameleonLedger.json"
@@ -130,6 +200,8 @@ def _get_web3() -> Web3:
             "SEPOLIA_RPC_URL not set. Add it to Backend/.env:\n"
             "  SEPOLIA_RPC_URL=https://sepolia.infura.io/v3/YOUR_PROJECT_ID"
         )
+    if Web3 is None:
+        raise ImportError("web3 is not installed: pip install web3")
 
     if SEPOLIA_RPC_URL.startswith("wss://"):
         provider = Web3.WebsocketProvider(SEPOLIA_RPC_URL)
@@ -162,6 +234,223 @@ def _get_contract(w3: Web3):
     )
 
 
+# ========================================================================
+# AnchorClient: cached connection + local nonce
+# ========================================================================
+
+class AnchorClient:
+    """
+    Web3 connection, contract and signing account, built once and reused.
+
+    The next nonce is tracked locally (seeded from the node's pending
+    count) so back-to-back sends don't each round-trip for it; after a
+    failed send, or a transaction that never got mined, it is re-read
+    from the node.  ``send`` with an explicit nonce replaces a pending
+    transaction instead.  Sending only submits — receipts are fetched
+    separately with ``get_receipt``.
+
+    Args:
+        w3: Connected ``Web3`` instance (or a local EVM stand-in with the
+            same ``eth`` / ``to_wei`` surface).
+        contract: ChameleonLedger contract bound to ``w3``.
+        private_key: Signing key of the contract owner.
+        default_gas: Gas limit used when estimation fails.
+    """
+
+    def __init__(self, w3, contract, private_key: str, default_gas: int = 100_000):
+        self.w3 = w3
+        self.contract = contract
+        self.private_key = private_key
+        self.default_gas = default_gas
+        self.account = w3.eth.account.from_key(private_key)
+        self.chain_id = w3.eth.chain_id
+        self._nonce: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AnchorClient":
+        if not PRIVATE_KEY:
+            raise ValueError(
+                "PRIVATE_KEY not set. Add to Backend/.env:\n"
+                "  PRIVATE_KEY=0xYOUR_PRIVATE_KEY_HERE\n"
+                "  ⚠️  Never commit this file to git!"
+            )
+        w3 = _get_web3()
+        return cls(w3, _get_contract(w3), PRIVATE_KEY)
+
+    def _gas_limit(self, merkle_root: str) -> int:
+        # Gas estimation with safety margin
+        try:
+            estimated_gas = self.contract.functions.storeMerkleRoot(
+                merkle_root
+            ).estimate_gas({"from": self.account.address})
+            return int(estimated_gas * 1.2)  # 20% safety buffer
+        except ContractLogicError as e:
+            logger.error("Contract logic error during gas estimation: %s", e)
+            raise
+        except Exception as e:
+            logger.warning("Gas estimation failed, using default: %s", e)
+            return self.default_gas  # Safe default for storeMerkleRoot
+
+    def _fees(self, multiplier: float = 1.0):
+        # EIP-1559 gas pricing (Sepolia supports it)
+        try:
+            latest_block = self.w3.eth.get_block("latest")
+            base_fee = latest_block.get("baseFeePerGas", self.w3.to_wei(1, "gwei"))
+            max_priority_fee = self.w3.to_wei(2, "gwei")
+            max_fee = base_fee * 2 + max_priority_fee
+        except Exception:
+            # Fallback to legacy gas pricing
+            max_fee = self.w3.to_wei(20, "gwei")
+            max_priority_fee = self.w3.to_wei(2, "gwei")
+        return int(max_fee * multiplier), int(max_priority_fee * multiplier)
+
+    def send_root(self, merkle_root: str) -> str:
+        """Sign and submit ``storeMerkleRoot(merkle_root)``; returns the tx hash."""
+        return self.send(merkle_root)[0]
+
+    def send(
+        self, merkle_root: str, nonce: Optional[int] = None, fee_multiplier: float = 1.0
+    ) -> Tuple[str, int]:
+        """
+        Sign and submit ``storeMerkleRoot(merkle_root)``; returns (tx hash, nonce).
+
+        With ``nonce`` the transaction replaces the pending one at that
+        nonce (``fee_multiplier`` must outbid it); the local nonce is left alone.
+        """
+        logger.info(
+            "Anchoring Merkle root: %s... (from %s)",
+            merkle_root[:16], self.account.address,
+        )
+        gas_limit = self._gas_limit(merkle_root)
+        max_fee, max_priority_fee = self._fees(fee_multiplier)
+        replacing = nonce is not None
+
+        with self._lock:
+            if not replacing:
+                if self._nonce is None:
+                    self._nonce = self.w3.eth.get_transaction_count(self.account.address, "pending")
+                nonce = self._nonce
+
+            tx = self.contract.functions.storeMerkleRoot(merkle_root).build_transaction({
+                "from": self.account.address,
+                "nonce": nonce,
+                "gas": gas_limit,
+                "maxFeePerGas": max_fee,
+                "maxPriorityFeePerGas": max_priority_fee,
+                "chainId": self.chain_id,
+            })
+
+            # ── Sign & Send ──────────────────────────────────────────
+            signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
+            try:
+                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception:
+                if not replacing:
+                    # Nonce may be stale (e.g. another sender) — resync next time
+                    self._nonce = None
+                raise
+            if not replacing:
+                self._nonce += 1
+
+        logger.info("Transaction sent: %s (nonce %d)", tx_hash.hex(), nonce)
+        return tx_hash.hex(), nonce
+
+    def resync_nonce(self) -> None:
+        """Re-read the next nonce from the node on the next send."""
+        with self._lock:
+            self._nonce = None
+
+    def get_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Receipt if the transaction is mined, else None (never blocks)."""
+        try:
+            return self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+
+    def call(self, function: str, *args) -> Any:
+        """Read-only contract call (``getRootCount``, ``getLatestRoot``, …)."""
+        return getattr(self.contract.functions, function)(*args).call()
+
+
+_client: Optional[AnchorClient] = None
+_client_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_anchor_client() -> AnchorClient:
+    """The process-wide ``AnchorClient``, created from .env on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AnchorClient.from_env()
+        return _client
+
+
+def reset_anchor_client(client: Optional[AnchorClient] = None) -> None:
+    """Drop (or replace) the cached client, e.g. after an RPC URL change."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def _rpc_executor() -> ThreadPoolExecutor:
+    """Bounded pool for blocking web3 calls (kept off the default executor)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ANCHOR_RPC_WORKERS, thread_name_prefix="anchor-rpc")
+    return _executor
+
+
+async def _run_rpc(fn: Callable, *args) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_rpc_executor(), fn, *args)
+
+
+async def wait_for_receipt(
+    client: AnchorClient,
+    tx_hash: str,
+    timeout: float = ANCHOR_RECEIPT_TIMEOUT_SECONDS,
+    poll_interval: float = ANCHOR_RECEIPT_POLL_SECONDS,
+) -> Optional[Dict[str, Any]]:
+    """
+    Poll for a receipt without tying up a thread between polls.
+
+    Returns None if the transaction is still unmined after ``timeout``.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        receipt = await _run_rpc(client.get_receipt, tx_hash)
+        if receipt is not None:
+            return receipt
+        if loop.time() >= deadline:
+            return None
+        await asyncio.sleep(poll_interval)
+
+
+def _anchor_result(merkle_root: str, tx_hash: str, receipt: Dict[str, Any]) -> Dict[str, Any]:
+    status = "success" if receipt["status"] == 1 else "failed"
+
+    result = {
+        "tx_hash": tx_hash,
+        "block_number": receipt["blockNumber"],
+        "gas_used": receipt["gasUsed"],
+        "root_stored": merkle_root,
+        "status": status,
+        "etherscan_url": f"https://sepolia.etherscan.io/tx/{tx_hash}",
+    }
+
+    if status == "success":
+        logger.info(
+            "✅ Merkle root anchored on Sepolia! Block #%d | Gas: %d | TX: %s",
+            receipt["blockNumber"], receipt["gasUsed"], tx_hash,
+        )
+    else:
+        logger.error("❌ Transaction failed! Receipt: %s", receipt)
+
+    return result
+
+
 # ========================================================================
 # Core: anchor_latest_root
 # ========================================================================
@@ -170,6 +459,10 @@ async def anchor_latest_root(merkle_root: str) -> Dict[str, Any]:
     """
     Sign and send a transaction to store a Merkle root on Sepolia.
 
+    Uses the cached ``AnchorClient``; the receipt is polled from the
+    event loop.  For periodic anchoring prefer ``anchor_scheduler``,
+    which batches many roots into one transaction.
+
     Args:
         merkle_root: SHA-256 Merkle root hash string (64 hex chars).
 
@@ -195,63 +488,23 @@ async def anchor_latest_root(merkle_root: str) -> Dict[str, Any]:
             "  ⚠️  Never commit this file to git!"
         )
 
-    # Run blocking web3 calls in executor to keep async non-blocking
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _anchor_sync, merkle_root)
+    client = await _run_rpc(get_anchor_client)
+    tx_hash = await _run_rpc(client.send_root, merkle_root)
+    receipt = await wait_for_receipt(client, tx_hash)
+    if receipt is None:
+        return {
+            "tx_hash": tx_hash,
+            "status": "pending",
+            "error": f"No receipt after {ANCHOR_RECEIPT_TIMEOUT_SECONDS:.0f}s",
+        }
+    return _anchor_result(merkle_root, tx_hash, receipt)
 
 
 def _anchor_sync(merkle_root: str) -> Dict[str, Any]:
-    """Synchronous web3 transaction logic (runs in thread pool)."""
+    """Blocking one-shot anchor (standalone script): send, then wait up to 120s."""
     w3 = _get_web3()
-    contract = _get_contract(w3)
-    account = w3.eth.account.from_key(PRIVATE_KEY)
-
-    logger.info(
-        "Anchoring Merkle root: %s... (from %s)",
-        merkle_root[:16], account.address,
-    )
-
-    # ── Build transaction ────────────────────────────────────────────
-    nonce = w3.eth.get_transaction_count(account.address, "pending")
-
-    # Gas estimation with safety margin
-    try:
-        estimated_gas = contract.functions.storeMerkleRoot(
-            merkle_root
-        ).estimate_gas({"from": account.address})
-        gas_limit = int(estimated_gas * 1.2)  # 20% safety buffer
-    except ContractLogicError as e:
-        logger.error("Contract logic error during gas estimation: %s", e)
-        raise
-    except Exception as e:
-        logger.warning("Gas estimation failed, using default: %s", e)
-        gas_limit = 100_000  # Safe default for storeMerkleRoot
-
-    # EIP-1559 gas pricing (Sepolia supports it)
-    try:
-        latest_block = w3.eth.get_block("latest")
-        base_fee = latest_block.get("baseFeePerGas", w3.to_wei(1, "gwei"))
-        max_priority_fee = w3.to_wei(2, "gwei")
-        max_fee = base_fee * 2 + max_priority_fee
-    except Exception:
-        # Fallback to legacy gas pricing
-        max_fee = w3.to_wei(20, "gwei")
-        max_priority_fee = w3.to_wei(2, "gwei")
-
-    tx = contract.functions.storeMerkleRoot(merkle_root).build_transaction({
-        "from": account.address,
-        "nonce": nonce,
-        "gas": gas_limit,
-        "maxFeePerGas": max_fee,
-        "maxPriorityFeePerGas": max_priority_fee,
-        "chainId": w3.eth.chain_id,
-    })
-
-    # ── Sign & Send ──────────────────────────────────────────────────
-    signed_tx = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-
-    logger.info("Transaction sent: %s  (waiting for receipt...)", tx_hash.hex())
+    client = AnchorClient(w3, _get_contract(w3), PRIVATE_KEY)
+    tx_hash = client.send_root(merkle_root)
 
     # ── Wait for confirmation (max 120s) ─────────────────────────────
     try:
@@ -259,31 +512,535 @@ def _anchor_sync(merkle_root: str) -> Dict[str, Any]:
     except Exception as e:
         logger.error("Transaction timed out or failed: %s", e)
         return {
-            "tx_hash": tx_hash.hex(),
+            "tx_hash": tx_hash,
             "status": "pending",
             "error": str(e),
         }
+    return _anchor_result(merkle_root, tx_hash, receipt)
 
-    status = "success" if receipt["status"] == 1 else "failed"
 
-    result = {
-        "tx_hash": tx_hash.hex(),
-        "block_number": receipt["blockNumber"],
-        "gas_used": receipt["gasUsed"],
-        "root_stored": merkle_root,
-        "status": status,
-        "etherscan_url": f"https://sepolia.etherscan.io/tx/{tx_hash.hex()}",
-    }
+# ========================================================================
+# Batched Anchoring: one root of roots per epoch
+# ========================================================================
 
-    if status == "success":
-        logger.info(
-            "✅ Merkle root anchored on Sepolia! Block #%d | Gas: %d | TX: %s",
-            receipt["blockNumber"], receipt["gasUsed"], tx_hash.hex(),
+@dataclass
+class AnchorMember:
+    """One Merkle root included in an epoch."""
+    source: str                  # registered stream, or label of a submitted root
+    root: str
+    count: Optional[int] = None  # leaves covered (registered streams only)
+    head_hash: Optional[str] = None  # hash of entry count-1 (registered streams only)
+
+
+@dataclass
+class AnchorEpoch:
+    """Roots sealed together and anchored as one root of roots."""
+    epoch: int
+    members: List[AnchorMember]
+    root_of_roots: str
+    sealed_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    status: str = "sealed"       # sealed | sent | timed_out | confirmed | failed
+    tx_hash: Optional[str] = None
+    nonce: Optional[int] = None
+    fee_bumps: int = 0
+    replaced_tx_hashes: List[str] = field(default_factory=list)
+    block_number: Optional[int] = None
+    gas_used: Optional[int] = None
+    error: Optional[str] = None
+    confirmed_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "epoch": self.epoch,
+            "root_of_roots": self.root_of_roots,
+            "members": [
+                {"source": m.source, "root": m.root, "count": m.count}
+                for m in self.members
+            ],
+            "sealed_at": self.sealed_at.isoformat(),
+            "status": self.status,
+            "tx_hash": self.tx_hash,
+            "nonce": self.nonce,
+            "fee_bumps": self.fee_bumps,
+            "block_number": self.block_number,
+            "gas_used": self.gas_used,
+            "error": self.error,
+            "confirmed_at": self.confirmed_at.isoformat() if self.confirmed_at else None,
+        }
+
+    def to_row(self) -> Dict[str, Any]:
+        """Column values for ``AnchorEpochRecord``."""
+        return {
+            "epoch": self.epoch,
+            "root_of_roots": self.root_of_roots,
+            "members": [
+                {"source": m.source, "root": m.root, "count": m.count, "head_hash": m.head_hash}
+                for m in self.members
+            ],
+            "status": self.status,
+            "tx_hash": self.tx_hash,
+            "replaced_tx_hashes": list(self.replaced_tx_hashes),
+            "nonce": self.nonce,
+            "fee_bumps": self.fee_bumps,
+            "block_number": self.block_number,
+            "gas_used": self.gas_used,
+            "error": self.error,
+            "sealed_at": self.sealed_at,
+            "confirmed_at": self.confirmed_at,
+        }
+
+    @classmethod
+    def from_row(cls, row: Any) -> "AnchorEpoch":
+        return cls(
+            epoch=row.epoch,
+            members=[AnchorMember(**m) for m in row.members],
+            root_of_roots=row.root_of_roots,
+            sealed_at=row.sealed_at,
+            status=row.status,
+            tx_hash=row.tx_hash,
+            nonce=row.nonce,
+            fee_bumps=row.fee_bumps,
+            replaced_tx_hashes=list(row.replaced_tx_hashes or []),
+            block_number=row.block_number,
+            gas_used=row.gas_used,
+            error=row.error,
+            confirmed_at=row.confirmed_at,
         )
-    else:
-        logger.error("❌ Transaction failed! Receipt: %s", receipt)
 
-    return result
+
+class AnchorScheduler:
+    """
+    Aggregates Merkle roots and anchors one root of roots per epoch.
+
+    Registered chains (``BlockchainLogger``, ``ThreatScoreSystem`` — anything
+    with ``checkpoint_state`` / ``block_hash``) contribute their current
+    root whenever they grew since the previous epoch; ``submit_root``
+    adds arbitrary roots (e.g. per-IP reputation roots).
+
+    Every epoch is upserted to ``anchor_epochs`` when it is sealed and
+    whenever its transaction state changes (persistence failures are
+    logged, never raised); ``restore`` reloads them at startup.
+
+    The scheduled task (``start``) anchors only while this process holds
+    the advisory lock ``lock_key``; without a database there is nothing
+    to coordinate with and it always anchors.
+
+    Args:
+        client_factory: Returns the ``AnchorClient`` (called on the RPC
+            pool; defaults to the cached .env client).
+        epoch_seconds: Seconds between epochs (``start``).
+        poll_interval: Seconds between receipt polls.
+        receipt_timeout: Seconds before an unmined epoch is replaced.
+        fee_bump: Fee multiplier per replacement of an unmined epoch.
+        proof_cache_size: Chain-prefix trees kept for ``prove_log``.
+        lock_key: Postgres advisory lock that elects the anchoring process.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], AnchorClient] = get_anchor_client,
+        epoch_seconds: float = ANCHOR_EPOCH_SECONDS,
+        poll_interval: float = ANCHOR_RECEIPT_POLL_SECONDS,
+        receipt_timeout: float = ANCHOR_RECEIPT_TIMEOUT_SECONDS,
+        fee_bump: float = ANCHOR_FEE_BUMP,
+        proof_cache_size: int = 4,
+        lock_key: int = ANCHOR_LOCK_KEY,
+    ):
+        self.client_factory = client_factory
+        self.epoch_seconds = epoch_seconds
+        self.poll_interval = poll_interval
+        self.receipt_timeout = receipt_timeout
+        self.fee_bump = fee_bump
+        self.lock_key = lock_key
+        self.epochs: List[AnchorEpoch] = []
+        self._streams: Dict[str, Any] = {}
+        self._submitted: List[AnchorMember] = []
+        # stream -> ascending leaf counts anchored, and (epoch, member) for each
+        self._coverage_counts: Dict[str, List[int]] = {}
+        self._coverage_refs: Dict[str, List[tuple]] = {}
+        self._prefix_trees: LRUTTLCache[tuple, MerkleTree] = LRUTTLCache(max_entries=proof_cache_size)
+        self._receipt_tasks: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        # Connection holding the advisory lock while this process anchors
+        self._lock_conn: Optional[Any] = None
+        self.stats: Dict[str, int] = {
+            "epochs": 0,
+            "roots_anchored": 0,
+            "transactions": 0,
+            "confirmed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "replacements": 0,
+            "persist_errors": 0,
+            "dropped_submissions": 0,
+        }
+
+    @property
+    def configured(self) -> bool:
+        """Whether the .env settings needed to send transactions are present."""
+        return bool(SEPOLIA_RPC_URL and PRIVATE_KEY and CONTRACT_ADDRESS)
+
+    def register(self, stream: str, chain: Any) -> None:
+        self._streams[stream] = chain
+
+    def submit_root(self, merkle_root: str, source: str = "submitted") -> None:
+        """Queue a root for the next epoch."""
+        self._submitted.append(AnchorMember(source=source, root=merkle_root))
+
+    # ------------------------------------------------------------------
+    # Epochs
+    # ------------------------------------------------------------------
+
+    def seal_epoch(self) -> Optional[AnchorEpoch]:
+        """Close the current epoch (None if there is nothing new to anchor)."""
+        members: List[AnchorMember] = []
+        for stream, chain in self._streams.items():
+            state = chain.checkpoint_state()
+            counts = self._coverage_counts.get(stream)
+            if state["count"] and (not counts or state["count"] > counts[-1]):
+                root = MerkleAccumulator(state["count"], state["frontier"]).root()
+                members.append(AnchorMember(
+                    source=stream, root=root, count=state["count"], head_hash=state["head_hash"],
+                ))
+        members.extend(self._submitted)
+        self._submitted = []
+        if not members:
+            return None
+
+        epoch = AnchorEpoch(
+            epoch=len(self.epochs),
+            members=members,
+            root_of_roots=MerkleTree.from_hashes([m.root for m in members]).root_hash,
+        )
+        self._add_epoch(epoch)
+        self.stats["epochs"] += 1
+        self.stats["roots_anchored"] += len(members)
+        return epoch
+
+    def _add_epoch(self, epoch: AnchorEpoch) -> None:
+        for index, member in enumerate(epoch.members):
+            if member.count is not None:
+                self._coverage_counts.setdefault(member.source, []).append(member.count)
+                self._coverage_refs.setdefault(member.source, []).append((epoch.epoch, index))
+        self.epochs.append(epoch)
+
+    async def anchor_epoch(self, epoch: AnchorEpoch) -> AnchorEpoch:
+        """
+        Send the epoch's transaction; its receipt is awaited in the
+        background.  A timed-out epoch is first checked for a late
+        receipt, then replaced at the same nonce with bumped fees.
+        """
+        replacing = epoch.status == "timed_out"
+        try:
+            client = await _run_rpc(self.client_factory)
+            if replacing:
+                for tx_hash in [epoch.tx_hash, *epoch.replaced_tx_hashes]:
+                    receipt = await _run_rpc(client.get_receipt, tx_hash)
+                    if receipt is not None:
+                        epoch.tx_hash = tx_hash
+                        self._apply_receipt(epoch, receipt)
+                        await self._persist(epoch)
+                        return epoch
+                tx_hash, nonce = await _run_rpc(
+                    client.send, epoch.root_of_roots, epoch.nonce, self.fee_bump ** (epoch.fee_bumps + 1),
+                )
+                epoch.replaced_tx_hashes.append(epoch.tx_hash)
+                epoch.fee_bumps += 1
+                self.stats["replacements"] += 1
+            else:
+                tx_hash, nonce = await _run_rpc(client.send, epoch.root_of_roots)
+        except Exception as e:
+            epoch.error = str(e)
+            if replacing:
+                # Still timed out; checked and replaced again next epoch
+                logger.warning("Replacing the transaction of epoch %d failed: %s", epoch.epoch, e)
+            else:
+                epoch.status = "failed"
+                self.stats["failed"] += 1
+                logger.error("Anchoring epoch %d failed: %s", epoch.epoch, e)
+            await self._persist(epoch)
+            return epoch
+
+        epoch.tx_hash, epoch.nonce = tx_hash, nonce
+        epoch.status = "sent"
+        epoch.error = None
+        self.stats["transactions"] += 1
+        await self._persist(epoch)
+        task = asyncio.get_running_loop().create_task(self._await_receipt(client, epoch))
+        self._receipt_tasks.add(task)
+        task.add_done_callback(self._receipt_tasks.discard)
+        return epoch
+
+    async def _await_receipt(self, client: AnchorClient, epoch: AnchorEpoch) -> None:
+        try:
+            receipt = await wait_for_receipt(
+                client, epoch.tx_hash, timeout=self.receipt_timeout, poll_interval=self.poll_interval,
+            )
+        except Exception as e:
+            epoch.error = str(e)
+            logger.warning("Receipt lookup for epoch %d failed: %s", epoch.epoch, e)
+            return
+        if receipt is None:
+            # Probably underpriced: later sends must not queue behind it,
+            # and run_epoch replaces it with higher fees
+            client.resync_nonce()
+            epoch.status = "timed_out"
+            epoch.error = f"No receipt after {self.receipt_timeout:.0f}s"
+            self.stats["timed_out"] += 1
+            logger.warning("Epoch %d transaction %s not mined; will replace it", epoch.epoch, epoch.tx_hash)
+        else:
+            self._apply_receipt(epoch, receipt)
+        await self._persist(epoch)
+
+    def _apply_receipt(self, epoch: AnchorEpoch, receipt: Dict[str, Any]) -> None:
+        epoch.block_number = receipt["blockNumber"]
+        epoch.gas_used = receipt["gasUsed"]
+        if receipt["status"] == 1:
+            epoch.status = "confirmed"
+            epoch.error = None
+            epoch.confirmed_at = datetime.now(timezone.utc)
+            self.stats["confirmed"] += 1
+        else:
+            epoch.status = "failed"
+            epoch.error = "Transaction reverted"
+            self.stats["failed"] += 1
+
+    async def run_epoch(self) -> Optional[AnchorEpoch]:
+        """Resend failed epochs, replace timed-out ones, then seal and anchor a new one."""
+        for retry in [
+            e for e in self.epochs
+            if (e.status == "failed" and e.tx_hash is None) or e.status == "timed_out"
+        ]:
+            await self.anchor_epoch(retry)
+        epoch = self.seal_epoch()
+        if epoch is not None:
+            await self._persist(epoch)
+            await self.anchor_epoch(epoch)
+        return epoch
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    async def _persist(self, epoch: AnchorEpoch) -> None:
+        if not (db.connected and db.session_factory):
+            return
+        try:
+            async with db.session_factory() as session:
+                await save_anchor_epoch(session, epoch.to_row())
+                await session.commit()
+        except Exception as e:
+            self.stats["persist_errors"] += 1
+            logger.warning("Anchor epoch %d not persisted: %s", epoch.epoch, e)
+
+    async def restore(self) -> int:
+        """
+        Reload persisted epochs (lifespan startup, after the registered
+        chains are loaded).  A stream's coverage is kept only while the
+        chain still ends each anchored prefix with the recorded head hash.
+        Returns the number of epochs restored.
+        """
+        if self.epochs or not (db.connected and db.session_factory):
+            return 0
+        try:
+            async with db.session_factory() as session:
+                rows = await get_anchor_epochs(session)
+        except Exception as e:
+            logger.warning("Anchor epochs not loaded: %s", e)
+            return 0
+
+        for row in rows:
+            if row.epoch != len(self.epochs):
+                logger.warning("Anchor epochs stop being contiguous at %d; ignoring the rest", row.epoch)
+                break
+            epoch = AnchorEpoch.from_row(row)
+            # Interrupted mid-flight: unsent epochs are resent, sent ones
+            # get their receipt checked (and are replaced if unmined)
+            if epoch.status == "sealed":
+                epoch.status = "failed"
+            elif epoch.status == "sent":
+                epoch.status = "timed_out"
+            self._add_epoch(epoch)
+
+        for stream, counts in self._coverage_counts.items():
+            chain = self._streams.get(stream)
+            keep = 0
+            for count in counts:
+                member = self._member(stream, keep)
+                if (chain is None or count > chain.checkpoint_state()["count"]
+                        or chain.block_hash(count - 1) != member.head_hash):
+                    break
+                keep += 1
+            if keep < len(counts):
+                logger.warning(
+                    "Stream %s no longer matches epochs anchored after entry %d; dropping their proofs",
+                    stream, counts[keep - 1] if keep else 0,
+                )
+                del counts[keep:]
+                del self._coverage_refs[stream][keep:]
+        return len(self.epochs)
+
+    async def _reload(self) -> int:
+        """Replace the in-memory epochs with the persisted ones."""
+        await self._cancel_receipt_tasks()
+        self.epochs = []
+        self._coverage_counts = {}
+        self._coverage_refs = {}
+        self._prefix_trees.clear()
+        return await self.restore()
+
+    def _member(self, stream: str, position: int) -> AnchorMember:
+        epoch_no, member_index = self._coverage_refs[stream][position]
+        return self.epochs[epoch_no].members[member_index]
+
+    # ------------------------------------------------------------------
+    # Proof of inclusion
+    # ------------------------------------------------------------------
+
+    async def prove_log(self, stream: str, index: int) -> Optional[Dict[str, Any]]:
+        """
+        Map entry ``index`` of ``stream`` to the first epoch that anchored it.
+
+        Returns the leaf → chain-root proof, the chain-root → root-of-roots
+        proof and the epoch's transaction, or None if not anchored yet.
+        The prefix tree is built in a worker thread.
+        """
+        counts = self._coverage_counts.get(stream, [])
+        position = bisect.bisect_right(counts, index)
+        if index < 0 or position == len(counts):
+            return None
+        count = counts[position]
+        epoch_no, member_index = self._coverage_refs[stream][position]
+        epoch = self.epochs[epoch_no]
+        member = epoch.members[member_index]
+
+        tree = self._prefix_trees.get((stream, count))
+        if tree is None:
+            chain = self._streams[stream]
+            tree = await asyncio.to_thread(
+                lambda: MerkleTree.from_hashes(chain.block_hashes(0, count))
+            )
+            self._prefix_trees.put((stream, count), tree)
+
+        return {
+            "stream": stream,
+            "index": index,
+            "leaf_hash": tree.node_hash(0, index),
+            "member_root": member.root,
+            "leaf_proof": tree.get_proof(index),
+            "epoch": epoch_no,
+            "root_of_roots": epoch.root_of_roots,
+            "epoch_proof": MerkleTree.from_hashes([m.root for m in epoch.members]).get_proof(member_index),
+            "status": epoch.status,
+            "tx_hash": epoch.tx_hash,
+            "block_number": epoch.block_number,
+        }
+
+    @staticmethod
+    def verify_inclusion(proof: Dict[str, Any]) -> bool:
+        """Check both Merkle proofs of a ``prove_log`` result."""
+        return (
+            MerkleTree.verify_proof(proof["leaf_hash"], proof["leaf_proof"], proof["member_root"])
+            and MerkleTree.verify_proof(proof["member_root"], proof["epoch_proof"], proof["root_of_roots"])
+        )
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def leader(self) -> bool:
+        """Whether this process currently holds the anchoring lock."""
+        return self._lock_conn is not None
+
+    async def _hold_lock(self) -> bool:
+        """
+        Whether this process may anchor this epoch.
+
+        A held lock is checked on its connection first (a dropped
+        connection has released it).  Taking the lock reloads the epochs
+        the previous holder persisted, so numbering, pending transactions
+        and their nonces carry on from there.
+        """
+        if not db.connected:
+            return True
+        if self._lock_conn is not None:
+            try:
+                await ping_connection(self._lock_conn)
+                return True
+            except Exception as e:
+                logger.warning("Anchoring lock lost: %s", e)
+                await self._release_lock()
+        try:
+            conn = await try_advisory_lock(self.lock_key)
+        except Exception as e:
+            logger.warning("Anchoring lock not taken: %s", e)
+            return False
+        if conn is None:
+            return False
+        self._lock_conn = conn
+        restored = await self._reload()
+        logger.info("Took the anchoring lock; continuing after %d persisted epochs", restored)
+        return True
+
+    async def _release_lock(self) -> None:
+        conn, self._lock_conn = self._lock_conn, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.debug("Closing the anchoring lock connection failed: %s", e)
+
+    async def tick(self) -> Optional[AnchorEpoch]:
+        """One scheduled epoch: anchored only if this process holds the lock."""
+        if await self._hold_lock():
+            return await self.run_epoch()
+        if self._submitted:
+            # Another worker anchors; it cannot see roots queued here
+            self.stats["dropped_submissions"] += len(self._submitted)
+            logger.warning("Dropping %d submitted roots: another worker anchors", len(self._submitted))
+            self._submitted = []
+        return None
+
+    async def start(self) -> None:
+        """Start anchoring one epoch every ``epoch_seconds``."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        await self._cancel_receipt_tasks(task)
+        await self._release_lock()
+
+    async def _cancel_receipt_tasks(self, *extra: Optional[asyncio.Task]) -> None:
+        tasks = [t for t in [*extra, *self._receipt_tasks] if t is not None and not t.done()]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.epoch_seconds)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error("Anchoring epoch failed: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "configured": self.configured,
+            "leader": self.leader,
+            "pending_receipts": len(self._receipt_tasks),
+            "latest_epoch": self.epochs[-1].to_dict() if self.epochs else None,
+        }
+
+
+anchor_scheduler = AnchorScheduler()
 
 
 # ========================================================================
@@ -292,26 +1049,14 @@ def _anchor_sync(merkle_root: str) -> Dict[str, Any]:
 
 async def get_root_count() -> int:
     """Get total number of anchored Merkle roots."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _get_root_count_sync)
-
-
-def _get_root_count_sync() -> int:
-    w3 = _get_web3()
-    contract = _get_contract(w3)
-    return contract.functions.getRootCount().call()
+    client = await _run_rpc(get_anchor_client)
+    return await _run_rpc(client.call, "getRootCount")
 
 
 async def get_latest_root() -> str:
     """Get the most recently anchored Merkle root."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _get_latest_root_sync)
-
-
-def _get_latest_root_sync() -> str:
-    w3 = _get_web3()
-    contract = _get_contract(w3)
-    return contract.functions.getLatestRoot().call()
+    client = await _run_rpc(get_anchor_client)
+    return await _run_rpc(client.call, "getLatestRoot")
 
 
 # ========================================================================
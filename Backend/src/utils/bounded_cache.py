@@ -0,0 +1,192 @@
+"""
+Bounded LRU + TTL Cache
+=======================
+
+Small in-process cache used on request hot paths (pipeline verdicts,
+LLM responses, per-attacker session state).  Entries are evicted in
+least-recently-used order once ``max_entries`` is reached and expire
+``ttl_seconds`` after they were last written.  An optional ``sizeof``
+hook turns on memory accounting (and a ``max_bytes`` budget).  Every
+cache keeps hit / miss / eviction / expiration counters for the status
+endpoints.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUTTLCache(Generic[K, V]):
+    """
+    Ordered-dict backed LRU cache with optional per-entry TTL.
+
+    Not thread-safe: intended for use from a single asyncio event loop,
+    where no ``await`` happens between a lookup and its update.
+
+    Args:
+        max_entries: Hard cap on the number of entries (LRU eviction).
+        ttl_seconds: Lifetime of an entry since it was written, or None
+            for no expiry.
+        on_evict: Optional ``callback(key, value)`` invoked when an entry
+            is dropped because of capacity or expiry (not on ``pop`` or
+            ``clear``).
+        clock: Monotonic time source (injectable for tests).
+        sizeof: Optional ``callback(key, value) -> int`` giving the
+            approximate footprint of an entry in bytes.  Enables the
+            ``bytes`` stat.
+        max_bytes: Byte budget enforced with LRU eviction (needs
+            ``sizeof``).  The most recent entry is always kept.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        on_evict: Optional[Callable[[K, V], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sizeof: Optional[Callable[[K, V], int]] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes requires a sizeof callback")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._clock = clock
+        self.sizeof = sizeof
+        self.max_bytes = max_bytes
+        # key -> (expires_at, value)
+        self._data: "OrderedDict[K, Tuple[Optional[float], V]]" = OrderedDict()
+        # key -> accounted size (only when sizeof is set)
+        self._sizes: Dict[K, int] = {}
+        self.bytes = 0
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._data.get(key)  # type: ignore[arg-type]
+        return entry is not None and not self._expired(entry[0], self._clock())
+
+    def _expired(self, expires_at: Optional[float], now: float) -> bool:
+        return expires_at is not None and now >= expires_at
+
+    def _forget_size(self, key: K) -> None:
+        if self.sizeof is not None:
+            self.bytes -= self._sizes.pop(key, 0)
+
+    def _drop(self, key: K, counter: str) -> None:
+        _, value = self._data.pop(key)
+        self._forget_size(key)
+        self.stats[counter] += 1
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def get(self, key: K, default: Any = None) -> Any:
+        """Return the cached value (refreshing its LRU position) or ``default``."""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.stats["misses"] += 1
+            return default
+
+        expires_at, value = entry
+        if self._expired(expires_at, self._clock()):
+            self._drop(key, "expirations")
+            self.stats["misses"] += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def put(self, key: K, value: V, ttl_seconds: Optional[float] = None) -> None:
+        """Insert or replace an entry, evicting the LRU entry when full."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = self._clock() + ttl if ttl is not None else None
+
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = (expires_at, value)
+        if self.sizeof is not None:
+            self._forget_size(key)
+            size = self.sizeof(key, value)
+            self._sizes[key] = size
+            self.bytes += size
+
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes and len(self._data) > 1
+        ):
+            oldest = next(iter(self._data))
+            self._drop(oldest, "evictions")
+
+    def touch(self, key: K) -> bool:
+        """
+        Restart the TTL of an existing entry (idle-timeout semantics).
+
+        Also re-measures the entry, so call it after mutating a value in
+        place to keep the byte accounting current.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return False
+        self.put(key, entry[1])
+        return True
+
+    def pop(self, key: K, default: Any = None) -> Any:
+        """Remove an entry without counting it as an eviction."""
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self._forget_size(key)
+        return entry[1]
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        now = self._clock()
+        expired = [k for k, (exp, _) in self._data.items() if self._expired(exp, now)]
+        for key in expired:
+            self._drop(key, "expirations")
+        return len(expired)
+
+    def clear(self) -> None:
+        """Invalidate the whole cache."""
+        if self._data:
+            self.stats["invalidations"] += 1
+        self._data.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    def keys(self) -> Iterator[K]:
+        return iter(list(self._data.keys()))
+
+    def items(self) -> Iterator[Tuple[K, V]]:
+        """Snapshot of (key, value) pairs, including not-yet-purged entries."""
+        return iter([(k, v) for k, (_, v) in self._data.items()])
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        stats = {
+            **self.stats,
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+        if self.sizeof is not None:
+            stats["bytes"] = self.bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
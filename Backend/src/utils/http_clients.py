@@ -0,0 +1,343 @@
+"""
+Shared Outbound HTTP Client Registry
+=====================================
+
+One pooled ``httpx`` client per upstream origin (scheme + host + port),
+created lazily and closed from the FastAPI lifespan.  Reusing clients
+keeps TCP/TLS connections alive between DeepSeek calls, webhook alerts,
+GeoIP lookups and sensor forwarding instead of paying a fresh handshake
+on every request.
+
+Each origin gets:
+  - a per-host connection cap and keep-alive pool (``httpx.Limits``)
+  - HTTP/2 when the ``h2`` package is installed
+  - default connect/read timeouts (overridable per request)
+  - in-flight / peak / error counters plus live pool occupancy
+
+Usage:
+    from src.utils.http_clients import http_clients
+
+    client = http_clients.get_client(settings.DEEPSEEK_API_URL)
+    response = await client.post(settings.DEEPSEEK_API_URL, json=payload)
+
+Sync callers running in worker threads (e.g. the paramiko SSH honeypot)
+use ``get_sync_client`` — ``httpx.Client`` pools are thread-safe.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class _HostStats:
+    """Request counters for one origin."""
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    errors: int = 0
+
+    def started(self) -> None:
+        self.requests += 1
+        self.in_flight += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+
+    def finished(self) -> None:
+        self.in_flight -= 1
+
+
+# ============================================================
+# Instrumented transports
+# ============================================================
+
+class _TrackedAsyncStream(httpx.AsyncByteStream):
+    """Response body wrapper that marks the request finished on close."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, stats: _HostStats):
+        self._stream = stream
+        self._stats = stats
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._stats.finished()
+
+
+class _TrackedSyncStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, stats: _HostStats):
+        self._stream = stream
+        self._stats = stats
+        self._closed = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._stats.finished()
+
+
+class _InstrumentedAsyncTransport(httpx.AsyncHTTPTransport):
+    """AsyncHTTPTransport that counts in-flight requests per origin."""
+
+    def __init__(self, host_stats: _HostStats, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.host_stats = host_stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.host_stats.started()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self.host_stats.errors += 1
+            self.host_stats.finished()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedAsyncStream(response.stream, self.host_stats),
+            extensions=response.extensions,
+        )
+
+
+class _InstrumentedSyncTransport(httpx.HTTPTransport):
+    def __init__(self, host_stats: _HostStats, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.host_stats = host_stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.host_stats.started()
+        try:
+            response = super().handle_request(request)
+        except BaseException:
+            self.host_stats.errors += 1
+            self.host_stats.finished()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedSyncStream(response.stream, self.host_stats),
+            extensions=response.extensions,
+        )
+
+
+def _pool_occupancy(transport: httpx.BaseTransport) -> Dict[str, int]:
+    """Open / idle connection counts from the underlying httpcore pool."""
+    pool = getattr(transport, "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for conn in connections if conn.is_idle())
+    return {"connections_open": len(connections), "connections_idle": idle}
+
+
+# ============================================================
+# Registry
+# ============================================================
+
+class HTTPClientRegistry:
+    """
+    Lazily-created, per-origin pooled HTTP clients.
+
+    Async clients are bound to the event loop they were created on; if a
+    different loop asks for the same origin (tests, ``asyncio.run`` in a
+    CLI) a fresh client is built for it.
+
+    Args:
+        max_connections_per_host: Upper bound on concurrent connections
+            to a single origin.
+        max_keepalive_connections: Idle connections kept per origin.
+        keepalive_expiry: Seconds an idle connection may stay pooled.
+        timeout: Default read/write/pool timeout in seconds.
+        connect_timeout: Default connect timeout in seconds.
+        http2: Negotiate HTTP/2 when available (needs ``h2``).
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        http2: bool = True,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("h2 not installed — outbound HTTP clients will use HTTP/1.1 only")
+
+        self._async_clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+        self._sync_clients: Dict[str, httpx.Client] = {}
+        self._stats: Dict[str, _HostStats] = {}
+        self._sync_lock = threading.Lock()
+        # Closes of replaced clients scheduled on the current loop
+        self._retiring: Set[asyncio.Future] = set()
+
+    @staticmethod
+    def origin(url: str) -> str:
+        """Normalise a URL to its ``scheme://host:port`` origin key."""
+        parts = urlsplit(url)
+        scheme = (parts.scheme or "http").lower()
+        host = (parts.hostname or "").lower()
+        port = parts.port or (443 if scheme == "https" else 80)
+        return f"{scheme}://{host}:{port}"
+
+    def _host_stats(self, origin: str) -> _HostStats:
+        stats = self._stats.get(origin)
+        if stats is None:
+            stats = self._stats[origin] = _HostStats()
+        return stats
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """Return the pooled AsyncClient for ``url``'s origin."""
+        origin = self.origin(url)
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(origin)
+        if entry is not None:
+            client, client_loop = entry
+            if client_loop is loop and not client.is_closed:
+                return client
+            self._retire(origin, client, client_loop)
+
+        transport = _InstrumentedAsyncTransport(
+            self._host_stats(origin), http2=self.http2, limits=self.limits,
+        )
+        client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+        self._async_clients[origin] = (client, loop)
+        logger.debug(f"Created pooled HTTP client for {origin} (http2={self.http2})")
+        return client
+
+    def _retire(
+        self,
+        origin: str,
+        client: httpx.AsyncClient,
+        client_loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        """
+        Close a client that belongs to another event loop.
+
+        Its connections must be closed on the loop that opened them, so
+        ``aclose`` is scheduled there.  A loop that is already closed can
+        no longer run it; the close is then attempted on the current loop
+        and whatever fails is left to garbage collection.
+        """
+        if client.is_closed:
+            return
+        if not client_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._close_client(origin, client), client_loop)
+        else:
+            future = asyncio.ensure_future(self._close_client(origin, client))
+            self._retiring.add(future)
+            future.add_done_callback(self._retiring.discard)
+        logger.debug(f"Retiring pooled HTTP client for {origin} (event loop changed)")
+
+    @staticmethod
+    async def _close_client(origin: str, client: httpx.AsyncClient) -> None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client for {origin}: {e}")
+
+    def get_sync_client(self, url: str) -> httpx.Client:
+        """Return the pooled (thread-safe) sync Client for ``url``'s origin."""
+        origin = self.origin(url)
+        with self._sync_lock:
+            client = self._sync_clients.get(origin)
+            if client is None or client.is_closed:
+                transport = _InstrumentedSyncTransport(
+                    self._host_stats(origin), http2=self.http2, limits=self.limits,
+                )
+                client = httpx.Client(transport=transport, timeout=self.timeout)
+                self._sync_clients[origin] = client
+            return client
+
+    async def aclose(self) -> None:
+        """Close every pooled client (called from the FastAPI lifespan)."""
+        loop = asyncio.get_running_loop()
+        clients, self._async_clients = self._async_clients, {}
+        for origin, (client, client_loop) in clients.items():
+            if client_loop is loop:
+                await self._close_client(origin, client)
+            else:
+                self._retire(origin, client, client_loop)
+        if self._retiring:
+            await asyncio.gather(*self._retiring, return_exceptions=True)
+        self.close_sync()
+
+    def close_sync(self) -> None:
+        with self._sync_lock:
+            clients, self._sync_clients = self._sync_clients, {}
+        for client in clients.values():
+            client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-origin request counters and pool utilisation."""
+        max_connections = self.limits.max_connections or 0
+        hosts: Dict[str, Any] = {}
+        for origin, stats in self._stats.items():
+            occupancy = {"connections_open": 0, "connections_idle": 0}
+            transports = []
+            if origin in self._async_clients:
+                transports.append(self._async_clients[origin][0]._transport)
+            if origin in self._sync_clients:
+                transports.append(self._sync_clients[origin]._transport)
+            for transport in transports:
+                for key, value in _pool_occupancy(transport).items():
+                    occupancy[key] += value
+
+            hosts[origin] = {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "in_flight": stats.in_flight,
+                "peak_in_flight": stats.peak_in_flight,
+                **occupancy,
+                "utilization": round(stats.in_flight / max_connections, 4) if max_connections else None,
+            }
+
+        return {
+            "http2": self.http2,
+            "max_connections_per_host": max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "hosts": hosts,
+        }
+
+
+http_clients = HTTPClientRegistry(
+    max_connections_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    timeout=settings.HTTP_TIMEOUT,
+    connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+    http2=settings.HTTP2_ENABLED,
+)
@@ -22,12 +22,20 @@ How Merkle Trees Work for Log Integrity:
 Author: Chameleon Security Team
 """
 
+import asyncio
 import hashlib
 import json
-from typing import List, Optional, Dict, Any, Tuple
+import mmap
+from binascii import hexlify
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +44,15 @@ logger = logging.getLogger(__name__)
 # Log Entry Hashing
 # ============================================================
 
+# Batches at least this large are hashed in a process pool …
+PARALLEL_HASH_THRESHOLD = 50_000
+# … in chunks of this many entries per task
+PARALLEL_CHUNK_SIZE = 10_000
+
+# One long-lived hashing pool per process (see _get_hash_pool)
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+
 def hash_log_entry(log_data: Dict[str, Any]) -> str:
     """
     Hash a single log entry using SHA-256.
@@ -65,6 +82,37 @@ def hash_log_entry(log_data: Dict[str, Any]) -> str:
         >>> hash_log_entry(log)
         'a1b2c3d4e5f6...7890abcdef'
     """
+    encoded = canonical_log_json(log_data).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+# Single C-encoder pass; ``sort_keys`` gives the same order as the
+# copy-and-sort path at every nesting level
+_encode_canonical = json.JSONEncoder(sort_keys=True, separators=(',', ':')).encode
+
+
+def canonical_log_json(log_data: Dict[str, Any]) -> str:
+    """
+    Canonical JSON text hashed by :func:`hash_log_entry`.
+
+    Fast path: JSON-native entries (``HoneypotLog.to_dict()`` output, JSONB
+    metadata) are encoded directly, without copying and re-sorting every
+    nested dict.  The result is only trusted when it cannot differ from the
+    reference encoding: anything the encoder rejects (datetimes, …) or any
+    ``null`` in the output (the reference drops ``None`` values) falls back
+    to :func:`_canonical_log_json_reference`.
+    """
+    try:
+        encoded = _encode_canonical(log_data)
+    except (TypeError, ValueError):
+        return _canonical_log_json_reference(log_data)
+    if 'null' in encoded:
+        return _canonical_log_json_reference(log_data)
+    return encoded
+
+
+def _canonical_log_json_reference(log_data: Dict[str, Any]) -> str:
+    """Reference encoding: datetimes to ISO strings, ``None`` values dropped."""
     # Create a copy to avoid modifying the original
     data = log_data.copy()
     
@@ -81,13 +129,87 @@ def hash_log_entry(log_data: Dict[str, Any]) -> str:
             serializable_data[key] = value
     
     # Convert to JSON string with sorted keys
-    json_string = json.dumps(serializable_data, sort_keys=True, separators=(',', ':'))
+    return json.dumps(serializable_data, sort_keys=True, separators=(',', ':'))
+
+
+def _hash_log_chunk(entries: List[Dict[str, Any]]) -> List[bytes]:
+    """Worker: raw SHA-256 digests for one chunk of entries."""
+    return [
+        hashlib.sha256(canonical_log_json(entry).encode('utf-8')).digest()
+        for entry in entries
+    ]
+
+
+def _get_hash_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The process-wide hashing pool, created on first use with ``workers``
+    processes.  Workers are started by a forkserver (spawn where that is
+    unavailable), never forked from the threaded server process.
+    """
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _hash_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    """Stop the hashing pool's workers (lifespan shutdown); the next batch starts a new one."""
+    global _hash_pool
+    with _hash_pool_lock:
+        pool, _hash_pool = _hash_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def hash_log_entries(
+    log_entries: Sequence[Dict[str, Any]],
+    workers: Optional[int] = None,
+    chunk_size: int = PARALLEL_CHUNK_SIZE,
+    parallel_threshold: int = PARALLEL_HASH_THRESHOLD
+) -> List[str]:
+    """
+    Hash many log entries; identical to ``[hash_log_entry(e) for e in ...]``.
+    
+    Batches of at least ``parallel_threshold`` entries are split into
+    ``chunk_size`` chunks and hashed in the shared process pool (pickling
+    a chunk is far cheaper than encoding it); smaller batches,
+    ``workers=1`` or a platform without process support run serially.
     
-    # Encode and hash
-    encoded = json_string.encode('utf-8')
-    hash_object = hashlib.sha256(encoded)
+    Args:
+        log_entries: Log entry dictionaries
+        workers: Pool size when the pool is first created (default: CPU count)
+        chunk_size: Entries per pool task
+        parallel_threshold: Minimum batch size worth a process pool
     
-    return hash_object.hexdigest()
+    Returns:
+        Hex SHA-256 hashes, in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(log_entries) >= max(parallel_threshold, 2 * chunk_size):
+        chunks = [
+            log_entries[i:i + chunk_size]
+            for i in range(0, len(log_entries), chunk_size)
+        ]
+        global _hash_pool
+        pool = None
+        try:
+            pool = _get_hash_pool(workers)
+            return [
+                digest.hex()
+                for digests in pool.map(_hash_log_chunk, chunks)
+                for digest in digests
+            ]
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            if isinstance(e, BrokenProcessPool):
+                # A worker died; the next batch starts a fresh pool
+                with _hash_pool_lock:
+                    if _hash_pool is pool:
+                        _hash_pool = None
+            logger.warning(f"Parallel log hashing unavailable, hashing serially: {e}")
+    return [digest.hex() for digest in _hash_log_chunk(log_entries)]
 
 
 def _make_serializable(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -127,6 +249,9 @@ def hash_pair(left: str, right: str) -> str:
 # Merkle Tree Implementation
 # ============================================================
 
+# Raw SHA-256 digest length stored per node
+DIGEST_SIZE = 32
+
 @dataclass
 class MerkleNode:
     """Represents a node in the Merkle Tree."""
@@ -156,75 +281,120 @@ class MerkleTree:
     2. Parent nodes contain hashes of their children combined
     3. The root node's hash represents the entire dataset
     
+    Storage is compact: every level is a contiguous buffer of raw 32-byte
+    SHA-256 digests (≈ 64 bytes per leaf for the whole tree), allocated
+    in one ``bytearray`` or, with ``storage_path``, in one mmap'ed file so
+    very large trees live in the page cache instead of the heap.  Parent
+    hashes still follow ``hash_pair`` (SHA-256 of the two children's hex
+    strings concatenated), so roots and proofs are unchanged.
+    
     Attributes:
-        leaves: List of leaf node hashes
-        root: Root node of the tree
-        tree: Complete tree structure for proof generation
+        levels: Per-level digest buffers, leaves first, root last
+        leaf_hashes: Hex leaf hashes (materialised on access)
+        root_hash: Hex root hash
     """
     
-    def __init__(self, log_entries: List[Dict[str, Any]]):
+    def __init__(
+        self,
+        log_entries: Optional[List[Dict[str, Any]]] = None,
+        storage_path: Optional[str] = None
+    ):
         """
         Initialize Merkle Tree from log entries.
         
         Args:
             log_entries: List of log entry dictionaries
+            storage_path: Optional file to mmap the level buffers into
         """
-        self.log_entries = log_entries
-        self.leaf_hashes: List[str] = []
-        self.nodes: List[List[MerkleNode]] = []
-        self.root: Optional[MerkleNode] = None
+        self.storage_path = storage_path
+        self.levels: List[memoryview] = []
+        self._sizes: List[int] = []
+        self._mmap: Optional[mmap.mmap] = None
         
         if log_entries:
+            self._allocate(len(log_entries))
+            self.levels[0][:] = bytes.fromhex(''.join(hash_log_entries(log_entries)))
             self._build_tree()
     
-    def _build_tree(self) -> None:
-        """Build the Merkle Tree from log entries."""
-        # Step 1: Create leaf nodes by hashing each log entry
-        leaf_nodes = []
-        for entry in self.log_entries:
-            entry_hash = hash_log_entry(entry)
-            self.leaf_hashes.append(entry_hash)
-            node = MerkleNode(hash=entry_hash, is_leaf=True, data=entry)
-            leaf_nodes.append(node)
-        
-        self.nodes.append(leaf_nodes)
-        
-        # Step 2: Build tree levels from bottom up
-        current_level = leaf_nodes
-        while len(current_level) > 1:
-            next_level = []
-            
-            # Process pairs of nodes
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                
-                if i + 1 < len(current_level):
-                    right = current_level[i + 1]
-                else:
-                    # Odd number of nodes - duplicate the last one
-                    right = MerkleNode(hash=left.hash, is_leaf=True)
-                
-                # Create parent node
-                parent_hash = hash_pair(left.hash, right.hash)
-                parent = MerkleNode(
-                    hash=parent_hash,
-                    left=left,
-                    right=right,
-                    is_leaf=False
-                )
-                next_level.append(parent)
-            
-            self.nodes.append(next_level)
-            current_level = next_level
+    @classmethod
+    def from_hashes(
+        cls,
+        leaf_hashes: Sequence[Union[str, bytes]],
+        storage_path: Optional[str] = None
+    ) -> "MerkleTree":
+        """Build a tree from precomputed leaf hashes (hex strings or 32-byte digests)."""
+        tree = cls(storage_path=storage_path)
+        if leaf_hashes:
+            tree._allocate(len(leaf_hashes))
+            leaves = tree.levels[0]
+            for i, leaf in enumerate(leaf_hashes):
+                digest = bytes.fromhex(leaf) if isinstance(leaf, str) else leaf
+                leaves[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE] = digest
+            tree._build_tree()
+        return tree
+    
+    def _allocate(self, leaf_count: int) -> None:
+        """Reserve one contiguous buffer for every level of the tree."""
+        sizes = [leaf_count]
+        while sizes[-1] > 1:
+            sizes.append((sizes[-1] + 1) // 2)
+        total = sum(sizes) * DIGEST_SIZE
+        
+        if self.storage_path:
+            with open(self.storage_path, "w+b") as f:
+                f.truncate(total)
+                self._mmap = mmap.mmap(f.fileno(), total)
+            buffer = memoryview(self._mmap)
+        else:
+            buffer = memoryview(bytearray(total))
         
-        # The last remaining node is the root
-        if current_level:
-            self.root = current_level[0]
+        offset = 0
+        for size in sizes:
+            self.levels.append(buffer[offset:offset + size * DIGEST_SIZE])
+            offset += size * DIGEST_SIZE
+        self._sizes = sizes
+    
+    def _build_tree(self) -> None:
+        """Hash each level into the next, pairing an odd last node with itself."""
+        sha256 = hashlib.sha256
+        for level in range(len(self._sizes) - 1):
+            src, dst, count = self.levels[level], self.levels[level + 1], self._sizes[level]
+            for i in range(count // 2):
+                # Adjacent children → their hex strings already concatenated
+                pair = hexlify(src[2 * i * DIGEST_SIZE:(2 * i + 2) * DIGEST_SIZE])
+                dst[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE] = sha256(pair).digest()
+            if count % 2:
+                last = hexlify(src[(count - 1) * DIGEST_SIZE:count * DIGEST_SIZE])
+                dst[(count // 2) * DIGEST_SIZE:(count // 2 + 1) * DIGEST_SIZE] = sha256(last + last).digest()
+    
+    def __len__(self) -> int:
+        return self._sizes[0] if self._sizes else 0
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the level buffers."""
+        return sum(self._sizes) * DIGEST_SIZE
+    
+    def node_hash(self, level: int, index: int) -> str:
+        """Hex hash of node ``index`` on ``level`` (0 = leaves)."""
+        return self.levels[level][index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE].hex()
+    
+    @property
+    def leaf_hashes(self) -> List[str]:
+        """Hex hashes of all leaves, in order."""
+        return [self.node_hash(0, i) for i in range(len(self))]
     
     @property
     def root_hash(self) -> Optional[str]:
         """Get the root hash of the tree."""
-        return self.root.hash if self.root else None
+        return self.node_hash(len(self.levels) - 1, 0) if self.levels else None
+    
+    @property
+    def root(self) -> Optional[MerkleNode]:
+        """Root node (hash only — children are not materialised)."""
+        if not self.levels:
+            return None
+        return MerkleNode(hash=self.root_hash, is_leaf=len(self.levels) == 1)
     
     def get_proof(self, index: int) -> List[Dict[str, str]]:
         """
@@ -232,7 +402,8 @@ class MerkleTree:
         
         A Merkle proof consists of the sibling hashes needed to
         verify that a leaf is part of the tree without needing
-        all other leaves.
+        all other leaves.  Read directly from the level buffers:
+        O(log n) regardless of tree size.
         
         Args:
             index: Index of the leaf node to prove
@@ -247,17 +418,14 @@ class MerkleTree:
             >>> proof = tree.get_proof(0)
             >>> # proof = [{"hash": "hash_of_log2", "position": "right"}, ...]
         """
-        if not self.root or index < 0 or index >= len(self.leaf_hashes):
+        if not self.levels or index < 0 or index >= len(self):
             return []
         
         proof = []
         current_index = index
         
         # Traverse from leaves to root
-        for level in range(len(self.nodes) - 1):
-            current_level = self.nodes[level]
-            
-            # Find sibling
+        for level in range(len(self.levels) - 1):
             if current_index % 2 == 0:
                 # Current is left child, sibling is right
                 sibling_index = current_index + 1
@@ -267,15 +435,12 @@ class MerkleTree:
                 sibling_index = current_index - 1
                 position = "left"
             
-            # Get sibling hash (or duplicate if out of bounds)
-            if sibling_index < len(current_level):
-                sibling_hash = current_level[sibling_index].hash
-            else:
-                # No sibling - use self hash (for odd-length levels)
-                sibling_hash = current_level[current_index].hash
+            # No sibling on an odd-length level - the node is paired with itself
+            if sibling_index >= self._sizes[level]:
+                sibling_index = current_index
             
             proof.append({
-                "hash": sibling_hash,
+                "hash": self.node_hash(level, sibling_index),
                 "position": position
             })
             
@@ -326,14 +491,126 @@ class MerkleTree:
         
         return current_hash == root_hash
     
+    def _node_dict(self, level: int, index: int) -> Dict[str, Any]:
+        node = {"hash": self.node_hash(level, index), "is_leaf": level == 0}
+        if level > 0:
+            left = self._node_dict(level - 1, 2 * index)
+            if 2 * index + 1 < self._sizes[level - 1]:
+                right = self._node_dict(level - 1, 2 * index + 1)
+            else:
+                right = {"hash": left["hash"], "is_leaf": True}
+            node["left"] = left
+            node["right"] = right
+        return node
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert tree to dictionary representation."""
         return {
             "root_hash": self.root_hash,
-            "leaf_count": len(self.leaf_hashes),
+            "leaf_count": len(self),
             "leaf_hashes": self.leaf_hashes,
-            "tree": self.root.to_dict() if self.root else None
+            "tree": self._node_dict(len(self.levels) - 1, 0) if self.levels else None
         }
+    
+    def close(self) -> None:
+        """Release the level buffers (and unmap ``storage_path``)."""
+        for view in self.levels:
+            view.release()
+        self.levels = []
+        self._sizes = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+# ============================================================
+# Append-only Merkle Accumulator
+# ============================================================
+
+class MerkleAccumulator:
+    """
+    Append-only Merkle root over a growing list of leaf hashes.
+    
+    Instead of keeping the tree, only the *frontier* is stored: for every
+    set bit k of the leaf count n, ``frontier[k]`` is the root of the
+    perfect subtree over the corresponding 2^k leaves.  Appending a leaf
+    is a binary increment (carry-merge full subtrees, O(log n)) and the
+    root folds the frontier from the lowest level up (O(log n), cached
+    until the next append).
+    
+    The root is identical to ``MerkleTree`` / ``calculate_merkle_root``
+    over the same leaves, including the Bitcoin-style rule of pairing an
+    odd last node with itself.  Folding with carry C_k at level k:
+    
+        bit k set,   no carry:  C_{k+1} = H(F_k, F_k)
+        bit k set,   carry:     C_{k+1} = H(F_k, C_k)
+        bit k clear, carry:     C_{k+1} = H(C_k, C_k)
+        root = H(F_K, C_K) if there is a carry at the top bit K, else F_K
+    
+    Usage:
+        acc = MerkleAccumulator()
+        for block_hash in hashes:
+            acc.append(block_hash)
+        acc.root()
+    """
+    
+    def __init__(self, size: int = 0, frontier: Optional[List[Optional[str]]] = None):
+        """
+        Create an empty accumulator, or restore one from a checkpoint.
+        
+        Args:
+            size: Number of leaves already accumulated
+            frontier: Subtree roots by level (None where bit k of size is clear)
+        """
+        frontier = list(frontier or [])
+        for k in range(max(size.bit_length(), len(frontier))):
+            present = k < len(frontier) and frontier[k] is not None
+            if present != bool(size >> k & 1):
+                raise ValueError(f"Frontier does not match leaf count {size} at level {k}")
+        self.size = size
+        self.frontier: List[Optional[str]] = frontier[:size.bit_length()]
+        self._root: Optional[str] = None
+    
+    @classmethod
+    def from_leaves(cls, leaves: List[str]) -> "MerkleAccumulator":
+        """Accumulate ``leaves`` in order (the input list is not modified)."""
+        acc = cls()
+        for leaf in leaves:
+            acc.append(leaf)
+        return acc
+    
+    def append(self, leaf_hash: str) -> None:
+        """Add one leaf hash (O(log n), amortised O(1))."""
+        node = leaf_hash
+        level = 0
+        while level < len(self.frontier) and self.frontier[level] is not None:
+            node = hash_pair(self.frontier[level], node)
+            self.frontier[level] = None
+            level += 1
+        if level == len(self.frontier):
+            self.frontier.append(node)
+        else:
+            self.frontier[level] = node
+        self.size += 1
+        self._root = None
+    
+    def root(self) -> Optional[str]:
+        """Current Merkle root (None when empty); cached between appends."""
+        if self._root is None and self.size:
+            top = self.size.bit_length() - 1
+            carry: Optional[str] = None
+            for level in range(top):
+                subtree = self.frontier[level]
+                if subtree is not None:
+                    carry = hash_pair(subtree, carry if carry is not None else subtree)
+                elif carry is not None:
+                    carry = hash_pair(carry, carry)
+            self._root = hash_pair(self.frontier[top], carry) if carry is not None else self.frontier[top]
+        return self._root
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Checkpoint state: ``MerkleAccumulator(**acc.snapshot())`` restores it."""
+        return {"size": self.size, "frontier": list(self.frontier)}
 
 
 # ============================================================
@@ -373,6 +650,8 @@ class MerkleLogger:
         self.log_hashes: List[str] = []
         self._tree: Optional[MerkleTree] = None
         self._root_hash: Optional[str] = None
+        # Root maintained incrementally; the full tree is only built for proofs
+        self._accumulator = MerkleAccumulator()
     
     def add_log(self, log_entry: Dict[str, Any]) -> str:
         """
@@ -387,6 +666,7 @@ class MerkleLogger:
         entry_hash = hash_log_entry(log_entry)
         self.logs.append(log_entry)
         self.log_hashes.append(entry_hash)
+        self._accumulator.append(entry_hash)
         
         # Invalidate cached tree
         self._tree = None
@@ -404,7 +684,7 @@ class MerkleLogger:
         Returns:
             List of hashes for the entries
         """
-        hashes = []
+        entry_dicts = []
         for entry in log_entries:
             if hasattr(entry, 'to_dict'):
                 entry_dict = entry.to_dict()
@@ -419,8 +699,19 @@ class MerkleLogger:
                     "response_sent": getattr(entry, 'response_sent', ''),
                     "metadata": getattr(entry, 'metadata', {})
                 }
-            entry_hash = self.add_log(entry_dict)
-            hashes.append(entry_hash)
+            entry_dicts.append(entry_dict)
+        
+        # Large batches are hashed in parallel; the accumulator is then
+        # fed in order so the root is unchanged
+        hashes = hash_log_entries(entry_dicts)
+        for entry_dict, entry_hash in zip(entry_dicts, hashes):
+            self.logs.append(entry_dict)
+            self.log_hashes.append(entry_hash)
+            self._accumulator.append(entry_hash)
+        
+        # Invalidate cached tree
+        self._tree = None
+        self._root_hash = None
         return hashes
     
     def build_tree(self) -> Optional[str]:
@@ -433,7 +724,7 @@ class MerkleLogger:
         if not self.logs:
             return None
         
-        self._tree = MerkleTree(self.logs)
+        self._tree = MerkleTree.from_hashes(self.log_hashes)
         self._root_hash = self._tree.root_hash
         
         if self._root_hash:
@@ -443,9 +734,9 @@ class MerkleLogger:
     
     @property
     def root_hash(self) -> Optional[str]:
-        """Get the current root hash (builds tree if needed)."""
+        """Get the current root hash (from the accumulator, no tree rebuild)."""
         if self._root_hash is None and self.logs:
-            self.build_tree()
+            self._root_hash = self._accumulator.root()
         return self._root_hash
     
     @property
@@ -525,6 +816,7 @@ class MerkleLogger:
         self.log_hashes.clear()
         self._tree = None
         self._root_hash = None
+        self._accumulator = MerkleAccumulator()
         logger.info("Merkle Logger cleared")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -540,6 +832,19 @@ class MerkleLogger:
 # Integration with ReputationScores
 # ============================================================
 
+def log_row_to_dict(row: Any) -> Dict[str, Any]:
+    """``HoneypotLog.to_dict()`` shape for a streamed log row."""
+    return {
+        "id": str(row.id),
+        "tenant_id": str(row.tenant_id),
+        "attacker_ip": row.attacker_ip,
+        "command_entered": row.command_entered,
+        "response_sent": row.response_sent,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+        "metadata": row.log_metadata
+    }
+
+
 async def update_reputation_merkle_root(
     session,
     ip_address: str,
@@ -553,6 +858,9 @@ async def update_reputation_merkle_root(
     2. Stores the root hash in ReputationScores.merkle_root
     3. Returns both the root hash and behavior hash
     
+    Pass the IP's logs oldest first — the order in which
+    :func:`verify_ip_log_integrity` walks them.
+    
     Args:
         session: SQLAlchemy async session
         ip_address: IP address to update
@@ -567,7 +875,7 @@ async def update_reputation_merkle_root(
         ...     session, "192.168.1.100", logs
         ... )
     """
-    from database_postgres import update_reputation_score
+    from src.core.database_postgres import update_reputation_score
     
     log_dicts = []
     for log in logs:
@@ -585,8 +893,9 @@ async def update_reputation_merkle_root(
                 "metadata": getattr(log, 'metadata', {})
             })
     
+    # Hashing a heavy IP's history is CPU-bound — keep it off the event loop
     merkle_logger = MerkleLogger()
-    merkle_logger.add_logs(log_dicts)
+    await asyncio.to_thread(merkle_logger.add_logs, log_dicts)
     merkle_root = merkle_logger.build_tree()
     
     behavior_data = {
@@ -610,18 +919,29 @@ async def update_reputation_merkle_root(
 async def verify_ip_log_integrity(
     session,  # AsyncSession from SQLAlchemy
     ip_address: str,
-    stored_root_hash: str
+    stored_root_hash: str,
+    full: bool = False
 ) -> Dict[str, Any]:
     """
     Verify the integrity of logs for a specific IP address.
     
-    This function retrieves all logs for an IP, rebuilds the Merkle Tree,
-    and compares the root hash with the stored value.
+    The IP's logs are walked oldest first into a Merkle accumulator and
+    the root is compared with the stored value.  If a signed checkpoint
+    exists for the IP, the accumulator is restored from it and only the
+    logs written after it are fetched and hashed; a successful check
+    writes a new checkpoint.  ``full=True`` ignores checkpoints and
+    re-hashes everything (the full audit for this stream).
+    
+    The checkpoint's cursor is a (timestamp, id) position, so a log
+    inserted later with an older timestamp (e.g. a replayed spill) lands
+    before it.  The number of logs up to the cursor is therefore checked
+    against the checkpoint first; if it moved, the IP is re-hashed in full.
     
     Args:
         session: SQLAlchemy async session
         ip_address: IP address to verify
         stored_root_hash: Previously stored Merkle root hash
+        full: Re-hash every log instead of resuming from the checkpoint
     
     Returns:
         Dictionary with verification results:
@@ -629,26 +949,77 @@ async def verify_ip_log_integrity(
             "valid": bool,
             "merkle_root": str,
             "log_count": int,
+            "rehashed": int,
+            "from_checkpoint": int,
             "verified_at": str
         }
     """
-    from database_postgres import get_logs_by_ip
+    from src.core.database_postgres import (
+        count_logs_through,
+        decode_log_cursor,
+        encode_log_cursor,
+        stream_honeypot_logs,
+    )
+    from src.core.integrity_checkpoints import Checkpoint, integrity_checkpointer, ip_stream
     
-    # Get all logs for this IP
-    logs = await get_logs_by_ip(session, ip_address)
+    stream = ip_stream(ip_address)
+    checkpoint = None if full else await integrity_checkpointer.load(stream, session=session)
+    if checkpoint is not None and checkpoint.cursor:
+        through = await count_logs_through(session, ip_address, decode_log_cursor(checkpoint.cursor))
+        if through != checkpoint.count:
+            logger.info(
+                f"Logs of {ip_address} up to the checkpoint cursor changed "
+                f"({checkpoint.count} -> {through}); re-hashing all of them"
+            )
+            checkpoint = None
+    accumulator = checkpoint.accumulator() if checkpoint else MerkleAccumulator()
+    after = decode_log_cursor(checkpoint.cursor) if checkpoint and checkpoint.cursor else None
     
-    # Build Merkle Tree
-    merkle_logger = MerkleLogger()
-    merkle_logger.add_logs(logs)
-    current_root = merkle_logger.build_tree()
+    # Fetch and hash only what follows the checkpoint, a chunk at a time
+    batch: List[Dict[str, Any]] = []
+    last_row = None
+    head_hash = checkpoint.head_hash if checkpoint else None
+    rehashed = 0
+    
+    async def _flush() -> None:
+        nonlocal batch, head_hash, rehashed
+        for entry_hash in await asyncio.to_thread(hash_log_entries, batch):
+            accumulator.append(entry_hash)
+            head_hash = entry_hash
+        rehashed += len(batch)
+        batch = []
+    
+    async for row in stream_honeypot_logs(session, after=after, attacker_ip=ip_address, newest_first=False):
+        batch.append(log_row_to_dict(row))
+        last_row = row
+        if len(batch) >= PARALLEL_CHUNK_SIZE:
+            await _flush()
+    if batch:
+        await _flush()
+    
+    current_root = accumulator.root()
     
     # Verify
     is_valid = current_root == stored_root_hash if current_root else stored_root_hash is None
     
+    if is_valid and last_row is not None:
+        await integrity_checkpointer.save(
+            Checkpoint(
+                stream=stream,
+                count=accumulator.size,
+                head_hash=head_hash,
+                frontier=list(accumulator.frontier),
+                cursor=encode_log_cursor(last_row.timestamp, last_row.id),
+            ),
+            session=session,
+        )
+    
     return {
         "valid": is_valid,
         "merkle_root": current_root,
-        "log_count": len(logs),
+        "log_count": accumulator.size,
+        "rehashed": rehashed,
+        "from_checkpoint": checkpoint.count if checkpoint else 0,
         "verified_at": datetime.utcnow().isoformat(),
         "ip_address": ip_address
     }
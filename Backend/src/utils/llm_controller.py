@@ -22,8 +22,10 @@ import asyncio
 import json
 import logging
 import hashlib
+import sys
+import time
 import uuid
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Set, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
@@ -31,6 +33,8 @@ from enum import Enum
 import httpx
 
 from src.core.config import settings
+from src.utils.bounded_cache import LRUTTLCache
+from src.utils.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +42,18 @@ logger = logging.getLogger(__name__)
 import os
 HONEYPOT_DOMAIN = os.getenv("HONEYPOT_DOMAIN", "localhost:8000")
 
+# Stand-in session id used in prompts and cached/shared responses.  The LLM
+# echoes it inside honeytoken files; each caller then swaps in its own
+# session id so one upstream response can serve many sessions.
+SHARED_BEACON_SESSION_ID = "5f0c6a1e-beac-4000-8000-00000000c0de"
+# Dash-less prefix form embedded in fake secrets by _static_fallback
+_SHARED_TOKEN_ID = SHARED_BEACON_SESSION_ID.replace("-", "")[:24]
+
+
+def beacon_url_for(session_id: str) -> str:
+    """Honeytoken tracking URL for a session."""
+    return f"http://{HONEYPOT_DOMAIN}/api/beacon/{session_id}"
+
 
 class LLMProvider(str, Enum):
     """Supported LLM providers."""
@@ -161,6 +177,60 @@ class CommandHistory:
     def to_dict(self) -> List[Dict[str, str]]:
         """Convert to dictionary for serialization."""
         return self.commands.copy()
+    
+    @classmethod
+    def from_dict(cls, commands: List[Dict[str, str]]) -> "CommandHistory":
+        """Rebuild a history from ``to_dict()`` output (e.g. a spilled session)."""
+        history = cls()
+        history.commands = list(commands)[-history.max_history:]
+        return history
+    
+    def memory_usage(self) -> int:
+        """Approximate footprint in bytes (list, entry dicts and their strings)."""
+        total = sys.getsizeof(self) + sys.getsizeof(self.commands)
+        for entry in self.commands:
+            total += sys.getsizeof(entry)
+            total += sum(sys.getsizeof(value) for value in entry.values())
+        return total
+
+
+def _response_size(command: str, response: str) -> int:
+    return sys.getsizeof(command) + sys.getsizeof(response)
+
+
+def _session_size(ip_address: str, history: CommandHistory) -> int:
+    return sys.getsizeof(ip_address) + history.memory_usage()
+
+
+# ============================================================
+# Cold Session Spill (Postgres)
+# ============================================================
+
+class PostgresSessionSpill:
+    """
+    Writes idle attacker sessions to the ``deception_sessions`` table and
+    reads them back when the same IP returns.  Every call is a no-op while
+    PostgreSQL is not connected.
+    """
+    
+    @property
+    def available(self) -> bool:
+        from src.core.database_postgres import db
+        return db.connected
+    
+    async def save(self, sessions: Dict[str, List[Dict[str, str]]]) -> int:
+        if not self.available:
+            return 0
+        from src.core.database_postgres import get_db_context, save_deception_sessions
+        async with get_db_context() as session:
+            return await save_deception_sessions(session, sessions)
+    
+    async def load(self, ip_address: str) -> Optional[List[Dict[str, str]]]:
+        if not self.available:
+            return None
+        from src.core.database_postgres import get_db_context, load_deception_session
+        async with get_db_context() as session:
+            return await load_deception_session(session, ip_address)
 
 
 class LLMController:
@@ -176,12 +246,18 @@ class LLMController:
     - API communication with LLM providers
     - Response generation and caching
     - Fallback to static responses
+    
+    Both in-process stores are bounded: responses are an LRU keyed by the
+    normalised command, sessions expire after ``LLM_SESSION_IDLE_TIMEOUT``
+    seconds without activity.  With a ``session_spill`` store (enabled by
+    ``LLM_SESSION_SPILL_ENABLED``) evicted sessions are written out and
+    reloaded by ``get_or_load_session`` when the attacker comes back.
     """
     
     DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
     DEEPSEEK_MODEL = "deepseek-chat"
     
-    def __init__(self, provider: str = "deepseek"):
+    def __init__(self, provider: str = "deepseek", session_spill: Optional[Any] = None):
         self.provider = LLMProvider(provider) if provider in [p.value for p in LLMProvider] else LLMProvider.DEEPSEEK
         
         if self.provider == LLMProvider.DEEPSEEK:
@@ -201,22 +277,137 @@ class LLMController:
         self.temperature = settings.LLM_TEMPERATURE
         self.timeout = settings.LLM_TIMEOUT
         
-        self._sessions: Dict[str, CommandHistory] = {}
-        self._cache: Dict[str, str] = {}
+        self._cache: LRUTTLCache[str, str] = LRUTTLCache(
+            max_entries=settings.LLM_RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_RESPONSE_CACHE_TTL_SECONDS,
+            sizeof=_response_size,
+            max_bytes=settings.LLM_RESPONSE_CACHE_MAX_BYTES,
+        )
+        self._sessions: LRUTTLCache[str, CommandHistory] = LRUTTLCache(
+            max_entries=settings.LLM_SESSION_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_SESSION_IDLE_TIMEOUT,
+            on_evict=self._on_session_evicted,
+            sizeof=_session_size,
+            max_bytes=settings.LLM_SESSION_MAX_BYTES,
+        )
+        self.session_sweep_interval = settings.LLM_SESSION_SWEEP_INTERVAL
+        self._last_sweep = time.monotonic()
+        
+        if session_spill is None and settings.LLM_SESSION_SPILL_ENABLED:
+            session_spill = PostgresSessionSpill()
+        self.session_spill = session_spill
+        # Evicted sessions waiting to be written (ip -> CommandHistory.to_dict())
+        self._pending_spill: Dict[str, List[Dict[str, str]]] = {}
+        self._spill_tasks: Set[asyncio.Task] = set()
+        # Single-flight: prompt key -> upstream call shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
         
         self.stats = {
             "total_requests": 0,
             "successful_requests": 0,
             "failed_requests": 0,
             "cache_hits": 0,
+            "coalesced_requests": 0,
+            "sessions_spilled": 0,
+            "sessions_restored": 0,
+            "spill_errors": 0,
             "provider": self.provider.value
         }
     
+    # ------------------------------------------------------------
+    # Session store
+    # ------------------------------------------------------------
+    
+    def _maybe_sweep_sessions(self) -> None:
+        """Expire idle sessions at most once per sweep interval."""
+        now = time.monotonic()
+        if now - self._last_sweep >= self.session_sweep_interval:
+            self._last_sweep = now
+            self._sessions.purge_expired()
+    
+    def _on_session_evicted(self, ip_address: str, history: CommandHistory) -> None:
+        """Queue an idle/evicted session for spilling (if a spill store is set)."""
+        if self.session_spill is None or not history.commands:
+            return
+        self._pending_spill[ip_address] = history.to_dict()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # flushed by the next spill on a running loop
+        if not self._spill_tasks:
+            task = loop.create_task(self.flush_spilled_sessions())
+            self._spill_tasks.add(task)
+            task.add_done_callback(self._spill_tasks.discard)
+    
+    async def flush_spilled_sessions(self) -> int:
+        """Write every queued session to the spill store; returns rows written."""
+        written = 0
+        while self._pending_spill and self.session_spill is not None:
+            batch, self._pending_spill = self._pending_spill, {}
+            try:
+                written += await self.session_spill.save(batch)
+            except Exception as e:
+                # Dropping is deliberate: re-queueing would grow without bound
+                # while the database is down.
+                self.stats["spill_errors"] += 1
+                logger.warning(f"Failed to spill {len(batch)} LLM sessions: {e}")
+        self.stats["sessions_spilled"] += written
+        return written
+    
+    async def spill_all_sessions(self) -> int:
+        """Spill every live session (called on shutdown so context survives restarts)."""
+        if self.session_spill is None:
+            return 0
+        for ip_address, history in self._sessions.items():
+            if history.commands:
+                self._pending_spill[ip_address] = history.to_dict()
+        return await self.flush_spilled_sessions()
+    
     def get_or_create_session(self, ip_address: str) -> CommandHistory:
         """Get or create a command history session for an IP."""
-        if ip_address not in self._sessions:
-            self._sessions[ip_address] = CommandHistory()
-        return self._sessions[ip_address]
+        self._maybe_sweep_sessions()
+        history = self._sessions.get(ip_address)
+        if history is None:
+            # Evicted but not yet written out — take it straight back
+            pending = self._pending_spill.pop(ip_address, None)
+            history = CommandHistory.from_dict(pending) if pending else CommandHistory()
+            self._sessions.put(ip_address, history)
+        return history
+    
+    async def get_or_load_session(self, ip_address: str) -> CommandHistory:
+        """
+        Like ``get_or_create_session``, but restores a spilled session from
+        the spill store when the IP is not in memory.
+        """
+        if (
+            self.session_spill is None
+            or ip_address in self._sessions
+            or ip_address in self._pending_spill
+        ):
+            return self.get_or_create_session(ip_address)
+        
+        try:
+            commands = await self.session_spill.load(ip_address)
+        except Exception as e:
+            logger.warning(f"Failed to load spilled LLM session for {ip_address}: {e}")
+            commands = None
+        
+        # Another request for the same IP may have created it while we awaited
+        if commands and ip_address not in self._sessions:
+            self._sessions.put(ip_address, CommandHistory.from_dict(commands))
+            self.stats["sessions_restored"] += 1
+        return self.get_or_create_session(ip_address)
+    
+    def touch_session(self, ip_address: str, history: CommandHistory) -> None:
+        """
+        Reset a session's idle timer and re-measure it after new commands.
+        
+        If the session was evicted while its LLM call was in flight it is
+        put back, since the attacker is clearly still active.
+        """
+        if not self._sessions.touch(ip_address):
+            self._pending_spill.pop(ip_address, None)
+            self._sessions.put(ip_address, history)
     
     def _build_prompt(self, command: str, history: CommandHistory, session_id: Optional[str] = None) -> str:
         """
@@ -233,7 +424,7 @@ class LLMController:
         context = history.get_context(last_n=5)
         
         # Inject the beacon URL into the system prompt
-        beacon_url = f"http://{HONEYPOT_DOMAIN}/api/beacon/{session_id}" if session_id else "http://internal-api.prod/validate"
+        beacon_url = beacon_url_for(session_id) if session_id else "http://internal-api.prod/validate"
         system_prompt_with_beacon = UBUNTU_SYSTEM_PROMPT.replace("{beacon_url}", beacon_url)
         
         prompt = f"""{system_prompt_with_beacon}
@@ -304,25 +495,28 @@ Generate the terminal output for this command. Remember to be realistic and cons
             }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=headers,
-                    json=payload
-                )
+            # Pooled keep-alive client shared across calls (no per-call handshake)
+            client = http_clients.get_client(self.api_url)
+            response = await client.post(
+                self.api_url,
+                headers=headers,
+                json=payload,
+                timeout=self.timeout,
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                content = self._extract_content(data)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    content = self._extract_content(data)
-                    
-                    self.stats["successful_requests"] += 1
-                    logger.debug(f"{self.provider.value} response generated: {len(content)} chars")
-                    return content
-                else:
-                    logger.error(f"{self.provider.value} API error: {response.status_code} - {response.text}")
-                    self.stats["failed_requests"] += 1
-                    raise Exception(f"API returned status {response.status_code}")
-                    
+                self.stats["successful_requests"] += 1
+                logger.debug(f"{self.provider.value} response generated: {len(content)} chars")
+                return content
+            else:
+                logger.error(f"{self.provider.value} API error: {response.status_code} - {response.text}")
+                self.stats["failed_requests"] += 1
+                raise Exception(f"API returned status {response.status_code}")
+                
+
         except httpx.TimeoutException:
             logger.error(f"{self.provider.value} API timeout")
             self.stats["failed_requests"] += 1
@@ -354,6 +548,42 @@ Generate the terminal output for this command. Remember to be realistic and cons
         """Legacy method - calls call_llm_api."""
         return await self.call_llm_api(prompt, system_prompt)
     
+    async def _call_llm_single_flight(self, prompt: str, system_prompt: str) -> str:
+        """
+        ``call_llm_api`` with concurrent identical prompts coalesced.
+        
+        The first caller starts the upstream request as its own task; any
+        caller with the same prompt that arrives before it finishes awaits
+        that task instead of issuing another request.  The task is shielded,
+        so a cancelled caller does not cancel the call for the others.
+        """
+        key = hashlib.sha256(f"{system_prompt}\x00{prompt}".encode("utf-8")).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.call_llm_api(prompt, system_prompt=system_prompt))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight_done(key, t))
+        else:
+            self.stats["coalesced_requests"] += 1
+        return await asyncio.shield(task)
+    
+    def _inflight_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved; every waiter re-raises it
+    
+    @staticmethod
+    def _personalize(template: str, session_id: str) -> str:
+        """Swap the shared beacon session id for the caller's own."""
+        if SHARED_BEACON_SESSION_ID not in template and _SHARED_TOKEN_ID not in template:
+            return template
+        return (
+            template
+            .replace(SHARED_BEACON_SESSION_ID, session_id)
+            .replace(_SHARED_TOKEN_ID, session_id.replace("-", "")[:24])
+        )
+    
     async def generate_deceptive_response(
         self,
         command: str,
@@ -370,6 +600,11 @@ Generate the terminal output for this command. Remember to be realistic and cons
         3. Calls GLM-5 API for response generation (with honeytoken beacon)
         4. Falls back to static responses if API fails
         
+        Prompts are built with ``SHARED_BEACON_SESSION_ID`` rather than the
+        caller's session id, so identical concurrent requests (a botnet
+        sending the same command from many IPs) share one upstream call and
+        each caller gets its own beacon URL substituted into the text.
+        
         Args:
             command: The shell command entered by the attacker
             history: Command history for context (optional)
@@ -391,36 +626,39 @@ Generate the terminal output for this command. Remember to be realistic and cons
             "ls", "ls -la", "ls -al", "ls -l", "dir"
         ])
         
-        if use_cache and not is_honeytoken_cmd and normalized_cmd in self._cache:
+        cached = self._cache.get(normalized_cmd) if use_cache and not is_honeytoken_cmd else None
+        if cached is not None:
             self.stats["cache_hits"] += 1
-            cached = self._cache[normalized_cmd]
+            response = self._personalize(cached, session_id)
             if history:
-                history.add_command(command, cached)
-            return cached, session_id
+                history.add_command(command, response)
+            return response, session_id
         
-        # Build prompt with beacon URL injected
-        beacon_url = f"http://{HONEYPOT_DOMAIN}/api/beacon/{session_id}"
+        # Build prompt with the shared beacon placeholder injected
+        beacon_url = beacon_url_for(SHARED_BEACON_SESSION_ID)
         system_prompt_with_beacon = UBUNTU_SYSTEM_PROMPT.replace("{beacon_url}", beacon_url)
         
         if history:
-            prompt = self._build_prompt(command, history, session_id)
+            prompt = self._build_prompt(command, history, SHARED_BEACON_SESSION_ID)
         else:
             prompt = f"{system_prompt_with_beacon}\n\nCURRENT COMMAND:\n$ {command}\n\nGenerate the terminal output for this command."
         
         try:
             if settings.USE_LLM_DECEPTION:
-                response = await self.call_llm_api(prompt, system_prompt=system_prompt_with_beacon)
+                template = await self._call_llm_single_flight(prompt, system_prompt_with_beacon)
             else:
-                response = self._static_fallback(command, session_id)
+                template = self._static_fallback(command, SHARED_BEACON_SESSION_ID)
         except Exception as e:
             logger.warning(f"{self.provider.value} failed, using fallback: {e}")
             if settings.FALLBACK_TO_STATIC_DECEPTION:
-                response = self._static_fallback(command, session_id)
+                template = self._static_fallback(command, SHARED_BEACON_SESSION_ID)
             else:
-                response = "Error: Connection refused. Please try again later."
+                template = "Error: Connection refused. Please try again later."
         
         if use_cache and self._is_cacheable(command) and not is_honeytoken_cmd:
-            self._cache[normalized_cmd] = response
+            self._cache.put(normalized_cmd, template)
+        
+        response = self._personalize(template, session_id)
         
         if history:
             history.add_command(command, response)
@@ -453,7 +691,7 @@ Generate the terminal output for this command. Remember to be realistic and cons
             Static deceptive response with embedded honeytokens
         """
         cmd = command.strip().lower()
-        beacon_url = f"http://{HONEYPOT_DOMAIN}/api/beacon/{session_id}" if session_id else "http://internal-api.prod/validate"
+        beacon_url = beacon_url_for(session_id) if session_id else "http://internal-api.prod/validate"
         
         # Common command responses
         responses = {
@@ -547,11 +785,19 @@ STRIPE_SK=sk_test_FAKE{session_id.replace('-','')[:24]}"""
         return f"bash: {command.split()[0]}: command not found"
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get controller statistics."""
+        """Get controller statistics (including store sizes and memory use)."""
+        response_cache = self._cache.get_stats()
+        sessions = self._sessions.get_stats()
         return {
             **self.stats,
             "cache_size": len(self._cache),
-            "active_sessions": len(self._sessions)
+            "active_sessions": len(self._sessions),
+            "pending_spill": len(self._pending_spill),
+            "inflight_requests": len(self._inflight),
+            "spill_enabled": self.session_spill is not None,
+            "memory_bytes": response_cache["bytes"] + sessions["bytes"],
+            "response_cache": response_cache,
+            "sessions": sessions,
         }
     
     def clear_cache(self) -> None:
@@ -560,8 +806,9 @@ STRIPE_SK=sk_test_FAKE{session_id.replace('-','')[:24]}"""
         logger.info("Response cache cleared")
     
     def clear_sessions(self) -> None:
-        """Clear all sessions."""
+        """Clear all sessions (without spilling them)."""
         self._sessions.clear()
+        self._pending_spill.clear()
         logger.info("All sessions cleared")
 
 
@@ -591,13 +838,17 @@ async def generate_deceptive_response(
     Returns:
         Tuple of (deceptive terminal response, session_id)
     """
-    if history is None and ip_address:
-        history = llm_controller.get_or_create_session(ip_address)
+    tracked_ip = ip_address if history is None else None
+    if tracked_ip:
+        history = await llm_controller.get_or_load_session(tracked_ip)
     
     if not session_id:
         session_id = str(uuid.uuid4())
     
-    return await llm_controller.generate_deceptive_response(command, history, session_id=session_id)
+    result = await llm_controller.generate_deceptive_response(command, history, session_id=session_id)
+    if tracked_ip:
+        llm_controller.touch_session(tracked_ip, history)
+    return result
 
 
 def get_session(ip_address: str) -> CommandHistory:
@@ -1,59 +1,43 @@
-from datetime import datetime, timedelta
-from typing import Dict, List
-from collections import defaultdict
+import time
+from typing import Callable, Optional
+from src.utils.state_backend import InProcessStateBackend, StateBackend, state_backend
+
+ATTEMPTS_NAMESPACE = "login_attempts"
 
 class LoginRateLimiter:
-    def __init__(self):
-        # Store login attempts: {ip_address: [timestamp1, timestamp2, ...]}
-        self.login_attempts: Dict[str, List[datetime]] = defaultdict(list)
-        self.max_attempts = 3
-        self.time_window = 20  # seconds
+    def __init__(
+        self,
+        backend: Optional[StateBackend] = None,
+        max_attempts: int = 3,
+        time_window: float = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # Login attempts per IP inside the window; only the newest
+        # max_attempts timestamps matter for the brute-force check.
+        self.backend = backend if backend is not None else InProcessStateBackend(clock=clock)
+        self.max_attempts = max_attempts
+        self.time_window = time_window  # seconds
         
     def record_attempt(self, ip_address: str) -> bool:
         """
         Record a login attempt and check if it's a brute force attack.
         Returns True if brute force detected (3 or more attempts within 20 seconds), False otherwise.
         """
-        current_time = datetime.utcnow()
-        
-        # Get attempts for this IP
-        attempts = self.login_attempts[ip_address]
-        
-        # Remove old attempts outside the time window
-        cutoff_time = current_time - timedelta(seconds=self.time_window)
-        self.login_attempts[ip_address] = [
-            attempt_time for attempt_time in attempts 
-            if attempt_time > cutoff_time
-        ]
-        
-        # Add current attempt
-        self.login_attempts[ip_address].append(current_time)
-        
-        # Check if brute force (3 or more attempts in time_window)
         # This means if this is the 3rd attempt within 20 seconds, it's brute force
-        if len(self.login_attempts[ip_address]) >= self.max_attempts:
-            return True
-        
-        return False
+        count = self.backend.hit(ATTEMPTS_NAMESPACE, ip_address, self.time_window, self.max_attempts)
+        return count >= self.max_attempts
     
     def is_rate_limited(self, ip_address: str) -> bool:
         """
         Check if an IP is currently rate limited.
         """
-        current_time = datetime.utcnow()
-        cutoff_time = current_time - timedelta(seconds=self.time_window)
-        
-        attempts = self.login_attempts.get(ip_address, [])
-        recent_attempts = [t for t in attempts if t > cutoff_time]
-        
-        return len(recent_attempts) >= self.max_attempts
+        return self.backend.count(ATTEMPTS_NAMESPACE, ip_address, self.time_window) >= self.max_attempts
     
     def reset_attempts(self, ip_address: str):
         """
         Reset login attempts for an IP (e.g., after successful login).
         """
-        if ip_address in self.login_attempts:
-            del self.login_attempts[ip_address]
+        self.backend.reset(ATTEMPTS_NAMESPACE, ip_address)
 
 # Global instance
-login_limiter = LoginRateLimiter()
+login_limiter = LoginRateLimiter(backend=state_backend)
@@ -0,0 +1,101 @@
+"""
+Lightweight In-Process Metrics
+==============================
+
+Fixed-bucket histograms used to expose latency and size distributions
+from hot paths (inference batching, caches, pools) without pulling in a
+metrics dependency.  Snapshots are plain dicts so they can be returned
+directly from the status endpoints.
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed, cumulative-style upper bounds.
+
+    Each observation is counted in the first bucket whose upper bound is
+    greater than or equal to the value; values above the last bound land
+    in the implicit ``+Inf`` bucket.
+
+    Example::
+
+        wait_ms = Histogram("queue_wait_ms", [1, 2, 5, 10, 25, 50])
+        wait_ms.observe(3.2)
+        wait_ms.snapshot()["p99"]
+    """
+
+    def __init__(self, name: str, buckets: Sequence[float]):
+        if not buckets:
+            raise ValueError("Histogram requires at least one bucket bound")
+        self.name = name
+        self.bounds: List[float] = sorted(float(b) for b in buckets)
+        self._counts: List[int] = [0] * (len(self.bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        idx = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum += value
+            if self._max is None or value > self._max:
+                self._max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Returns the observed maximum when the quantile falls in the
+        ``+Inf`` bucket, or None if nothing has been observed yet.
+        """
+        with self._lock:
+            if self._count == 0:
+                return None
+            rank = q * self._count
+            running = 0
+            for idx, count in enumerate(self._counts):
+                running += count
+                if running >= rank and count:
+                    if idx < len(self.bounds):
+                        return self.bounds[idx]
+                    return self._max
+            return self._max
+
+    def reset(self) -> None:
+        """Clear all recorded observations."""
+        with self._lock:
+            self._counts = [0] * (len(self.bounds) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._max = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable view of the histogram."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            total_sum = self._sum
+            max_value = self._max
+
+        buckets = {f"le_{bound:g}": count for bound, count in zip(self.bounds, counts)}
+        buckets["le_inf"] = counts[-1]
+
+        return {
+            "name": self.name,
+            "count": total,
+            "sum": round(total_sum, 4),
+            "mean": round(total_sum / total, 4) if total else None,
+            "max": max_value,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
@@ -0,0 +1,144 @@
+"""
+Sliding-Window Rate Tracking
+============================
+
+Shared per-key event counter behind the tarpit and the login brute-force
+limiter.  Each key keeps a deque of event times inside the window: a new
+event is appended and expired ones are popped from the left, so updates
+are O(1) amortized instead of rebuilding a timestamp list per request.
+
+Memory is bounded globally.  Keys are held in least-recently-touched
+order; once ``max_keys`` is reached the oldest key is dropped, and a
+sweep (run opportunistically at most once per ``sweep_interval``, or on
+demand) removes keys with no events left in the window.  A key never
+holds more than ``max_events_per_key`` timestamps — enough for any
+threshold the callers compare against, since the newest events are the
+ones kept.
+"""
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, Iterator
+
+
+class SlidingWindowCounter:
+    """
+    Bounded per-key sliding-window event counts.
+
+    Not thread-safe: intended for use from a single asyncio event loop,
+    like ``LRUTTLCache``.
+
+    Args:
+        window_seconds: Events older than this are no longer counted.
+        max_keys: Hard cap on tracked keys (least recently touched first).
+        max_events_per_key: Timestamps kept per key; counts saturate here.
+        sweep_interval: Minimum seconds between opportunistic idle sweeps.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        max_keys: int = 100_000,
+        max_events_per_key: int = 256,
+        sweep_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be > 0")
+        if max_keys < 1 or max_events_per_key < 1:
+            raise ValueError("max_keys and max_events_per_key must be >= 1")
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self.max_events_per_key = max_events_per_key
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        # key -> event times, oldest first; dict order = least recently touched first
+        self._events: "OrderedDict[Hashable, Deque[float]]" = OrderedDict()
+        self._last_sweep = clock()
+        self.stats: Dict[str, int] = {
+            "events": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "sweeps": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __contains__(self, key: object) -> bool:
+        return self.count(key) > 0  # type: ignore[arg-type]
+
+    def _expire(self, events: Deque[float], now: float) -> None:
+        cutoff = now - self.window_seconds
+        while events and events[0] <= cutoff:
+            events.popleft()
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+    def record(self, key: Hashable) -> int:
+        """Record one event for ``key``; returns the events now in its window."""
+        now = self._clock()
+        self._maybe_sweep(now)
+        events = self._events.get(key)
+        if events is None:
+            while len(self._events) >= self.max_keys:
+                _, oldest = self._events.popitem(last=False)
+                idle = not oldest or oldest[-1] <= now - self.window_seconds
+                self.stats["expirations" if idle else "evictions"] += 1
+            events = self._events[key] = deque(maxlen=self.max_events_per_key)
+        else:
+            self._events.move_to_end(key)
+            self._expire(events, now)
+        events.append(now)
+        self.stats["events"] += 1
+        return len(events)
+
+    def count(self, key: Hashable) -> int:
+        """Events for ``key`` inside the window (does not refresh its position)."""
+        events = self._events.get(key)
+        if events is None:
+            return 0
+        self._expire(events, self._clock())
+        if not events:
+            del self._events[key]
+            self.stats["expirations"] += 1
+            return 0
+        return len(events)
+
+    def reset(self, key: Hashable) -> None:
+        """Forget every event for ``key``."""
+        self._events.pop(key, None)
+
+    def sweep(self, now: float = None) -> int:
+        """Drop keys with no events left in the window; returns how many."""
+        now = self._clock() if now is None else now
+        self._last_sweep = now
+        self.stats["sweeps"] += 1
+        cutoff = now - self.window_seconds
+        # Keys are in last-touched order, so idle ones are all at the front
+        removed = 0
+        while self._events:
+            key, events = next(iter(self._events.items()))
+            if events and events[-1] > cutoff:
+                break
+            del self._events[key]
+            removed += 1
+        self.stats["expirations"] += removed
+        return removed
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def keys(self) -> Iterator[Hashable]:
+        return iter(list(self._events.keys()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "keys": len(self._events),
+            "max_keys": self.max_keys,
+            "window_seconds": self.window_seconds,
+        }
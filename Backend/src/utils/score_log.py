@@ -0,0 +1,389 @@
+"""
+Segmented Threat Score Log
+==========================
+
+Append-only storage for the threat-score hash chain.  Every score change
+is one fixed-size binary record::
+
+    previous_hash (32) | hash (32) | timestamp µs (8) | ip (46) |
+    attack_type (24) | old_score (1) | new_score (1) | is_malicious (1)
+
+with ``hash = SHA-256(previous_hash || body)``, so appending costs one
+``struct.pack`` and one digest instead of a sorted ``json.dumps``.
+Records fill numbered segment files of ``segment_records`` entries; a
+record's position is a fixed offset, so reads page straight from the
+segment that holds them.  Only the newest ``tail_records`` are kept in
+memory, and verification walks one segment at a time.
+
+The directory also holds an atomically replaced ``snapshot.json`` (state
+derived from the first N records, see ``ThreatScoreSystem``) and a
+``LOCK`` file: one process owns a log at a time, so each uvicorn worker
+takes its own ``slot-<n>`` directory via ``open_slot``.
+
+Without a directory the log keeps its segments in memory (tests, tools).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_BODY = struct.Struct("<q46s24sBB?")
+RECORD = struct.Struct("<32s32s" + _BODY.format[1:])
+RECORD_SIZE = RECORD.size
+GENESIS_HASH = bytes(32)
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_SEGMENT_PREFIX = "segment-"
+_SEGMENT_SUFFIX = ".log"
+SNAPSHOT_FILE = "snapshot.json"
+
+
+class ScoreRecord(NamedTuple):
+    previous_hash: bytes
+    hash: bytes
+    timestamp_us: int
+    ip_address: str
+    attack_type: str
+    old_score: int
+    new_score: int
+    is_malicious: bool
+
+    @property
+    def timestamp(self) -> datetime:
+        """Naive UTC, as written by ``datetime.utcnow()``"""
+        return _EPOCH + self.timestamp_us * _MICROSECOND
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The JSON shape served by the score-chain endpoints"""
+        return {
+            "ip_address": self.ip_address,
+            "old_score": self.old_score,
+            "new_score": self.new_score,
+            "attack_type": self.attack_type,
+            "is_malicious": self.is_malicious,
+            "timestamp": self.timestamp.isoformat(),
+            "previous_hash": self.previous_hash.hex(),
+            "hash": self.hash.hex(),
+        }
+
+
+def _decode(raw: bytes, offset: int = 0) -> ScoreRecord:
+    prev, digest, ts, ip, attack, old, new, malicious = RECORD.unpack_from(raw, offset)
+    return ScoreRecord(
+        prev, digest, ts,
+        ip.rstrip(b"\0").decode("utf-8", "replace"),
+        attack.rstrip(b"\0").decode("utf-8", "replace"),
+        old, new, malicious,
+    )
+
+
+def iter_score_records(raw: bytes) -> Iterator[ScoreRecord]:
+    """Decode a run of raw records (e.g. a chunk from ``iter_raw``)"""
+    for offset in range(0, len(raw), RECORD_SIZE):
+        yield _decode(raw, offset)
+
+
+def _record_digest(raw: bytes, offset: int = 0) -> bytes:
+    """SHA-256(previous_hash || body) of the record at ``offset``"""
+    h = hashlib.sha256(raw[offset:offset + 32])
+    h.update(raw[offset + 64:offset + RECORD_SIZE])
+    return h.digest()
+
+
+class ScoreChainLog:
+    """
+    Append-only, segmented score-change log.
+
+    Not thread-safe: appends come from the event loop.
+
+    Args:
+        directory: Segment directory, or None to keep segments in memory.
+        segment_records: Records per segment file.
+        tail_records: Newest records also held in memory.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        segment_records: int = settings.THREAT_SCORE_SEGMENT_RECORDS,
+        tail_records: int = settings.THREAT_SCORE_TAIL_RECORDS,
+    ):
+        if segment_records < 1:
+            raise ValueError("segment_records must be >= 1")
+        self.directory = directory
+        self.segment_records = segment_records
+        self._segments: List[bytearray] = []          # in-memory mode only
+        self._tail: Deque[bytes] = deque(maxlen=max(tail_records, 1))
+        self._length = 0
+        self._head = GENESIS_HASH
+        self._writer = None
+        self._writer_segment = -1
+        self._lock_file = None
+        # Last sealed (full) segment read from disk: (number, bytes)
+        self._read_cache = (-1, b"")
+        if directory is not None:
+            self._open()
+
+    @classmethod
+    def open_slot(cls, base_dir: str, max_slots: int = 64, **kwargs) -> "ScoreChainLog":
+        """Open the first ``base_dir/slot-<n>`` log not held by another process"""
+        for slot in range(max_slots):
+            try:
+                return cls(os.path.join(base_dir, f"slot-{slot}"), **kwargs)
+            except BlockingIOError:
+                continue
+        raise RuntimeError(f"All {max_slots} score log slots under {base_dir} are in use")
+
+    # ------------------------------------------------------------------
+    # Opening
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{_SEGMENT_PREFIX}{segment:08d}{_SEGMENT_SUFFIX}")
+
+    def _open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(os.path.join(self.directory, "LOCK"), "a+b")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                raise BlockingIOError(f"{self.directory} is in use by another process")
+        self._lock_file = lock_file
+        try:
+            self._scan_segments()
+        except BaseException:
+            self.close()
+            raise
+
+    def _scan_segments(self) -> None:
+        segments = sorted(
+            int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)
+        )
+        if segments != list(range(len(segments))):
+            raise ValueError(f"Score log segments in {self.directory} are not contiguous: {segments}")
+        full_size = self.segment_records * RECORD_SIZE
+        for segment in segments[:-1]:
+            if os.path.getsize(self._segment_path(segment)) != full_size:
+                raise ValueError(f"Score log segment {segment} in {self.directory} is incomplete")
+        if segments:
+            last = self._segment_path(segments[-1])
+            size = os.path.getsize(last)
+            if size % RECORD_SIZE:
+                # Torn final write: drop the partial record
+                logger.warning(f"Truncating partial record at the end of {last}")
+                size -= size % RECORD_SIZE
+                os.truncate(last, size)
+            self._length = (len(segments) - 1) * self.segment_records + size // RECORD_SIZE
+
+        if self._length:
+            raw = b"".join(self.iter_raw(max(0, self._length - self._tail.maxlen)))
+            self._tail.extend(raw[i:i + RECORD_SIZE] for i in range(0, len(raw), RECORD_SIZE))
+            self._head = RECORD.unpack_from(self._tail[-1])[1]
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(
+        self,
+        ip_address: str,
+        attack_type: str,
+        old_score: int,
+        new_score: int,
+        is_malicious: bool,
+        timestamp: datetime,
+    ) -> str:
+        """Append one record; returns its hash (hex).  Long text is truncated."""
+        body = _BODY.pack(
+            (timestamp - _EPOCH) // _MICROSECOND,
+            ip_address.encode("utf-8")[:46],
+            attack_type.encode("utf-8")[:24],
+            old_score, new_score, is_malicious,
+        )
+        digest = hashlib.sha256(self._head + body).digest()
+        raw = self._head + digest + body
+
+        segment = self._length // self.segment_records
+        if self.directory is None:
+            if segment == len(self._segments):
+                self._segments.append(bytearray())
+            self._segments[segment] += raw
+        else:
+            if segment != self._writer_segment:
+                if self._writer is not None:
+                    self._writer.close()
+                self._writer = open(self._segment_path(segment), "ab")
+                self._writer_segment = segment
+            self._writer.write(raw)
+            self._writer.flush()
+
+        self._tail.append(raw)
+        self._length += 1
+        self._head = digest
+        return digest.hex()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._writer_segment = -1
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def head_hash(self) -> Optional[str]:
+        return self._head.hex() if self._length else None
+
+    def _read_range(self, start: int, end: int, use_tail: bool = True) -> bytes:
+        """Raw records [start, end), which must lie in one segment"""
+        tail_start = self._length - len(self._tail)
+        if use_tail and start >= tail_start and end <= self._length and self._tail:
+            return b"".join(self._tail[i - tail_start] for i in range(start, end))
+
+        segment, first = divmod(start, self.segment_records)
+        count = end - start
+        if self.directory is None:
+            return bytes(self._segments[segment][first * RECORD_SIZE:(first + count) * RECORD_SIZE])
+
+        sealed = segment < self._length // self.segment_records
+        if sealed:
+            if self._read_cache[0] != segment:
+                with open(self._segment_path(segment), "rb") as f:
+                    self._read_cache = (segment, f.read())
+            data = self._read_cache[1]
+            return data[first * RECORD_SIZE:(first + count) * RECORD_SIZE]
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(first * RECORD_SIZE)
+            return f.read(count * RECORD_SIZE)
+
+    def iter_raw(self, start: int = 0, end: Optional[int] = None, use_tail: bool = True) -> Iterator[bytes]:
+        """
+        Raw bytes of records [start, end), one segment-sized chunk at a time.
+
+        With ``use_tail=False`` everything is read from the segments
+        (files, or buffers for in-memory logs), whose bytes before ``end``
+        never change, so a worker thread can iterate while appends go on.
+        """
+        end = self._length if end is None else min(end, self._length)
+        position = max(start, 0)
+        while position < end:
+            chunk_end = min(end, (position // self.segment_records + 1) * self.segment_records)
+            yield self._read_range(position, chunk_end, use_tail)
+            position = chunk_end
+
+    def iter_records(self, start: int = 0, end: Optional[int] = None, use_tail: bool = True) -> Iterator[ScoreRecord]:
+        for raw in self.iter_raw(start, end, use_tail):
+            yield from iter_score_records(raw)
+
+    def records_for_ip(self, ip_address: str, skip: int, limit: int, end: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        (total, page) of the records in [0, end) for one IP, page being
+        matches [skip, skip + limit).  Reads the segments only, so it is
+        safe to run via ``asyncio.to_thread``.
+        """
+        total, page = 0, []
+        for record in self.iter_records(0, end, use_tail=False):
+            if record.ip_address == ip_address:
+                if skip <= total < skip + limit:
+                    page.append(record.to_dict())
+                total += 1
+        return total, page
+
+    def record(self, index: int) -> ScoreRecord:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("score log index out of range")
+        return _decode(self._read_range(index, index + 1))
+
+    def hash_at(self, index: int) -> str:
+        return self.record(index).hash.hex()
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._length)
+            if step != 1:
+                raise ValueError("score log slices must be contiguous")
+            return [r.to_dict() for r in self.iter_records(start, stop)]
+        return self.record(item).to_dict()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (r.to_dict() for r in self.iter_records())
+
+    # ------------------------------------------------------------------
+    # Verification
+    # ------------------------------------------------------------------
+
+    def verify_range(self, start: int, end: int) -> Optional[int]:
+        """
+        Re-hash records [start, end) segment by segment; index of the
+        first record whose link or hash is wrong, or None.
+        """
+        start = max(start, 0)
+        prev = self.record(start - 1).hash if start > 0 else None
+        index = start
+        for raw in self.iter_raw(start, end):
+            for offset in range(0, len(raw), RECORD_SIZE):
+                previous_hash = raw[offset:offset + 32]
+                if prev is not None and previous_hash != prev:
+                    return index
+                digest = raw[offset + 32:offset + 64]
+                if digest != _record_digest(raw, offset):
+                    return index
+                prev = digest
+                index += 1
+        return None
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def save_snapshot(self, state: Dict[str, Any]) -> None:
+        """Atomically replace the snapshot (no-op for in-memory logs)"""
+        if self.directory is None:
+            return
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def load_snapshot(self) -> Optional[Dict[str, Any]]:
+        if self.directory is None:
+            return None
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable score snapshot {path}: {e}")
+            return None
@@ -0,0 +1,548 @@
+"""
+Rate-Limit / Reputation State Backends
+======================================
+
+Storage behind ``tarpit_manager``, ``login_limiter`` and the threat
+scores.  With several uvicorn workers an in-process singleton only sees
+its share of an attacker's requests, so thresholds are reached late or
+never; pointing every worker at one shared backend restores the single
+process behaviour.
+
+Two implementations share the ``StateBackend`` protocol:
+
+* ``InProcessStateBackend`` — per-worker dicts and sliding-window
+  counters (the default, zero overhead).
+* ``SharedStateBackend`` — one SQLite database that every worker on the
+  host opens (by default on ``/dev/shm``, i.e. a memory-backed file that
+  SQLite memory-maps).  Each operation is a single ``BEGIN IMMEDIATE``
+  transaction, so read-modify-write updates such as score penalties are
+  atomic across processes.  Every value write bumps a per-namespace
+  version, so readers can fetch only what changed (``changes``).  If the
+  database stays locked past ``STATE_BACKEND_BUSY_TIMEOUT`` (or is
+  otherwise unusable) an operation fails open to a per-worker in-process
+  backend instead of failing the request.
+
+Select one with ``STATE_BACKEND=memory|shared`` (``STATE_BACKEND_PATH``
+for the shared file).  Attacker session state (``session_tracker``,
+``_session_store``) stays per worker: it is keyed by session id and only
+ever touched by the worker serving that session.
+"""
+
+import functools
+import logging
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Protocol, Tuple
+
+from src.core.config import settings
+from src.utils.rate_tracking import SlidingWindowCounter
+
+logger = logging.getLogger(__name__)
+
+
+class StateBackend(Protocol):
+    """Namespaced sliding-window counters and numeric values."""
+
+    shared: bool
+
+    def hit(self, namespace: str, key: str, window_seconds: float, max_events: int) -> int:
+        """Record one event for ``key``; returns the events in its window."""
+        ...
+
+    def count(self, namespace: str, key: str, window_seconds: float) -> int:
+        ...
+
+    def reset(self, namespace: str, key: str) -> None:
+        """Forget the events for ``key``."""
+        ...
+
+    def active_keys(self, namespace: str) -> int:
+        ...
+
+    def sweep(self, namespace: str, window_seconds: float) -> int:
+        """Drop keys with no events left in the window; returns how many."""
+        ...
+
+    def get_value(self, namespace: str, key: str, default: Optional[float] = None) -> Optional[float]:
+        ...
+
+    def set_value(self, namespace: str, key: str, value: float) -> None:
+        ...
+
+    def delete_value(self, namespace: str, key: str) -> None:
+        ...
+
+    def adjust_value(
+        self, namespace: str, key: str, delta: float, default: float, lo: float, hi: float
+    ) -> Tuple[float, float]:
+        """Atomically add ``delta`` (clamped to [lo, hi]); returns (old, new)."""
+        ...
+
+    def update_value(
+        self, namespace: str, key: str, update: Callable[[Optional[float]], Optional[float]]
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """Atomically replace the value with ``update(old)`` (None = absent / delete); returns (old, new)."""
+        ...
+
+    def values(self, namespace: str) -> Dict[str, float]:
+        ...
+
+    def changes(self, namespace: str, since: int) -> Tuple[int, Optional[Dict[str, Optional[float]]]]:
+        """
+        (version, {key: value, None if deleted}) for writes after version
+        ``since``.  The dict is None when the changes are not available
+        (first read, history pruned) and the caller must reload ``values``.
+        """
+        ...
+
+    def delete_values_below(self, namespace: str, threshold: float) -> int:
+        """Drop values < ``threshold`` (e.g. lapsed expiry times); returns how many."""
+        ...
+
+    def get_stats(self) -> Dict[str, Any]:
+        ...
+
+
+class InProcessStateBackend:
+    """Per-worker state: one ``SlidingWindowCounter`` per namespace plus dicts."""
+
+    shared = False
+
+    def __init__(
+        self,
+        max_keys: int = settings.RATE_TRACKING_MAX_KEYS,
+        sweep_interval: float = settings.RATE_TRACKING_SWEEP_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._windows: Dict[str, SlidingWindowCounter] = {}
+        self._values: Dict[str, Dict[str, float]] = defaultdict(dict)
+
+    def _window(self, namespace: str, window_seconds: float, max_events: int) -> SlidingWindowCounter:
+        counter = self._windows.get(namespace)
+        if counter is None:
+            counter = self._windows[namespace] = SlidingWindowCounter(
+                window_seconds,
+                max_keys=self.max_keys,
+                max_events_per_key=max_events,
+                sweep_interval=self.sweep_interval,
+                clock=self._clock,
+            )
+        return counter
+
+    def hit(self, namespace: str, key: str, window_seconds: float, max_events: int) -> int:
+        return self._window(namespace, window_seconds, max_events).record(key)
+
+    def count(self, namespace: str, key: str, window_seconds: float) -> int:
+        counter = self._windows.get(namespace)
+        return counter.count(key) if counter is not None else 0
+
+    def reset(self, namespace: str, key: str) -> None:
+        counter = self._windows.get(namespace)
+        if counter is not None:
+            counter.reset(key)
+
+    def active_keys(self, namespace: str) -> int:
+        counter = self._windows.get(namespace)
+        return len(counter) if counter is not None else 0
+
+    def sweep(self, namespace: str, window_seconds: float) -> int:
+        counter = self._windows.get(namespace)
+        return counter.sweep() if counter is not None else 0
+
+    def get_value(self, namespace: str, key: str, default: Optional[float] = None) -> Optional[float]:
+        return self._values[namespace].get(key, default)
+
+    def set_value(self, namespace: str, key: str, value: float) -> None:
+        self._values[namespace][key] = value
+
+    def delete_value(self, namespace: str, key: str) -> None:
+        self._values[namespace].pop(key, None)
+
+    def adjust_value(
+        self, namespace: str, key: str, delta: float, default: float, lo: float, hi: float
+    ) -> Tuple[float, float]:
+        values = self._values[namespace]
+        old = values.get(key, default)
+        new = values[key] = min(hi, max(lo, old + delta))
+        return old, new
+
+    def update_value(
+        self, namespace: str, key: str, update: Callable[[Optional[float]], Optional[float]]
+    ) -> Tuple[Optional[float], Optional[float]]:
+        values = self._values[namespace]
+        old = values.get(key)
+        new = update(old)
+        if new is None:
+            values.pop(key, None)
+        else:
+            values[key] = new
+        return old, new
+
+    def values(self, namespace: str) -> Dict[str, float]:
+        return dict(self._values[namespace])
+
+    def changes(self, namespace: str, since: int) -> Tuple[int, Optional[Dict[str, Optional[float]]]]:
+        # No change history: the values are local, nothing to catch up on
+        return 0, None
+
+    def delete_values_below(self, namespace: str, threshold: float) -> int:
+        values = self._values[namespace]
+        lapsed = [k for k, v in values.items() if v < threshold]
+        for key in lapsed:
+            del values[key]
+        return len(lapsed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "windows": {ns: c.get_stats() for ns, c in self._windows.items()},
+            "values": {ns: len(v) for ns, v in self._values.items()},
+        }
+
+
+def _fails_open(method):
+    """Run the in-process fallback's method of the same name if SQLite fails."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except sqlite3.OperationalError as e:
+            self._fell_back(method.__name__, e)
+            return getattr(self._fallback, method.__name__)(*args, **kwargs)
+    return wrapper
+
+
+class SharedStateBackend:
+    """
+    Host-wide state in a SQLite file shared by every worker process.
+
+    Connections are opened lazily and re-opened after a fork.  Event
+    times come from the wall clock so all processes agree on windows.
+    Like ``SlidingWindowCounter``, ``hit`` sweeps its namespace at most
+    once per ``sweep_interval`` (per process).
+
+    Operations run on the caller's thread (the event loop), so the busy
+    timeout is kept short; a locked or broken database raises
+    ``sqlite3.OperationalError``, which is logged (at most once per
+    ``FALLBACK_LOG_INTERVAL``) and answered from a per-worker
+    ``InProcessStateBackend`` — rate limits fail open to local counts
+    rather than turning into 500s.
+
+    Args:
+        path: Database file (``/dev/shm/...`` keeps it in memory).
+        max_keys: Per-namespace key cap enforced by ``sweep``.
+        sweep_interval: Minimum seconds between opportunistic sweeps.
+        clock: Wall-clock time source (injectable for tests).
+        busy_timeout: Seconds to wait for another worker's transaction.
+    """
+
+    shared = True
+
+    FALLBACK_LOG_INTERVAL = 60.0
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS rate_events ("
+        " ns TEXT NOT NULL, key TEXT NOT NULL, ts REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_rate_events_key ON rate_events (ns, key, ts)",
+        "CREATE INDEX IF NOT EXISTS ix_rate_events_ts ON rate_events (ns, ts)",
+        "CREATE TABLE IF NOT EXISTS state_values ("
+        " ns TEXT NOT NULL, key TEXT NOT NULL, value REAL NOT NULL,"
+        " PRIMARY KEY (ns, key)) WITHOUT ROWID",
+        # Per-namespace write version; changes at or below ``pruned`` may
+        # have lost their deletion markers
+        "CREATE TABLE IF NOT EXISTS state_versions ("
+        " ns TEXT PRIMARY KEY, version INTEGER NOT NULL, pruned INTEGER NOT NULL)",
+        # Version of the last write per key (a marker once the value is gone)
+        "CREATE TABLE IF NOT EXISTS state_changes ("
+        " ns TEXT NOT NULL, key TEXT NOT NULL, version INTEGER NOT NULL,"
+        " PRIMARY KEY (ns, key)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS ix_state_changes_version ON state_changes (ns, version)",
+    )
+
+    def __init__(
+        self,
+        path: str = settings.STATE_BACKEND_PATH,
+        max_keys: int = settings.RATE_TRACKING_MAX_KEYS,
+        sweep_interval: float = settings.RATE_TRACKING_SWEEP_INTERVAL,
+        clock: Callable[[], float] = time.time,
+        busy_timeout: float = settings.STATE_BACKEND_BUSY_TIMEOUT,
+    ):
+        self.path = path
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._last_sweep: Dict[str, float] = {}
+        self._clock = clock
+        self.busy_timeout = busy_timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._fallback = InProcessStateBackend(max_keys=max_keys, sweep_interval=sweep_interval)
+        self._last_fallback_log = -self.FALLBACK_LOG_INTERVAL
+        self.fallbacks = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA mmap_size=67108864")
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _fell_back(self, operation: str, error: sqlite3.OperationalError) -> None:
+        self.fallbacks += 1
+        now = time.monotonic()
+        if now - self._last_fallback_log >= self.FALLBACK_LOG_INTERVAL:
+            self._last_fallback_log = now
+            logger.warning(
+                f"Shared state {self.path} unavailable for {operation} ({error}); "
+                f"using per-worker state ({self.fallbacks} fallbacks so far)"
+            )
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection, namespace: str) -> int:
+        conn.execute(
+            "INSERT INTO state_versions (ns, version, pruned) VALUES (?, 1, 0)"
+            " ON CONFLICT (ns) DO UPDATE SET version = version + 1",
+            (namespace,),
+        )
+        return conn.execute("SELECT version FROM state_versions WHERE ns = ?", (namespace,)).fetchone()[0]
+
+    def _changed(self, conn: sqlite3.Connection, namespace: str, key: str) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO state_changes (ns, key, version) VALUES (?, ?, ?)",
+            (namespace, key, self._bump_version(conn, namespace)),
+        )
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    @_fails_open
+    def hit(self, namespace: str, key: str, window_seconds: float, max_events: int) -> int:
+        now = self._clock()
+        if now - self._last_sweep.setdefault(namespace, now) >= self.sweep_interval:
+            self.sweep(namespace, window_seconds)
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM rate_events WHERE ns = ? AND key = ? AND ts <= ?",
+                (namespace, key, now - window_seconds),
+            )
+            conn.execute("INSERT INTO rate_events (ns, key, ts) VALUES (?, ?, ?)", (namespace, key, now))
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM rate_events WHERE ns = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if count > max_events:
+                conn.execute(
+                    "DELETE FROM rate_events WHERE rowid IN ("
+                    " SELECT rowid FROM rate_events WHERE ns = ? AND key = ? ORDER BY ts LIMIT ?)",
+                    (namespace, key, count - max_events),
+                )
+                count = max_events
+        return count
+
+    @_fails_open
+    def count(self, namespace: str, key: str, window_seconds: float) -> int:
+        (count,) = self._connection().execute(
+            "SELECT COUNT(*) FROM rate_events WHERE ns = ? AND key = ? AND ts > ?",
+            (namespace, key, self._clock() - window_seconds),
+        ).fetchone()
+        return count
+
+    @_fails_open
+    def reset(self, namespace: str, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM rate_events WHERE ns = ? AND key = ?", (namespace, key))
+
+    @_fails_open
+    def active_keys(self, namespace: str) -> int:
+        (count,) = self._connection().execute(
+            "SELECT COUNT(DISTINCT key) FROM rate_events WHERE ns = ?", (namespace,)
+        ).fetchone()
+        return count
+
+    @_fails_open
+    def sweep(self, namespace: str, window_seconds: float) -> int:
+        self._last_sweep[namespace] = self._clock()
+        with self._transaction() as conn:
+            before = conn.execute(
+                "SELECT COUNT(DISTINCT key) FROM rate_events WHERE ns = ?", (namespace,)
+            ).fetchone()[0]
+            conn.execute(
+                "DELETE FROM rate_events WHERE ns = ? AND ts <= ?",
+                (namespace, self._clock() - window_seconds),
+            )
+            # Key cap: drop the keys whose newest event is oldest
+            conn.execute(
+                "DELETE FROM rate_events WHERE ns = ? AND key IN ("
+                " SELECT key FROM rate_events WHERE ns = ? GROUP BY key"
+                " ORDER BY MAX(ts) DESC LIMIT -1 OFFSET ?)",
+                (namespace, namespace, self.max_keys),
+            )
+            after = conn.execute(
+                "SELECT COUNT(DISTINCT key) FROM rate_events WHERE ns = ?", (namespace,)
+            ).fetchone()[0]
+        return before - after
+
+    @_fails_open
+    def get_value(self, namespace: str, key: str, default: Optional[float] = None) -> Optional[float]:
+        row = self._connection().execute(
+            "SELECT value FROM state_values WHERE ns = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return row[0] if row else default
+
+    @_fails_open
+    def set_value(self, namespace: str, key: str, value: float) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO state_values (ns, key, value) VALUES (?, ?, ?)",
+                (namespace, key, value),
+            )
+            self._changed(conn, namespace, key)
+
+    @_fails_open
+    def delete_value(self, namespace: str, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM state_values WHERE ns = ? AND key = ?", (namespace, key))
+            self._changed(conn, namespace, key)
+
+    @_fails_open
+    def adjust_value(
+        self, namespace: str, key: str, delta: float, default: float, lo: float, hi: float
+    ) -> Tuple[float, float]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT value FROM state_values WHERE ns = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            old = row[0] if row else default
+            new = min(hi, max(lo, old + delta))
+            conn.execute(
+                "INSERT OR REPLACE INTO state_values (ns, key, value) VALUES (?, ?, ?)",
+                (namespace, key, new),
+            )
+            self._changed(conn, namespace, key)
+        return old, new
+
+    @_fails_open
+    def update_value(
+        self, namespace: str, key: str, update: Callable[[Optional[float]], Optional[float]]
+    ) -> Tuple[Optional[float], Optional[float]]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT value FROM state_values WHERE ns = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            old = row[0] if row else None
+            new = update(old)
+            if new is None:
+                conn.execute("DELETE FROM state_values WHERE ns = ? AND key = ?", (namespace, key))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO state_values (ns, key, value) VALUES (?, ?, ?)",
+                    (namespace, key, new),
+                )
+            if new != old:
+                self._changed(conn, namespace, key)
+        return old, new
+
+    @_fails_open
+    def values(self, namespace: str) -> Dict[str, float]:
+        return dict(self._connection().execute(
+            "SELECT key, value FROM state_values WHERE ns = ?", (namespace,)
+        ).fetchall())
+
+    def changes(self, namespace: str, since: int) -> Tuple[int, Optional[Dict[str, Optional[float]]]]:
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN")  # one read snapshot for version and changes
+            try:
+                row = conn.execute(
+                    "SELECT version, pruned FROM state_versions WHERE ns = ?", (namespace,)
+                ).fetchone()
+                version, pruned = row if row else (0, 0)
+                # since > version: the file was recreated under us
+                if since <= 0 or since < pruned or since > version:
+                    return version, None
+                return version, dict(conn.execute(
+                    "SELECT c.key, v.value FROM state_changes c"
+                    " LEFT JOIN state_values v ON v.ns = c.ns AND v.key = c.key"
+                    " WHERE c.ns = ? AND c.version > ?",
+                    (namespace, since),
+                ).fetchall())
+            finally:
+                conn.execute("COMMIT")
+        except sqlite3.OperationalError as e:
+            # Nothing new rather than a reload from the (empty) fallback
+            self._fell_back("changes", e)
+            return since, {}
+
+    @_fails_open
+    def delete_values_below(self, namespace: str, threshold: float) -> int:
+        with self._transaction() as conn:
+            version = self._bump_version(conn, namespace)
+            conn.execute(
+                "INSERT OR REPLACE INTO state_changes (ns, key, version)"
+                " SELECT ns, key, ? FROM state_values WHERE ns = ? AND value < ?",
+                (version, namespace, threshold),
+            )
+            deleted = conn.execute(
+                "DELETE FROM state_values WHERE ns = ? AND value < ?", (namespace, threshold)
+            ).rowcount
+            # Keep deletion markers for the last max_keys versions; readers
+            # further behind than that reload everything
+            horizon = version - self.max_keys
+            if horizon > 0:
+                conn.execute(
+                    "DELETE FROM state_changes WHERE ns = ? AND version <= ? AND key NOT IN"
+                    " (SELECT key FROM state_values WHERE ns = ?)",
+                    (namespace, horizon, namespace),
+                )
+                conn.execute(
+                    "UPDATE state_versions SET pruned = MAX(pruned, ?) WHERE ns = ?", (horizon, namespace)
+                )
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {"backend": "shared", "path": self.path, "fallbacks": self.fallbacks}
+        try:
+            conn = self._connection()
+            stats["events"] = conn.execute("SELECT COUNT(*) FROM rate_events").fetchone()[0]
+            stats["values"] = conn.execute("SELECT COUNT(*) FROM state_values").fetchone()[0]
+        except sqlite3.OperationalError as e:
+            stats["error"] = str(e)
+        return stats
+
+
+def create_state_backend(kind: Optional[str] = None) -> StateBackend:
+    """Backend selected by ``STATE_BACKEND`` (``memory`` or ``shared``)."""
+    kind = (kind or settings.STATE_BACKEND).lower()
+    if kind == "memory":
+        return InProcessStateBackend()
+    if kind == "shared":
+        return SharedStateBackend()
+    raise ValueError(f"Unknown STATE_BACKEND {kind!r} (expected 'memory' or 'shared')")
+
+
+# Global instance shared by the tarpit, login limiter and threat scores
+state_backend = create_state_backend()
@@ -1,35 +1,49 @@
 import time
 import random
-from typing import Tuple, Dict, List
+from typing import Any, Callable, Optional, Tuple, Dict
 from src.core.config import settings
-from datetime import datetime, timedelta
+from src.utils.state_backend import InProcessStateBackend, StateBackend, state_backend
+
+# Requests beyond this many in the window all hit the delay cap, so the
+# window never needs to hold more timestamps than that per IP.
+_MAX_COUNTED_REQUESTS = settings.TARPIT_THRESHOLD + int(
+    (settings.TARPIT_DELAY_MAX - settings.TARPIT_DELAY_MIN) / 0.5
+) + 2
+
+REQUESTS_NAMESPACE = "tarpit"
+BLOCKS_NAMESPACE = "tarpit_blocks"
 
 class TarpitManager:
-    def __init__(self):
-        self.request_timestamps: Dict[str, List[float]] = {}
-        self.blocked_ips: Dict[str, datetime] = {}
-
-    def clean_old_requests(self, ip: str):
-        current_time = time.time()
-        if ip in self.request_timestamps:
-            # Keep only requests from the last 60 seconds
-            self.request_timestamps[ip] = [
-                ts for ts in self.request_timestamps[ip] 
-                if current_time - ts <= 60
-            ]
-            if not self.request_timestamps[ip]:
-                del self.request_timestamps[ip]
+    def __init__(
+        self,
+        backend: Optional[StateBackend] = None,
+        window_seconds: float = 60,
+        sweep_interval: float = settings.RATE_TRACKING_SWEEP_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # Request counts and block expiries (wall-clock epoch seconds)
+        self.backend = backend if backend is not None else InProcessStateBackend(clock=clock)
+        self.window_seconds = window_seconds
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._last_sweep = clock()
+
+    def _maybe_sweep(self) -> None:
+        """Drop idle IPs and expired blocks at most once per sweep interval."""
+        if self._clock() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Forget idle IPs and lapsed blocks; returns how many entries were removed."""
+        self._last_sweep = self._clock()
+        return (
+            self.backend.sweep(REQUESTS_NAMESPACE, self.window_seconds)
+            + self.backend.delete_values_below(BLOCKS_NAMESPACE, time.time())
+        )
 
     def record_request(self, ip: str) -> Tuple[bool, float]:
-        self.clean_old_requests(ip)
-        
-        current_time = time.time()
-        if ip not in self.request_timestamps:
-            self.request_timestamps[ip] = []
-        
-        self.request_timestamps[ip].append(current_time)
-        
-        count = len(self.request_timestamps[ip])
+        self._maybe_sweep()
+        count = self.backend.hit(REQUESTS_NAMESPACE, ip, self.window_seconds, _MAX_COUNTED_REQUESTS)
         
         if count > settings.TARPIT_THRESHOLD:
             excess_requests = count - settings.TARPIT_THRESHOLD
@@ -48,16 +62,23 @@ class TarpitManager:
         return False, 0.0
 
     def is_blocked(self, ip: str) -> bool:
-        if ip in self.blocked_ips:
-            expiry = self.blocked_ips[ip]
-            if datetime.utcnow() > expiry:
-                del self.blocked_ips[ip]
-                return False
-            return True
-        return False
+        expiry = self.backend.get_value(BLOCKS_NAMESPACE, ip)
+        if expiry is None:
+            return False
+        if time.time() > expiry:
+            self.backend.delete_value(BLOCKS_NAMESPACE, ip)
+            return False
+        return True
 
     def block_ip(self, ip: str, duration_minutes: int):
-        expiry = datetime.utcnow() + timedelta(minutes=duration_minutes)
-        self.blocked_ips[ip] = expiry
+        self.backend.set_value(BLOCKS_NAMESPACE, ip, time.time() + duration_minutes * 60)
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._maybe_sweep()
+        return {
+            "active_ips": self.backend.active_keys(REQUESTS_NAMESPACE),
+            "blocked_ips": len(self.backend.values(BLOCKS_NAMESPACE)),
+            "backend": "shared" if self.backend.shared else "memory",
+        }
 
-tarpit_manager = TarpitManager()
+tarpit_manager = TarpitManager(backend=state_backend)
@@ -1,21 +1,262 @@
 """
 Threat Score System - Blockchain-based IP Reputation Tracking
 Assigns reputation scores to IPs based on attack patterns
+
+Score changes are chained in a segmented on-disk log (score_log); the
+in-memory state (scores, per-IP counters and history) is derived from
+it and periodically snapshotted, so a restart replays only the records
+after the last snapshot.
+
+Scores recover over time: an IP's deficit (100 - score) halves every
+THREAT_SCORE_HALF_LIFE_HOURS without new attacks.  Rather than a
+(score, last_update) pair, each IP stores the single decay key
+``ln(deficit) + rate * t``; its deficit at any later time is
+``exp(key - rate * now)``.  Scores are therefore decayed lazily on
+read, and since the key order never changes with time, flagged / top-k
+queries and the sweep of recovered IPs are range scans of one sorted
+index.
 """
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from collections import defaultdict
-import hashlib
-import json
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from collections import Counter, deque
+from collections.abc import Mapping
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import threading
 
-class ThreatScoreSystem:
+from src.core.config import settings
+from src.utils.integrity import MerkleAccumulator
+from src.utils.score_log import ScoreChainLog
+from src.utils.state_backend import StateBackend, state_backend
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:  # pragma: no cover - bisect fallback, O(n) inserts
+    class SortedList(list):
+        def add(self, value) -> None:
+            bisect.insort(self, value)
+        
+        def remove(self, value) -> None:
+            del self[bisect.bisect_left(self, value)]
+        
+        def bisect_left(self, value) -> int:
+            return bisect.bisect_left(self, value)
+
+logger = logging.getLogger(__name__)
+
+SCORES_NAMESPACE = "threat_scores"
+
+# Width of the recent-activity window, in hourly ring buckets
+RECENT_WINDOW_HOURS = 24
+_EPOCH = datetime(1970, 1, 1)
+
+
+# Deficit below which an IP rounds to a clean score of 100
+_RECOVERED_DEFICIT = 0.5
+
+
+def _hour_of(timestamp: datetime) -> int:
+    return (timestamp - _EPOCH) // timedelta(hours=1)
+
+
+class DecayIndex:
+    """
+    IPs ordered by decay key (see ThreatScoreSystem).
+    
+    Keys don't change as time passes, only the threshold they are
+    compared against does, so one sorted list answers "lowest scores
+    first", "how many below X" and "who has fully recovered" without
+    rescoring anything.
+    """
+    
+    def __init__(self):
+        self._sorted = SortedList()
+        self._keys: Dict[str, float] = {}
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def __contains__(self, ip_address: object) -> bool:
+        return ip_address in self._keys
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+    
+    def get(self, ip_address: str) -> Optional[float]:
+        return self._keys.get(ip_address)
+    
+    def items(self):
+        return self._keys.items()
+    
+    def update(self, ip_address: str, key: Optional[float]) -> None:
+        """Set the key for an IP; ``None`` removes it"""
+        old = self._keys.get(ip_address)
+        if old == key:
+            return
+        if old is not None:
+            self._sorted.remove((old, ip_address))
+        if key is None:
+            del self._keys[ip_address]
+        else:
+            self._sorted.add((key, ip_address))
+            self._keys[ip_address] = key
+    
+    def remove(self, ip_address: str) -> None:
+        self.update(ip_address, None)
+    
+    def highest(self, min_key: float, limit: Optional[int] = None) -> Iterator[Tuple[str, float]]:
+        """(ip, key) pairs with key >= ``min_key``, highest first, at most ``limit``"""
+        for n, (key, ip_address) in enumerate(reversed(self._sorted)):
+            if key < min_key or (limit is not None and n >= limit):
+                return
+            yield ip_address, key
+    
+    def count_at_least(self, min_key: float) -> int:
+        return len(self._sorted) - self._sorted.bisect_left((min_key,))
+    
+    def pop_below(self, cutoff: float) -> List[str]:
+        """Remove and return the IPs with key < ``cutoff``"""
+        end = self._sorted.bisect_left((cutoff,))
+        popped = [ip_address for _, ip_address in self._sorted[:end]]
+        del self._sorted[:end]
+        for ip_address in popped:
+            del self._keys[ip_address]
+        return popped
+
+
+class DecayedScores(Mapping):
+    """Read-only ``{ip: score}`` view, each score decayed to the time of the read"""
+    
+    def __init__(self, system: "ThreatScoreSystem"):
+        self._system = system
+    
+    def __getitem__(self, ip_address: str) -> int:
+        key = self._system.score_index.get(ip_address)
+        if key is None:
+            raise KeyError(ip_address)
+        return self._system._score(key, self._system._seconds(self._system._clock()))
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._system.score_index)
+    
+    def __len__(self) -> int:
+        return len(self._system.score_index)
+    
+    def items(self):
+        t = self._system._seconds(self._system._clock())
+        score = self._system._score
+        return [(ip, score(key, t)) for ip, key in self._system.score_index.items()]
+
+
+class IpActivity:
+    """Running counters for one IP plus an hourly ring for recent activity"""
+    
+    __slots__ = ("events", "total_attacks", "first_seen", "last_seen", "_hours", "_counts")
+    
     def __init__(self):
-        # IP reputation scores: {ip_address: score}
+        self.events = 0
+        self.total_attacks = 0
+        self.first_seen: Optional[datetime] = None
+        self.last_seen: Optional[datetime] = None
+        # Ring slot -> (absolute hour it holds, events in that hour)
+        self._hours = [-1] * RECENT_WINDOW_HOURS
+        self._counts = [0] * RECENT_WINDOW_HOURS
+    
+    def record(self, timestamp: datetime, attack_type: str) -> None:
+        self.events += 1
+        if attack_type != "BENIGN":
+            self.total_attacks += 1
+        if self.first_seen is None:
+            self.first_seen = timestamp
+        self.last_seen = timestamp
+        
+        hour = _hour_of(timestamp)
+        slot = hour % RECENT_WINDOW_HOURS
+        if self._hours[slot] != hour:
+            self._hours[slot] = hour
+            self._counts[slot] = 0
+        self._counts[slot] += 1
+    
+    def recent(self, now: datetime) -> int:
+        """Events in the last RECENT_WINDOW_HOURS, to hour granularity"""
+        oldest = _hour_of(now) - RECENT_WINDOW_HOURS
+        return sum(c for h, c in zip(self._hours, self._counts) if h > oldest)
+    
+    def copy(self) -> "IpActivity":
+        activity = IpActivity()
+        activity.events = self.events
+        activity.total_attacks = self.total_attacks
+        activity.first_seen = self.first_seen
+        activity.last_seen = self.last_seen
+        activity._hours = list(self._hours)
+        activity._counts = list(self._counts)
+        return activity
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "total_attacks": self.total_attacks,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+            "hours": self._hours,
+            "counts": self._counts,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IpActivity":
+        activity = cls()
+        activity.events = data["events"]
+        activity.total_attacks = data["total_attacks"]
+        activity.first_seen = datetime.fromisoformat(data["first_seen"])
+        activity.last_seen = datetime.fromisoformat(data["last_seen"])
+        activity._hours = list(data["hours"])
+        activity._counts = list(data["counts"])
+        return activity
+
+
+class ThreatScoreSystem:
+    def __init__(
+        self,
+        backend: Optional[StateBackend] = None,
+        log_dir: Optional[str] = None,
+        snapshot_interval: int = settings.THREAT_SCORE_SNAPSHOT_INTERVAL,
+        history_per_ip: int = settings.THREAT_SCORE_HISTORY_PER_IP,
+        half_life_hours: float = settings.THREAT_SCORE_HALF_LIFE_HOURS,
+        sweep_interval: float = settings.THREAT_SCORE_SWEEP_INTERVAL,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        # Decay key per IP below 100: ln(100 - score) + decay_rate * t.
+        # IPs at 100 (clean or fully recovered) have no entry
+        self.score_index = DecayIndex()
+        # Per-second rate at which the deficit decays (0 = no time recovery)
+        self.decay_rate = math.log(2) / (half_life_hours * 3600) if half_life_hours > 0 else 0.0
+        self._clock = clock
+        
+        # IP reputation scores: {ip_address: score}, decayed on read
         # Score ranges: 0-100 (100 = clean, 0 = highly malicious)
-        self.ip_scores: Dict[str, int] = defaultdict(lambda: 100)
+        self.ip_scores = DecayedScores(self)
+        
+        # Fully recovered IPs are forgotten at most once per sweep_interval
+        self.sweep_interval = sweep_interval
+        self._last_sweep = self._seconds(clock())
+        
+        # Per-IP attack counters / recent-activity ring for reputation reads
+        self.activity: Dict[str, IpActivity] = {}
         
-        # Attack history: {ip_address: [attack_records]}
-        self.attack_history: Dict[str, List[dict]] = defaultdict(list)
+        # With a shared backend the authoritative decay key lives there
+        # (all workers penalise the same IP); score_index mirrors it locally
+        self.backend = backend if backend is not None and backend.shared else None
+        # Backend version score_index was last synced to
+        self._synced_version = 0
+        
+        # Attack history: {ip_address: newest attack_records}
+        self.history_per_ip = history_per_ip
+        self.attack_history: Dict[str, Deque[dict]] = {}
+        # Score changes per attack type, over the whole chain
+        self.attack_type_counts: Counter = Counter()
         
         # Score penalties per attack type
         self.penalties = {
@@ -35,9 +276,95 @@ class ThreatScoreSystem:
             "CRITICAL": (0, 19)         # Dark Red
         }
         
-        # Blockchain-like hash chain for immutability
-        self.score_chain: List[dict] = []
-        
+        # Blockchain-like hash chain for immutability.  In memory until
+        # load() opens the on-disk log under log_dir
+        self.log_dir = log_dir
+        self.snapshot_interval = snapshot_interval
+        self.score_chain = ScoreChainLog()
+        # Merkle root over the record hashes, and the verified prefix
+        # [0, verified_upto) ending in checkpoint_hash
+        self.accumulator = MerkleAccumulator()
+        self.verified_upto = 0
+        self.checkpoint_hash: Optional[str] = None
+        # Snapshot writes run in a worker thread; the lock orders them and
+        # snapshot_written (chain length of the file on disk) stops an
+        # older state from replacing a newer one
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_task: Optional[asyncio.Future] = None
+        self.snapshot_written = 0
+    
+    # ------------------------------------------------------------
+    # Decay model
+    # ------------------------------------------------------------
+    
+    @staticmethod
+    def _seconds(timestamp: datetime) -> float:
+        return (timestamp - _EPOCH) / timedelta(seconds=1)
+    
+    def _deficit(self, key: Optional[float], t: float) -> float:
+        return 0.0 if key is None else math.exp(key - self.decay_rate * t)
+    
+    def _score(self, key: Optional[float], t: float) -> int:
+        return 100 - int(self._deficit(key, t) + 0.5)
+    
+    def _threshold_key(self, threshold: int, t: float) -> float:
+        """Smallest key whose score at time t is below ``threshold``"""
+        deficit = 100.5 - threshold
+        if deficit <= 0:
+            return -math.inf
+        return math.log(deficit) + self.decay_rate * t
+    
+    def _next_key(self, key: Optional[float], attack_type: str, is_malicious: bool, t: float) -> Optional[float]:
+        """Decay key after one scored request at time t (None = back to 100)"""
+        if attack_type == "RESET":
+            return None
+        deficit = self._deficit(key, t)
+        if not is_malicious:
+            # Benign request - slowly improve score (max 100)
+            deficit -= 1
+        else:
+            # Malicious attack - apply penalty (min 0)
+            deficit = min(100.0, deficit + self.penalties.get(attack_type, 10))
+        if deficit <= 0:
+            return None
+        return math.log(deficit) + self.decay_rate * t
+    
+    def _apply_score_event(self, ip_address: str, attack_type: str, is_malicious: bool,
+                           timestamp: datetime) -> Tuple[int, int]:
+        """Update the decay key for one request; returns (old score, new score)"""
+        t = self._seconds(timestamp)
+        if self.backend is not None:
+            old, new = self.backend.update_value(
+                SCORES_NAMESPACE, ip_address, lambda key: self._next_key(key, attack_type, is_malicious, t)
+            )
+        else:
+            old = self.score_index.get(ip_address)
+            new = self._next_key(old, attack_type, is_malicious, t)
+        self.score_index.update(ip_address, new)
+        return self._score(old, t), self._score(new, t)
+    
+    def sweep_recovered(self) -> int:
+        """Forget IPs whose score has decayed back to 100; returns how many"""
+        t = self._seconds(self._clock())
+        self._last_sweep = t
+        cutoff = math.log(_RECOVERED_DEFICIT) + self.decay_rate * t
+        if self.backend is not None:
+            self.backend.delete_values_below(SCORES_NAMESPACE, cutoff)
+        recovered = self.score_index.pop_below(cutoff)
+        # Counters and history of IPs with nothing left to decay go too
+        for ip_address in [ip for ip in self.activity if ip not in self.score_index]:
+            del self.activity[ip_address]
+            self.attack_history.pop(ip_address, None)
+        return len(recovered)
+    
+    def _maybe_sweep(self, t: float) -> None:
+        if t - self._last_sweep >= self.sweep_interval:
+            self.sweep_recovered()
+    
+    # ------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------
+    
     def calculate_threat_score(self, ip_address: str, attack_type: str, is_malicious: bool) -> int:
         """
         Calculate and update threat score for an IP address
@@ -50,54 +377,45 @@ class ThreatScoreSystem:
         Returns:
             Updated threat score (0-100)
         """
-        current_score = self.ip_scores[ip_address]
-        
-        if not is_malicious:
-            # Benign request - slowly improve score (max 100)
-            new_score = min(100, current_score + 1)
-        else:
-            # Malicious attack - apply penalty
-            penalty = self.penalties.get(attack_type, 10)
-            new_score = max(0, current_score - penalty)
+        timestamp = self._clock()
+        current_score, new_score = self._apply_score_event(ip_address, attack_type, is_malicious, timestamp)
         
-        # Record the score change
-        self._record_score_change(ip_address, current_score, new_score, attack_type, is_malicious)
-        
-        # Update score
-        self.ip_scores[ip_address] = new_score
+        # Record the score change (may snapshot, so after the update)
+        self._record_score_change(ip_address, current_score, new_score, attack_type, is_malicious, timestamp)
+        self._maybe_sweep(self._seconds(timestamp))
         
         return new_score
     
     def _record_score_change(self, ip_address: str, old_score: int, new_score: int, 
-                            attack_type: str, is_malicious: bool):
+                            attack_type: str, is_malicious: bool, timestamp: datetime):
         """Record score change in blockchain-like chain"""
-        timestamp = datetime.utcnow()
-        
-        # Create record
-        record = {
-            "ip_address": ip_address,
-            "old_score": old_score,
-            "new_score": new_score,
-            "attack_type": attack_type,
-            "is_malicious": is_malicious,
-            "timestamp": timestamp.isoformat(),
-            "previous_hash": self.score_chain[-1]["hash"] if self.score_chain else "0" * 64
-        }
-        
-        # Calculate hash
-        record_str = json.dumps(record, sort_keys=True)
-        record["hash"] = hashlib.sha256(record_str.encode()).hexdigest()
-        
         # Add to chain
-        self.score_chain.append(record)
+        record_hash = self.score_chain.append(
+            ip_address, attack_type, old_score, new_score, is_malicious, timestamp
+        )
+        self.accumulator.append(record_hash)
+        self._apply_change(ip_address, old_score, new_score, attack_type, timestamp)
         
-        # Add to attack history
-        self.attack_history[ip_address].append({
+        if self.score_chain.directory is not None and len(self.score_chain) % self.snapshot_interval == 0:
+            self._schedule_snapshot()
+    
+    def _apply_change(self, ip_address: str, old_score: int, new_score: int,
+                      attack_type: str, timestamp: datetime):
+        """Fold one chain record into the derived in-memory state"""
+        history = self.attack_history.get(ip_address)
+        if history is None:
+            history = self.attack_history[ip_address] = deque(maxlen=self.history_per_ip)
+        history.append({
             "timestamp": timestamp,
             "attack_type": attack_type,
             "score_change": new_score - old_score,
             "new_score": new_score
         })
+        activity = self.activity.get(ip_address)
+        if activity is None:
+            activity = self.activity[ip_address] = IpActivity()
+        activity.record(timestamp, attack_type)
+        self.attack_type_counts[attack_type] += 1
     
     def get_reputation_level(self, score: int) -> str:
         """Get reputation level name from score"""
@@ -120,86 +438,264 @@ class ThreatScoreSystem:
     
     def get_ip_score(self, ip_address: str) -> int:
         """Get current threat score for an IP"""
-        return self.ip_scores.get(ip_address, 100)
+        if self.backend is not None:
+            key = self.backend.get_value(SCORES_NAMESPACE, ip_address)
+        else:
+            key = self.score_index.get(ip_address)
+        return self._score(key, self._seconds(self._clock()))
+    
+    def sync_scores(self) -> None:
+        """
+        Refresh score_index from the shared backend (no-op in-process):
+        only the keys written since the last sync, unless the backend
+        asks for a full reload.
+        """
+        if self.backend is None:
+            return
+        version, changed = self.backend.changes(SCORES_NAMESPACE, self._synced_version)
+        if changed is None:
+            keys = self.backend.values(SCORES_NAMESPACE)
+            for ip in [ip for ip in self.score_index if ip not in keys]:
+                self.score_index.remove(ip)
+            changed = keys
+        for ip, key in changed.items():
+            self.score_index.update(ip, key)
+        self._synced_version = version
     
     def get_ip_reputation(self, ip_address: str) -> dict:
         """Get complete reputation info for an IP"""
-        score = self.get_ip_score(ip_address)
-        level = self.get_reputation_level(score)
-        color = self.get_reputation_color(score)
-        
-        # Get attack statistics
-        history = self.attack_history.get(ip_address, [])
-        total_attacks = len([h for h in history if h.get("attack_type") != "BENIGN"])
-        
-        # Get recent attacks (last 24 hours)
-        cutoff = datetime.utcnow() - timedelta(hours=24)
-        recent_attacks = len([h for h in history if h["timestamp"] > cutoff])
-        
+        return self._reputation(ip_address, self.get_ip_score(ip_address), self._clock())
+    
+    def _reputation(self, ip_address: str, score: int, now: datetime) -> dict:
+        activity = self.activity.get(ip_address)
         return {
             "ip_address": ip_address,
             "score": score,
-            "level": level,
-            "color": color,
-            "total_attacks": total_attacks,
-            "recent_attacks": recent_attacks,
-            "first_seen": history[0]["timestamp"].isoformat() if history else None,
-            "last_seen": history[-1]["timestamp"].isoformat() if history else None,
+            "level": self.get_reputation_level(score),
+            "color": self.get_reputation_color(score),
+            "total_attacks": activity.total_attacks if activity else 0,
+            # Activity in the last 24 hours
+            "recent_attacks": activity.recent(now) if activity else 0,
+            "first_seen": activity.first_seen.isoformat() if activity else None,
+            "last_seen": activity.last_seen.isoformat() if activity else None,
             "is_flagged": score < 40  # Flag if suspicious or worse
         }
     
+    def _lowest(self, threshold: int, limit: Optional[int] = None) -> List[dict]:
+        """Reputations with score < threshold right now, lowest first"""
+        self.sync_scores()
+        now = self._clock()
+        t = self._seconds(now)
+        return [
+            self._reputation(ip, self._score(key, t), now)
+            for ip, key in self.score_index.highest(self._threshold_key(threshold, t), limit)
+        ]
+    
     def get_flagged_ips(self, threshold: int = 40) -> List[dict]:
-        """Get all IPs with score below threshold (flagged as malicious)"""
-        flagged = []
-        for ip, score in self.ip_scores.items():
-            if score < threshold:
-                flagged.append(self.get_ip_reputation(ip))
-        
-        # Sort by score (lowest first)
-        flagged.sort(key=lambda x: x["score"])
-        return flagged
+        """Get all IPs with score below threshold (flagged as malicious), lowest first"""
+        return self._lowest(threshold)
+    
+    def count_flagged_ips(self, threshold: int = 40) -> int:
+        """Number of IPs with score below threshold"""
+        self.sync_scores()
+        return self.score_index.count_at_least(self._threshold_key(threshold, self._seconds(self._clock())))
     
     def get_top_threats(self, limit: int = 10) -> List[dict]:
         """Get top threat IPs (lowest scores)"""
-        all_ips = [(ip, score) for ip, score in self.ip_scores.items() if score < 100]
-        all_ips.sort(key=lambda x: x[1])  # Sort by score ascending
-        
-        return [self.get_ip_reputation(ip) for ip, _ in all_ips[:limit]]
+        return self._lowest(100, limit)
+    
+    def get_most_active_ips(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """(ip, score changes) for the IPs with the most recorded changes"""
+        return heapq.nlargest(limit, ((ip, a.events) for ip, a in self.activity.items()), key=lambda x: x[1])
     
-    def verify_chain_integrity(self) -> bool:
-        """Verify the integrity of the score chain"""
-        if not self.score_chain:
-            return True
+    def verify_blocks(self, start: int, end: int) -> Optional[int]:
+        """Re-hash records [start, end) segment by segment; index of the first bad one, or None"""
+        return self.score_chain.verify_range(start, end)
+    
+    def verify_chain_integrity(self, full: bool = False) -> bool:
+        """
+        Verify the integrity of the score chain
         
-        for i in range(1, len(self.score_chain)):
-            current = self.score_chain[i]
-            previous = self.score_chain[i - 1]
-            
-            # Verify previous hash
-            if current["previous_hash"] != previous["hash"]:
-                return False
-            
-            # Verify current hash
-            record_copy = current.copy()
-            stored_hash = record_copy.pop("hash")
-            record_str = json.dumps(record_copy, sort_keys=True)
-            calculated_hash = hashlib.sha256(record_str.encode()).hexdigest()
-            
-            if stored_hash != calculated_hash:
-                return False
+        Only records added since the last successful verification (or
+        trusted checkpoint) are re-hashed; ``full=True`` re-checks all.
+        """
+        start = 0 if full else self.verified_upto
+        if start > len(self.score_chain):
+            start = 0
+        if start and self.score_chain.hash_at(start - 1) != self.checkpoint_hash:
+            return False
         
+        if self.verify_blocks(max(start, 1), len(self.score_chain)) is not None:
+            return False
+        
+        if len(self.score_chain):
+            self.verified_upto = len(self.score_chain)
+            self.checkpoint_hash = self.score_chain.head_hash
+        return True
+    
+    def checkpoint_state(self) -> dict:
+        """Entry count, head hash and Merkle frontier for a signed checkpoint"""
+        snapshot = self.accumulator.snapshot()
+        return {
+            "count": snapshot["size"],
+            "head_hash": self.score_chain.head_hash,
+            "frontier": snapshot["frontier"],
+        }
+    
+    def block_hash(self, index: int) -> str:
+        return self.score_chain.hash_at(index)
+    
+    def block_hashes(self, start: int, end: int) -> List[str]:
+        """Hashes of records [start, end), read from the segments (safe off the loop)"""
+        return [record.hash.hex() for record in self.score_chain.iter_records(start, end, use_tail=False)]
+    
+    def trust_checkpoint(self, count: int, head_hash: Optional[str]) -> bool:
+        """Treat records [0, count) as verified if record count-1 still has head_hash"""
+        if not 0 < count <= len(self.score_chain) or self.score_chain.hash_at(count - 1) != head_hash:
+            return False
+        if count > self.verified_upto:
+            self.verified_upto = count
+            self.checkpoint_hash = head_hash
         return True
     
     def get_score_history(self, ip_address: str) -> List[dict]:
-        """Get score change history for an IP"""
-        return self.attack_history.get(ip_address, [])
+        """Get score change history for an IP (newest history_per_ip changes)"""
+        return list(self.attack_history.get(ip_address, ()))
     
     def reset_score(self, ip_address: str):
         """Reset score for an IP (admin function)"""
-        if ip_address in self.ip_scores:
-            old_score = self.ip_scores[ip_address]
-            self._record_score_change(ip_address, old_score, 100, "RESET", False)
-            self.ip_scores[ip_address] = 100
+        tracked = ip_address in self.score_index or (
+            self.backend is not None
+            and self.backend.get_value(SCORES_NAMESPACE, ip_address) is not None
+        )
+        if tracked:
+            timestamp = self._clock()
+            old_score, _ = self._apply_score_event(ip_address, "RESET", False, timestamp)
+            self._record_score_change(ip_address, old_score, 100, "RESET", False, timestamp)
+
+    # ------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------
+    
+    def _copy_state(self) -> Dict[str, Any]:
+        """
+        Point-in-time copy of the derived state, cheap enough for the
+        event loop: history entries are never mutated once appended, so
+        only the containers are copied.  Encoding happens in _encode_state.
+        """
+        return {
+            "count": len(self.score_chain),
+            "head_hash": self.score_chain.head_hash,
+            "accumulator": self.accumulator.snapshot(),
+            "score_keys": dict(self.score_index.items()),
+            "activity": {ip: a.copy() for ip, a in self.activity.items()},
+            "history": {ip: list(history) for ip, history in self.attack_history.items()},
+            "attack_type_counts": dict(self.attack_type_counts),
+        }
+    
+    @staticmethod
+    def _encode_state(state: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(
+            state,
+            activity={ip: a.to_dict() for ip, a in state["activity"].items()},
+            history={
+                ip: [dict(h, timestamp=h["timestamp"].isoformat()) for h in history]
+                for ip, history in state["history"].items()
+            },
+        )
+    
+    def _write_snapshot(self, state: Dict[str, Any]) -> None:
+        """Encode and write a copied state unless a newer one is already on disk"""
+        with self._snapshot_lock:
+            if state["count"] <= self.snapshot_written:
+                return
+            try:
+                self.score_chain.save_snapshot(self._encode_state(state))
+            except OSError as e:
+                logger.error(f"Failed to write score snapshot: {e}")
+                return
+            self.snapshot_written = state["count"]
+    
+    def _schedule_snapshot(self) -> None:
+        """
+        Snapshot from the request path: copy the state here and write it
+        in a worker thread.  Skipped while the previous write is still
+        running; the next interval (or close) catches up.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save_snapshot()
+            return
+        if self._snapshot_task is not None and not self._snapshot_task.done():
+            return
+        self._snapshot_task = loop.create_task(asyncio.to_thread(self._write_snapshot, self._copy_state()))
+    
+    def save_snapshot(self) -> None:
+        """Write the derived state for the current chain length (blocking)"""
+        self._write_snapshot(self._copy_state())
+    
+    def _restore_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        for ip, key in snapshot["score_keys"].items():
+            self.score_index.update(ip, key)
+        self.activity = {ip: IpActivity.from_dict(a) for ip, a in snapshot["activity"].items()}
+        self.attack_history = {
+            ip: deque(
+                (dict(h, timestamp=datetime.fromisoformat(h["timestamp"])) for h in history),
+                maxlen=self.history_per_ip,
+            )
+            for ip, history in snapshot["history"].items()
+        }
+        self.attack_type_counts = Counter(snapshot["attack_type_counts"])
+        self.accumulator = MerkleAccumulator(**snapshot["accumulator"])
+    
+    def load(self) -> int:
+        """
+        Open the on-disk chain under log_dir and rebuild the in-memory
+        state: restore the latest snapshot that matches the chain, then
+        replay the records after it.  Returns the number replayed.
+        """
+        if self.log_dir is None or self.score_chain.directory is not None:
+            return 0
+        if len(self.score_chain):
+            logger.warning("Score chain already has in-memory records; not loading from disk")
+            return 0
+        
+        log = ScoreChainLog.open_slot(self.log_dir)
+        snapshot = log.load_snapshot()
+        start = 0
+        if snapshot is not None:
+            count = snapshot.get("count", 0)
+            # Snapshots from before time-decayed scores hold no decay keys
+            if (0 < count <= len(log) and log.hash_at(count - 1) == snapshot.get("head_hash")
+                    and "score_keys" in snapshot):
+                self._restore_snapshot(snapshot)
+                self.snapshot_written = start = count
+            else:
+                logger.warning(f"Score snapshot in {log.directory} does not match the chain; replaying all")
+        
+        for record in log.iter_records(start):
+            self.accumulator.append(record.hash.hex())
+            if self.backend is None:
+                # Same timestamp as the live update, so the same decay key
+                self.score_index.update(record.ip_address, self._next_key(
+                    self.score_index.get(record.ip_address), record.attack_type,
+                    record.is_malicious, self._seconds(record.timestamp),
+                ))
+            self._apply_change(
+                record.ip_address, record.old_score, record.new_score, record.attack_type, record.timestamp
+            )
+        self.score_chain = log
+        self.sweep_recovered()
+        replayed = len(log) - start
+        logger.info(f"Loaded {len(log)} score records from {log.directory} ({replayed} replayed)")
+        return replayed
+    
+    def close(self) -> None:
+        """Snapshot and release the on-disk chain"""
+        if self.score_chain.directory is not None:
+            self.save_snapshot()
+            self.score_chain.close()
 
 # Global instance
-threat_score_system = ThreatScoreSystem()
+threat_score_system = ThreatScoreSystem(backend=state_backend, log_dir=settings.THREAT_SCORE_LOG_DIR)
@@ -9,9 +9,9 @@ from src.api.pipeline import evaluate_payload
 
 async def main():
     payload = "LOGIN:SELECT * FROM users WHERE '1'='1'"
-    verdict = await evaluate_payload(payload)
+    result = await evaluate_payload(payload)
     print(f"Payload: {payload}")
-    print(f"Verdict: {verdict}")
+    print(f"Verdict: {result.verdict} (stage={result.stage}, timings={result.timings_ms})")
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -17,7 +17,6 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.api.pipeline import evaluate_payload
-from src.ml_engine.ml_classifier import classifier
 
 print("=" * 70)
 print("CHAMELEON PIPELINE CLASSIFICATION TEST")
@@ -66,11 +65,10 @@ async def test_pipeline():
     print("=" * 70 + "\n")
     
     for command, expected_type, description in TEST_CASES:
-        # Get pipeline verdict
-        verdict = await evaluate_payload(command)
-        
-        # Get classifier details
-        classification = classifier.classify(command)
+        # Get pipeline verdict (carries the heuristic classification)
+        result = await evaluate_payload(command)
+        verdict = result.verdict
+        classification = result.classification
         
         # Determine if correct
         is_correct = (
@@ -0,0 +1,452 @@
+"""
+Batched Merkle-Root Anchoring — Test Suite
+===========================================
+Runs src/utils/blockchain_sync.py against an in-process EVM stand-in
+(no web3 or network needed): cached client with a local nonce, one
+root-of-roots transaction per epoch, asynchronous receipt polling,
+retry of failed sends, fee-bumped replacement of unmined transactions,
+log → epoch proofs of inclusion and their survival across a restart.
+
+Run:  pytest tests/test_anchor_scheduler.py -v
+"""
+
+import sys
+import os
+import asyncio
+import hashlib
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.utils.blockchain_sync as blockchain_sync
+from src.utils.blockchain_sync import (
+    AnchorClient,
+    AnchorScheduler,
+    TransactionNotFound,
+    anchor_latest_root,
+    get_root_count,
+    reset_anchor_client,
+)
+from src.utils.blockchain_logger import BlockchainLogger
+from src.utils.integrity import MerkleTree
+from src.utils.threat_score import ThreatScoreSystem
+
+
+class FakeEVM:
+    """Minimal ``Web3`` + ChameleonLedger stand-in: nonces, receipts, stored roots."""
+
+    chain_id = 31337
+
+    def __init__(self):
+        self.eth = self
+        self.account = self
+        self.functions = self
+        self.pending_nonce = 0
+        self.nonce_reads = 0
+        self.roots = []
+        self.receipts = {}
+        self.unmined_polls = 0
+        self.fail_next_send = False
+        # While stalled, sends are accepted into the mempool but not mined
+        self.stalled = False
+        self.mempool = {}   # nonce -> maxFeePerGas of unmined transactions
+
+    # w3.eth.account
+    def from_key(self, key):
+        return SimpleNamespace(address="0x" + "cc" * 20)
+
+    def sign_transaction(self, tx, key):
+        return SimpleNamespace(raw_transaction=json.dumps(tx, sort_keys=True).encode())
+
+    # w3.eth
+    def get_transaction_count(self, address, block):
+        self.nonce_reads += 1
+        return self.pending_nonce
+
+    def get_block(self, block):
+        return {"baseFeePerGas": 10 ** 9}
+
+    def send_raw_transaction(self, raw):
+        if self.fail_next_send:
+            self.fail_next_send = False
+            raise ConnectionError("RPC unavailable")
+        tx = json.loads(raw)
+        nonce = tx["nonce"]
+        if nonce in self.mempool:
+            if tx["maxFeePerGas"] < self.mempool[nonce] * 1.1:
+                raise ValueError("replacement transaction underpriced")
+            del self.mempool[nonce]
+        elif nonce != self.pending_nonce:
+            raise ValueError("nonce too low")
+        else:
+            self.pending_nonce += 1
+        tx_hash = hashlib.sha256(raw).digest()
+        if self.stalled:
+            self.mempool[nonce] = tx["maxFeePerGas"]
+            return tx_hash
+        self.roots.append(tx["data"])
+        self.receipts[tx_hash.hex()] = {"status": 1, "blockNumber": len(self.roots), "gasUsed": tx["gas"]}
+        return tx_hash
+
+    def get_transaction_receipt(self, tx_hash):
+        if self.unmined_polls:
+            self.unmined_polls -= 1
+            raise TransactionNotFound(tx_hash)
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(tx_hash)
+        return self.receipts[tx_hash]
+
+    def to_wei(self, value, unit):
+        return int(value * 10 ** 9)
+
+    # contract.functions
+    def storeMerkleRoot(self, root):
+        return SimpleNamespace(
+            estimate_gas=lambda tx: 50_000,
+            build_transaction=lambda params: {**params, "data": root},
+        )
+
+    def getRootCount(self):
+        return SimpleNamespace(call=lambda: len(self.roots))
+
+
+def _client(evm):
+    return AnchorClient(evm, evm, "0x" + "a1" * 32)
+
+
+def _chain(n, chain=None):
+    chain = chain or BlockchainLogger()
+    for _ in range(n):
+        chain.add_block({"n": len(chain.chain)})
+    return chain
+
+
+def _scheduler(evm, **kwargs):
+    client = _client(evm)
+    return AnchorScheduler(client_factory=lambda: client, poll_interval=0, **kwargs)
+
+
+async def _settle(scheduler):
+    while scheduler._receipt_tasks:
+        await asyncio.gather(*scheduler._receipt_tasks)
+
+
+class FakeEpochTable:
+    """``anchor_epochs`` stand-in behind a connected ``db``."""
+
+    def __init__(self, monkeypatch):
+        self.rows = {}
+        monkeypatch.setattr(blockchain_sync, "db", SimpleNamespace(connected=True, session_factory=self._session))
+        monkeypatch.setattr(blockchain_sync, "save_anchor_epoch", self._save)
+        monkeypatch.setattr(blockchain_sync, "get_anchor_epochs", self._load)
+
+    @asynccontextmanager
+    async def _session(self):
+        async def commit():
+            pass
+        yield SimpleNamespace(commit=commit)
+
+    async def _save(self, session, values):
+        self.rows[values["epoch"]] = SimpleNamespace(**values)
+
+    async def _load(self, session):
+        return [self.rows[k] for k in sorted(self.rows)]
+
+
+class FakeAdvisoryLock:
+    """``pg_try_advisory_lock`` stand-in shared by several schedulers (workers)."""
+
+    def __init__(self, monkeypatch):
+        self.holder = None
+        monkeypatch.setattr(blockchain_sync, "try_advisory_lock", self._try)
+        monkeypatch.setattr(blockchain_sync, "ping_connection", self._ping)
+
+    async def _try(self, key):
+        if self.holder is not None:
+            return None
+        lock = self
+
+        class Connection:
+            alive = True
+
+            async def close(self):
+                self.alive = False
+                if lock.holder is self:
+                    lock.holder = None
+
+        self.holder = Connection()
+        return self.holder
+
+    async def _ping(self, conn):
+        if not conn.alive:
+            raise ConnectionError("connection closed")
+
+
+class TestAnchorClient:
+
+    def test_nonce_is_managed_locally(self):
+        evm = FakeEVM()
+        client = _client(evm)
+        client.send_root("a" * 64)
+        client.send_root("b" * 64)
+        assert evm.nonce_reads == 1
+        assert evm.roots == ["a" * 64, "b" * 64]
+
+    def test_nonce_resynced_after_failed_send(self):
+        evm = FakeEVM()
+        client = _client(evm)
+        client.send_root("a" * 64)
+        evm.fail_next_send = True
+        with pytest.raises(ConnectionError):
+            client.send_root("b" * 64)
+        client.send_root("c" * 64)
+        assert evm.nonce_reads == 2
+        assert evm.roots == ["a" * 64, "c" * 64]
+
+    def test_gas_limit_has_buffer(self):
+        evm = FakeEVM()
+        _client(evm).send_root("a" * 64)
+        tx_hash = next(iter(evm.receipts))
+        assert evm.receipts[tx_hash]["gasUsed"] == 60_000
+
+    def test_pending_receipt_is_none(self):
+        evm = FakeEVM()
+        client = _client(evm)
+        tx_hash = client.send_root("a" * 64)
+        evm.unmined_polls = 1
+        assert client.get_receipt(tx_hash) is None
+        assert client.get_receipt(tx_hash)["status"] == 1
+
+
+class TestScheduler:
+
+    async def test_one_transaction_per_epoch(self):
+        evm = FakeEVM()
+        scheduler = _scheduler(evm)
+        chain, scores = _chain(5), ThreatScoreSystem()
+        scores.calculate_threat_score("10.0.0.1", "SQLI", True)
+        scheduler.register("blockchain", chain)
+        scheduler.register("threat_scores", scores)
+        scheduler.submit_root("f" * 64, source="ip:10.0.0.1")
+
+        epoch = await scheduler.run_epoch()
+        await _settle(scheduler)
+
+        assert evm.roots == [epoch.root_of_roots]
+        assert [m.source for m in epoch.members] == ["blockchain", "threat_scores", "ip:10.0.0.1"]
+        assert epoch.members[0].root == MerkleTree.from_hashes([b["hash"] for b in chain.chain]).root_hash
+        assert epoch.root_of_roots == MerkleTree.from_hashes([m.root for m in epoch.members]).root_hash
+        assert epoch.status == "confirmed" and epoch.block_number == 1
+
+    async def test_only_grown_streams_join_next_epoch(self):
+        evm = FakeEVM()
+        scheduler = _scheduler(evm)
+        chain, scores = _chain(3), ThreatScoreSystem()
+        scores.calculate_threat_score("10.0.0.1", "XSS", True)
+        scheduler.register("blockchain", chain)
+        scheduler.register("threat_scores", scores)
+        await scheduler.run_epoch()
+
+        assert await scheduler.run_epoch() is None
+        _chain(2, chain)
+        epoch = await scheduler.run_epoch()
+        assert [(m.source, m.count) for m in epoch.members] == [("blockchain", 5)]
+        assert len(evm.roots) == 2
+
+    async def test_receipt_polled_without_blocking(self):
+        evm = FakeEVM()
+        evm.unmined_polls = 3
+        scheduler = _scheduler(evm)
+        scheduler.register("blockchain", _chain(2))
+        epoch = await scheduler.run_epoch()
+        assert epoch.status == "sent"
+        await _settle(scheduler)
+        assert epoch.status == "confirmed"
+
+    async def test_unmined_transaction_is_replaced_with_higher_fees(self):
+        evm = FakeEVM()
+        evm.stalled = True
+        scheduler = _scheduler(evm, receipt_timeout=0)
+        chain = _chain(2)
+        scheduler.register("blockchain", chain)
+        epoch = await scheduler.run_epoch()
+        await _settle(scheduler)
+        assert epoch.status == "timed_out" and "No receipt" in epoch.error
+        stuck_hash = epoch.tx_hash
+        assert epoch.nonce in evm.mempool
+        client = scheduler.client_factory()
+        assert client._nonce is None           # next fresh send re-reads it
+
+        evm.stalled = False
+        _chain(1, chain)
+        second = await scheduler.run_epoch()
+        await _settle(scheduler)
+        assert epoch.status == "confirmed" and epoch.fee_bumps == 1
+        assert epoch.replaced_tx_hashes == [stuck_hash] and epoch.tx_hash != stuck_hash
+        assert second.status == "confirmed" and second.nonce == epoch.nonce + 1
+        # The fake only accepts a replacement that outbids the stuck fee by 10%
+        assert evm.roots == [epoch.root_of_roots, second.root_of_roots] and not evm.mempool
+
+    async def test_late_receipt_of_timed_out_transaction_is_used(self):
+        evm = FakeEVM()
+        evm.unmined_polls = 10 ** 6
+        scheduler = _scheduler(evm, receipt_timeout=0)
+        scheduler.register("blockchain", _chain(2))
+        epoch = await scheduler.run_epoch()
+        await _settle(scheduler)
+        assert epoch.status == "timed_out"
+
+        evm.unmined_polls = 0
+        await scheduler.run_epoch()
+        assert epoch.status == "confirmed" and epoch.fee_bumps == 0
+        assert len(evm.roots) == 1
+
+    async def test_failed_send_is_retried(self):
+        evm = FakeEVM()
+        scheduler = _scheduler(evm)
+        scheduler.register("blockchain", _chain(2))
+        evm.fail_next_send = True
+        epoch = await scheduler.run_epoch()
+        assert epoch.status == "failed" and evm.roots == []
+
+        assert await scheduler.run_epoch() is None   # nothing new, but the failed epoch is resent
+        await _settle(scheduler)
+        assert epoch.status == "confirmed" and evm.roots == [epoch.root_of_roots]
+
+
+class TestSingleAnchoringWorker:
+
+    async def test_only_the_lock_holder_anchors(self, monkeypatch):
+        table, lock = FakeEpochTable(monkeypatch), FakeAdvisoryLock(monkeypatch)
+        evm = FakeEVM()
+        workers = [_scheduler(evm), _scheduler(evm)]
+        for worker in workers:
+            worker.register("blockchain", _chain(3))
+        workers[1].submit_root("f" * 64)
+
+        assert await workers[0].tick() is not None
+        assert await workers[1].tick() is None
+        await _settle(workers[0])
+
+        assert len(evm.roots) == 1 and list(table.rows) == [0]
+        assert workers[0].leader and not workers[1].leader
+        assert workers[1].stats["dropped_submissions"] == 1
+        await workers[0].stop()
+        await workers[1].stop()
+
+    async def test_next_holder_continues_after_persisted_epochs(self, monkeypatch):
+        table, lock = FakeEpochTable(monkeypatch), FakeAdvisoryLock(monkeypatch)
+        evm = FakeEVM()
+        first, second = _scheduler(evm), _scheduler(evm)
+        first.register("blockchain", _chain(3))
+        second.register("blockchain", _chain(4))
+        await first.tick()
+        await _settle(first)
+
+        await first.stop()
+        epoch = await second.tick()
+        await _settle(second)
+
+        assert second.leader and epoch.epoch == 1
+        assert [e.epoch for e in second.epochs] == [0, 1]
+        assert table.rows[0].tx_hash is not None and table.rows[0].members == first.epochs[0].to_row()["members"]
+        assert len(evm.roots) == 2
+        await second.stop()
+
+    async def test_lost_lock_connection_is_retaken(self, monkeypatch):
+        FakeEpochTable(monkeypatch)
+        lock = FakeAdvisoryLock(monkeypatch)
+        scheduler = _scheduler(FakeEVM())
+        scheduler.register("blockchain", _chain(1))
+        await scheduler.tick()
+        dropped = lock.holder
+        await dropped.close()
+
+        _chain(1, scheduler._streams["blockchain"])
+        assert await scheduler.tick() is not None
+        assert scheduler.leader and lock.holder is not dropped
+        await scheduler.stop()
+
+
+class TestProofOfInclusion:
+
+    async def test_log_maps_to_anchoring_epoch(self):
+        evm = FakeEVM()
+        scheduler = _scheduler(evm)
+        chain = _chain(6)
+        scheduler.register("blockchain", chain)
+        scheduler.submit_root("e" * 64)
+        await scheduler.run_epoch()
+        _chain(5, chain)
+        await scheduler.run_epoch()
+        await _settle(scheduler)
+
+        early = await scheduler.prove_log("blockchain", 5)
+        late = await scheduler.prove_log("blockchain", 6)
+        assert early["epoch"] == 0 and late["epoch"] == 1
+        assert early["leaf_hash"] == chain.chain[5]["hash"]
+        assert late["status"] == "confirmed" and late["tx_hash"]
+        assert AnchorScheduler.verify_inclusion(early) and AnchorScheduler.verify_inclusion(late)
+
+        forged = dict(late, leaf_hash=chain.chain[7]["hash"])
+        assert not AnchorScheduler.verify_inclusion(forged)
+
+    async def test_unanchored_entries_have_no_proof(self):
+        scheduler = _scheduler(FakeEVM())
+        chain = _chain(3)
+        scheduler.register("blockchain", chain)
+        assert await scheduler.prove_log("blockchain", 0) is None
+        await scheduler.run_epoch()
+        _chain(1, chain)
+        assert await scheduler.prove_log("blockchain", 3) is None
+        assert await scheduler.prove_log("blockchain", -1) is None
+        assert await scheduler.prove_log("threat_scores", 0) is None
+
+    async def test_proofs_survive_a_restart(self, monkeypatch, tmp_path):
+        table = FakeEpochTable(monkeypatch)
+        evm = FakeEVM()
+        scores = ThreatScoreSystem(log_dir=str(tmp_path))
+        scores.load()
+        for i in range(5):
+            scores.calculate_threat_score(f"10.0.0.{i}", "SQLI", True)
+        chain = _chain(4)
+        scheduler = _scheduler(evm)
+        scheduler.register("threat_scores", scores)
+        scheduler.register("blockchain", chain)
+        await scheduler.run_epoch()
+        await _settle(scheduler)
+        before = await scheduler.prove_log("threat_scores", 3)
+        scores.close()
+
+        restarted_scores = ThreatScoreSystem(log_dir=str(tmp_path))
+        restarted_scores.load()
+        restarted = _scheduler(evm)
+        restarted.register("threat_scores", restarted_scores)
+        restarted.register("blockchain", _chain(2))     # in-memory chain lost its blocks
+        assert await restarted.restore() == 1
+        after = await restarted.prove_log("threat_scores", 3)
+        assert after == before and AnchorScheduler.verify_inclusion(after)
+        assert await restarted.prove_log("blockchain", 0) is None
+        assert table.rows[0].status == "confirmed"
+        restarted_scores.close()
+
+
+class TestModuleFunctions:
+
+    async def test_anchor_latest_root_uses_cached_client(self, monkeypatch):
+        evm = FakeEVM()
+        monkeypatch.setattr(blockchain_sync, "PRIVATE_KEY", "0x" + "a1" * 32)
+        reset_anchor_client(_client(evm))
+        try:
+            first = await anchor_latest_root("a" * 64)
+            second = await anchor_latest_root("b" * 64)
+            assert first["status"] == second["status"] == "success"
+            assert second["block_number"] == 2
+            assert evm.nonce_reads == 1
+            assert await get_root_count() == 2
+        finally:
+            reset_anchor_client()
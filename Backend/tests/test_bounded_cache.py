@@ -0,0 +1,148 @@
+"""
+Bounded LRU + TTL Cache — Test Suite
+=====================================
+Validates src/utils/bounded_cache.py: LRU eviction order, TTL expiry,
+idle-timeout refresh via touch(), eviction callbacks and counters.
+
+Run:  pytest tests/test_bounded_cache.py -v
+"""
+
+import sys
+import os
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.bounded_cache import LRUTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUTTLCache:
+
+    def test_lru_eviction_order(self):
+        evicted = []
+        cache = LRUTTLCache(2, on_evict=lambda k, v: evicted.append(k))
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")          # "b" is now least recently used
+        cache.put("c", 3)
+
+        assert evicted == ["b"]
+        assert "a" in cache and "c" in cache
+        assert cache.stats["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = LRUTTLCache(10, ttl_seconds=5, clock=clock)
+        cache.put("k", "v")
+        clock.now = 4.9
+        assert cache.get("k") == "v"
+        clock.now = 5.0
+        assert cache.get("k") is None
+        assert cache.stats["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_touch_extends_idle_timeout(self):
+        clock = FakeClock()
+        cache = LRUTTLCache(10, ttl_seconds=5, clock=clock)
+        cache.put("k", "v")
+        clock.now = 4
+        assert cache.touch("k")
+        clock.now = 8
+        assert cache.get("k") == "v"
+
+    def test_purge_expired(self):
+        clock = FakeClock()
+        cache = LRUTTLCache(10, ttl_seconds=1, clock=clock)
+        for i in range(3):
+            cache.put(i, i)
+        clock.now = 2
+        assert cache.purge_expired() == 3
+        assert len(cache) == 0
+
+    def test_pop_and_clear_do_not_count_as_evictions(self):
+        cache = LRUTTLCache(10)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.pop("a") == 1
+        cache.clear()
+        assert cache.stats["evictions"] == 0
+        assert cache.stats["invalidations"] == 1
+
+    def test_stats_hit_rate(self):
+        cache = LRUTTLCache(10)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_rejects_zero_capacity(self):
+        with pytest.raises(ValueError):
+            LRUTTLCache(0)
+
+
+class TestMemoryAccounting:
+
+    @staticmethod
+    def _len_size(key, value):
+        return len(value)
+
+    def test_bytes_track_put_replace_pop_clear(self):
+        cache = LRUTTLCache(10, sizeof=self._len_size)
+        cache.put("a", "xxxx")
+        cache.put("b", "yy")
+        assert cache.bytes == 6
+        cache.put("a", "x")
+        assert cache.bytes == 3
+        cache.pop("b")
+        assert cache.bytes == 1
+        cache.clear()
+        assert cache.bytes == 0
+        assert cache.get_stats()["bytes"] == 0
+
+    def test_max_bytes_evicts_lru(self):
+        evicted = []
+        cache = LRUTTLCache(
+            10, sizeof=self._len_size, max_bytes=10,
+            on_evict=lambda k, v: evicted.append(k),
+        )
+        cache.put("a", "x" * 4)
+        cache.put("b", "x" * 4)
+        cache.put("c", "x" * 4)
+        assert evicted == ["a"]
+        assert cache.bytes == 8
+
+    def test_oversized_entry_is_still_kept(self):
+        cache = LRUTTLCache(10, sizeof=self._len_size, max_bytes=2)
+        cache.put("a", "x" * 5)
+        assert "a" in cache
+
+    def test_touch_remeasures_mutated_value(self):
+        cache = LRUTTLCache(10, sizeof=lambda k, v: len(v))
+        value = ["x"]
+        cache.put("a", value)
+        value.extend(["y", "z"])
+        cache.touch("a")
+        assert cache.bytes == 3
+
+    def test_expiry_releases_bytes(self):
+        clock = FakeClock()
+        cache = LRUTTLCache(10, ttl_seconds=1, clock=clock, sizeof=self._len_size)
+        cache.put("a", "xyz")
+        clock.now = 5
+        cache.purge_expired()
+        assert cache.bytes == 0
+
+    def test_max_bytes_requires_sizeof(self):
+        with pytest.raises(ValueError):
+            LRUTTLCache(10, max_bytes=100)
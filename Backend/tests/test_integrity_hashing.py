@@ -0,0 +1,100 @@
+"""
+Merkle Leaf Hashing Fast Path — Test Suite
+===========================================
+Checks that the single-pass canonical encoder in src/utils/integrity.py
+produces byte-identical text to the reference copy-and-sort encoding
+(including the entries that must fall back to it), and that chunked
+process-pool hashing returns the serial hashes in order.
+
+Run:  pytest tests/test_integrity_hashing.py -v
+"""
+
+import sys
+import os
+from datetime import datetime, timezone
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.utils.integrity as integrity
+from src.utils.integrity import (
+    MerkleLogger,
+    MerkleTree,
+    _canonical_log_json_reference,
+    canonical_log_json,
+    hash_log_entries,
+    hash_log_entry,
+    shutdown_hash_pool,
+)
+
+T0 = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def _log(i, **overrides):
+    entry = {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "tenant_id": "11111111-1111-1111-1111-111111111111",
+        "attacker_ip": f"10.0.0.{i % 256}",
+        "command_entered": f"' OR {i}=1 --",
+        "response_sent": "Invalid credentials",
+        "timestamp": T0.isoformat(),
+        "metadata": {"classification": {"is_malicious": True, "attack_type": "SQLI", "confidence": 0.9}},
+    }
+    entry.update(overrides)
+    return entry
+
+
+class TestCanonicalEncoding:
+
+    @pytest.mark.parametrize("entry", [
+        _log(1),
+        _log(2, metadata={"z": 1, "a": {"y": [1, "two", 3.5], "b": True}}),
+        _log(3, command_entered="café ☃ \"quoted\""),
+        _log(4, timestamp=None),
+        _log(5, metadata=None),
+        _log(6, metadata={"dropped": None, "kept": [None, 1]}),
+        _log(7, timestamp=T0),
+        _log(8, metadata={"seen": T0, "history": [T0, "x"], "pair": (1, 2)}),
+        _log(9, command_entered="nullable"),
+        {"id": 1, "count": 3},
+        {},
+    ])
+    def test_matches_reference(self, entry):
+        assert canonical_log_json(entry) == _canonical_log_json_reference(entry)
+
+    def test_unserialisable_value_still_raises(self):
+        with pytest.raises(TypeError):
+            hash_log_entry({"id": 1, "history": [T0]})
+
+
+class TestBatchHashing:
+
+    def test_serial_batch_matches_single(self):
+        logs = [_log(i) for i in range(50)]
+        assert hash_log_entries(logs) == [hash_log_entry(e) for e in logs]
+
+    def test_process_pool_preserves_order(self):
+        logs = [_log(i) for i in range(257)]
+        parallel = hash_log_entries(logs, workers=2, chunk_size=32, parallel_threshold=0)
+        assert parallel == [hash_log_entry(e) for e in logs]
+
+    def test_pool_is_reused_and_not_forked(self):
+        logs = [_log(i) for i in range(64)]
+        try:
+            hash_log_entries(logs, workers=2, chunk_size=16, parallel_threshold=0)
+            pool = integrity._hash_pool
+            assert pool is not None and pool._mp_context.get_start_method() in ("forkserver", "spawn")
+            assert hash_log_entries(logs, workers=2, chunk_size=16, parallel_threshold=0) == \
+                [hash_log_entry(e) for e in logs]
+            assert integrity._hash_pool is pool
+        finally:
+            shutdown_hash_pool()
+        assert integrity._hash_pool is None
+
+    def test_merkle_structures_use_batch_hashes(self):
+        logs = [_log(i) for i in range(11)]
+        merkle = MerkleLogger()
+        hashes = merkle.add_logs(logs)
+        assert hashes == [hash_log_entry(e) for e in logs]
+        assert merkle.root_hash == MerkleTree(logs).root_hash == MerkleTree.from_hashes(hashes).root_hash
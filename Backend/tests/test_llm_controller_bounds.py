@@ -0,0 +1,197 @@
+"""
+Bounded LLM Controller Stores — Test Suite
+===========================================
+Validates that LLMController's response cache and per-IP sessions in
+src/utils/llm_controller.py are bounded (LRU / idle timeout), report
+memory use, and spill cold sessions to a spill store and restore them
+when the attacker returns.
+
+Run:  pytest tests/test_llm_controller_bounds.py -v
+"""
+
+import sys
+import os
+import asyncio
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.bounded_cache import LRUTTLCache
+from src.utils.llm_controller import CommandHistory, LLMController
+from src.utils import llm_controller as llm_module
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class MemorySpill:
+    """In-memory stand-in for the Postgres spill store."""
+
+    def __init__(self):
+        self.rows = {}
+        self.saves = 0
+
+    async def save(self, sessions):
+        self.saves += 1
+        self.rows.update(sessions)
+        return len(sessions)
+
+    async def load(self, ip_address):
+        return self.rows.get(ip_address)
+
+
+def _controller(spill=None, max_sessions=100, idle=60.0, clock=None):
+    controller = LLMController(provider="deepseek", session_spill=spill)
+    controller._sessions = LRUTTLCache(
+        max_entries=max_sessions,
+        ttl_seconds=idle,
+        on_evict=controller._on_session_evicted,
+        sizeof=llm_module._session_size,
+        clock=clock or FakeClock(),
+    )
+    return controller
+
+
+@pytest.fixture(autouse=True)
+def static_deception(monkeypatch):
+    monkeypatch.setattr(llm_module.settings, "USE_LLM_DECEPTION", False)
+
+
+class TestResponseCache:
+
+    async def test_cache_is_lru_bounded(self):
+        controller = LLMController(provider="deepseek")
+        controller._cache = LRUTTLCache(2, sizeof=llm_module._response_size)
+        for cmd in ("whoami", "id", "pwd"):
+            await controller.generate_deceptive_response(cmd)
+
+        assert len(controller._cache) == 2
+        assert "whoami" not in controller._cache
+        assert controller._cache.stats["evictions"] == 1
+
+    async def test_cache_hit_and_memory_stats(self):
+        controller = LLMController(provider="deepseek")
+        await controller.generate_deceptive_response("whoami")
+        await controller.generate_deceptive_response("whoami")
+
+        stats = controller.get_stats()
+        assert stats["cache_hits"] == 1
+        assert stats["cache_size"] == 1
+        assert stats["response_cache"]["bytes"] > 0
+        assert stats["memory_bytes"] >= stats["response_cache"]["bytes"]
+
+    async def test_honeytoken_commands_never_cached(self):
+        controller = LLMController(provider="deepseek")
+        await controller.generate_deceptive_response("ls -la")
+        assert len(controller._cache) == 0
+
+
+class TestSessionBounds:
+
+    def test_idle_sessions_expire(self):
+        clock = FakeClock()
+        controller = _controller(clock=clock, idle=10)
+        controller.session_sweep_interval = 0
+
+        first = controller.get_or_create_session("1.1.1.1")
+        first.add_command("id", "uid=33")
+        clock.now = 5
+        assert controller.get_or_create_session("1.1.1.1") is first
+        clock.now = 20
+        controller.get_or_create_session("2.2.2.2")
+        assert "1.1.1.1" not in controller._sessions
+
+    def test_session_count_bounded(self):
+        controller = _controller(max_sessions=3)
+        for i in range(10):
+            controller.get_or_create_session(f"10.0.0.{i}")
+        assert controller.get_stats()["active_sessions"] == 3
+
+    def test_session_bytes_grow_with_history(self):
+        controller = _controller()
+        history = controller.get_or_create_session("1.1.1.1")
+        before = controller._sessions.bytes
+        history.add_command("cat /etc/passwd", "root:x:0:0:root:/root:/bin/bash\n" * 20)
+        controller.touch_session("1.1.1.1", history)
+        assert controller._sessions.bytes > before
+
+    def test_history_roundtrip_keeps_last_entries(self):
+        history = CommandHistory()
+        for i in range(30):
+            history.add_command(f"cmd{i}", "ok")
+        restored = CommandHistory.from_dict(history.to_dict())
+        assert restored.commands == history.commands
+        assert len(CommandHistory.from_dict([{"command": "x", "response": ""}] * 50).commands) == 20
+
+
+class TestSessionSpill:
+
+    async def test_evicted_session_spilled_and_restored(self):
+        spill = MemorySpill()
+        controller = _controller(spill=spill, max_sessions=1)
+
+        history = controller.get_or_create_session("1.1.1.1")
+        history.add_command("whoami", "www-data")
+        controller.get_or_create_session("2.2.2.2")      # evicts 1.1.1.1
+        await asyncio.sleep(0)
+        await controller.flush_spilled_sessions()
+
+        assert spill.rows["1.1.1.1"][0]["command"] == "whoami"
+        assert controller.stats["sessions_spilled"] == 1
+
+        restored = await controller.get_or_load_session("1.1.1.1")
+        assert restored.commands[0]["response"] == "www-data"
+        assert controller.stats["sessions_restored"] == 1
+
+    async def test_pending_spill_reclaimed_without_store_roundtrip(self):
+        spill = MemorySpill()
+        controller = _controller(spill=spill, max_sessions=1)
+
+        controller.get_or_create_session("1.1.1.1").add_command("id", "uid=33")
+        controller.get_or_create_session("2.2.2.2")      # queued, not yet written
+        again = await controller.get_or_load_session("1.1.1.1")
+        assert again.commands[0]["command"] == "id"
+
+    async def test_empty_sessions_not_spilled(self):
+        spill = MemorySpill()
+        controller = _controller(spill=spill, max_sessions=1)
+        controller.get_or_create_session("1.1.1.1")
+        controller.get_or_create_session("2.2.2.2")
+        await controller.flush_spilled_sessions()
+        assert spill.rows == {}
+
+    async def test_spill_all_sessions_on_shutdown(self):
+        spill = MemorySpill()
+        controller = _controller(spill=spill)
+        for ip in ("1.1.1.1", "2.2.2.2"):
+            controller.get_or_create_session(ip).add_command("pwd", "/var/www/html")
+
+        assert await controller.spill_all_sessions() == 2
+        assert set(spill.rows) == {"1.1.1.1", "2.2.2.2"}
+
+    async def test_spill_failures_are_counted_not_raised(self):
+        class BrokenSpill(MemorySpill):
+            async def save(self, sessions):
+                raise ConnectionError("db down")
+
+        controller = _controller(spill=BrokenSpill())
+        controller.get_or_create_session("1.1.1.1").add_command("id", "uid=33")
+        assert await controller.spill_all_sessions() == 0
+        assert controller.stats["spill_errors"] == 1
+
+    async def test_convenience_function_restores_context(self, monkeypatch):
+        spill = MemorySpill()
+        spill.rows["9.9.9.9"] = [{"command": "cd /tmp", "response": "", "timestamp": ""}]
+        controller = _controller(spill=spill)
+        monkeypatch.setattr(llm_module, "llm_controller", controller)
+
+        await llm_module.generate_deceptive_response("whoami", ip_address="9.9.9.9")
+
+        history = controller.get_or_create_session("9.9.9.9")
+        assert [c["command"] for c in history.commands] == ["cd /tmp", "whoami"]
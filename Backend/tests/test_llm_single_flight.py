@@ -0,0 +1,128 @@
+"""
+LLM Request Coalescing (Single-Flight) — Test Suite
+====================================================
+Verifies that concurrent identical deception requests in
+src/utils/llm_controller.py share one upstream LLM call, and that
+honeytoken responses are personalised with each session's beacon URL.
+
+Run:  pytest tests/test_llm_single_flight.py -v
+"""
+
+import sys
+import os
+import asyncio
+import uuid
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import llm_controller as llm_module
+from src.utils.llm_controller import (
+    LLMController,
+    SHARED_BEACON_SESSION_ID,
+    beacon_url_for,
+)
+
+
+class SlowUpstream:
+    """Replacement for call_llm_api that echoes the beacon URL it was given."""
+
+    def __init__(self, delay: float = 0.05, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self, prompt, system_prompt=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return f"AccessKeyId,SecretAccessKey\n# Verify keys at: {beacon_url_for(SHARED_BEACON_SESSION_ID)}"
+
+
+@pytest.fixture(autouse=True)
+def llm_enabled(monkeypatch):
+    monkeypatch.setattr(llm_module.settings, "USE_LLM_DECEPTION", True)
+
+
+@pytest.fixture
+def controller():
+    return LLMController(provider="deepseek")
+
+
+def _sessions(n):
+    return [str(uuid.uuid4()) for _ in range(n)]
+
+
+class TestCoalescing:
+
+    async def test_identical_cacheable_commands_share_one_call(self, controller):
+        upstream = controller.call_llm_api = SlowUpstream()
+        results = await asyncio.gather(*(
+            controller.generate_deceptive_response("whoami", session_id=sid)
+            for sid in _sessions(50)
+        ))
+
+        assert upstream.calls == 1
+        assert controller.stats["coalesced_requests"] == 49
+        assert len({text.split("\n")[0] for text, _ in results}) == 1
+        assert controller._inflight == {}
+
+    async def test_honeytoken_responses_get_per_session_beacons(self, controller):
+        upstream = controller.call_llm_api = SlowUpstream()
+        sessions = _sessions(20)
+        results = await asyncio.gather(*(
+            controller.generate_deceptive_response("cat aws_production_keys.csv", session_id=sid)
+            for sid in sessions
+        ))
+
+        assert upstream.calls == 1
+        for (text, returned_sid), sid in zip(results, sessions):
+            assert returned_sid == sid
+            assert beacon_url_for(sid) in text
+            assert SHARED_BEACON_SESSION_ID not in text
+
+    async def test_different_commands_are_not_coalesced(self, controller):
+        upstream = controller.call_llm_api = SlowUpstream()
+        await asyncio.gather(
+            controller.generate_deceptive_response("whoami"),
+            controller.generate_deceptive_response("uname -a"),
+        )
+        assert upstream.calls == 2
+
+    async def test_sequential_calls_hit_cache_with_personalised_text(self, controller):
+        upstream = controller.call_llm_api = SlowUpstream(delay=0)
+        sid_a, sid_b = _sessions(2)
+        text_a, _ = await controller.generate_deceptive_response("whoami", session_id=sid_a)
+        text_b, _ = await controller.generate_deceptive_response("whoami", session_id=sid_b)
+
+        assert upstream.calls == 1
+        assert beacon_url_for(sid_a) in text_a
+        assert beacon_url_for(sid_b) in text_b
+
+    async def test_upstream_failure_falls_back_per_session(self, controller):
+        upstream = controller.call_llm_api = SlowUpstream(fail=True)
+        sessions = _sessions(5)
+        results = await asyncio.gather(*(
+            controller.generate_deceptive_response("cat .env.backup", session_id=sid)
+            for sid in sessions
+        ))
+
+        assert upstream.calls == 1
+        for (text, _), sid in zip(results, sessions):
+            assert beacon_url_for(sid) in text
+            assert sid.replace("-", "")[:24] in text
+        assert controller._inflight == {}
+
+    async def test_cancelled_leader_does_not_cancel_followers(self, controller):
+        upstream = controller.call_llm_api = SlowUpstream(delay=0.1)
+        leader = asyncio.ensure_future(controller.generate_deceptive_response("id"))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(controller.generate_deceptive_response("id"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        text, _ = await follower
+        assert text.startswith("AccessKeyId")
+        assert upstream.calls == 1
@@ -0,0 +1,176 @@
+"""
+Keyset Pagination & NDJSON Streaming — Test Suite
+==================================================
+Covers the (timestamp, id) cursor helpers in src/core/database_postgres.py
+and the page / stream wrappers in src/core/database.py: cursor encoding,
+index-friendly SQL, next-cursor detection, and server-side streaming.
+
+Run:  pytest tests/test_log_pagination.py -v
+"""
+
+import sys
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.dialects import postgresql
+
+from src.core import database
+from src.core.database_postgres import (
+    decode_log_cursor,
+    encode_log_cursor,
+    get_honeypot_logs_page,
+    logs_keyset_query,
+)
+
+T0 = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def _log(i):
+    return SimpleNamespace(
+        id=uuid4(), attacker_ip="10.0.0.1", command_entered=f"cmd{i}", response_sent="ok",
+        timestamp=T0 - timedelta(seconds=i), log_metadata={},
+    )
+
+
+def _compile(stmt):
+    return str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class _Stream:
+    def __init__(self, rows):
+        self._rows = rows
+        self.closed = False
+
+    async def __aiter__(self):
+        for row in self._rows:
+            yield row
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Serves canned rows and records the statements it was given."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self.streams = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return _Result(self.rows[:stmt._limit])
+
+    async def stream(self, stmt):
+        self.statements.append(stmt)
+        limit = stmt._limit if stmt._limit is not None else len(self.rows)
+        stream = _Stream(self.rows[:limit])
+        self.streams.append(stream)
+        return stream
+
+
+class TestCursor:
+
+    def test_round_trip(self):
+        log_id = uuid4()
+        cursor = encode_log_cursor(T0, log_id)
+        assert decode_log_cursor(cursor) == (T0, log_id)
+        assert "=" not in cursor and "/" not in cursor
+
+    @pytest.mark.parametrize("garbage", ["", "!!!", "bm90LWEtY3Vyc29y", encode_log_cursor(T0, "x")])
+    def test_garbage_rejected(self, garbage):
+        with pytest.raises(ValueError):
+            decode_log_cursor(garbage)
+
+
+class TestQuery:
+
+    def test_ordering_and_index_friendly_bounds(self):
+        sql = _compile(logs_keyset_query(after=(T0, uuid4()), attacker_ip="1.2.3.4"))
+        assert "ORDER BY honeypot_logs.timestamp DESC, honeypot_logs.id DESC" in sql
+        assert "honeypot_logs.attacker_ip = $1" in sql
+        # Plain bound (index range start) plus the tie-breaking row comparison
+        assert "honeypot_logs.timestamp <= $2" in sql
+        assert "(honeypot_logs.timestamp, honeypot_logs.id) < ($3::TIMESTAMP WITH TIME ZONE, $4::UUID)" in sql
+        assert "OFFSET" not in sql
+
+    def test_first_page_has_no_bound(self):
+        sql = _compile(logs_keyset_query())
+        assert "WHERE" not in sql
+
+
+class TestPages:
+
+    async def test_next_cursor_points_at_last_row(self):
+        logs = [_log(i) for i in range(5)]
+        session = FakeSession(logs)
+
+        page, next_cursor = await get_honeypot_logs_page(session, limit=3)
+        assert page == logs[:3]
+        assert decode_log_cursor(next_cursor) == (logs[2].timestamp, logs[2].id)
+        assert session.statements[0]._limit == 4
+
+    async def test_last_page_has_no_cursor(self):
+        session = FakeSession([_log(i) for i in range(3)])
+        page, next_cursor = await get_honeypot_logs_page(session, limit=3)
+        assert len(page) == 3 and next_cursor is None
+
+
+class FakeDB:
+    def __init__(self, session):
+        self.connected = True
+        self._session = session
+
+    @asynccontextmanager
+    async def _factory(self):
+        yield self._session
+
+    @property
+    def session_factory(self):
+        return self._factory
+
+
+class TestStreaming:
+
+    async def test_streams_rows_from_server_side_cursor(self, monkeypatch):
+        session = FakeSession([_log(i) for i in range(4)])
+        monkeypatch.setattr(database, "db", FakeDB(session))
+
+        items = [item async for item in database.stream_attack_logs(ip_address="10.0.0.1")]
+
+        assert [item["raw_input"] for item in items] == ["cmd0", "cmd1", "cmd2", "cmd3"]
+        stmt = session.statements[0]
+        assert stmt.get_execution_options()["yield_per"] == 500
+        assert session.streams[0].closed
+
+    async def test_limit_appends_resume_cursor(self, monkeypatch):
+        logs = [_log(i) for i in range(4)]
+        session = FakeSession(logs)
+        monkeypatch.setattr(database, "db", FakeDB(session))
+
+        items = [item async for item in database.stream_attack_logs(limit=2)]
+
+        assert len(items) == 3
+        assert decode_log_cursor(items[-1]["next_cursor"]) == (logs[1].timestamp, logs[1].id)
+
+    async def test_disconnected_database_streams_nothing(self, monkeypatch):
+        monkeypatch.setattr(database, "db", SimpleNamespace(connected=False, session_factory=None))
+        assert [item async for item in database.stream_attack_logs()] == []
@@ -0,0 +1,213 @@
+"""
+Write-Behind HoneypotLog Writer — Test Suite
+=============================================
+Exercises src/core/log_writer.py with an in-memory insert function:
+size/time flush triggers, backpressure, durable disk spill while the
+database is down, replay once it is back, and drain on shutdown.
+
+Run:  pytest tests/test_log_writer.py -v
+"""
+
+import sys
+import os
+import asyncio
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.log_writer import HoneypotLogWriter, _BadRows, _NoDatabase
+
+
+class FakeTable:
+    """Collects inserted batches; can be switched off to simulate an outage."""
+
+    def __init__(self):
+        self.batches = []
+        self.down = False
+        self.reject = False
+        self.absent = False
+        self.delay = 0.0
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+    async def insert(self, rows):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.absent:
+            raise _NoDatabase("PostgreSQL not connected")
+        if self.down:
+            raise ConnectionError("postgres down")
+        if self.reject:
+            raise _BadRows("value too long")
+        self.batches.append(list(rows))
+
+
+@pytest.fixture
+def table():
+    return FakeTable()
+
+
+def _writer(table, tmp_path, **kwargs):
+    options = dict(batch_size=10, flush_interval_ms=20, spill_dir=str(tmp_path / "spill"))
+    options.update(kwargs)
+    return HoneypotLogWriter(insert_fn=table.insert, **options)
+
+
+async def _submit(writer, n, prefix="cmd"):
+    return [
+        await writer.submit(attacker_ip="10.0.0.1", command_entered=f"{prefix}{i}", response_sent="ok")
+        for i in range(n)
+    ]
+
+
+class TestBatching:
+
+    async def test_submit_returns_without_waiting_for_db(self, table, tmp_path):
+        writer = _writer(table, tmp_path, flush_interval_ms=1000)
+        log_id = await writer.submit(attacker_ip="1.2.3.4", command_entered="id", response_sent="uid=0")
+        assert len(log_id) == 36
+        assert table.batches == []
+        await writer.stop()
+        assert table.rows[0]["id"] == log_id
+
+    async def test_size_trigger_writes_full_batches(self, table, tmp_path):
+        writer = _writer(table, tmp_path, flush_interval_ms=1000)
+        await _submit(writer, 25)
+        await asyncio.sleep(0.05)
+        assert [len(b) for b in table.batches] == [10, 10]
+        await writer.stop()
+        assert len(table.rows) == 25
+
+    async def test_time_trigger_flushes_partial_batch(self, table, tmp_path):
+        writer = _writer(table, tmp_path, flush_interval_ms=10)
+        await _submit(writer, 3)
+        await asyncio.sleep(0.1)
+        assert [len(b) for b in table.batches] == [3]
+        await writer.stop()
+
+    async def test_rows_keep_submission_order_and_fields(self, table, tmp_path):
+        writer = _writer(table, tmp_path)
+        await writer.submit(
+            attacker_ip="5.5.5.5", command_entered="ls", response_sent="x",
+            metadata={"hash": "abc"}, tenant_id="t-1",
+        )
+        await _submit(writer, 3)
+        await writer.stop()
+
+        first = table.rows[0]
+        assert first["metadata"] == {"hash": "abc"}
+        assert first["tenant_id"] == "t-1"
+        assert first["timestamp"].tzinfo is not None
+        assert [r["command_entered"] for r in table.rows[1:]] == ["cmd0", "cmd1", "cmd2"]
+
+
+class TestBackpressureAndSpill:
+
+    async def test_full_queue_spills_instead_of_blocking(self, table, tmp_path):
+        writer = _writer(table, tmp_path, batch_size=1, max_queue_size=2, enqueue_timeout=0.01)
+        table.delay = 0.2                # slow database: the worker falls behind
+        await _submit(writer, 10)
+        assert writer.stats["backpressure_waits"] > 0
+        assert writer.stats["spilled"] > 0
+
+        table.delay = 0
+        await writer.stop()
+        assert sorted(r["command_entered"] for r in table.rows) == sorted(f"cmd{i}" for i in range(10))
+
+    async def test_outage_spills_to_disk_and_replays(self, table, tmp_path):
+        writer = _writer(table, tmp_path)
+        table.down = True
+        ids = await _submit(writer, 5)
+        await asyncio.sleep(0.05)
+        assert writer.get_stats()["spill_files"] >= 1
+        assert table.rows == []
+
+        table.down = False
+        await _submit(writer, 1, prefix="after")
+        await asyncio.sleep(0.1)
+        assert set(ids) <= {r["id"] for r in table.rows}
+        assert writer.get_stats()["spill_files"] == 0
+        assert writer.stats["replayed"] == 5
+        await writer.stop()
+
+    async def test_spill_survives_restart(self, table, tmp_path):
+        writer = _writer(table, tmp_path)
+        table.down = True
+        ids = await _submit(writer, 4)
+        await writer.stop()
+        assert table.rows == []
+
+        table.down = False
+        restarted = _writer(table, tmp_path)
+        assert await restarted.replay_spill() == 4
+        assert [r["id"] for r in table.rows] == ids
+        assert table.rows[0]["timestamp"].tzinfo is not None
+
+    async def test_rejected_batches_are_quarantined(self, table, tmp_path):
+        writer = _writer(table, tmp_path)
+        table.reject = True
+        await _submit(writer, 3)
+        await writer.stop()
+
+        assert writer.stats["rejected"] == 3
+        assert writer.get_stats()["spill_files"] == 0
+        assert len(list((tmp_path / "spill").glob("*.rejected"))) == 1
+
+
+    async def test_timer_replays_without_new_writes(self, table, tmp_path):
+        writer = _writer(table, tmp_path, replay_interval=0.02)
+        table.down = True
+        ids = await _submit(writer, 3)
+        await asyncio.sleep(0.05)
+        assert writer.get_stats()["spill_files"] >= 1
+
+        table.down = False                # no further submits
+        await asyncio.sleep(0.2)
+        assert [r["id"] for r in table.rows] == ids
+        assert writer.get_stats()["spill_files"] == 0
+        await writer.stop()
+
+    async def test_spill_dir_is_capped(self, table, tmp_path):
+        writer = _writer(table, tmp_path, batch_size=1, max_spill_files=3, replay_interval=60)
+        table.down = True
+        for i in range(6):
+            await _submit(writer, 1, prefix=f"c{i}-")
+            await asyncio.sleep(0.02)
+        await writer.stop()
+
+        assert writer.get_stats()["spill_files"] == 3
+        assert writer.stats["spill_dropped_files"] == 3
+        assert writer.stats["spill_dropped_rows"] == 3
+
+        table.down = False
+        assert await _writer(table, tmp_path).replay_spill() == 3
+        assert [r["command_entered"] for r in table.rows] == ["c3-0", "c4-0", "c5-0"]
+
+    async def test_no_database_does_not_spill(self, table, tmp_path):
+        writer = _writer(table, tmp_path)
+        table.absent = True
+        await _submit(writer, 5)
+        await writer.stop()
+        assert writer.stats["unpersisted"] == 5
+        assert writer.stats["spilled"] == 0
+        assert not (tmp_path / "spill").exists()
+
+
+class TestShutdown:
+
+    async def test_stop_drains_everything_queued(self, table, tmp_path):
+        writer = _writer(table, tmp_path, batch_size=1000, flush_interval_ms=10_000)
+        await _submit(writer, 50)
+        await writer.stop()
+        assert len(table.rows) == 50
+        assert writer.get_stats()["queue_depth"] == 0
+
+    async def test_stop_mid_collection_loses_nothing(self, table, tmp_path):
+        writer = _writer(table, tmp_path, batch_size=100, flush_interval_ms=10_000)
+        await _submit(writer, 7)
+        await asyncio.sleep(0.01)       # worker is now waiting for more rows
+        await writer.stop()
+        assert len(table.rows) == 7
@@ -0,0 +1,129 @@
+"""
+Append-only Merkle Accumulator — Test Suite
+============================================
+Checks MerkleAccumulator in src/utils/integrity.py against the full
+MerkleTree for every size up to a few hundred leaves, checkpoint
+restore, and its use in BlockchainLogger (non-mutating root helper,
+O(1) chain root, incremental chain verification).
+
+Run:  pytest tests/test_merkle_accumulator.py -v
+"""
+
+import sys
+import os
+import hashlib
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.integrity import MerkleAccumulator, MerkleLogger, MerkleTree, hash_pair
+from src.utils.blockchain_logger import BlockchainLogger
+
+
+def _leaves(n):
+    return [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)]
+
+
+def _reference_root(hashes):
+    """The original recursive duplicate-last construction."""
+    if not hashes:
+        return None
+    level = list(hashes)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0]
+
+
+class TestAccumulator:
+
+    def test_matches_reference_for_every_size(self):
+        leaves = _leaves(300)
+        acc = MerkleAccumulator()
+        assert acc.root() is None
+        for n, leaf in enumerate(leaves, start=1):
+            acc.append(leaf)
+            assert acc.root() == _reference_root(leaves[:n]), n
+
+    def test_matches_merkle_tree(self):
+        entries = [{"id": i, "command_entered": f"cmd{i}"} for i in range(37)]
+        tree = MerkleTree(entries)
+        assert MerkleAccumulator.from_leaves(tree.leaf_hashes).root() == tree.root_hash
+
+    def test_frontier_is_logarithmic(self):
+        acc = MerkleAccumulator.from_leaves(_leaves(1000))
+        assert len(acc.frontier) == (1000).bit_length()
+        assert sum(f is not None for f in acc.frontier) == bin(1000).count("1")
+
+    def test_snapshot_restore_continues(self):
+        leaves = _leaves(50)
+        acc = MerkleAccumulator.from_leaves(leaves[:21])
+        restored = MerkleAccumulator(**acc.snapshot())
+        for leaf in leaves[21:]:
+            restored.append(leaf)
+        assert restored.root() == _reference_root(leaves)
+
+    def test_inconsistent_frontier_rejected(self):
+        with pytest.raises(ValueError):
+            MerkleAccumulator(size=3, frontier=["a", None])
+
+    def test_merkle_logger_root_without_tree_build(self):
+        merkle = MerkleLogger()
+        for i in range(9):
+            merkle.add_log({"id": i})
+        assert merkle.root_hash == MerkleTree(merkle.logs).root_hash
+        assert merkle._tree is None
+
+
+class TestBlockchainLogger:
+
+    def test_calculate_merkle_root_does_not_mutate(self):
+        hashes = _leaves(5)
+        copy = list(hashes)
+        assert BlockchainLogger().calculate_merkle_root(hashes) == _reference_root(copy)
+        assert hashes == copy
+
+    def test_chain_root_tracks_appends(self):
+        chain = BlockchainLogger()
+        assert chain.get_merkle_root() is None
+        for i in range(7):
+            chain.add_block({"n": i})
+            assert chain.get_merkle_root() == _reference_root([b["hash"] for b in chain.chain])
+
+    def test_incremental_verification_only_rehashes_new_blocks(self, monkeypatch):
+        chain = BlockchainLogger()
+        for i in range(10):
+            chain.add_block({"n": i})
+        assert chain.verify_chain_integrity()
+
+        calls = []
+        original = chain.calculate_hash
+        monkeypatch.setattr(chain, "calculate_hash", lambda d, p: calls.append(d) or original(d, p))
+        for i in range(10, 13):
+            chain.add_block({"n": i})
+        calls.clear()
+        assert chain.verify_chain_integrity()
+        assert calls == [{"n": 10}, {"n": 11}, {"n": 12}]
+
+    def test_tampering_detected(self):
+        chain = BlockchainLogger()
+        for i in range(5):
+            chain.add_block({"n": i})
+        assert chain.verify_chain_integrity()
+
+        chain.chain[2]["data"]["n"] = 99
+        chain.add_block({"n": 5})
+        # Incremental pass only covers the new block …
+        assert chain.verify_chain_integrity()
+        # … a full pass catches the edited one
+        assert not chain.verify_chain_integrity(full=True)
+
+    def test_replaced_checkpoint_block_detected(self):
+        chain = BlockchainLogger()
+        for i in range(4):
+            chain.add_block({"n": i})
+        assert chain.verify_chain_integrity()
+        chain.chain[-1] = dict(chain.chain[-1], hash="f" * 64)
+        assert not chain.verify_chain_integrity()
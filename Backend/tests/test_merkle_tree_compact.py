@@ -0,0 +1,104 @@
+"""
+Compact Array-Backed MerkleTree — Test Suite
+=============================================
+Checks the level-buffer MerkleTree in src/utils/integrity.py: roots and
+proofs identical to the hex ``hash_pair`` construction, 32 bytes per
+node, mmap-backed storage, and the nested ``to_dict`` shape.
+
+Run:  pytest tests/test_merkle_tree_compact.py -v
+"""
+
+import sys
+import os
+import hashlib
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.integrity import (
+    DIGEST_SIZE,
+    MerkleLogger,
+    MerkleTree,
+    hash_log_entry,
+    hash_pair,
+)
+
+
+def _leaves(n):
+    return [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)]
+
+
+def _reference_levels(hashes):
+    levels = [list(hashes)]
+    while len(levels[-1]) > 1:
+        level = list(levels[-1])
+        if len(level) % 2:
+            level.append(level[-1])
+        levels.append([hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)])
+    return levels
+
+
+class TestCompactTree:
+
+    @pytest.mark.parametrize("n", [1, 2, 3, 5, 8, 13, 64, 100])
+    def test_root_matches_hex_construction(self, n):
+        hashes = _leaves(n)
+        assert MerkleTree.from_hashes(hashes).root_hash == _reference_levels(hashes)[-1][0]
+
+    def test_entries_hash_like_before(self):
+        entries = [{"id": i, "command_entered": f"cmd{i}"} for i in range(7)]
+        tree = MerkleTree(entries)
+        assert tree.leaf_hashes == [hash_log_entry(e) for e in entries]
+        assert tree.root_hash == MerkleTree.from_hashes(tree.leaf_hashes).root_hash
+
+    def test_binary_digests_accepted(self):
+        hashes = _leaves(9)
+        digests = [bytes.fromhex(h) for h in hashes]
+        assert MerkleTree.from_hashes(digests).root_hash == MerkleTree.from_hashes(hashes).root_hash
+
+    def test_every_proof_verifies(self):
+        hashes = _leaves(37)
+        tree = MerkleTree.from_hashes(hashes)
+        for i, leaf in enumerate(hashes):
+            proof = tree.get_proof(i)
+            assert len(proof) == len(tree.levels) - 1
+            assert MerkleTree.verify_proof(leaf, proof, tree.root_hash)
+        assert not MerkleTree.verify_proof(hashes[0], tree.get_proof(1), tree.root_hash)
+        assert tree.get_proof(37) == []
+
+    def test_storage_is_32_bytes_per_node(self):
+        tree = MerkleTree.from_hashes(_leaves(1000))
+        nodes = sum(len(level) for level in _reference_levels(_leaves(1000)))
+        assert tree.nbytes == nodes * DIGEST_SIZE
+        assert len(tree) == 1000
+
+    def test_mmap_storage(self, tmp_path):
+        path = tmp_path / "tree.bin"
+        hashes = _leaves(50)
+        tree = MerkleTree.from_hashes(hashes, storage_path=str(path))
+        assert path.stat().st_size == tree.nbytes
+        assert tree.root_hash == MerkleTree.from_hashes(hashes).root_hash
+        assert MerkleTree.verify_proof(hashes[7], tree.get_proof(7), tree.root_hash)
+        tree.close()
+        assert tree.root_hash is None
+
+    def test_to_dict_duplicates_odd_node(self):
+        hashes = _leaves(3)
+        data = MerkleTree.from_hashes(hashes).to_dict()
+        right = data["tree"]["right"]
+        assert right["left"]["hash"] == hashes[2]
+        assert right["right"] == {"hash": hashes[2], "is_leaf": True}
+        assert data["leaf_count"] == 3
+
+    def test_empty_tree(self):
+        tree = MerkleTree([])
+        assert tree.root_hash is None and tree.root is None
+        assert tree.to_dict()["tree"] is None
+
+    def test_merkle_logger_proofs(self):
+        merkle = MerkleLogger()
+        logs = [{"id": i} for i in range(6)]
+        merkle.add_logs(logs)
+        proof = merkle.get_proof_for_log(4)
+        assert merkle.verify_log(logs[4], proof, merkle.root_hash)
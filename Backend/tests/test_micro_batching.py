@@ -0,0 +1,134 @@
+"""
+Micro-Batching Front-End — Test Suite
+======================================
+Validates request coalescing in src/ml_engine/batching.py: batches are
+bounded by size and wait time, every caller receives its own result, and
+batch-size / queue-wait histograms are recorded.
+
+Run:  pytest tests/test_micro_batching.py -v
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ml_engine.batching import MicroBatcher
+from src.utils.metrics import Histogram
+
+
+class RecordingBatchFn:
+    """Fake model: scores each string by its length and records batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        self.threads.add(threading.get_ident())
+        return [len(item) / 100.0 for item in items]
+
+
+class TestMicroBatcher:
+
+    async def test_single_request_round_trip(self):
+        fn = RecordingBatchFn()
+        batcher = MicroBatcher(fn, max_batch_size=8, max_wait_ms=1)
+        assert await batcher.submit("whoami") == pytest.approx(0.06)
+        await batcher.close()
+
+    async def test_concurrent_requests_are_coalesced(self):
+        fn = RecordingBatchFn()
+        batcher = MicroBatcher(fn, max_batch_size=64, max_wait_ms=50)
+        commands = [f"cmd-{i:03d}" for i in range(20)]
+
+        results = await asyncio.gather(*(batcher.submit(c) for c in commands))
+
+        assert results == [len(c) / 100.0 for c in commands]
+        assert len(fn.batches) == 1
+        assert fn.batches[0] == commands
+        await batcher.close()
+
+    async def test_batches_bounded_by_max_size(self):
+        fn = RecordingBatchFn()
+        batcher = MicroBatcher(fn, max_batch_size=4, max_wait_ms=50)
+
+        await asyncio.gather(*(batcher.submit("x" * i) for i in range(10)))
+
+        assert all(len(batch) <= 4 for batch in fn.batches)
+        assert sum(len(batch) for batch in fn.batches) == 10
+        await batcher.close()
+
+    async def test_batch_runs_off_event_loop_thread(self):
+        fn = RecordingBatchFn()
+        batcher = MicroBatcher(fn, max_batch_size=4, max_wait_ms=1)
+        await batcher.submit("id")
+        assert threading.get_ident() not in fn.threads
+        await batcher.close()
+
+    async def test_max_wait_flushes_partial_batch(self):
+        fn = RecordingBatchFn()
+        batcher = MicroBatcher(fn, max_batch_size=1000, max_wait_ms=5)
+        result = await asyncio.wait_for(batcher.submit("ls"), timeout=1.0)
+        assert result == pytest.approx(0.02)
+        await batcher.close()
+
+    async def test_errors_propagate_to_every_caller(self):
+        def broken(items):
+            raise ValueError("model exploded")
+
+        batcher = MicroBatcher(broken, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(
+            batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+        assert batcher.stats["errors"] >= 1
+
+        # Worker survives a failed batch
+        batcher.batch_fn = RecordingBatchFn()
+        assert await batcher.submit("abc") == pytest.approx(0.03)
+        await batcher.close()
+
+    async def test_histograms_recorded(self):
+        fn = RecordingBatchFn()
+        batcher = MicroBatcher(fn, max_batch_size=16, max_wait_ms=20)
+        await asyncio.gather(*(batcher.submit("ping") for _ in range(8)))
+
+        stats = batcher.get_stats()
+        assert stats["requests"] == 8
+        assert stats["batch_size"]["count"] == stats["batches"]
+        assert stats["queue_wait_ms"]["count"] == 8
+        assert stats["batch_size"]["max"] == 8
+        await batcher.close()
+
+    def test_invalid_configuration_rejected(self):
+        with pytest.raises(ValueError):
+            MicroBatcher(RecordingBatchFn(), max_batch_size=0)
+        with pytest.raises(ValueError):
+            MicroBatcher(RecordingBatchFn(), max_wait_ms=-1)
+
+
+class TestHistogram:
+
+    def test_bucket_counts_and_quantiles(self):
+        hist = Histogram("latency_ms", [1, 5, 10])
+        for value in (0.5, 2, 3, 7, 50):
+            hist.observe(value)
+
+        snap = hist.snapshot()
+        assert snap["count"] == 5
+        assert snap["buckets"] == {"le_1": 1, "le_5": 2, "le_10": 1, "le_inf": 1}
+        assert snap["p50"] == 5
+        assert snap["p99"] == 50
+        assert snap["max"] == 50
+
+    def test_empty_histogram(self):
+        snap = Histogram("empty", [1]).snapshot()
+        assert snap["count"] == 0
+        assert snap["p50"] is None
+        assert snap["mean"] is None
@@ -0,0 +1,143 @@
+"""
+TC-PSO Optimizer Service — Test Suite
+======================================
+Exercises src/optimization/optimizer_service.py: the immutable delay
+snapshot read by request handlers, batched application of queued
+session outcomes on one task, dropping on a full queue, draining on
+shutdown, and the deception layer only feeding the swarm when
+TC_PSO_LEARN_FROM_REQUESTS is on.
+
+Run:  pytest tests/test_optimizer_service.py -v
+"""
+
+import sys
+import os
+import asyncio
+import random
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.optimization.meta_heuristics import SessionTracker, ThreatCalibratedPSO
+from src.optimization.optimizer_service import DEFAULT_DELAY, SessionOutcome, TarpitOptimizerService
+
+
+def _outcomes(n, seed=5):
+    rng = random.Random(seed)
+    return [
+        SessionOutcome(rng.choice(["SQLI", "xss", "TENANT3_RCE"]), rng.uniform(0.5, 12.0),
+                       rng.randint(0, 12), rng.random() < 0.2, anomaly_score=rng.random())
+        for _ in range(n)
+    ]
+
+
+class TestDelaySnapshot:
+
+    @pytest.mark.asyncio
+    async def test_snapshot_matches_optimizer_and_is_read_only(self):
+        pso = ThreatCalibratedPSO()
+        service = TarpitOptimizerService(pso)
+        assert service.get_delay("sqli") == await pso.get_optimal_delay("SQLI")
+        assert service.get_delay("UNSEEN") == DEFAULT_DELAY
+        with pytest.raises(TypeError):
+            service.delays["SQLI"] = 1.0
+
+    @pytest.mark.asyncio
+    async def test_submit_leaves_swarm_untouched_until_batch_runs(self):
+        pso = ThreatCalibratedPSO()
+        service = TarpitOptimizerService(pso, batch_size=100, flush_interval_ms=10)
+        before = service.delays
+        assert service.submit(SessionOutcome("SQLI", 3.0, 10, False, anomaly_score=0.9))
+        assert pso.iteration_count["SQLI"] == 0 and service.delays is before
+
+        await asyncio.sleep(0.05)
+        assert pso.iteration_count["SQLI"] == 1
+        assert service.delays is not before
+        assert service.get_delay("SQLI") == pso.global_best["SQLI"][0]
+        await service.stop()
+
+
+class TestBatching:
+
+    @pytest.mark.asyncio
+    async def test_batches_apply_in_order_like_direct_updates(self):
+        outcomes = _outcomes(40)
+
+        random.seed(9)
+        direct = ThreatCalibratedPSO()
+        for o in outcomes:
+            await direct.update_fitness(o.attack_category, o.delay_used, o.commands_executed,
+                                        o.dropped, bilstm_anomaly_score=o.anomaly_score)
+
+        random.seed(9)
+        service = TarpitOptimizerService(ThreatCalibratedPSO(), batch_size=16, flush_interval_ms=5)
+        for o in outcomes:
+            service.submit(o)
+        await asyncio.sleep(0.05)
+        assert service.stats["applied"] == 40 and service.stats["batches"] == 3
+        assert service.optimizer.global_best == direct.global_best
+        await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_and_stop_drains(self):
+        pso = ThreatCalibratedPSO()
+        service = TarpitOptimizerService(pso, batch_size=4, max_queue_size=5)
+        accepted = [service.submit(o) for o in _outcomes(8)]
+        assert accepted == [True] * 5 + [False] * 3
+        assert service.stats["dropped"] == 3
+
+        await service.stop()
+        assert service.stats["applied"] == 5
+        assert sum(pso.iteration_count.values()) == 5
+        assert service.get_stats()["queue_depth"] == 0
+
+
+class TestDeceptionLayer:
+
+    @pytest.fixture
+    def handler(self, monkeypatch):
+        from src.api import main
+
+        submitted = []
+        service = TarpitOptimizerService(ThreatCalibratedPSO())
+        monkeypatch.setattr(service, "get_delay", lambda category: 0.0)
+        monkeypatch.setattr(service, "submit", submitted.append)
+        monkeypatch.setattr(main, "optimizer_service", service)
+        monkeypatch.setattr(main, "session_tracker", SessionTracker())
+
+        async def ignore(*args, **kwargs):
+            return None
+
+        monkeypatch.setattr(main, "log_attack", ignore)
+        monkeypatch.setattr(main.log_writer, "submit", ignore)
+        return main, submitted
+
+    async def _hit(self, main):
+        request_data = {"ip_address": "10.0.0.1", "attack_category": "SQLI", "action": "login"}
+        return await main.handle_deception_layer("' OR 1=1 --", request_data)
+
+    async def test_outcomes_not_learned_by_default(self, handler):
+        main, submitted = handler
+        assert not main.settings.TC_PSO_LEARN_FROM_REQUESTS
+        response = await self._hit(main)
+        assert response.status_code == 200
+        assert submitted == []
+        assert main.session_tracker.sessions == {}
+
+    async def test_outcomes_queued_when_enabled(self, handler, monkeypatch):
+        main, submitted = handler
+        monkeypatch.setattr(main.settings, "TC_PSO_LEARN_FROM_REQUESTS", True)
+        await self._hit(main)
+        assert [(o.attack_category, o.dropped) for o in submitted] == [("SQLI", False)]
+        assert main.session_tracker.sessions == {}
+
+    def test_ended_sessions_are_dropped(self):
+        tracker = SessionTracker()
+        tracker.create_session("s1", "SQLI", 1.0)
+        tracker.record_command("s1")
+        session = tracker.end_session("s1")
+        assert session.ended and session.commands_executed == 1
+        assert tracker.sessions == {}
+        assert tracker.end_session("s1") is None
+
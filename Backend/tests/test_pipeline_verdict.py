@@ -0,0 +1,185 @@
+"""
+Two-Stage Pipeline Verdict — Test Suite
+========================================
+Validates the structured PipelineVerdict returned by
+src/api/pipeline.py::evaluate_payload: deciding stage, per-stage timings,
+the heuristic classification carried along, verdict reconciliation, and
+the LRU+TTL verdict cache in front of the pipeline.
+
+Run:  pytest tests/test_pipeline_verdict.py -v
+"""
+
+import sys
+import os
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api import pipeline
+from src.api.pipeline import (
+    PipelineVerdict,
+    STAGE_HEURISTIC,
+    STAGE_MLX,
+    STAGE_MLX_FALLBACK,
+    evaluate_payload,
+)
+from src.core.models import AttackType, ClassificationResult
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch, tmp_path):
+    """Isolate every test behind its own small verdict cache."""
+    cache = pipeline.VerdictCache(
+        max_entries=2, ttl_seconds=60, model_dir=tmp_path, check_interval=0,
+    )
+    monkeypatch.setattr(pipeline, "verdict_cache", cache)
+    monkeypatch.setattr(pipeline.settings, "VERDICT_CACHE_ENABLED", True)
+    return cache
+
+
+@pytest.fixture
+def mlx_calls(monkeypatch):
+    """Replace MLX inference with a recorder returning a fixed verdict."""
+    calls = []
+
+    async def fake_infer(payload):
+        calls.append(payload)
+        return "ALLOW"
+
+    monkeypatch.setattr(pipeline.mlx_model, "infer", fake_infer)
+    return calls
+
+
+class TestEvaluatePayload:
+
+    async def test_benign_decided_by_heuristic(self, mlx_calls):
+        result = await evaluate_payload("ls -la")
+        assert result.verdict == "ALLOW"
+        assert result.stage == STAGE_HEURISTIC
+        assert result.classification.attack_type == AttackType.BENIGN
+        assert set(result.timings_ms) == {STAGE_HEURISTIC}
+        assert mlx_calls == []
+
+    async def test_high_confidence_attack_decided_by_heuristic(self, mlx_calls):
+        result = await evaluate_payload("<script>alert(1)</script>")
+        assert result.verdict == "BLOCK"
+        assert result.is_malicious
+        assert result.stage == STAGE_HEURISTIC
+        assert result.classification.attack_type == AttackType.XSS
+        assert mlx_calls == []
+
+    async def test_moderate_confidence_goes_to_mlx(self, mlx_calls):
+        result = await evaluate_payload("password1")
+        assert result.stage == STAGE_MLX
+        assert result.verdict == "ALLOW"
+        assert result.classification.attack_type == AttackType.BRUTE_FORCE
+        assert set(result.timings_ms) == {STAGE_HEURISTIC, STAGE_MLX}
+        assert mlx_calls == ["password1"]
+
+    async def test_mlx_failure_falls_back_to_block(self, monkeypatch):
+        async def broken(payload):
+            raise RuntimeError("metal crashed")
+
+        monkeypatch.setattr(pipeline.mlx_model, "infer", broken)
+        result = await evaluate_payload("password1")
+        assert result.verdict == "BLOCK"
+        assert result.stage == STAGE_MLX_FALLBACK
+
+    async def test_heuristic_runs_once_per_request(self, monkeypatch, mlx_calls):
+        calls = []
+        original = pipeline.classifier.classify
+
+        def counting(text):
+            calls.append(text)
+            return original(text)
+
+        monkeypatch.setattr(pipeline.classifier, "classify", counting)
+        await evaluate_payload("password1")
+        assert calls == ["password1"]
+
+
+class TestToClassification:
+
+    def _verdict(self, verdict, attack_type):
+        classification = ClassificationResult(
+            attack_type=attack_type, confidence=0.75,
+            is_malicious=attack_type != AttackType.BENIGN,
+        )
+        return PipelineVerdict(verdict, classification, STAGE_MLX)
+
+    def test_blocked_benign_uses_fallback_type(self):
+        result = self._verdict("BLOCK", AttackType.BENIGN)
+        reconciled = result.to_classification(fallback_type=AttackType.BRUTE_FORCE)
+        assert reconciled.attack_type == AttackType.BRUTE_FORCE
+        assert reconciled.is_malicious is True
+        assert reconciled.confidence == 0.99
+
+    def test_allowed_attack_keeps_type_but_not_malicious(self):
+        reconciled = self._verdict("ALLOW", AttackType.BRUTE_FORCE).to_classification()
+        assert reconciled.attack_type == AttackType.BRUTE_FORCE
+        assert reconciled.is_malicious is False
+        assert reconciled.confidence == 0.01
+
+    def test_returns_copy(self):
+        result = self._verdict("BLOCK", AttackType.SQLI)
+        result.to_classification().attack_type = AttackType.XSS
+        assert result.classification.attack_type == AttackType.SQLI
+
+
+class TestVerdictCache:
+
+    async def test_repeat_payload_skips_mlx(self, fresh_cache, mlx_calls):
+        first = await evaluate_payload("password1")
+        second = await evaluate_payload("password1")
+
+        assert mlx_calls == ["password1"]
+        assert not first.cache_hit
+        assert second.cache_hit
+        assert second.stage == STAGE_MLX
+        assert second.verdict == first.verdict
+        assert set(second.timings_ms) == {"cache"}
+        assert fresh_cache.get_stats()["hits"] == 1
+
+    async def test_hit_returns_independent_copy(self, fresh_cache, mlx_calls):
+        first = await evaluate_payload("password1")
+        first.classification.attack_type = AttackType.XSS
+        second = await evaluate_payload("password1")
+        assert second.classification.attack_type == AttackType.BRUTE_FORCE
+
+    async def test_key_is_exact_payload(self, fresh_cache, mlx_calls):
+        await evaluate_payload("password1")
+        await evaluate_payload("password1 ")
+        assert mlx_calls == ["password1", "password1 "]
+
+    async def test_lru_eviction_counted(self, fresh_cache, mlx_calls):
+        for payload in ("ls", "pwd", "whoami"):
+            await evaluate_payload(payload)
+        assert fresh_cache.get_stats()["evictions"] == 1
+        assert fresh_cache.get_stats()["size"] == 2
+
+    async def test_mlx_fallback_not_cached(self, fresh_cache, monkeypatch):
+        async def broken(payload):
+            raise RuntimeError("metal crashed")
+
+        monkeypatch.setattr(pipeline.mlx_model, "infer", broken)
+        await evaluate_payload("password1")
+        assert fresh_cache.get("password1") is None
+
+    async def test_model_dir_change_invalidates(self, fresh_cache, mlx_calls, tmp_path):
+        await evaluate_payload("password1")
+        (tmp_path / "weights.safetensors").write_bytes(b"new model")
+        await evaluate_payload("password1")
+        assert mlx_calls == ["password1", "password1"]
+        assert fresh_cache.get_stats()["invalidations"] == 1
+
+    async def test_pattern_reload_invalidates_immediately(self, fresh_cache, mlx_calls):
+        fresh_cache.check_interval = 3600
+        engine = pipeline.heuristic_engine
+        await evaluate_payload("password1")
+        try:
+            engine.load(benign_patterns=engine.benign_patterns + (r"^noop$",))
+            await evaluate_payload("password1")
+        finally:
+            engine.load()
+        assert mlx_calls == ["password1", "password1"]
@@ -0,0 +1,138 @@
+"""
+Sliding-Window Rate Tracking — Test Suite
+==========================================
+Validates src/utils/rate_tracking.py (window expiry, per-key saturation,
+global key cap, idle sweeps) and the tarpit / login limiters built on it.
+
+Run:  pytest tests/test_rate_tracking.py -v
+"""
+
+import sys
+import os
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.config import settings
+from src.utils.login_rate_limiter import LoginRateLimiter
+from src.utils.rate_tracking import SlidingWindowCounter
+from src.utils.tarpit_manager import TarpitManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSlidingWindowCounter:
+
+    def test_events_expire_out_of_window(self):
+        clock = FakeClock()
+        counter = SlidingWindowCounter(10, clock=clock)
+        assert counter.record("a") == 1
+        clock.now = 5
+        assert counter.record("a") == 2
+        clock.now = 10
+        assert counter.count("a") == 1      # the t=0 event has left the window
+        clock.now = 15
+        assert counter.count("a") == 0
+        assert len(counter) == 0
+
+    def test_counts_saturate_at_per_key_cap(self):
+        counter = SlidingWindowCounter(60, max_events_per_key=4, clock=FakeClock())
+        counts = [counter.record("a") for _ in range(10)]
+        assert counts == [1, 2, 3, 4, 4, 4, 4, 4, 4, 4]
+
+    def test_key_cap_evicts_least_recently_touched(self):
+        clock = FakeClock()
+        counter = SlidingWindowCounter(60, max_keys=2, clock=clock)
+        counter.record("a")
+        counter.record("b")
+        counter.record("a")                 # "b" is now least recently touched
+        counter.record("c")
+        assert set(counter.keys()) == {"a", "c"}
+        assert counter.stats["evictions"] == 1
+
+    def test_sweep_drops_idle_keys_only(self):
+        clock = FakeClock()
+        counter = SlidingWindowCounter(10, sweep_interval=1000, clock=clock)
+        for ip in ("a", "b", "c"):
+            counter.record(ip)
+        clock.now = 8
+        counter.record("b")
+        clock.now = 12
+        assert counter.sweep() == 2
+        assert list(counter.keys()) == ["b"]
+
+    def test_sweep_runs_opportunistically(self):
+        clock = FakeClock()
+        counter = SlidingWindowCounter(5, sweep_interval=30, clock=clock)
+        for i in range(100):
+            counter.record(f"10.0.0.{i}")
+        clock.now = 31
+        counter.record("10.0.1.1")
+        assert len(counter) == 1
+        assert counter.stats["sweeps"] == 1 and counter.stats["expirations"] == 100
+
+
+class TestTarpitManager:
+
+    def test_delay_starts_after_threshold(self):
+        tarpit = TarpitManager(clock=FakeClock())
+        results = [tarpit.record_request("1.2.3.4") for _ in range(settings.TARPIT_THRESHOLD + 1)]
+        assert all(not tarpitted for tarpitted, _ in results[:-1])
+        tarpitted, delay = results[-1]
+        assert tarpitted and 0.0 < delay <= settings.TARPIT_DELAY_MAX
+
+    def test_flood_reaches_delay_cap(self):
+        tarpit = TarpitManager(clock=FakeClock())
+        for _ in range(500):
+            _, delay = tarpit.record_request("1.2.3.4")
+        assert delay == settings.TARPIT_DELAY_MAX
+
+    def test_sweep_forgets_idle_ips_and_lapsed_blocks(self):
+        clock = FakeClock()
+        tarpit = TarpitManager(sweep_interval=30, clock=clock)
+        for i in range(50):
+            tarpit.record_request(f"10.0.0.{i}")
+        tarpit.block_ip("10.9.9.9", -1)
+        tarpit.block_ip("10.8.8.8", 5)
+
+        clock.now = 61
+        stats = tarpit.get_stats()
+        assert stats["active_ips"] == 0
+        assert stats["blocked_ips"] == 1 and tarpit.is_blocked("10.8.8.8")
+
+
+class TestLoginRateLimiter:
+
+    def test_third_attempt_in_window_is_brute_force(self):
+        clock = FakeClock()
+        limiter = LoginRateLimiter(clock=clock)
+        assert not limiter.record_attempt("5.6.7.8")
+        assert not limiter.record_attempt("5.6.7.8")
+        assert not limiter.is_rate_limited("5.6.7.8")
+        assert limiter.record_attempt("5.6.7.8")
+        assert limiter.is_rate_limited("5.6.7.8")
+
+        clock.now = 21
+        assert not limiter.is_rate_limited("5.6.7.8")
+
+    def test_spaced_attempts_are_not_brute_force(self):
+        clock = FakeClock()
+        limiter = LoginRateLimiter(clock=clock)
+        for i in range(5):
+            clock.now = i * 15
+            assert not limiter.record_attempt("5.6.7.8")
+
+    def test_reset_clears_ip(self):
+        limiter = LoginRateLimiter(clock=FakeClock())
+        for _ in range(3):
+            limiter.record_attempt("5.6.7.8")
+        limiter.reset_attempts("5.6.7.8")
+        assert not limiter.is_rate_limited("5.6.7.8")
+        assert limiter.backend.active_keys("login_attempts") == 0
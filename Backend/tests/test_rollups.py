@@ -0,0 +1,241 @@
+"""
+Dashboard Rollups — Test Suite
+===============================
+Covers src/core/rollups.py: bucket keys and per-dimension increments,
+the log writer only rolling up rows its INSERT actually created (so
+spill replays never double count), dashboard reads served from
+``log_rollups`` instead of ``honeypot_logs``, and the backfill SQL.
+
+Run:  pytest tests/test_rollups.py -v
+"""
+
+import sys
+import os
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.dialects import postgresql
+
+from src.core import database_postgres, log_writer as log_writer_module
+from src.core.log_writer import HoneypotLogWriter
+from src.core.models_sqlalchemy import ATTACK_TYPE_SQL, IS_MALICIOUS_SQL
+from src.core.rollups import backfill_statement, bucket_start, rollup_deltas
+
+TS = datetime(2026, 10, 17, 12, 34, 56, 789, tzinfo=timezone.utc)
+
+
+def _row(ip="1.2.3.4", attack_type="SQLI", malicious=True, geo=None, ts=TS):
+    return {
+        "id": f"{ip}-{ts.isoformat()}",
+        "attacker_ip": ip,
+        "timestamp": ts,
+        "metadata": {
+            "classification": {"attack_type": attack_type, "is_malicious": malicious},
+            "geo_location": geo,
+        },
+    }
+
+
+def _compile(stmt):
+    return str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+
+
+class _Result:
+    def __init__(self, rows=(), rowcount=0):
+        self._rows = list(rows)
+        self.rowcount = rowcount
+
+    def all(self):
+        return self._rows
+
+    def scalar(self):
+        return self._rows[0][0] if self._rows else None
+
+    def scalars(self):
+        return _Result([row[0] for row in self._rows])
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class RecordingSession:
+    """Returns canned rows per query and records the compiled SQL."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.sql = []
+
+    async def execute(self, stmt):
+        self.sql.append(_compile(stmt))
+        return _Result(self.results.pop(0) if self.results else [])
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class TestDeltas:
+
+    def test_bucket_start_is_utc(self):
+        local = TS.astimezone(timezone(timedelta(hours=5, minutes=30)))
+        assert bucket_start(local, "minute") == datetime(2026, 10, 17, 12, 34, tzinfo=timezone.utc)
+        assert bucket_start(local, "hour") == datetime(2026, 10, 17, 12, tzinfo=timezone.utc)
+        with pytest.raises(ValueError):
+            bucket_start(TS, "day")
+
+    def test_one_increment_per_granularity_and_dimension(self):
+        geo = {"country": "US", "city": "Austin", "latitude": 30.2, "longitude": -97.7}
+        deltas = rollup_deltas([_row(geo=geo)])
+
+        assert len(deltas) == 6
+        keys = {(d["granularity"], d["dimension"], d["key"], d["sub_key"]) for d in deltas}
+        for granularity in ("minute", "hour"):
+            assert (granularity, "attack_type", "SQLI", "") in keys
+            assert (granularity, "ip", "1.2.3.4", "") in keys
+            assert (granularity, "country", "US", "Austin") in keys
+        country = next(d for d in deltas if d["dimension"] == "country")
+        assert (country["latitude"], country["longitude"]) == (30.2, -97.7)
+
+    def test_coordinates_are_kept_as_a_pair(self):
+        austin = {"country": "US", "city": "Austin", "latitude": 30.2, "longitude": -97.7}
+        partial = {"country": "US", "city": "Austin", "latitude": 99.0}
+        deltas = rollup_deltas([_row(geo=austin), _row(ts=TS + timedelta(seconds=1), geo=partial)])
+
+        country = next(d for d in deltas if d["dimension"] == "country")
+        assert country["count"] == 2
+        assert (country["latitude"], country["longitude"]) == (30.2, -97.7)
+
+    def test_rows_in_same_bucket_are_merged(self):
+        later = TS + timedelta(seconds=2)
+        deltas = rollup_deltas([_row(), _row(ts=later), _row(ip="5.6.7.8")])
+        ip_minutes = {d["key"]: d for d in deltas if d["granularity"] == "minute" and d["dimension"] == "ip"}
+
+        assert ip_minutes["1.2.3.4"]["count"] == 2
+        assert ip_minutes["1.2.3.4"]["last_seen"] == later
+        attack = next(d for d in deltas if d["granularity"] == "hour" and d["dimension"] == "attack_type")
+        assert attack["count"] == 3
+
+    def test_missing_fields_match_sql_semantics(self):
+        row = _row(attack_type=None, malicious="yes", geo={})
+        deltas = rollup_deltas([row])
+
+        assert {d["dimension"] for d in deltas} == {"attack_type", "ip"}
+        assert all(d["is_malicious"] is False for d in deltas)
+        assert next(d for d in deltas if d["dimension"] == "attack_type")["key"] == ""
+
+    def test_deltas_sorted_by_primary_key(self):
+        rows = [_row(ip=f"10.0.0.{i}", ts=TS + timedelta(minutes=i)) for i in (3, 1, 2)]
+        deltas = rollup_deltas(rows)
+        pks = [
+            (d["granularity"], d["bucket_start"], d["dimension"], d["key"], d["sub_key"], d["is_malicious"])
+            for d in deltas
+        ]
+        assert pks == sorted(pks)
+
+
+class FakeDB:
+    def __init__(self, session):
+        self.connected = True
+        self._session = session
+
+    @asynccontextmanager
+    async def _factory(self):
+        yield self._session
+
+    @property
+    def session_factory(self):
+        return self._factory
+
+
+class TestWriterHook:
+
+    @pytest.fixture
+    def applied(self, monkeypatch):
+        calls = []
+
+        async def fake_apply(session, rows):
+            calls.append(list(rows))
+            return len(rows)
+
+        async def fake_prune(session, before):
+            return 0
+
+        monkeypatch.setattr(log_writer_module, "apply_rollups", fake_apply)
+        monkeypatch.setattr(log_writer_module, "prune_minute_rollups", fake_prune)
+        return calls
+
+    async def test_only_newly_inserted_rows_are_rolled_up(self, monkeypatch, applied, tmp_path):
+        rows = [dict(_row(ip=f"10.0.0.{i}"), id=f"id-{i}", tenant_id="t") for i in range(3)]
+        # id-1 already existed (e.g. a replayed spill file): RETURNING omits it
+        session = RecordingSession([("id-0",), ("id-2",)])
+        monkeypatch.setattr(log_writer_module, "db", FakeDB(session))
+
+        writer = HoneypotLogWriter(spill_dir=str(tmp_path))
+        await writer._insert_rows(rows)
+
+        assert "RETURNING honeypot_logs.id" in session.sql[0]
+        assert [row["id"] for row in applied[0]] == ["id-0", "id-2"]
+        assert writer.stats["rollup_rows"] == 2
+
+    async def test_rollups_can_be_disabled(self, monkeypatch, applied, tmp_path):
+        session = RecordingSession([("id-0",)])
+        monkeypatch.setattr(log_writer_module, "db", FakeDB(session))
+
+        writer = HoneypotLogWriter(spill_dir=str(tmp_path), rollups=False)
+        await writer._insert_rows([dict(_row(), id="id-0", tenant_id="t")])
+        assert applied == []
+
+
+class TestDashboardReads:
+
+    async def test_dashboard_stats_read_rollups_not_logs(self):
+        session = RecordingSession(
+            [(True, "SQLI", 5), (False, "", 2)],
+            [("1.2.3.4", 5, TS)],
+            [("US", "", 30.2, -97.7, 5)],
+            [(3,)],
+            [],
+        )
+        stats = await database_postgres.get_dashboard_stats(session)
+
+        assert stats["total_attempts"] == 7
+        assert stats["malicious_attempts"] == 5
+        assert stats["attack_distribution"] == {"SQLI": 5}
+        assert stats["top_attackers"] == [{"ip": "1.2.3.4", "count": 5}]
+        assert stats["geo_locations"][0]["city"] is None
+        assert stats["flagged_ips_count"] == 3
+
+        for sql in session.sql[:3]:
+            assert "FROM log_rollups" in sql
+            assert "honeypot_logs" not in sql
+            assert re.search(r"log_rollups\.granularity = \$\d+", sql)
+
+
+class TestBackfill:
+
+    def test_statement_uses_same_expressions_as_indexes(self):
+        sql = str(backfill_statement("hour", "attack_type"))
+        assert "INSERT INTO log_rollups" in sql
+        assert f"COALESCE({ATTACK_TYPE_SQL}, '')" in sql
+        assert f"COALESCE({IS_MALICIOUS_SQL} = 'true', false)" in sql
+        assert "date_trunc('hour'" in sql
+        assert ":since" not in sql
+
+    def test_since_is_bound(self):
+        since = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        stmt = backfill_statement("minute", "country", since)
+        assert "timestamp >= :since" in str(stmt)
+        assert stmt.compile().params == {"since": since}
+
+    def test_unknown_granularity_rejected(self):
+        with pytest.raises(ValueError):
+            backfill_statement("day", "ip")
+
@@ -0,0 +1,168 @@
+"""
+Segmented Threat Score Log — Test Suite
+========================================
+Covers src/utils/score_log.py (binary records across segment files,
+bounded tail, reopening, torn writes, per-segment verification) and
+ThreatScoreSystem's snapshot + replay on restart.
+
+Run:  pytest tests/test_score_log.py -v
+"""
+
+import sys
+import os
+import asyncio
+import random
+import threading
+from datetime import datetime, timedelta
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.integrity import MerkleTree
+from src.utils.score_log import RECORD_SIZE, ScoreChainLog
+from src.utils.threat_score import ThreatScoreSystem
+
+T0 = datetime(2026, 10, 17, 12, 0)
+
+
+def _fill(log, n, start=0):
+    hashes = []
+    for i in range(start, start + n):
+        hashes.append(log.append(f"10.0.0.{i % 7}", "SQLI" if i % 3 else "BENIGN", 100, 85, bool(i % 3),
+                                 T0 + timedelta(seconds=i)))
+    return hashes
+
+
+class TestScoreChainLog:
+
+    def test_records_round_trip_across_segments(self, tmp_path):
+        log = ScoreChainLog(str(tmp_path), segment_records=4, tail_records=3)
+        hashes = _fill(log, 10)
+        assert len(log) == 10 and log.head_hash == hashes[-1]
+        assert sorted(os.listdir(tmp_path)) == ["LOCK", "segment-00000000.log",
+                                                "segment-00000001.log", "segment-00000002.log"]
+
+        page = log[3:9]                       # spans three segments, mostly off the tail
+        assert [r["hash"] for r in page] == hashes[3:9]
+        assert page[0]["previous_hash"] == hashes[2]
+        assert log[0]["previous_hash"] == "0" * 64
+        assert log[5]["timestamp"] == (T0 + timedelta(seconds=5)).isoformat()
+        assert log[-1]["ip_address"] == "10.0.0.2" and log[-1]["is_malicious"] is False
+        assert len(log._tail) == 3
+
+    def test_reopen_restores_length_head_and_tail(self, tmp_path):
+        log = ScoreChainLog(str(tmp_path), segment_records=4, tail_records=5)
+        hashes = _fill(log, 9)
+        log.close()
+
+        reopened = ScoreChainLog(str(tmp_path), segment_records=4, tail_records=5)
+        assert len(reopened) == 9 and reopened.head_hash == hashes[-1]
+        assert [RECORD_SIZE] * 5 == [len(r) for r in reopened._tail]
+        hashes += _fill(reopened, 3, start=9)
+        assert [r["hash"] for r in reopened] == hashes
+        assert reopened.verify_range(0, 12) is None
+
+    def test_torn_final_write_is_dropped(self, tmp_path):
+        log = ScoreChainLog(str(tmp_path), segment_records=8)
+        hashes = _fill(log, 3)
+        log.close()
+        with open(tmp_path / "segment-00000000.log", "ab") as f:
+            f.write(b"\x01" * 40)
+        reopened = ScoreChainLog(str(tmp_path), segment_records=8)
+        assert len(reopened) == 3 and reopened.head_hash == hashes[-1]
+
+    def test_verification_finds_edited_record(self, tmp_path):
+        log = ScoreChainLog(str(tmp_path), segment_records=4, tail_records=2)
+        _fill(log, 10)
+        assert log.verify_range(0, 10) is None
+        with open(tmp_path / "segment-00000001.log", "r+b") as f:
+            f.seek(RECORD_SIZE + 64 + 8)     # record 5, first byte of the IP
+            f.write(b"9")
+        log._read_cache = (-1, b"")
+        assert log.verify_range(0, 10) == 5
+        assert log.verify_range(0, 5) is None and log.verify_range(6, 10) is None
+
+    def test_records_for_ip_reads_segments_not_tail(self, tmp_path):
+        log = ScoreChainLog(str(tmp_path), segment_records=4, tail_records=3)
+        hashes = _fill(log, 20)
+        log._tail.clear()                     # a worker thread must not depend on it
+        total, page = log.records_for_ip("10.0.0.3", 1, 2, end=18)
+        assert total == 3                     # records 3, 10, 17 (24 is past end)
+        assert [r["hash"] for r in page] == [hashes[10], hashes[17]]
+
+        memory = ScoreChainLog(segment_records=4)
+        _fill(memory, 20)
+        assert memory.records_for_ip("10.0.0.3", 0, 10, end=20)[0] == 3
+
+    def test_slots_are_exclusive(self, tmp_path):
+        first = ScoreChainLog.open_slot(str(tmp_path))
+        second = ScoreChainLog.open_slot(str(tmp_path))
+        assert first.directory.endswith("slot-0") and second.directory.endswith("slot-1")
+        first.close()
+        assert ScoreChainLog.open_slot(str(tmp_path)).directory.endswith("slot-0")
+
+
+class TestThreatScorePersistence:
+
+    def _events(self, scores, n, seed):
+        rng = random.Random(seed)
+        for _ in range(n):
+            attack = rng.choice(["SQLI", "XSS", "BENIGN"])
+            scores.calculate_threat_score(f"10.1.0.{rng.randrange(12)}", attack, attack != "BENIGN")
+
+    def test_restart_replays_after_snapshot(self, tmp_path):
+        scores = ThreatScoreSystem(log_dir=str(tmp_path), snapshot_interval=25)
+        scores.load()
+        self._events(scores, 60, seed=1)
+        expected = {
+            "ip_scores": dict(scores.ip_scores),
+            "reputation": {ip: scores.get_ip_reputation(ip) for ip in scores.ip_scores},
+            "history": {ip: scores.get_score_history(ip) for ip in scores.ip_scores},
+            "state": scores.checkpoint_state(),
+            "types": dict(scores.attack_type_counts),
+        }
+        scores.score_chain.close()            # crash: no final snapshot
+
+        restarted = ThreatScoreSystem(log_dir=str(tmp_path), snapshot_interval=25)
+        assert restarted.load() == 10         # records 50..59, after the 50-record snapshot
+        assert dict(restarted.ip_scores) == expected["ip_scores"]
+        assert {ip: restarted.get_ip_reputation(ip) for ip in restarted.ip_scores} == expected["reputation"]
+        assert {ip: restarted.get_score_history(ip) for ip in restarted.ip_scores} == expected["history"]
+        assert restarted.checkpoint_state() == expected["state"]
+        assert dict(restarted.attack_type_counts) == expected["types"]
+        assert restarted.accumulator.root() == MerkleTree.from_hashes(
+            [r["hash"] for r in restarted.score_chain]).root_hash
+
+        self._events(restarted, 5, seed=2)
+        assert restarted.verify_chain_integrity(full=True)
+        restarted.close()
+        assert ThreatScoreSystem(log_dir=str(tmp_path)).load() == 0
+
+    @pytest.mark.asyncio
+    async def test_snapshot_on_request_path_is_written_in_a_thread(self, tmp_path, monkeypatch):
+        scores = ThreatScoreSystem(log_dir=str(tmp_path), snapshot_interval=25)
+        scores.load()
+        writers = []
+        save = scores.score_chain.save_snapshot
+        monkeypatch.setattr(scores.score_chain, "save_snapshot",
+                            lambda state: (writers.append(threading.get_ident()), save(state)))
+        self._events(scores, 25, seed=3)
+        assert scores._snapshot_task is not None and scores.snapshot_written == 0
+        await scores._snapshot_task
+        assert scores.snapshot_written == 25
+        assert writers and writers[0] != threading.get_ident()
+
+        self._events(scores, 5, seed=4)
+        scores.close()                        # blocking final snapshot at 30
+        assert scores.snapshot_written == 30
+        assert ThreatScoreSystem(log_dir=str(tmp_path)).load() == 0
+
+    def test_history_is_bounded(self):
+        scores = ThreatScoreSystem(history_per_ip=5)
+        for _ in range(12):
+            scores.calculate_threat_score("10.2.0.1", "XSS", True)
+        history = scores.get_score_history("10.2.0.1")
+        assert len(history) == 5 and history[-1]["new_score"] == 0
+        assert scores.get_ip_reputation("10.2.0.1")["total_attacks"] == 12
+        assert len(scores.score_chain) == 12
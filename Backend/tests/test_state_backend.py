@@ -0,0 +1,182 @@
+"""
+Shared Rate-Limit / Reputation State — Test Suite
+==================================================
+Covers src/utils/state_backend.py: the host-wide SQLite backend seen by
+several worker processes, and the tarpit, login limiter and threat
+scores staying correct when each worker holds its own instance.
+
+Run:  pytest tests/test_state_backend.py -v
+"""
+
+import sys
+import os
+import multiprocessing
+import sqlite3
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.config import settings
+from src.utils.login_rate_limiter import LoginRateLimiter
+from src.utils.state_backend import (
+    InProcessStateBackend,
+    SharedStateBackend,
+    create_state_backend,
+)
+from src.utils.tarpit_manager import TarpitManager
+from src.utils.threat_score import ThreatScoreSystem
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _worker_hits(path, n):
+    backend = SharedStateBackend(path)
+    for _ in range(n):
+        backend.hit("tarpit", "1.2.3.4", 60, 10_000)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "state.db")
+
+
+class TestSharedStateBackend:
+
+    def test_window_and_event_cap(self, db_path):
+        clock = FakeClock()
+        backend = SharedStateBackend(db_path, clock=clock)
+        assert [backend.hit("ns", "a", 10, 3) for _ in range(5)] == [1, 2, 3, 3, 3]
+        clock.now += 11
+        assert backend.count("ns", "a", 10) == 0
+        assert backend.hit("ns", "a", 10, 3) == 1
+
+    def test_sweep_drops_idle_and_caps_keys(self, db_path):
+        clock = FakeClock()
+        backend = SharedStateBackend(db_path, max_keys=2, sweep_interval=10_000, clock=clock)
+        backend.hit("ns", "idle", 10, 5)
+        clock.now += 20
+        for key in ("a", "b", "c"):
+            clock.now += 1
+            backend.hit("ns", key, 10, 5)
+        assert backend.sweep("ns", 10) == 2
+        assert backend.active_keys("ns") == 2
+        assert backend.count("ns", "a", 10) == 0 and backend.count("ns", "c", 10) == 1
+
+    def test_adjust_is_clamped(self, db_path):
+        backend = SharedStateBackend(db_path)
+        assert backend.adjust_value("scores", "ip", -15, 100, 0, 100) == (100, 85)
+        assert backend.adjust_value("scores", "ip", -90, 100, 0, 100) == (85, 0)
+        assert backend.values("scores") == {"ip": 0}
+
+    def test_counts_span_processes(self, db_path):
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=_worker_hits, args=(db_path, 25)) for _ in range(3)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(30)
+            assert p.exitcode == 0
+        assert SharedStateBackend(db_path).count("tarpit", "1.2.3.4", 60) == 75
+
+    def test_changes_since_version(self, db_path):
+        backend = SharedStateBackend(db_path, max_keys=3)
+        assert backend.changes("scores", 0) == (0, None)
+        backend.set_value("scores", "a", 5)
+        backend.set_value("scores", "b", 1)
+        version, changed = backend.changes("scores", 0)
+        assert changed is None and version == 2
+
+        backend.update_value("scores", "a", lambda v: None)
+        backend.adjust_value("scores", "c", 2, 0, 0, 10)
+        assert backend.changes("scores", version) == (4, {"a": None, "c": 2})
+        assert backend.delete_values_below("scores", 1.5) == 1
+        assert backend.changes("scores", 4) == (5, {"b": None})
+        assert backend.changes("scores", 5) == (5, {})
+
+        for i in range(3):                    # markers older than max_keys versions go
+            backend.set_value("scores", f"k{i}", 9)
+        backend.delete_values_below("scores", 0)
+        assert backend.changes("scores", 4) == (9, None)
+        assert backend.changes("scores", 6)[1] == {"k1": 9, "k2": 9}
+
+    def test_locked_database_fails_open(self, db_path):
+        backend = SharedStateBackend(db_path, busy_timeout=0.01)
+        assert backend.hit("ns", "a", 10, 5) == 1
+        blocker = sqlite3.connect(db_path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        try:
+            tarpit = TarpitManager(backend=backend)
+            assert tarpit.record_request("5.5.5.5") == (False, 0.0)
+            assert not LoginRateLimiter(backend=backend).record_attempt("5.5.5.5")
+            assert backend.hit("ns", "a", 10, 5) == 1      # local count only
+            assert backend.fallbacks == 3 and backend.get_stats()["fallbacks"] == 3
+        finally:
+            blocker.execute("ROLLBACK")
+        assert backend.hit("ns", "a", 10, 5) == 2
+
+    def test_factory(self, monkeypatch):
+        assert isinstance(create_state_backend("memory"), InProcessStateBackend)
+        with pytest.raises(ValueError):
+            create_state_backend("redis")
+
+
+class TestMultiWorkerComponents:
+    """One component instance per simulated worker, all on one shared file."""
+
+    def test_tarpit_threshold_reached_across_workers(self, db_path):
+        workers = [TarpitManager(backend=SharedStateBackend(db_path)) for _ in range(4)]
+        results = [workers[i % 4].record_request("6.6.6.6") for i in range(settings.TARPIT_THRESHOLD + 1)]
+        assert not any(tarpitted for tarpitted, _ in results[:-1])
+        assert results[-1][0]
+
+        workers[0].block_ip("6.6.6.6", 5)
+        assert workers[3].is_blocked("6.6.6.6")
+        assert workers[2].get_stats()["blocked_ips"] == 1
+
+    def test_login_brute_force_across_workers(self, db_path):
+        a = LoginRateLimiter(backend=SharedStateBackend(db_path))
+        b = LoginRateLimiter(backend=SharedStateBackend(db_path))
+        assert not a.record_attempt("7.7.7.7")
+        assert not b.record_attempt("7.7.7.7")
+        assert a.record_attempt("7.7.7.7")
+        assert b.is_rate_limited("7.7.7.7")
+        b.reset_attempts("7.7.7.7")
+        assert not a.is_rate_limited("7.7.7.7")
+
+    def test_threat_scores_accumulate_across_workers(self, db_path):
+        a = ThreatScoreSystem(backend=SharedStateBackend(db_path))
+        b = ThreatScoreSystem(backend=SharedStateBackend(db_path))
+        assert a.calculate_threat_score("8.8.8.8", "SQLI", True) == 85
+        assert b.calculate_threat_score("8.8.8.8", "XSS", True) == 73
+        assert a.get_ip_score("8.8.8.8") == 73
+        assert [t["ip_address"] for t in a.get_top_threats()] == ["8.8.8.8"]
+
+        b.reset_score("8.8.8.8")
+        assert a.get_ip_score("8.8.8.8") == 100
+
+    def test_score_sync_is_incremental(self, db_path, monkeypatch):
+        a = ThreatScoreSystem(backend=SharedStateBackend(db_path))
+        b = ThreatScoreSystem(backend=SharedStateBackend(db_path))
+        for i in range(5):
+            b.calculate_threat_score(f"8.8.4.{i}", "SQLI", True)
+        a.sync_scores()                       # first sync: full reload
+        assert len(a.score_index) == 5
+
+        monkeypatch.setattr(a.backend, "values", lambda ns: pytest.fail("full reload"))
+        b.calculate_threat_score("8.8.4.9", "XSS", True)
+        b.reset_score("8.8.4.0")
+        a.sync_scores()
+        assert sorted(a.score_index) == ["8.8.4.1", "8.8.4.2", "8.8.4.3", "8.8.4.4", "8.8.4.9"]
+
+    def test_in_process_backend_keeps_local_scores(self):
+        scores = ThreatScoreSystem(backend=InProcessStateBackend())
+        assert scores.backend is None
+        assert scores.calculate_threat_score("9.9.9.9", "SQLI", True) == 85
+        assert scores.ip_scores["9.9.9.9"] == 85
@@ -0,0 +1,208 @@
+"""
+Streaming STIX 2.1 Export — Test Suite
+=======================================
+Covers src/api/export/stix.py: deterministic uuid5 object ids, per-IP
+indicator de-duplication, RFC 3339 timestamps, the incrementally written
+bundle (valid JSON, resume cursor trailer) and the insertion-ordered
+keyset query used for since-cursor exports, including logs inserted
+after an export with an older timestamp.
+
+Run:  pytest tests/test_stix_export.py -v
+"""
+
+import sys
+import os
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.dialects import postgresql
+
+from src.api.export import stix
+from src.api.export.stix import (
+    StixBundleBuilder,
+    create_stix_bundle,
+    stix_id,
+    stix_timestamp,
+    stream_stix_bundle,
+)
+from src.core.database_postgres import decode_log_cursor, logs_keyset_query
+
+T0 = datetime(2026, 10, 17, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def _log(i, ip="10.0.0.1", malicious=True, attack_type="SQLI", inserted_at=None):
+    return SimpleNamespace(
+        id=uuid4(), attacker_ip=ip, command_entered=f"cmd{i}",
+        timestamp=T0 + timedelta(seconds=i),
+        inserted_at=inserted_at or T0 + timedelta(seconds=i),
+        log_metadata={"classification": {"is_malicious": malicious, "attack_type": attack_type}},
+    )
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class TestObjects:
+
+    def test_timestamps_are_rfc3339_utc(self):
+        assert stix_timestamp(T0) == "2026-10-17T12:00:00.123Z"
+        assert stix_timestamp(T0.replace(tzinfo=None)) == "2026-10-17T12:00:00.123Z"
+        local = T0.astimezone(timezone(timedelta(hours=-5)))
+        assert stix_timestamp(local) == "2026-10-17T12:00:00.123Z"
+
+    def test_ids_are_deterministic(self):
+        log = _log(0)
+        first = StixBundleBuilder().objects_for_log(log)
+        second = StixBundleBuilder().objects_for_log(log)
+        assert [o["id"] for o in first] == [o["id"] for o in second]
+        assert first[0]["id"] == stix_id("indicator", "10.0.0.1")
+
+    def test_indicator_emitted_once_per_ip(self):
+        builder = StixBundleBuilder()
+        objects = [o for i in range(3) for o in builder.objects_for_log(_log(i))]
+        objects += builder.objects_for_log(_log(3, ip="10.0.0.2"))
+
+        types = [o["type"] for o in objects]
+        assert types.count("indicator") == 2
+        assert types.count("attack-pattern") == 1
+        assert types.count("relationship") == 2
+        assert types.count("sighting") == 4
+        assert len({o["id"] for o in objects}) == len(objects)
+        assert builder.object_count == len(objects)
+
+    def test_benign_logs_only_sighted(self):
+        objects = StixBundleBuilder().objects_for_log(_log(0, malicious=False))
+        assert [o["type"] for o in objects] == ["indicator", "sighting"]
+
+    def test_shared_objects_keep_created_across_exports(self):
+        first = {o["id"]: o for o in StixBundleBuilder().objects_for_log(_log(0))}
+        later = {o["id"]: o for o in StixBundleBuilder().objects_for_log(_log(3600))}
+        for object_id, obj in first.items():
+            if obj["type"] == "sighting":
+                continue
+            assert later[object_id]["created"] == obj["created"] == "1970-01-01T00:00:00.000Z"
+            assert later[object_id]["modified"] > obj["modified"]
+        assert StixBundleBuilder().identity() == StixBundleBuilder().identity()
+
+    def test_evicted_ip_reuses_same_id(self):
+        builder = StixBundleBuilder(dedupe_capacity=1)
+        a = builder.objects_for_log(_log(0, ip="1.1.1.1", malicious=False))
+        builder.objects_for_log(_log(1, ip="2.2.2.2", malicious=False))
+        again = builder.objects_for_log(_log(2, ip="1.1.1.1", malicious=False))
+        assert again[0]["id"] == a[0]["id"]
+
+
+class TestStreaming:
+
+    async def test_stream_is_valid_bundle_with_cursor(self):
+        logs = [_log(i, ip=f"10.0.0.{i % 3}") for i in range(10)]
+        chunks = await _collect(stream_stix_bundle(_aiter(logs), chunk_objects=5))
+        bundle = json.loads("".join(chunks))
+
+        assert len(chunks) > 3
+        assert bundle["type"] == "bundle"
+        assert bundle["objects"][0]["type"] == "identity"
+        expected = create_stix_bundle(logs)["objects"]
+        assert [o["id"] for o in bundle["objects"]] == [o["id"] for o in expected]
+        assert decode_log_cursor(bundle["x_chameleon_next_cursor"]) == (logs[-1].inserted_at, logs[-1].id)
+
+    async def test_empty_export_keeps_resume_cursor(self):
+        chunks = await _collect(stream_stix_bundle(_aiter([]), resume_cursor="abc"))
+        bundle = json.loads("".join(chunks))
+        assert [o["type"] for o in bundle["objects"]] == ["identity"]
+        assert bundle["x_chameleon_next_cursor"] == "abc"
+
+
+class TestIncrementalQuery:
+
+    def test_forward_query_after_cursor_and_range(self):
+        stmt = logs_keyset_query(
+            after=(T0, uuid4()), tenant_id="t", newest_first=False,
+            since=T0 - timedelta(days=1), until=T0 + timedelta(days=1),
+        )
+        sql = str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+        assert "ORDER BY honeypot_logs.timestamp ASC, honeypot_logs.id ASC" in sql
+        assert "honeypot_logs.timestamp >= $2" in sql
+        assert "honeypot_logs.timestamp < $3" in sql
+        assert "(honeypot_logs.timestamp, honeypot_logs.id) >" in sql
+
+    def test_insertion_ordered_query_leaves_unsettled_rows(self):
+        stmt = logs_keyset_query(
+            after=(T0, uuid4()), tenant_id="t", newest_first=False,
+            by_insertion=True, settle_seconds=60,
+        )
+        sql = str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+        assert "ORDER BY honeypot_logs.inserted_at ASC, honeypot_logs.id ASC" in sql
+        assert "honeypot_logs.inserted_at < now() - $2" in sql
+        assert "(honeypot_logs.inserted_at, honeypot_logs.id) >" in sql
+
+
+class FakeLogTable:
+    """``honeypot_logs`` stand-in with the insertion-ordered query semantics."""
+
+    def __init__(self, monkeypatch):
+        self.rows = []
+        self.now = T0
+        monkeypatch.setattr(stix, "db", SimpleNamespace(session_factory=self._session))
+        monkeypatch.setattr(stix, "stream_honeypot_logs", self._stream)
+
+    def insert(self, log):
+        self.now += timedelta(seconds=1)
+        log.inserted_at = self.now
+        self.rows.append(log)
+
+    @asynccontextmanager
+    async def _session(self):
+        yield None
+
+    async def _stream(self, session, tenant_id, newest_first, by_insertion, settle_seconds, after=None, **_):
+        assert by_insertion and not newest_first
+        rows = sorted(self.rows, key=lambda r: (r.inserted_at, r.id))
+        for row in rows:
+            if row.inserted_at >= self.now - timedelta(seconds=settle_seconds):
+                continue
+            if after is not None and (row.inserted_at, row.id) <= after:
+                continue
+            yield row
+
+
+class TestLateInserts:
+
+    async def _export(self, table, cursor=None):
+        after = decode_log_cursor(cursor) if cursor else None
+        logs = stix._tenant_logs("t", after=after)
+        bundle = json.loads("".join(await _collect(stream_stix_bundle(logs, resume_cursor=cursor))))
+        sighted = [o["description"] for o in bundle["objects"] if o["type"] == "sighting"]
+        return sighted, bundle["x_chameleon_next_cursor"]
+
+    async def test_log_with_older_timestamp_inserted_after_export_is_not_skipped(self, monkeypatch):
+        monkeypatch.setattr(stix.settings, "STIX_EXPORT_SETTLE_SECONDS", 60)
+        table = FakeLogTable(monkeypatch)
+        for i in range(3):
+            table.insert(_log(i))
+        table.now += timedelta(minutes=5)
+        sighted, cursor = await self._export(table)
+        assert sighted == ["cmd0", "cmd1", "cmd2"]
+
+        # Replayed from a spill file: timestamp from before the export
+        table.insert(_log(-3600))
+        assert (await self._export(table, cursor))[0] == []     # not settled yet
+
+        table.now += timedelta(minutes=5)
+        sighted, cursor = await self._export(table, cursor)
+        assert sighted == ["cmd-3600"]
+        assert (await self._export(table, cursor))[0] == []
+
@@ -31,6 +31,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.optimization.meta_heuristics import (
     ThreatCalibratedPSO,
     AdaptiveTarpitPSO,
+    ParticleSwarm,
     TC_PSO_CONFIG,
     PSO_CONFIG,
     FITNESS_WEIGHTS,
@@ -57,6 +58,38 @@ def expected_fitness_multiplier(anomaly_score: float) -> float:
     return 1.0 + BETA * anomaly_score
 
 
+def reference_swarm_run(config: dict, sessions: List[Tuple[float, float]], w: float):
+    """
+    Per-particle reference loop for ParticleSwarm: initialise, then for
+    each (delay_used, fitness) update fitness histories and bests and move
+    every particle.  Returns (positions, best positions, global best).
+    """
+    lo, hi = config["min_delay"], config["max_delay"]
+    max_v = (hi - lo) * 0.3
+    particles = []
+    for _ in range(config["num_particles"]):
+        x = random.uniform(lo, hi)
+        particles.append({"x": x, "v": random.uniform(-max_v, max_v), "px": x,
+                          "pf": float("-inf"), "hist": []})
+    g_best = (3.0, float("-inf"))
+    for delay_used, fitness in sessions:
+        for p in particles:
+            if abs(p["x"] - delay_used) < 1.5:
+                p["hist"] = (p["hist"] + [fitness])[-config["fitness_history_size"]:]
+                avg = sum(p["hist"]) / len(p["hist"])
+                if avg > p["pf"]:
+                    p["pf"], p["px"] = avg, p["x"]
+                if avg > g_best[1]:
+                    g_best = (p["x"], avg)
+        for p in particles:
+            r1, r2 = random.random(), random.random()
+            v = w * p["v"] + config["cognitive_coefficient"] * r1 * (p["px"] - p["x"]) \
+                + config["social_coefficient"] * r2 * (g_best[0] - p["x"])
+            p["v"] = max(-max_v, min(max_v, v))
+            p["x"] = max(lo, min(p["x"] + p["v"], hi))
+    return [p["x"] for p in particles], [p["px"] for p in particles], g_best
+
+
 def simulate_attacker(delay: float) -> Tuple[int, bool]:
     """Synthetic attacker response model used throughout tests."""
     if delay > 5.0:
@@ -517,3 +550,52 @@ class TestTCPSOIntegration:
         ]
         for key in required_keys:
             assert key in stats, f"Missing key in swarm statistics: {key}"
+
+
+# ============================================================================
+# TEST GROUP 4 — Vectorized Swarm State
+# ============================================================================
+
+class TestVectorizedSwarm:
+    """ParticleSwarm must match the per-particle loop draw for draw."""
+
+    def _run(self, config, sessions, w):
+        swarm = ParticleSwarm(config)
+        g_best = (3.0, float("-inf"))
+        for delay_used, fitness in sessions:
+            new_best = swarm.record_fitness(delay_used, fitness, g_best[1])
+            if new_best is not None:
+                g_best = new_best
+            swarm.step(w, config["cognitive_coefficient"], config["social_coefficient"], g_best[0])
+        return list(swarm.position), list(swarm.best_position), g_best
+
+    @pytest.mark.parametrize("num_particles", [15, 2000])
+    def test_same_seed_same_swarm(self, num_particles):
+        config = {**TC_PSO_CONFIG, "num_particles": num_particles}
+        rng = random.Random(7)
+        sessions = [(rng.uniform(0, 13), rng.uniform(-3, 12)) for _ in range(60)]
+
+        random.seed(42)
+        expected = reference_swarm_run(config, sessions, W_BASE)
+        expected_next = random.random()
+        random.seed(42)
+        assert self._run(config, sessions, W_BASE) == expected
+        assert random.random() == expected_next, "RNG draws out of step with the reference loop"
+
+    def test_history_ring_averages_last_five(self):
+        swarm = ParticleSwarm({**PSO_CONFIG, "num_particles": 4})
+        swarm.position[:] = [1.0, 5.0, 5.5, 11.0]
+        for fitness in [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 10.0]:
+            swarm.record_fitness(5.2, fitness, float("inf"))
+        assert list(swarm.history_count) == [0, 7, 7, 0]
+        assert swarm.best_fitness[1] == swarm.best_fitness[2] == sum([3.0, 4.0, 5.0, 6.0, 10.0]) / 5
+        assert swarm.best_fitness[0] == float("-inf")
+
+    @pytest.mark.asyncio
+    async def test_many_tenant_categories(self):
+        pso = ThreatCalibratedPSO()
+        for tenant in range(50):
+            await pso.update_fitness(f"TENANT{tenant}_SQLI", 3.0, 8, False, bilstm_anomaly_score=0.9)
+        stats = pso.get_swarm_statistics("TENANT49_SQLI")
+        assert stats["iterations"] == 1 and stats["num_particles"] == TC_PSO_CONFIG["num_particles"]
+        assert MIN_DELAY <= await pso.get_optimal_delay("tenant49_sqli") <= MAX_DELAY
@@ -0,0 +1,127 @@
+"""
+Tenant Resolver Cache — Test Suite
+===================================
+Validates the cached tenant lookups in src/core/database_postgres.py
+against an in-memory SQLite ``tenants`` table: default-tenant and
+API-key hits issue no SQL, and ``create_tenant`` invalidates the cache.
+
+Run:  pytest tests/test_tenant_resolver.py -v
+"""
+
+import sys
+import os
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core import database_postgres
+from src.core.database_postgres import (
+    TenantResolver,
+    create_tenant,
+    get_default_tenant,
+    get_tenant_by_api_key,
+)
+from src.core.models_sqlalchemy import Tenant
+
+
+@pytest.fixture
+async def sessions(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Tenant.__table__.create)
+
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    monkeypatch.setattr(database_postgres, "tenant_resolver", TenantResolver(ttl_seconds=60))
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    yield factory, statements
+    await engine.dispose()
+
+
+def _selects(statements):
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+class TestDefaultTenant:
+
+    async def test_second_lookup_hits_cache(self, sessions):
+        factory, statements = sessions
+        async with factory() as session:
+            await create_tenant(session, email="a@x", api_key="key-a")
+            await session.commit()
+
+        statements.clear()
+        for _ in range(5):
+            async with factory() as session:
+                tenant = await get_default_tenant(session)
+                assert tenant.email == "a@x"
+
+        assert len(_selects(statements)) == 1
+        assert database_postgres.tenant_resolver.stats["default_hits"] == 4
+
+    async def test_missing_tenant_is_not_cached(self, sessions):
+        factory, statements = sessions
+        async with factory() as session:
+            assert await get_default_tenant(session) is None
+            await create_tenant(session, email="a@x", api_key="key-a")
+            await session.commit()
+        async with factory() as session:
+            assert (await get_default_tenant(session)).api_key == "key-a"
+
+    async def test_create_tenant_invalidates(self, sessions):
+        factory, _ = sessions
+        resolver = database_postgres.tenant_resolver
+        async with factory() as session:
+            await create_tenant(session, email="a@x", api_key="key-a")
+            await session.commit()
+        async with factory() as session:
+            await get_default_tenant(session)
+        assert resolver.get_stats()["default_cached"]
+
+        async with factory() as session:
+            await create_tenant(session, email="b@x", api_key="key-b")
+            await session.commit()
+        assert not resolver.get_stats()["default_cached"]
+
+    async def test_cached_tenant_survives_rollback_elsewhere(self, sessions):
+        factory, _ = sessions
+        async with factory() as session:
+            await create_tenant(session, email="a@x", api_key="key-a")
+            await session.commit()
+        async with factory() as session:
+            await get_default_tenant(session)
+            await session.rollback()
+        async with factory() as session:
+            assert await database_postgres.tenant_resolver.default_tenant_id(session)
+
+
+class TestApiKeyCache:
+
+    async def test_api_key_lookups_cached(self, sessions):
+        factory, statements = sessions
+        async with factory() as session:
+            await create_tenant(session, email="a@x", api_key="key-a")
+            await create_tenant(session, email="b@x", api_key="key-b")
+            await session.commit()
+
+        statements.clear()
+        for _ in range(3):
+            async with factory() as session:
+                assert (await get_tenant_by_api_key(session, "key-b")).email == "b@x"
+        assert len(_selects(statements)) == 1
+
+    async def test_unknown_keys_not_cached(self, sessions):
+        factory, statements = sessions
+        statements.clear()
+        for _ in range(2):
+            async with factory() as session:
+                assert await get_tenant_by_api_key(session, "nope") is None
+        assert len(_selects(statements)) == 2
@@ -0,0 +1,161 @@
+"""
+Indexed Threat Scores — Test Suite
+===================================
+Checks the decay-key index, time-decayed reputation and per-IP
+activity counters in src/utils/threat_score.py against brute-force
+scans of ip_scores and attack_history.
+
+Run:  pytest tests/test_threat_score_index.py -v
+"""
+
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+import pytest
+
+# ── path setup ──────────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.threat_score import DecayIndex, IpActivity, ThreatScoreSystem
+
+ATTACKS = ["SQLI", "XSS", "SSI", "BRUTE_FORCE", "BENIGN"]
+
+
+def _populated(seed=3, events=600, ips=40):
+    rng = random.Random(seed)
+    scores = ThreatScoreSystem()
+    for _ in range(events):
+        attack = rng.choice(ATTACKS)
+        scores.calculate_threat_score(f"10.0.0.{rng.randrange(ips)}", attack, attack != "BENIGN")
+    return scores
+
+
+class FakeClock:
+    def __init__(self, now=datetime(2026, 10, 17, 12, 0)):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestDecayIndex:
+
+    def test_highest_is_ordered_and_limited(self):
+        index = DecayIndex()
+        for ip, key in [("a", 2.0), ("b", 4.0), ("c", 0.5), ("d", 3.0)]:
+            index.update(ip, key)
+        index.update("c", 5.0)
+        assert list(index.highest(1.0)) == [("c", 5.0), ("b", 4.0), ("d", 3.0), ("a", 2.0)]
+        assert list(index.highest(2.5, limit=2)) == [("c", 5.0), ("b", 4.0)]
+        assert index.count_at_least(3.0) == 3
+
+    def test_remove_and_pop_below(self):
+        index = DecayIndex()
+        for ip, key in [("a", 1.0), ("b", 2.0), ("c", 3.0)]:
+            index.update(ip, key)
+        index.update("a", None)
+        index.remove("missing")
+        assert index.pop_below(3.0) == ["b"]
+        assert len(index) == 1 and list(index.highest(float("-inf"))) == [("c", 3.0)]
+
+
+class TestThreatScoreQueries:
+
+    def test_top_threats_match_full_sort(self):
+        scores = _populated()
+        expected = sorted((s, ip) for ip, s in scores.ip_scores.items() if s < 100)
+        top = scores.get_top_threats(limit=7)
+        assert [t["score"] for t in top] == [s for s, _ in expected[:7]]
+        assert all(scores.ip_scores[t["ip_address"]] == t["score"] for t in top)
+
+    def test_flagged_match_threshold_scan(self):
+        scores = _populated(seed=5)
+        flagged = scores.get_flagged_ips(threshold=70)
+        assert {f["ip_address"] for f in flagged} == {ip for ip, s in scores.ip_scores.items() if s < 70}
+        assert [f["score"] for f in flagged] == sorted(f["score"] for f in flagged)
+        assert scores.count_flagged_ips(threshold=70) == len(flagged)
+
+    def test_reputation_counters_match_history(self):
+        scores = _populated(seed=9)
+        for ip, history in scores.attack_history.items():
+            rep = scores.get_ip_reputation(ip)
+            assert rep["total_attacks"] == sum(h["attack_type"] != "BENIGN" for h in history)
+            assert rep["recent_attacks"] == len(history)
+            assert rep["first_seen"] == history[0]["timestamp"].isoformat()
+            assert rep["last_seen"] == history[-1]["timestamp"].isoformat()
+
+    def test_unknown_ip(self):
+        rep = ThreatScoreSystem().get_ip_reputation("192.0.2.1")
+        assert rep["score"] == 100 and rep["total_attacks"] == 0 and rep["first_seen"] is None
+
+    def test_reset_reindexes(self):
+        scores = ThreatScoreSystem()
+        scores.calculate_threat_score("10.1.1.1", "SQLI", True)
+        scores.reset_score("10.1.1.1")
+        assert scores.get_top_threats() == []
+
+
+class TestReputationDecay:
+
+    def test_deficit_halves_each_half_life(self):
+        clock = FakeClock()
+        scores = ThreatScoreSystem(half_life_hours=24, clock=clock)
+        assert scores.calculate_threat_score("10.3.0.1", "SQLI", True) == 85
+        assert scores.calculate_threat_score("10.3.0.1", "BENIGN", False) == 86   # +1 still applies
+        clock.now += timedelta(hours=24)
+        assert scores.ip_scores["10.3.0.1"] == 93
+        clock.now += timedelta(hours=48)
+        assert scores.get_ip_score("10.3.0.1") == 98
+        assert scores.calculate_threat_score("10.3.0.1", "XSS", True) == 86
+
+    def test_queries_track_decay_without_rescoring(self):
+        clock = FakeClock()
+        scores = ThreatScoreSystem(half_life_hours=1, clock=clock)
+        rng = random.Random(11)
+        for _ in range(300):
+            clock.now += timedelta(seconds=rng.randrange(60))
+            attack = rng.choice(ATTACKS)
+            scores.calculate_threat_score(f"10.4.0.{rng.randrange(30)}", attack, attack != "BENIGN")
+        for hours in (0, 1, 3, 8):
+            clock.now += timedelta(hours=hours)
+            current = dict(scores.ip_scores)
+            flagged = scores.get_flagged_ips(threshold=70)
+            assert {f["ip_address"] for f in flagged} == {ip for ip, s in current.items() if s < 70}
+            assert [f["score"] for f in flagged] == sorted(current[f["ip_address"]] for f in flagged)
+            assert scores.count_flagged_ips(threshold=70) == len(flagged)
+            top = scores.get_top_threats(limit=5)
+            assert [t["score"] for t in top] == sorted(s for s in current.values() if s < 100)[:5]
+
+    def test_sweep_forgets_recovered_ips(self):
+        clock = FakeClock()
+        scores = ThreatScoreSystem(half_life_hours=1, sweep_interval=600, clock=clock)
+        scores.calculate_threat_score("10.5.0.1", "SQLI", True)
+        clock.now += timedelta(hours=3)
+        scores.calculate_threat_score("10.5.0.2", "XSS", True)
+        clock.now += timedelta(hours=2)
+        assert scores.ip_scores["10.5.0.1"] == 100 and scores.ip_scores["10.5.0.2"] == 97
+        scores.calculate_threat_score("10.5.0.3", "BENIGN", False)   # triggers the sweep
+        assert set(scores.ip_scores) == {"10.5.0.2"}
+        assert set(scores.activity) == set(scores.attack_history) == {"10.5.0.2"}
+
+    def test_no_half_life_keeps_scores(self):
+        clock = FakeClock()
+        scores = ThreatScoreSystem(half_life_hours=0, clock=clock)
+        scores.calculate_threat_score("10.6.0.1", "SSI", True)
+        clock.now += timedelta(days=365)
+        assert scores.get_ip_score("10.6.0.1") == 90
+
+
+class TestIpActivity:
+
+    def test_hourly_ring_forgets_old_hours(self):
+        t0 = datetime(2026, 10, 17, 0, 30)
+        activity = IpActivity()
+        for h in range(30):
+            activity.record(t0 + timedelta(hours=h), "SQLI")
+        now = t0 + timedelta(hours=29)
+        assert activity.recent(now) == 24
+        assert activity.recent(now + timedelta(hours=10)) == 14
+        assert activity.recent(now + timedelta(days=2)) == 0
+        assert activity.total_attacks == 30